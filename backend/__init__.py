@@ -1,12 +1,17 @@
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager
-
-db = SQLAlchemy()
-jwt = JWTManager()
+from backend.extensions import db, jwt
+from backend.utils.json_provider import FastJSONProvider
 
 def create_app(config_name='default'):
+    """Aplicación mínima (modelos, JWT y JSON) usada por las pruebas
+
+    La aplicación completa, con blueprints y middlewares, la crea
+    ``backend.app.create_app``.
+    """
+    from backend.config import config
+
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
     # Configuración
     app.config.from_object(config[config_name])
@@ -15,19 +20,4 @@ def create_app(config_name='default'):
     db.init_app(app)
     jwt.init_app(app)
     
-    # Registrar blueprints
-    from .blueprints.auth import auth_bp
-    from .blueprints.clientes import clientes_bp
-    from .blueprints.vehiculos import vehiculos_bp
-    from .blueprints.servicios import servicios_bp
-    from .blueprints.mecanicos import mecanicos_bp
-    from .blueprints.horas_trabajo import horas_trabajo_bp
-    
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(clientes_bp, url_prefix='/api')
-    app.register_blueprint(vehiculos_bp, url_prefix='/api')
-    app.register_blueprint(servicios_bp, url_prefix='/api')
-    app.register_blueprint(mecanicos_bp, url_prefix='/api')
-    app.register_blueprint(horas_trabajo_bp, url_prefix='/api')
-    
-    return app 
\ No newline at end of file
+    return app
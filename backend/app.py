@@ -32,11 +32,17 @@ from backend.blueprints.reports import reports_bp
 from backend.api_docs import api_bp
 from backend.utils.logger import StructuredLogger, log_request, metrics, init_logger
 from backend.utils.error_monitor import init_error_monitoring
-from backend.utils.cache import cache
+from backend.utils.cache import cache, setup_cache
 from backend.blueprints.restore import restore_bp
 from flask_swagger_ui import get_swaggerui_blueprint
 from backend.middleware.security import SecurityMiddleware
 from backend.middleware.query_monitor import QueryMonitor
+from backend.middleware.compression import Compression
+from backend.utils.json_provider import FastJSONProvider
+from backend.services.search_service import search_service
+from backend.services.dashboard_service import dashboard_summary
+from backend.services.rollup_service import daily_rollups
+from backend.services.stock_alert_service import stock_alerts
 
 # Cargar variables de entorno
 load_dotenv()
@@ -60,6 +66,8 @@ import os
 
 def create_app():
     app = Flask(__name__)
+    # JSON con orjson (si está instalado) y fechas en ISO 8601
+    app.json = FastJSONProvider(app)
     
 <<<<<<< HEAD
     # Configuración
@@ -113,12 +121,28 @@ def create_app():
     # Configurar CORS
     setup_cors(app)
     
+    # Caché de dos niveles (LRU del proceso + Redis)
+    setup_cache(app)
+    
     # Inicializar monitoreo de errores
     init_error_monitoring(app)
     
     # Inicializar middlewares
     SecurityMiddleware(app)
     QueryMonitor(app)
+    Compression(app)
+    
+    # Índice de búsqueda de texto completo
+    search_service.init_app(app)
+    
+    # Contadores materializados del dashboard
+    dashboard_summary.init_app(app)
+    
+    # Resúmenes diarios de los reportes por período
+    daily_rollups.init_app(app)
+    
+    # Alertas de stock bajo al confirmar movimientos
+    stock_alerts.init_app(app)
     
     # Registrar blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
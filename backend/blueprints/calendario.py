@@ -19,8 +19,8 @@ def get_eventos():
             'eventos': [{
                 'id': e.id,
                 'title': e.title,
-                'start': e.start.isoformat(),
-                'end': e.end.isoformat(),
+                'start': e.start,
+                'end': e.end,
                 'descripcion': e.descripcion,
                 'cliente_id': e.cliente_id,
                 'vehiculo_id': e.vehiculo_id,
@@ -54,8 +54,8 @@ def create_evento():
             'evento': {
                 'id': evento.id,
                 'title': evento.title,
-                'start': evento.start.isoformat(),
-                'end': evento.end.isoformat()
+                'start': evento.start,
+                'end': evento.end
             }
         }), 201
     except Exception as e:
@@ -84,8 +84,8 @@ def update_evento(id):
             'evento': {
                 'id': evento.id,
                 'title': evento.title,
-                'start': evento.start.isoformat(),
-                'end': evento.end.isoformat()
+                'start': evento.start,
+                'end': evento.end
             }
         }), 200
     except Exception as e:
@@ -136,12 +136,12 @@ def get_disponibilidad_mecanico(mecanico_id):
                     break
                     
             if slot_disponible:
-                slots.append(hora_actual.isoformat())
+                slots.append(hora_actual)
                 
             hora_actual += timedelta(minutes=30)  # Slots de 30 minutos
             
         return jsonify({
-            'fecha': fecha.isoformat(),
+            'fecha': fecha,
             'mecanico_id': mecanico_id,
             'slots_disponibles': slots
         }), 200
@@ -174,8 +174,8 @@ def sugerir_evento():
                     "mecanico_id": mecanico.id,
                     "mecanico_nombre": f"{mecanico.nombre} {mecanico.apellido}",
                     "color": mecanico.color,
-                    "fecha_inicio": fecha_inicio.isoformat(),
-                    "fecha_fin": fecha_fin.isoformat()
+                    "fecha_inicio": fecha_inicio,
+                    "fecha_fin": fecha_fin
                 }), 200
             if menor_citas is None or len(eventos) < menor_citas:
                 menor_citas = len(eventos)
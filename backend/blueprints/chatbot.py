@@ -48,7 +48,7 @@ def procesar_consulta():
                         'id': servicio_actual.id,
                         'descripcion': servicio_actual.descripcion,
                         'estado': servicio_actual.estado,
-                        'fecha': servicio_actual.fecha.isoformat()
+                        'fecha': servicio_actual.fecha
                     }
                 }
         
@@ -158,7 +158,7 @@ def get_historial_chatbot(cliente_id):
         return jsonify([{
             'id': n.id,
             'mensaje': n.mensaje,
-            'fecha': n.fecha.isoformat(),
+            'fecha': n.fecha,
             'leida': n.leida
         } for n in notificaciones]), 200
     except Exception as e:
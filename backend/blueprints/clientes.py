@@ -4,11 +4,14 @@ from backend.extensions import db
 from backend.models import Cliente, Vehiculo, Servicio, Factura
 from datetime import datetime, timezone
 from sqlalchemy import or_
+from backend.services.search_service import search_service
+from backend.utils.conditional import conditional_get
 
 bp = Blueprint('clientes', __name__)
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@conditional_get('clientes:list', 'vehiculos:list', 'servicios:list')
 def listar_clientes():
     try:
         # Obtener parámetros de filtrado
@@ -21,19 +24,19 @@ def listar_clientes():
         # Aplicar filtros
         if estado:
             query = query.filter_by(estado=estado)
-        if busqueda:
-            query = query.filter(
-                or_(
-                    Cliente.nombre.ilike(f'%{busqueda}%'),
-                    Cliente.apellido.ilike(f'%{busqueda}%'),
-                    Cliente.email.ilike(f'%{busqueda}%'),
-                    Cliente.telefono.ilike(f'%{busqueda}%')
-                )
-            )
         
-        clientes = query.order_by(Cliente.apellido, Cliente.nombre).all()
+        paginacion = {}
+        if busqueda:
+            # Búsqueda por relevancia sobre el índice de texto completo
+            page = request.args.get('page', 1, type=int)
+            per_page = min(request.args.get('per_page', 20, type=int), 100)
+            clientes, total = search_service.buscar('cliente', busqueda, page, per_page, query=query)
+            paginacion = {'total': total, 'page': page, 'per_page': per_page}
+        else:
+            clientes = query.order_by(Cliente.apellido, Cliente.nombre).all()
         
         return jsonify({
+            **paginacion,
             'clientes': [{
                 'id': c.id,
                 'nombre': c.nombre,
@@ -148,8 +151,8 @@ def obtener_cliente(id):
             'servicios': [{
                 'id': s.id,
                 'tipo': s.tipo_servicio,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                'fecha_inicio': s.fecha_inicio,
+                'fecha_fin': s.fecha_fin,
                 'estado': s.estado,
                 'vehiculo': s.vehiculo.placa
             } for s in Servicio.query.join(Vehiculo).filter(Vehiculo.cliente_id == id).order_by(Servicio.fecha_inicio.desc()).all()]
@@ -180,8 +183,8 @@ def listar_vehiculos_cliente(id):
                 'servicios': [{
                     'id': s.id,
                     'tipo': s.tipo_servicio,
-                    'fecha_inicio': s.fecha_inicio.isoformat(),
-                    'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                    'fecha_inicio': s.fecha_inicio,
+                    'fecha_fin': s.fecha_fin,
                     'estado': s.estado
                 } for s in v.servicios]
             } for v in cliente.vehiculos]
@@ -265,7 +268,7 @@ def get_vehiculos():
             'servicios': [{
                 'id': s.id,
                 'descripcion': s.descripcion,
-                'fecha': s.fecha.isoformat(),
+                'fecha': s.fecha,
                 'estado': s.estado
             } for s in v.servicios]
         } for v in vehiculos]), 200
@@ -288,7 +291,7 @@ def get_vehiculo(id):
             'servicios': [{
                 'id': s.id,
                 'descripcion': s.descripcion,
-                'fecha': s.fecha.isoformat(),
+                'fecha': s.fecha,
                 'estado': s.estado,
                 'mecanico': {
                     'id': s.mecanico.id,
@@ -298,7 +301,7 @@ def get_vehiculo(id):
             'facturas': [{
                 'id': f.id,
                 'numero': f.numero,
-                'fecha': f.fecha.isoformat(),
+                'fecha': f.fecha,
                 'total': f.total
             } for f in vehiculo.facturas]
         }), 200
@@ -359,7 +362,7 @@ def get_vehiculos_cliente(cliente_id):
             'servicios': [{
                 'id': s.id,
                 'descripcion': s.descripcion,
-                'fecha': s.fecha.isoformat(),
+                'fecha': s.fecha,
                 'estado': s.estado
             } for s in v.servicios]
         } for v in vehiculos]), 200
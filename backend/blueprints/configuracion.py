@@ -2,6 +2,7 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.models import Configuracion
 from backend.extensions import db
+from backend.utils.conditional import conditional_get
 import os
 from werkzeug.utils import secure_filename
 
@@ -10,6 +11,7 @@ configuracion_bp = Blueprint('configuracion', __name__)
 # Obtener configuración del sistema
 @configuracion_bp.route('/api/configuracion/sistema', methods=['GET'])
 @jwt_required()
+@conditional_get('configuracion:list')
 def obtener_configuracion():
     try:
         config = Configuracion.query.first()
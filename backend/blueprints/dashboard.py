@@ -1,16 +1,9 @@
-<<<<<<< HEAD
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required
-from models import Cliente, Vehiculo, Servicio, Mecanico, Factura, Inventario
-from extensions import db
-from sqlalchemy import func, and_
-=======
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models import Cliente, Vehiculo, Servicio, Mecanico, Factura
+from backend.models import Cliente, Vehiculo, Servicio, Factura, Inventario
 from backend.extensions import db
-from sqlalchemy import func
->>>>>>> cc4bc33f90ff4f4cfed9d9b715b5818b6f50788d
+from backend.services.dashboard_service import dashboard_summary
+from sqlalchemy import func, and_
 from datetime import datetime, timedelta
 
 bp = Blueprint('dashboard', __name__)
@@ -19,48 +12,49 @@ bp = Blueprint('dashboard', __name__)
 @jwt_required()
 def get_estadisticas():
     try:
-        # Estadísticas generales
-        total_clientes = Cliente.query.count()
-        total_vehiculos = Vehiculo.query.count()
-        total_servicios = Servicio.query.count()
-        total_mecanicos = Mecanico.query.count()
-        
-        # Servicios por estado
-        servicios_por_estado = db.session.query(
-            Servicio.estado, 
-            func.count(Servicio.id)
-        ).group_by(Servicio.estado).all()
-        
-        # Servicios de los últimos 30 días
-        fecha_limite = datetime.now() - timedelta(days=30)
-        servicios_recientes = Servicio.query.filter(
-            Servicio.fecha_inicio >= fecha_limite
-        ).count()
-        
-        # Ingresos de los últimos 30 días
-        ingresos_recientes = db.session.query(
-            func.sum(Factura.total)
-        ).join(Servicio).filter(
-            Servicio.fecha_inicio >= fecha_limite,
-            Servicio.estado == 'completado'
-        ).scalar() or 0
+        # Lectura O(1) de los contadores materializados
+        resumen = dashboard_summary.leer(dias=30)
+        totales = resumen['totales']
         
         return jsonify({
             'estadisticas_generales': {
-                'total_clientes': total_clientes,
-                'total_vehiculos': total_vehiculos,
-                'total_servicios': total_servicios,
-                'total_mecanicos': total_mecanicos
+                'total_clientes': totales['cliente'],
+                'total_vehiculos': totales['vehiculo'],
+                'total_servicios': totales['servicio'],
+                'total_mecanicos': totales['mecanico']
             },
-            'servicios_por_estado': dict(servicios_por_estado),
+            'servicios_por_estado': resumen['servicios_por_estado'],
             'ultimos_30_dias': {
-                'servicios': servicios_recientes,
-                'ingresos': float(ingresos_recientes)
+                'servicios': resumen['recientes']['servicios'],
+                'ingresos': resumen['recientes']['ingresos']
             }
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_estadisticas():
+    """Envía los cambios del dashboard por Server-Sent Events
+
+    Al conectar se envía el resumen completo (evento ``resumen``) y después
+    un evento ``cambio`` por cada cambio de estado, factura o movimiento
+    confirmado, con solo los contadores que variaron. Cada conexión dura como
+    máximo ``DASHBOARD_SSE_MAX_DURACION`` segundos y el navegador reconecta.
+    EventSource no permite cabeceras, así que el token se acepta también
+    como ``?jwt=<token>``.
+    """
+    eventos = dashboard_summary.stream(
+        max_duracion=current_app.config.get('DASHBOARD_SSE_MAX_DURACION', 300),
+        heartbeat=current_app.config.get('DASHBOARD_SSE_HEARTBEAT', 15)
+    )
+    
+    return Response(
+        stream_with_context(eventos),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @bp.route('/api/dashboard/servicios', methods=['GET'])
 def get_servicios_dashboard():
     try:
@@ -190,7 +184,7 @@ def get_proximos_servicios():
             {
                 'vehiculo': f"{servicio.Vehiculo.marca} {servicio.Vehiculo.modelo}",
                 'cliente': f"{servicio.Cliente.nombre} {servicio.Cliente.apellido}",
-                'fecha': servicio.Servicio.fecha_programada.isoformat(),
+                'fecha': servicio.Servicio.fecha_programada,
                 'tipo': servicio.Servicio.tipo
             }
             for servicio in proximos_servicios
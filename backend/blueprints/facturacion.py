@@ -4,6 +4,7 @@ from backend.models import Factura, Pago, Servicio, Vehiculo, Cliente, Usuario
 from backend.extensions import db
 from datetime import datetime, timezone
 from sqlalchemy import func
+from backend.services.dashboard_service import dashboard_summary
 
 facturacion_bp = Blueprint('facturacion', __name__)
 
@@ -16,7 +17,7 @@ def get_facturas():
         return jsonify([{
             'id': f.id,
             'numero': f.numero,
-            'fecha': f.fecha.isoformat(),
+            'fecha': f.fecha,
             'total': f.total,
             'estado': f.estado,
             'cliente': {
@@ -34,7 +35,7 @@ def get_facturas():
                 'id': s.id,
                 'tipo': s.tipo_servicio,
                 'descripcion': s.descripcion,
-                'fecha': s.fecha_inicio.isoformat()
+                'fecha': s.fecha_inicio
             } for s in f.servicios]
         } for f in facturas]), 200
     except Exception as e:
@@ -48,7 +49,7 @@ def get_factura(id):
         return jsonify({
             'id': factura.id,
             'numero': factura.numero,
-            'fecha': factura.fecha.isoformat(),
+            'fecha': factura.fecha,
             'total': factura.total,
             'estado': factura.estado,
             'cliente': {
@@ -69,8 +70,8 @@ def get_factura(id):
                 'id': s.id,
                 'tipo': s.tipo_servicio,
                 'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                'fecha_inicio': s.fecha_inicio,
+                'fecha_fin': s.fecha_fin,
                 'mecanico': {
                     'id': s.mecanico.id,
                     'nombre': f"{s.mecanico.nombre} {s.mecanico.apellido}",
@@ -159,6 +160,11 @@ def create_factura():
         db.session.add(factura)
         db.session.commit()
         
+        dashboard_summary.publicar_cambio('factura', {
+            'factura_id': factura.id,
+            'total': factura.total
+        })
+        
         return jsonify({
             'message': 'Factura creada exitosamente',
             'id': factura.id
@@ -247,7 +253,7 @@ def get_pagos(factura_id):
         return jsonify([{
             'id': p.id,
             'monto': p.monto,
-            'fecha': p.fecha.isoformat(),
+            'fecha': p.fecha,
             'metodo': p.metodo,
             'referencia': p.referencia
         } for p in pagos]), 200
@@ -286,7 +292,7 @@ def get_reporte_ventas():
             'facturas': [{
                 'id': f.id,
                 'numero': f.numero,
-                'fecha': f.fecha.isoformat(),
+                'fecha': f.fecha,
                 'total': f.total,
                 'estado': f.estado,
                 'cliente': f.vehiculo.cliente.nombre if f.vehiculo and f.vehiculo.cliente else None
@@ -304,7 +310,7 @@ def get_facturas_cliente(cliente_id):
         return jsonify([{
             'id': f.id,
             'numero': f.numero,
-            'fecha': f.fecha.isoformat(),
+            'fecha': f.fecha,
             'total': f.total,
             'estado': f.estado,
             'vehiculo': {
@@ -326,7 +332,7 @@ def get_facturas_vehiculo(vehiculo_id):
         return jsonify([{
             'id': f.id,
             'numero': f.numero,
-            'fecha': f.fecha.isoformat(),
+            'fecha': f.fecha,
             'total': f.total,
             'estado': f.estado,
             'cliente': {
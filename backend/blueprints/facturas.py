@@ -44,7 +44,7 @@ def listar_facturas():
             'facturas': [{
                 'id': f.id,
                 'numero': f.numero,
-                'fecha': f.fecha.isoformat(),
+                'fecha': f.fecha,
                 'total': f.total,
                 'estado': f.estado,
                 'servicio': {
@@ -73,15 +73,15 @@ def obtener_factura(id):
         return jsonify({
             'id': factura.id,
             'numero': factura.numero,
-            'fecha': factura.fecha.isoformat(),
+            'fecha': factura.fecha,
             'total': factura.total,
             'estado': factura.estado,
             'servicio': {
                 'id': factura.servicio.id,
                 'tipo': factura.servicio.tipo_servicio,
                 'descripcion': factura.servicio.descripcion,
-                'fecha_inicio': factura.servicio.fecha_inicio.isoformat(),
-                'fecha_fin': factura.servicio.fecha_fin.isoformat() if factura.servicio.fecha_fin else None,
+                'fecha_inicio': factura.servicio.fecha_inicio,
+                'fecha_fin': factura.servicio.fecha_fin,
                 'vehiculo': {
                     'id': factura.servicio.vehiculo.id,
                     'placa': factura.servicio.vehiculo.placa,
@@ -105,7 +105,7 @@ def obtener_factura(id):
                 } for r in factura.servicio.repuestos],
                 'horas_trabajo': [{
                     'id': h.id,
-                    'fecha': h.fecha.isoformat(),
+                    'fecha': h.fecha,
                     'horas': h.horas,
                     'descripcion': h.descripcion,
                     'mecanico': f"{h.mecanico.nombre} {h.mecanico.apellido}",
@@ -179,7 +179,7 @@ def listar_facturas_servicio(id):
             'facturas': [{
                 'id': f.id,
                 'numero': f.numero,
-                'fecha': f.fecha.isoformat(),
+                'fecha': f.fecha,
                 'total': f.total,
                 'estado': f.estado
             } for f in servicio.facturas]
@@ -39,10 +39,10 @@ def get_horas_trabajo():
             'id': h.id,
             'mecanico_id': h.mecanico_id,
             'servicio_id': h.servicio_id,
-            'fecha': h.fecha.isoformat(),
+            'fecha': h.fecha,
             'horas_trabajadas': h.horas_trabajadas,
             'descripcion': h.descripcion,
-            'fecha_registro': h.fecha_registro.isoformat(),
+            'fecha_registro': h.fecha_registro,
             'costo': h.calcular_costo()
         } for h in horas]), 200
     except Exception as e:
@@ -57,10 +57,10 @@ def get_hora_trabajo(id):
             'id': hora.id,
             'mecanico_id': hora.mecanico_id,
             'servicio_id': hora.servicio_id,
-            'fecha': hora.fecha.isoformat(),
+            'fecha': hora.fecha,
             'horas_trabajadas': hora.horas_trabajadas,
             'descripcion': hora.descripcion,
-            'fecha_registro': hora.fecha_registro.isoformat(),
+            'fecha_registro': hora.fecha_registro,
             'costo': hora.calcular_costo()
         }), 200
     except Exception as e:
@@ -97,10 +97,10 @@ def create_hora_trabajo():
             'id': hora.id,
             'mecanico_id': hora.mecanico_id,
             'servicio_id': hora.servicio_id,
-            'fecha': hora.fecha.isoformat(),
+            'fecha': hora.fecha,
             'horas_trabajadas': hora.horas_trabajadas,
             'descripcion': hora.descripcion,
-            'fecha_registro': hora.fecha_registro.isoformat(),
+            'fecha_registro': hora.fecha_registro,
             'costo': hora.calcular_costo()
         }), 201
     except Exception as e:
@@ -128,10 +128,10 @@ def update_hora_trabajo(id):
             'id': hora.id,
             'mecanico_id': hora.mecanico_id,
             'servicio_id': hora.servicio_id,
-            'fecha': hora.fecha.isoformat(),
+            'fecha': hora.fecha,
             'horas_trabajadas': hora.horas_trabajadas,
             'descripcion': hora.descripcion,
-            'fecha_registro': hora.fecha_registro.isoformat(),
+            'fecha_registro': hora.fecha_registro,
             'costo': hora.calcular_costo()
         }), 200
     except Exception as e:
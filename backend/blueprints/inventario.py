@@ -1,22 +1,40 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Repuesto, MovimientoInventario, db
-<<<<<<< HEAD
-from datetime import datetime, timedelta
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
-from functools import wraps
-from utils.api_response import success_response, error_response, paginated_response
-from sqlalchemy import or_
-=======
+from backend.models import Repuesto, MovimientoInventario, Proveedor, db
 from datetime import datetime
->>>>>>> cc4bc33f90ff4f4cfed9d9b715b5818b6f50788d
+from backend.utils.api_response import success_response, error_response, paginated_response, cursor_response
+from backend.utils.pagination import keyset_paginate, estimate_count, InvalidCursorError
+from backend.utils.decorators import transaction_handler
+from backend.utils.error_handlers import handle_error
+from backend.services.stock_service import StockService, StockInsuficienteError, RepuestoNoEncontradoError
+from backend.services.search_service import search_service
+from backend.services.dashboard_service import dashboard_summary
+from backend.utils.conditional import conditional_get
 
 inventario_bp = Blueprint('inventario', __name__)
+stock_service = StockService()
 
 # ========== REPUESTOS ==========
 
+def _serializar_repuesto_lista(r):
+    """Formato de un repuesto en los listados"""
+    return {
+        'id': r.id,
+        'codigo': r.codigo,
+        'nombre': r.nombre,
+        'descripcion': r.descripcion,
+        'categoria': r.categoria,
+        'stock_actual': r.stock,
+        'stock_minimo': r.stock_minimo,
+        'precio_compra': r.precio_compra,
+        'precio_venta': r.precio_venta,
+        'estado': r.estado,
+        'proveedor': getattr(r, 'proveedor', '') or ''
+    }
+
 @inventario_bp.route('/repuestos', methods=['GET'])
 @jwt_required()
+@conditional_get('repuestos:list')
 def get_repuestos():
     try:
         # Obtener parámetros de paginación y filtrado
@@ -34,36 +52,53 @@ def get_repuestos():
             query = query.filter_by(categoria=categoria)
         if stock_bajo:
             query = query.filter(Repuesto.stock <= Repuesto.stock_minimo)
+        coincidencias = None
         if busqueda:
-            query = query.filter(
-                or_(
-                    Repuesto.nombre.ilike(f'%{busqueda}%'),
-                    Repuesto.codigo.ilike(f'%{busqueda}%'),
-                    Repuesto.categoria.ilike(f'%{busqueda}%')
-                )
+            # Búsqueda sobre el índice de texto completo en lugar de ILIKE '%...%'
+            coincidencias = search_service.coincidencias('repuesto', busqueda)
+            query = query.join(coincidencias, Repuesto.id == coincidencias.c.entidad_id)
+        
+        # Modo cursor: búsqueda por (nombre, id) sin OFFSET ni COUNT obligatorio
+        if 'cursor' in request.args:
+            cursor = request.args.get('cursor') or None
+            modo_total = request.args.get('count', 'none')
+            
+            repuestos, next_cursor = keyset_paginate(
+                query,
+                [('nombre', Repuesto.nombre), ('id', Repuesto.id)],
+                cursor=cursor,
+                per_page=per_page
+            )
+            
+            total = None
+            if modo_total == 'exact':
+                total = query.count()
+            elif modo_total == 'estimated':
+                filtrado = bool(categoria or stock_bajo or busqueda)
+                total = estimate_count(query, Repuesto, filtered=filtrado)
+            
+            return cursor_response(
+                items=[_serializar_repuesto_lista(r) for r in repuestos],
+                next_cursor=next_cursor,
+                per_page=per_page,
+                total=total,
+                total_estimated=modo_total == 'estimated',
+                message="Lista de repuestos obtenida exitosamente"
             )
         
         # Obtener total y aplicar paginación
         total = query.count()
-        repuestos = query.order_by(Repuesto.nombre)\
+        orden = [Repuesto.nombre]
+        if coincidencias is not None:
+            # Con búsqueda, los resultados más relevantes primero
+            orden = [coincidencias.c.puntuacion, Repuesto.nombre, Repuesto.id]
+        repuestos = query.order_by(*orden)\
             .offset((page - 1) * per_page)\
             .limit(per_page)\
             .all()
         
         # Formatear respuesta
-        items = [{
-            'id': r.id,
-            'codigo': r.codigo,
-            'nombre': r.nombre,
-            'descripcion': r.descripcion,
-            'categoria': r.categoria,
-            'stock_actual': r.stock,
-            'stock_minimo': r.stock_minimo,
-            'precio_compra': r.precio_compra,
-            'precio_venta': r.precio_venta,
-            'estado': r.estado,
-            'proveedor': getattr(r, 'proveedor', '') or ''
-        } for r in repuestos]
+        items = [_serializar_repuesto_lista(r) for r in repuestos]
         
         return paginated_response(
             items=items,
@@ -73,6 +108,12 @@ def get_repuestos():
             message="Lista de repuestos obtenida exitosamente"
         )
         
+    except InvalidCursorError as e:
+        return error_response(
+            message="Cursor de paginación inválido",
+            errors=[str(e)],
+            status_code=400
+        )
     except Exception as e:
         return error_response(
             message="Error al obtener la lista de repuestos",
@@ -108,8 +149,6 @@ def get_repuesto(id):
             status_code=500
         )
 
-<<<<<<< HEAD
-=======
 # ========== VALIDACIONES DE REPUESTOS ==========
 
 def validar_repuesto(data, es_actualizacion=False):
@@ -169,7 +208,6 @@ def validar_repuesto(data, es_actualizacion=False):
     
     return errores
 
->>>>>>> cc4bc33f90ff4f4cfed9d9b715b5818b6f50788d
 @inventario_bp.route('/repuestos', methods=['POST'])
 @jwt_required()
 @transaction_handler
@@ -177,7 +215,6 @@ def create_repuesto():
     try:
         data = request.get_json()
         
-<<<<<<< HEAD
         # Validar datos
         errores = validar_repuesto(data)
         if errores:
@@ -194,24 +231,13 @@ def create_repuesto():
                 errors=[f'El código del repuesto {data["codigo"]} ya existe'],
                 status_code=400
             )
-=======
-        # Validar campos requeridos
-        required_fields = ['codigo', 'nombre', 'categoria', 'precio_compra', 'precio_venta']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Campo {field} es requerido'}), 400
-        
-        # Verificar código único
-        if Repuesto.query.filter_by(codigo=data['codigo']).first():
-            return jsonify({'error': 'El código del repuesto ya existe'}), 400
->>>>>>> cc4bc33f90ff4f4cfed9d9b715b5818b6f50788d
         
         # Crear repuesto
         repuesto = Repuesto(
             codigo=data['codigo'],
             nombre=data['nombre'],
             descripcion=data.get('descripcion', ''),
-            categoria=data['categoria'],
+            categoria=data.get('categoria'),
             stock=data.get('stock', 0),
             stock_minimo=data.get('stock_minimo', 0),
             precio_compra=float(data['precio_compra']),
@@ -222,20 +248,13 @@ def create_repuesto():
         db.session.add(repuesto)
         db.session.commit()
         
-<<<<<<< HEAD
         return success_response(
             data={
-=======
-        return jsonify({
-            'mensaje': 'Repuesto creado exitosamente',
-            'repuesto': {
->>>>>>> cc4bc33f90ff4f4cfed9d9b715b5818b6f50788d
                 'id': repuesto.id,
                 'codigo': repuesto.codigo,
                 'nombre': repuesto.nombre,
                 'categoria': repuesto.categoria,
                 'stock_actual': repuesto.stock
-<<<<<<< HEAD
             },
             message="Repuesto creado exitosamente",
             status_code=201
@@ -248,14 +267,6 @@ def create_repuesto():
             errors=[str(e)],
             status_code=500
         )
-=======
-            }
-        }), 201
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': str(e)}), 500
->>>>>>> cc4bc33f90ff4f4cfed9d9b715b5818b6f50788d
 
 @inventario_bp.route('/repuestos/<int:id>', methods=['PUT'])
 @jwt_required()
@@ -363,34 +374,28 @@ def validar_movimiento_inventario(repuesto_id, cantidad, tipo):
     return True, None
 
 def registrar_movimiento(repuesto_id, cantidad, tipo, notas=None, servicio_id=None, usuario_id=None):
-    """Registra un movimiento en el inventario"""
+    """Registra un movimiento en el inventario
+    
+    El stock se actualiza con un UPDATE condicional en la base de datos, sin
+    leer el repuesto antes, para no perder actualizaciones concurrentes.
+    """
     try:
-        # Validar movimiento
-        es_valido, mensaje = validar_movimiento_inventario(repuesto_id, cantidad, tipo)
-        if not es_valido:
-            return False, mensaje
-            
-        # Crear movimiento
-        movimiento = MovimientoInventario(
-            repuesto_id=repuesto_id,
-            tipo=tipo,
-            cantidad=cantidad,
+        resultado = stock_service.registrar(
+            repuesto_id,
+            cantidad,
+            tipo,
             notas=notas,
             servicio_id=servicio_id,
             usuario_id=usuario_id
         )
-        
-        # Actualizar stock
-        repuesto = Repuesto.query.get(repuesto_id)
-        if tipo == 'entrada':
-            repuesto.stock += cantidad
-        else:  # salida
-            repuesto.stock -= cantidad
-            
-        db.session.add(movimiento)
-        db.session.commit()
-        
+        dashboard_summary.publicar_cambio('movimiento', resultado)
         return True, "Movimiento registrado exitosamente"
+    except RepuestoNoEncontradoError:
+        return False, "Repuesto no encontrado"
+    except StockInsuficienteError:
+        return False, "Stock insuficiente"
+    except ValueError as e:
+        return False, str(e)
     except Exception as e:
         db.session.rollback()
         return False, str(e)
@@ -410,47 +415,35 @@ def create_movimiento():
             if field not in data:
                 return jsonify({'error': f'Campo {field} es requerido'}), 400
         
-        # Obtener repuesto
-        repuesto = Repuesto.query.get_or_404(data['repuesto_id'])
-        
-        # Validar tipo
-        if data['tipo'] not in ['entrada', 'salida']:
-            return jsonify({'error': 'Tipo debe ser entrada o salida'}), 400
+        # Validar tipo y cantidad
+        error = StockService.validar(data['tipo'], data['cantidad'])
+        if error:
+            return jsonify({'error': error}), 400
         
-        # Validar cantidad para salida
-        cantidad = int(data['cantidad'])
-        if data['tipo'] == 'salida' and repuesto.stock < cantidad:
+        # Crear movimiento y actualizar stock de forma atómica
+        try:
+            movimiento = stock_service.registrar(
+                data['repuesto_id'],
+                int(data['cantidad']),
+                data['tipo'],
+                notas=data.get('motivo', ''),  # ✅ Cambiar a 'notas' pero mantener compatibilidad con 'motivo'
+                servicio_id=data.get('servicio_id'),
+                usuario_id=data.get('usuario_id')
+            )
+        except RepuestoNoEncontradoError:
+            return jsonify({'error': 'Repuesto no encontrado'}), 404
+        except StockInsuficienteError:
             return jsonify({'error': 'Stock insuficiente'}), 400
         
-        # Crear movimiento
-        movimiento = MovimientoInventario(
-            repuesto_id=data['repuesto_id'],
-            tipo=data['tipo'],
-            cantidad=cantidad,
-            notas=data.get('motivo', ''),  # ✅ Cambiar a 'notas' pero mantener compatibilidad con 'motivo'
-            fecha=datetime.utcnow(),
-            servicio_id=data.get('servicio_id'),
-            usuario_id=data.get('usuario_id')
-        )
-        
-        # Actualizar stock
-        if data['tipo'] == 'entrada':
-            repuesto.stock += cantidad
-        else:  # salida
-            repuesto.stock -= cantidad
-        
-        repuesto.fecha_actualizacion = datetime.utcnow()
-        
-        db.session.add(movimiento)
-        db.session.commit()
+        dashboard_summary.publicar_cambio('movimiento', movimiento)
         
         return jsonify({
             'mensaje': 'Movimiento registrado exitosamente',
             'movimiento': {
-                'id': movimiento.id,
-                'tipo': movimiento.tipo,
-                'cantidad': movimiento.cantidad,
-                'stock_actual': repuesto.stock
+                'id': movimiento['id'],
+                'tipo': movimiento['tipo'],
+                'cantidad': movimiento['cantidad'],
+                'stock_actual': movimiento['stock_actual']
             }
         }), 201
         
@@ -458,6 +451,77 @@ def create_movimiento():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Registrar varios movimientos en una sola petición
+@inventario_bp.route('/movimientos/bulk', methods=['POST'])
+@jwt_required()
+def create_movimientos_bulk():
+    """Registra un lote de movimientos con una validación, un INSERT y un commit
+    
+    Acepta una lista de movimientos o ``{"movimientos": [...], "atomico": bool}``.
+    Con ``atomico=true`` el lote se aplica completo o no se aplica; por defecto
+    se aceptan los movimientos válidos y se informa el resultado de cada uno.
+    """
+    try:
+        data = request.get_json()
+        atomico = False
+        if isinstance(data, dict):
+            atomico = bool(data.get('atomico', False))
+            data = data.get('movimientos')
+        
+        if not isinstance(data, list) or not data:
+            return jsonify({'error': 'Se requiere una lista de movimientos'}), 400
+        
+        max_items = current_app.config.get('INVENTARIO_BULK_MAX_ITEMS', 500)
+        if len(data) > max_items:
+            return jsonify({'error': f'El lote no puede superar {max_items} movimientos'}), 400
+        
+        usuario_id = get_jwt_identity()
+        for mov in data:
+            if isinstance(mov, dict):
+                mov.setdefault('usuario_id', usuario_id)
+                mov.setdefault('notas', mov.get('motivo', ''))
+        
+        if atomico:
+            invalidos = [i for i, mov in enumerate(data) if not isinstance(mov, dict)]
+            if invalidos:
+                return jsonify({'error': 'Cada movimiento debe ser un objeto', 'indices': invalidos}), 400
+            try:
+                movimientos = stock_service.registrar_lote(data)
+            except RepuestoNoEncontradoError as e:
+                return jsonify({'error': 'Repuesto no encontrado', 'repuestos': e.repuesto_ids}), 404
+            except StockInsuficienteError as e:
+                return jsonify({'error': 'Stock insuficiente', 'repuestos': e.repuesto_ids}), 400
+            except (KeyError, TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            
+            dashboard_summary.publicar_cambio('movimientos', {'exitosos': len(movimientos)})
+            
+            return jsonify({
+                'mensaje': 'Movimientos registrados exitosamente',
+                'resultados': {
+                    'exitosos': len(movimientos),
+                    'fallidos': 0,
+                    'items': [dict(m, indice=i, exito=True) for i, m in enumerate(movimientos)]
+                }
+            }), 201
+        
+        resultado = stock_service.registrar_lote_parcial(data)
+        if resultado['exitosos']:
+            dashboard_summary.publicar_cambio('movimientos', {'exitosos': resultado['exitosos']})
+        
+        return jsonify({
+            'mensaje': f"{resultado['exitosos']} movimientos registrados, {resultado['fallidos']} rechazados",
+            'resultados': {
+                'exitosos': resultado['exitosos'],
+                'fallidos': resultado['fallidos'],
+                'items': resultado['resultados']
+            }
+        }), 201 if resultado['fallidos'] == 0 else 207
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 # Obtener movimientos de un repuesto (corregido)
 @inventario_bp.route('/repuestos/<int:id>/movimientos', methods=['GET'])
 @jwt_required()
@@ -478,7 +542,7 @@ def get_movimientos_repuesto(id):
                 'tipo': m.tipo,
                 'cantidad': m.cantidad,
                 'notas': m.notas,
-                'fecha': m.fecha.isoformat()
+                'fecha': m.fecha
             } for m in movimientos]
         }), 200
         
@@ -18,14 +18,14 @@ def get_historial_vehiculo(vehiculo_id):
             'id': h.id,
             'tipo': h.tipo,
             'descripcion': h.descripcion,
-            'fecha': h.fecha.isoformat(),
+            'fecha': h.fecha,
             'kilometraje': h.kilometraje,
             'costo': h.costo,
             'servicio_id': h.servicio_id,
             'servicio': {
                 'id': h.servicio.id,
                 'descripcion': h.servicio.descripcion,
-                'fecha': h.servicio.fecha.isoformat(),
+                'fecha': h.servicio.fecha,
                 'mecanico': {
                     'id': h.servicio.mecanico.id,
                     'nombre': h.servicio.mecanico.nombre
@@ -76,7 +76,7 @@ def get_mantenimiento_predictivo(vehiculo_id):
             
             if ultimo:
                 ultimos_mantenimientos[tipo] = {
-                    'fecha': ultimo.fecha.isoformat(),
+                    'fecha': ultimo.fecha,
                     'kilometraje': ultimo.kilometraje
                 }
         
@@ -86,7 +86,7 @@ def get_mantenimiento_predictivo(vehiculo_id):
         # Mantenimiento de aceite (cada 5000 km o 6 meses)
         if 'aceite' in ultimos_mantenimientos:
             ultimo = ultimos_mantenimientos['aceite']
-            fecha_ultimo = datetime.fromisoformat(ultimo['fecha'])
+            fecha_ultimo = ultimo['fecha']
             km_ultimo = ultimo['kilometraje']
             
             # Por kilometraje
@@ -127,7 +127,7 @@ def get_mantenimiento_predictivo(vehiculo_id):
         # Mantenimiento de frenos (cada 20000 km o 1 año)
         if 'frenos' in ultimos_mantenimientos:
             ultimo = ultimos_mantenimientos['frenos']
-            fecha_ultimo = datetime.fromisoformat(ultimo['fecha'])
+            fecha_ultimo = ultimo['fecha']
             km_ultimo = ultimo['kilometraje']
             
             # Por kilometraje
@@ -200,7 +200,7 @@ def get_notificaciones():
             'id': n.id,
             'tipo': n.tipo,
             'mensaje': n.mensaje,
-            'fecha': n.fecha.isoformat(),
+            'fecha': n.fecha,
             'leida': n.leida,
             'cliente_id': n.cliente_id,
             'cliente': {
@@ -169,8 +169,8 @@ def get_servicios_mecanico(id):
                 'tipo_servicio': s.tipo_servicio,
                 'descripcion': s.descripcion,
                 'estado': s.estado,
-                'fecha_inicio': s.fecha_inicio.isoformat() if s.fecha_inicio else None,
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                'fecha_inicio': s.fecha_inicio,
+                'fecha_fin': s.fecha_fin,
                 'honorarios': s.honorarios,
                 'vehiculo': {
                     'id': s.vehiculo.id,
@@ -1,17 +1,57 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
-from models import (
+from backend.models import (
     Cliente, Vehiculo, Servicio, Factura, Repuesto,
     Mecanico, MovimientoInventario, Usuario
 )
-from extensions import db
-from sqlalchemy import or_
+from backend.extensions import db
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from backend.services.search_service import search_service
+from backend.utils.conditional import conditional_get
+from backend.utils.serializers import (
+    ServicioSerializer, FacturaSerializer, RepuestoSerializer, nombre_completo
+)
 
 relaciones_bp = Blueprint('relaciones', __name__)
 
+def _repuestos_de_servicio(s, ctx):
+    """Repuestos usados en el servicio con la cantidad de sus movimientos"""
+    movimientos = ctx.relacion(s, 'movimientos_inventario')
+    return [{
+        'id': r.id,
+        'nombre': r.nombre,
+        'cantidad': next((m.cantidad for m in movimientos if m.repuesto_id == r.id), 0),
+        'precio': r.precio_venta
+    } for r in s.repuestos]
+
+# Historial de servicios: facturas y movimientos (relaciones dinámicas) se precargan en bloque
+SERVICIO_HISTORIAL_VEHICULO = ServicioSerializer(
+    campos=('id', 'descripcion', 'fecha_inicio', 'fecha_fin', 'estado'),
+    relaciones={'facturas': FacturaSerializer(primero=True, clave='factura')},
+    calculados={
+        'tipo': lambda s, ctx: s.tipo_servicio,
+        'mecanico': lambda s, ctx: nombre_completo(s.mecanico),
+        'repuestos': _repuestos_de_servicio
+    },
+    requiere=('mecanico', 'repuestos', 'movimientos_inventario')
+)
+
+SERVICIO_HISTORIAL_CLIENTE = ServicioSerializer(
+    campos=('id', 'descripcion', 'fecha_inicio', 'fecha_fin', 'estado'),
+    relaciones={'facturas': FacturaSerializer(primero=True, clave='factura')},
+    calculados={
+        'tipo': lambda s, ctx: s.tipo_servicio,
+        'vehiculo': lambda s, ctx: s.vehiculo.placa if s.vehiculo else None,
+        'mecanico': lambda s, ctx: nombre_completo(s.mecanico)
+    },
+    requiere=('vehiculo', 'mecanico')
+)
+
 # Clientes y Vehículos
 @relaciones_bp.route('/api/relaciones/clientes', methods=['GET'])
 @jwt_required()
+@conditional_get('clientes:list', 'vehiculos:list')
 def get_clientes():
     try:
         clientes = Cliente.query.filter_by(estado='activo').all()
@@ -32,6 +72,7 @@ def get_clientes():
 
 @relaciones_bp.route('/api/relaciones/vehiculos', methods=['GET'])
 @jwt_required()
+@conditional_get('vehiculos:list', 'clientes:list')
 def get_vehiculos():
     try:
         vehiculos = Vehiculo.query.all()
@@ -51,6 +92,7 @@ def get_vehiculos():
 # Mecánicos
 @relaciones_bp.route('/api/relaciones/mecanicos', methods=['GET'])
 @jwt_required()
+@conditional_get('mecanicos:list', 'servicios:list')
 def get_mecanicos():
     try:
         mecanicos = Mecanico.query.filter_by(estado='activo').all()
@@ -66,6 +108,7 @@ def get_mecanicos():
 # Repuestos
 @relaciones_bp.route('/api/relaciones/repuestos', methods=['GET'])
 @jwt_required()
+@conditional_get('repuestos:list')
 def get_repuestos():
     try:
         repuestos = Repuesto.query.filter_by(estado='activo').all()
@@ -85,6 +128,9 @@ def get_repuestos():
 # Servicios
 @relaciones_bp.route('/api/relaciones/servicios', methods=['GET'])
 @jwt_required()
+@conditional_get(
+    'servicios:list', 'vehiculos:list', 'clientes:list', 'mecanicos:list', 'repuestos:list', 'movimientos:list'
+)
 def get_servicios():
     try:
         servicios = Servicio.query.all()
@@ -110,6 +156,7 @@ def get_servicios():
 # Facturas
 @relaciones_bp.route('/api/relaciones/facturas', methods=['GET'])
 @jwt_required()
+@conditional_get('facturas:list', 'clientes:list', 'vehiculos:list', 'servicios:list')
 def get_facturas():
     try:
         facturas = Factura.query.all()
@@ -126,81 +173,88 @@ def get_facturas():
         return jsonify({'error': str(e)}), 500
 
 # Búsqueda global
+ENTIDADES_BUSQUEDA = ('clientes', 'vehiculos', 'servicios', 'repuestos')
+
+def _consultas_busqueda(tipos):
+    """Consultas base por entidad, con las relaciones que usa el serializador ya cargadas"""
+    consultas = {
+        'cliente': select(Cliente).where(Cliente.estado == 'activo'),
+        'vehiculo': select(Vehiculo).where(Vehiculo.estado == 'activo')
+            .options(joinedload(Vehiculo.cliente)),
+        'servicio': select(Servicio)
+            .options(joinedload(Servicio.vehiculo).joinedload(Vehiculo.cliente)),
+        'repuesto': select(Repuesto).where(Repuesto.estado == 'activo'),
+    }
+    return {entidad: consulta for entidad, consulta in consultas.items() if f"{entidad}s" in tipos}
+
+def _serializar_resultado(resultado):
+    """Convierte un resultado de la búsqueda federada en un dict JSON"""
+    tipo = resultado['tipo']
+    r = resultado['registro']
+    if tipo == 'cliente':
+        datos = {
+            'id': r.id,
+            'nombre': f"{r.nombre} {r.apellido}",
+            'email': r.email,
+            'telefono': r.telefono
+        }
+    elif tipo == 'vehiculo':
+        datos = {
+            'id': r.id,
+            'placa': r.placa,
+            'marca': r.marca,
+            'modelo': r.modelo,
+            'cliente': f"{r.cliente.nombre} {r.cliente.apellido}" if r.cliente else None
+        }
+    elif tipo == 'servicio':
+        cliente = r.vehiculo.cliente if r.vehiculo else None
+        datos = {
+            'id': r.id,
+            'tipo': r.tipo_servicio,
+            'estado': r.estado,
+            'vehiculo': r.vehiculo.placa if r.vehiculo else None,
+            'cliente': f"{cliente.nombre} {cliente.apellido}" if cliente else None
+        }
+    else:
+        datos = {
+            'id': r.id,
+            'nombre': r.nombre,
+            'codigo': r.codigo,
+            'categoria': r.categoria,
+            'stock': r.stock
+        }
+    return {'tipo': tipo, 'relevancia': resultado['relevancia'], **datos}
+
 @relaciones_bp.route('/api/buscar', methods=['GET'])
 @jwt_required()
 def buscar():
+    """Búsqueda federada en clientes, vehículos, servicios y repuestos
+
+    Parámetros:
+        q: Término de búsqueda
+        limit: Máximo de resultados por tipo (por defecto 5, máximo 50)
+        top: Máximo de resultados en total (por defecto 20, máximo 100)
+        tipos: Lista separada por comas de clientes, vehiculos, servicios, repuestos
+    """
     try:
-        termino = request.args.get('q', '')
+        termino = request.args.get('q', '').strip()
         if not termino:
             return jsonify({'error': 'Término de búsqueda requerido'}), 400
         
-        # Buscar en clientes
-        clientes = Cliente.query.filter(
-            or_(
-                Cliente.nombre.ilike(f'%{termino}%'),
-                Cliente.apellido.ilike(f'%{termino}%'),
-                Cliente.email.ilike(f'%{termino}%'),
-                Cliente.telefono.ilike(f'%{termino}%')
-            ),
-            Cliente.estado == 'activo'
-        ).all()
-        
-        # Buscar en vehículos
-        vehiculos = Vehiculo.query.filter(
-            or_(
-                Vehiculo.placa.ilike(f'%{termino}%'),
-                Vehiculo.marca.ilike(f'%{termino}%'),
-                Vehiculo.modelo.ilike(f'%{termino}%')
-            ),
-            Vehiculo.estado == 'activo'
-        ).all()
+        limite = max(1, min(request.args.get('limit', 5, type=int), 50))
+        top = max(1, min(request.args.get('top', 20, type=int), 100))
+        tipos = [t.strip() for t in request.args.get('tipos', ','.join(ENTIDADES_BUSQUEDA)).split(',')]
+        invalidos = [t for t in tipos if t not in ENTIDADES_BUSQUEDA]
+        if invalidos:
+            return jsonify({'error': f"Tipos de búsqueda no válidos: {', '.join(invalidos)}"}), 400
         
-        # Buscar en servicios
-        servicios = Servicio.query.filter(
-            or_(
-                Servicio.tipo_servicio.ilike(f'%{termino}%'),
-                Servicio.descripcion.ilike(f'%{termino}%')
-            )
-        ).all()
-        
-        # Buscar en repuestos
-        repuestos = Repuesto.query.filter(
-            or_(
-                Repuesto.nombre.ilike(f'%{termino}%'),
-                Repuesto.codigo.ilike(f'%{termino}%'),
-                Repuesto.categoria.ilike(f'%{termino}%')
-            ),
-            Repuesto.estado == 'activo'
-        ).all()
+        # Cada entidad se busca con su propio LIMIT y en paralelo
+        federado = search_service.buscar_federado(termino, _consultas_busqueda(tipos), limite, top)
         
         return jsonify({
-            'clientes': [{
-                'id': c.id,
-                'nombre': f"{c.nombre} {c.apellido}",
-                'email': c.email,
-                'telefono': c.telefono
-            } for c in clientes],
-            'vehiculos': [{
-                'id': v.id,
-                'placa': v.placa,
-                'marca': v.marca,
-                'modelo': v.modelo,
-                'cliente': f"{v.cliente.nombre} {v.cliente.apellido}"
-            } for v in vehiculos],
-            'servicios': [{
-                'id': s.id,
-                'tipo': s.tipo_servicio,
-                'estado': s.estado,
-                'vehiculo': s.vehiculo.placa,
-                'cliente': f"{s.vehiculo.cliente.nombre} {s.vehiculo.cliente.apellido}"
-            } for s in servicios],
-            'repuestos': [{
-                'id': r.id,
-                'nombre': r.nombre,
-                'codigo': r.codigo,
-                'categoria': r.categoria,
-                'stock': r.stock
-            } for r in repuestos]
+            'termino': termino,
+            'resultados': [_serializar_resultado(r) for r in federado['resultados']],
+            'hay_mas': {f"{entidad}s": valor for entidad, valor in federado['hay_mas'].items()}
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -212,7 +266,8 @@ def get_historial_vehiculo(id):
     try:
         vehiculo = Vehiculo.query.get_or_404(id)
         
-        servicios = Servicio.query.filter_by(vehiculo_id=id).order_by(Servicio.fecha_inicio.desc()).all()
+        servicios = SERVICIO_HISTORIAL_VEHICULO.aplicar(Servicio.query)\
+            .filter_by(vehiculo_id=id).order_by(Servicio.fecha_inicio.desc()).all()
         
         return jsonify({
             'vehiculo': {
@@ -223,27 +278,7 @@ def get_historial_vehiculo(id):
                 'año': vehiculo.año,
                 'cliente': f"{vehiculo.cliente.nombre} {vehiculo.cliente.apellido}"
             },
-            'servicios': [{
-                'id': s.id,
-                'tipo': s.tipo_servicio,
-                'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
-                'estado': s.estado,
-                'mecanico': f"{s.mecanico.nombre} {s.mecanico.apellido}" if s.mecanico else None,
-                'repuestos': [{
-                    'id': r.id,
-                    'nombre': r.nombre,
-                    'cantidad': next((m.cantidad for m in s.movimientos_inventario if m.repuesto_id == r.id), 0),
-                    'precio': r.precio
-                } for r in s.repuestos],
-                'factura': {
-                    'id': s.facturas[0].id,
-                    'numero': s.facturas[0].numero,
-                    'total': s.facturas[0].total,
-                    'estado': s.facturas[0].estado
-                } if s.facturas else None
-            } for s in servicios]
+            'servicios': SERVICIO_HISTORIAL_VEHICULO.serializar_lista(servicios)
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -256,7 +291,9 @@ def get_historial_cliente(id):
         cliente = Cliente.query.get_or_404(id)
         
         # Obtener todos los servicios de los vehículos del cliente
-        servicios = Servicio.query.join(Vehiculo).filter(
+        servicios = SERVICIO_HISTORIAL_CLIENTE.aplicar(Servicio.query).join(
+            Servicio.vehiculo
+        ).filter(
             Vehiculo.cliente_id == id
         ).order_by(Servicio.fecha_inicio.desc()).all()
         
@@ -274,22 +311,7 @@ def get_historial_cliente(id):
                 'modelo': v.modelo,
                 'año': v.año
             } for v in cliente.vehiculos],
-            'servicios': [{
-                'id': s.id,
-                'tipo': s.tipo_servicio,
-                'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
-                'estado': s.estado,
-                'vehiculo': s.vehiculo.placa,
-                'mecanico': f"{s.mecanico.nombre} {s.mecanico.apellido}" if s.mecanico else None,
-                'factura': {
-                    'id': s.facturas[0].id,
-                    'numero': s.facturas[0].numero,
-                    'total': s.facturas[0].total,
-                    'estado': s.facturas[0].estado
-                } if s.facturas else None
-            } for s in servicios]
+            'servicios': SERVICIO_HISTORIAL_CLIENTE.serializar_lista(servicios)
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -314,8 +336,8 @@ def get_historial_mecanico(id):
                 'id': s.id,
                 'tipo': s.tipo_servicio,
                 'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                'fecha_inicio': s.fecha_inicio,
+                'fecha_fin': s.fecha_fin,
                 'estado': s.estado,
                 'vehiculo': {
                     'id': s.vehiculo.id,
@@ -359,7 +381,7 @@ def get_historial_repuesto(id):
                 'id': m.id,
                 'tipo': m.tipo,
                 'cantidad': m.cantidad,
-                'fecha': m.fecha.isoformat(),
+                'fecha': m.fecha,
                 'servicio': {
                     'id': m.servicio.id,
                     'tipo': m.servicio.tipo_servicio,
@@ -2,72 +2,70 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.models import Servicio, Factura, Repuesto, MovimientoInventario, Cliente, Vehiculo
 from backend.extensions import db
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import joinedload
+from backend.utils.serializers import ServicioSerializer, VehiculoSerializer, nombre_completo
+from backend.services.statistics_service import StatisticsService
+from backend.services.rollup_service import daily_rollups
+from backend.utils.pagination import keyset_paginate, InvalidCursorError
 
 reportes_bp = Blueprint('reportes', __name__)
+statistics_service = StatisticsService()
+
+SERVICIO_REPORTE = ServicioSerializer(
+    campos=('id', 'estado', 'fecha_inicio', 'fecha_fin'),
+    relaciones={'vehiculo': VehiculoSerializer(campos=('id', 'placa', 'marca', 'modelo'))},
+    calculados={
+        'tipo': lambda s, ctx: s.tipo_servicio,
+        'mecanico': lambda s, ctx: nombre_completo(s.mecanico)
+    },
+    requiere=('mecanico',)
+)
 
 # Reporte de servicios por período
 @reportes_bp.route('/api/reportes/servicios', methods=['GET'])
 @jwt_required()
 def reporte_servicios():
+    """Reporte de servicios agregado en la base de datos
+
+    Parámetros:
+        fecha_inicio, fecha_fin, estado: Filtros opcionales
+        detalle: 'true' para incluir las filas de servicios, paginadas
+        page, per_page: Paginación del detalle (por defecto 1 y 50, máximo 200)
+    """
     try:
         # Obtener parámetros
-        fecha_inicio = request.args.get('fecha_inicio')
-        fecha_fin = request.args.get('fecha_fin')
+        try:
+            fecha_inicio = request.args.get('fecha_inicio')
+            fecha_inicio = datetime.fromisoformat(fecha_inicio) if fecha_inicio else None
+            fecha_fin = request.args.get('fecha_fin')
+            fecha_fin = datetime.fromisoformat(fecha_fin) if fecha_fin else None
+        except ValueError:
+            return jsonify({'error': 'Las fechas deben tener formato ISO 8601 (AAAA-MM-DD)'}), 400
         estado = request.args.get('estado')
         
-        # Construir query base
-        query = Servicio.query
+        # Desgloses por estado, tipo y mecánico calculados con GROUP BY
+        reporte = statistics_service.desglose_servicios(fecha_inicio, fecha_fin, estado)
         
-        # Aplicar filtros
-        if fecha_inicio:
-            query = query.filter(Servicio.fecha_inicio >= datetime.fromisoformat(fecha_inicio))
-        if fecha_fin:
-            query = query.filter(Servicio.fecha_inicio <= datetime.fromisoformat(fecha_fin))
-        if estado:
-            query = query.filter(Servicio.estado == estado)
-        
-        servicios = query.all()
-        
-        # Procesar resultados
-        total_servicios = len(servicios)
-        servicios_por_estado = {}
-        servicios_por_tipo = {}
-        servicios_por_mecanico = {}
-        
-        for servicio in servicios:
-            # Contar por estado
-            servicios_por_estado[servicio.estado] = servicios_por_estado.get(servicio.estado, 0) + 1
-            
-            # Contar por tipo
-            servicios_por_tipo[servicio.tipo_servicio] = servicios_por_tipo.get(servicio.tipo_servicio, 0) + 1
+        if request.args.get('detalle', 'false').lower() == 'true':
+            page = max(1, request.args.get('page', 1, type=int))
+            per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+            servicios = SERVICIO_REPORTE.aplicar(Servicio.query).filter(
+                *statistics_service.filtros_servicios(fecha_inicio, fecha_fin, estado)
+            ).order_by(
+                Servicio.fecha_inicio.desc(), Servicio.id.desc()
+            ).offset((page - 1) * per_page).limit(per_page).all()
             
-            # Contar por mecánico
-            if servicio.mecanico:
-                nombre_mecanico = f"{servicio.mecanico.nombre} {servicio.mecanico.apellido}"
-                servicios_por_mecanico[nombre_mecanico] = servicios_por_mecanico.get(nombre_mecanico, 0) + 1
+            reporte['servicios'] = SERVICIO_REPORTE.serializar_lista(servicios)
+            reporte['paginacion'] = {
+                'page': page,
+                'per_page': per_page,
+                'total': reporte['total_servicios'],
+                'pages': (reporte['total_servicios'] + per_page - 1) // per_page
+            }
         
-        return jsonify({
-            'total_servicios': total_servicios,
-            'servicios_por_estado': servicios_por_estado,
-            'servicios_por_tipo': servicios_por_tipo,
-            'servicios_por_mecanico': servicios_por_mecanico,
-            'servicios': [{
-                'id': s.id,
-                'tipo': s.tipo_servicio,
-                'estado': s.estado,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
-                'vehiculo': {
-                    'id': s.vehiculo.id,
-                    'placa': s.vehiculo.placa,
-                    'marca': s.vehiculo.marca,
-                    'modelo': s.vehiculo.modelo
-                },
-                'mecanico': f"{s.mecanico.nombre} {s.mecanico.apellido}" if s.mecanico else None
-            } for s in servicios]
-        }), 200
+        return jsonify(reporte), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -75,45 +73,39 @@ def reporte_servicios():
 @reportes_bp.route('/api/reportes/inventario', methods=['GET'])
 @jwt_required()
 def reporte_inventario():
+    """Reporte de inventario valorado en la base de datos
+
+    Parámetros:
+        categoria: Filtra por categoría
+        stock_bajo: 'true' para limitarse a repuestos con stock bajo
+        detalle: 'true' para incluir los repuestos, paginados por cursor
+        cursor, per_page: Paginación del detalle (por defecto 50, máximo 200)
+    """
     try:
         # Obtener parámetros
         categoria = request.args.get('categoria')
         stock_bajo = request.args.get('stock_bajo', 'false').lower() == 'true'
         
-        # Construir query base
-        query = Repuesto.query.filter_by(estado='activo')
-        
-        # Aplicar filtros
-        if categoria:
-            query = query.filter(Repuesto.categoria == categoria)
-        if stock_bajo:
-            query = query.filter(Repuesto.stock <= Repuesto.stock_minimo)
+        # Valor, conteo por categoría y stock bajo en una sola consulta agrupada
+        reporte = statistics_service.valoracion_inventario(categoria, stock_bajo)
         
-        repuestos = query.all()
-        
-        # Procesar resultados
-        total_repuestos = len(repuestos)
-        repuestos_por_categoria = {}
-        valor_total_inventario = 0
-        repuestos_stock_bajo = 0
-        
-        for repuesto in repuestos:
-            # Contar por categoría
-            repuestos_por_categoria[repuesto.categoria] = repuestos_por_categoria.get(repuesto.categoria, 0) + 1
-            
-            # Calcular valor total
-            valor_total_inventario += repuesto.stock * repuesto.precio_compra
+        if request.args.get('detalle', 'false').lower() == 'true':
+            per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+            query = Repuesto.query.filter(
+                *statistics_service.filtros_inventario(categoria, stock_bajo)
+            )
+            try:
+                # Orden (nombre, id) cubierto por ix_repuesto_nombre_id
+                repuestos, next_cursor = keyset_paginate(
+                    query,
+                    [('nombre', Repuesto.nombre), ('id', Repuesto.id)],
+                    cursor=request.args.get('cursor'),
+                    per_page=per_page
+                )
+            except InvalidCursorError as e:
+                return jsonify({'error': str(e)}), 400
             
-            # Contar stock bajo
-            if repuesto.stock <= repuesto.stock_minimo:
-                repuestos_stock_bajo += 1
-        
-        return jsonify({
-            'total_repuestos': total_repuestos,
-            'repuestos_por_categoria': repuestos_por_categoria,
-            'valor_total_inventario': valor_total_inventario,
-            'repuestos_stock_bajo': repuestos_stock_bajo,
-            'repuestos': [{
+            reporte['repuestos'] = [{
                 'id': r.id,
                 'nombre': r.nombre,
                 'codigo': r.codigo,
@@ -122,65 +114,98 @@ def reporte_inventario():
                 'stock_minimo': r.stock_minimo,
                 'precio_compra': r.precio_compra,
                 'precio_venta': r.precio_venta,
-                'valor_total': r.stock * r.precio_compra
+                'valor_total': (r.stock or 0) * r.precio_compra
             } for r in repuestos]
-        }), 200
+            reporte['paginacion'] = {
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'total': reporte['total_repuestos']
+            }
+        
+        return jsonify(reporte), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _periodo_dias():
+    """Fechas fecha_inicio/fecha_fin de la petición como días (o None)
+
+    Raises:
+        ValueError: Si alguna fecha no tiene formato ISO 8601
+    """
+    try:
+        fecha_inicio = request.args.get('fecha_inicio')
+        fecha_fin = request.args.get('fecha_fin')
+        return (
+            datetime.fromisoformat(fecha_inicio).date() if fecha_inicio else None,
+            datetime.fromisoformat(fecha_fin).date() if fecha_fin else None
+        )
+    except ValueError:
+        raise ValueError('Las fechas deben tener formato ISO 8601 (AAAA-MM-DD)')
+
+def _paginacion_detalle():
+    """(page, per_page) del detalle paginado, o None si no se pidió"""
+    if request.args.get('detalle', 'false').lower() != 'true':
+        return None
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+    return page, per_page
+
 # Reporte de facturación
 @reportes_bp.route('/api/reportes/facturacion', methods=['GET'])
 @jwt_required()
 def reporte_facturacion():
+    """Reporte de facturación a partir del resumen diario
+
+    Parámetros:
+        fecha_inicio, fecha_fin: Período (por día de emisión)
+        estado: Filtra por estado de la factura
+        detalle: 'true' para incluir las facturas, paginadas
+        page, per_page: Paginación del detalle (por defecto 1 y 50, máximo 200)
+    """
     try:
-        # Obtener parámetros
-        fecha_inicio = request.args.get('fecha_inicio')
-        fecha_fin = request.args.get('fecha_fin')
+        try:
+            desde, hasta = _periodo_dias()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         estado = request.args.get('estado')
         
-        # Construir query base
-        query = Factura.query
-        
-        # Aplicar filtros
-        if fecha_inicio:
-            query = query.filter(Factura.fecha >= datetime.fromisoformat(fecha_inicio))
-        if fecha_fin:
-            query = query.filter(Factura.fecha <= datetime.fromisoformat(fecha_fin))
-        if estado:
-            query = query.filter(Factura.estado == estado)
-        
-        facturas = query.all()
+        # Suma de a lo sumo una fila por día y estado del período
+        reporte = daily_rollups.facturacion(desde, hasta, estado)
+        reporte['actualizado_hasta'] = daily_rollups.actualizado_hasta()
         
-        # Procesar resultados
-        total_facturado = sum(f.total for f in facturas)
-        facturas_por_estado = {}
-        facturas_por_mes = {}
-        
-        for factura in facturas:
-            # Contar por estado
-            facturas_por_estado[factura.estado] = facturas_por_estado.get(factura.estado, 0) + 1
+        paginacion = _paginacion_detalle()
+        if paginacion:
+            page, per_page = paginacion
+            query = Factura.query.options(
+                joinedload(Factura.cliente), joinedload(Factura.vehiculo)
+            )
+            if desde:
+                query = query.filter(Factura.fecha_emision >= datetime.combine(desde, time.min))
+            if hasta:
+                query = query.filter(Factura.fecha_emision < datetime.combine(hasta + timedelta(days=1), time.min))
+            if estado:
+                query = query.filter(Factura.estado == estado)
+            facturas = query.order_by(
+                Factura.fecha_emision.desc(), Factura.id.desc()
+            ).offset((page - 1) * per_page).limit(per_page).all()
             
-            # Contar por mes
-            mes = factura.fecha.strftime('%Y-%m')
-            if mes not in facturas_por_mes:
-                facturas_por_mes[mes] = {'cantidad': 0, 'total': 0}
-            facturas_por_mes[mes]['cantidad'] += 1
-            facturas_por_mes[mes]['total'] += factura.total
-        
-        return jsonify({
-            'total_facturado': total_facturado,
-            'facturas_por_estado': facturas_por_estado,
-            'facturas_por_mes': facturas_por_mes,
-            'facturas': [{
+            reporte['facturas'] = [{
                 'id': f.id,
                 'numero': f.numero,
-                'fecha': f.fecha.isoformat(),
+                'fecha': f.fecha_emision,
                 'total': f.total,
                 'estado': f.estado,
-                'cliente': f"{f.cliente.nombre} {f.cliente.apellido}",
-                'vehiculo': f.vehiculo.placa
+                'cliente': nombre_completo(f.cliente),
+                'vehiculo': f.vehiculo.placa if f.vehiculo else None
             } for f in facturas]
-        }), 200
+            reporte['paginacion'] = {
+                'page': page,
+                'per_page': per_page,
+                'total': reporte['total_facturas'],
+                'pages': (reporte['total_facturas'] + per_page - 1) // per_page
+            }
+        
+        return jsonify(reporte), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -188,63 +213,79 @@ def reporte_facturacion():
 @reportes_bp.route('/api/reportes/clientes', methods=['GET'])
 @jwt_required()
 def reporte_clientes():
+    """Reporte de clientes activos con servicios completados del resumen diario
+
+    Parámetros:
+        fecha_inicio, fecha_fin: Limita a clientes con servicios completados
+            iniciados en el período
+        detalle: 'true' para incluir los clientes, paginados
+        page, per_page: Paginación del detalle (por defecto 1 y 50, máximo 200)
+    """
     try:
-        # Obtener parámetros
-        fecha_inicio = request.args.get('fecha_inicio')
-        fecha_fin = request.args.get('fecha_fin')
+        try:
+            desde, hasta = _periodo_dias()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Construir query base
-        query = Cliente.query.filter_by(estado='activo')
+        servicios = daily_rollups.servicios_por_cliente(desde, hasta)
+        vehiculos = db.session.query(
+            Vehiculo.cliente_id,
+            func.count(Vehiculo.id).label('vehiculos')
+        ).group_by(Vehiculo.cliente_id).subquery()
         
-        # Aplicar filtros de fecha si se proporcionan
-        if fecha_inicio or fecha_fin:
-            subquery = db.session.query(Vehiculo.cliente_id).join(Servicio).filter(
-                Servicio.estado == 'completado'
-            )
-            if fecha_inicio:
-                subquery = subquery.filter(Servicio.fecha_inicio >= datetime.fromisoformat(fecha_inicio))
-            if fecha_fin:
-                subquery = subquery.filter(Servicio.fecha_inicio <= datetime.fromisoformat(fecha_fin))
-            query = query.filter(Cliente.id.in_(subquery))
+        num_vehiculos = func.coalesce(vehiculos.c.vehiculos, 0)
+        num_servicios = func.coalesce(servicios.c.servicios_completados, 0)
+        condiciones = [Cliente.estado == 'activo']
+        if desde or hasta:
+            condiciones.append(servicios.c.cliente_id.isnot(None))
         
-        clientes = query.all()
+        def con_agregados(*columnas):
+            return db.session.query(*columnas).select_from(Cliente).outerjoin(
+                vehiculos, vehiculos.c.cliente_id == Cliente.id
+            ).outerjoin(
+                servicios, servicios.c.cliente_id == Cliente.id
+            ).filter(*condiciones)
         
-        # Procesar resultados
-        total_clientes = len(clientes)
-        clientes_activos = 0
-        clientes_con_servicios = 0
-        total_vehiculos = 0
+        # Totales en una sola consulta agregada
+        totales = con_agregados(
+            func.count(Cliente.id).label('total'),
+            func.count(Cliente.id).filter(num_vehiculos > 0).label('activos'),
+            func.count(Cliente.id).filter(num_vehiculos > 0, num_servicios > 0).label('con_servicios'),
+            func.coalesce(func.sum(num_vehiculos), 0).label('vehiculos')
+        ).one()
         
-        for cliente in clientes:
-            if cliente.vehiculos:
-                clientes_activos += 1
-                total_vehiculos += len(cliente.vehiculos)
-                
-                # Verificar si tiene servicios completados
-                tiene_servicios = any(
-                    any(s.estado == 'completado' for s in v.servicios)
-                    for v in cliente.vehiculos
-                )
-                if tiene_servicios:
-                    clientes_con_servicios += 1
+        reporte = {
+            'total_clientes': totales.total,
+            'clientes_activos': totales.activos,
+            'clientes_con_servicios': totales.con_servicios,
+            'total_vehiculos': int(totales.vehiculos or 0),
+            'actualizado_hasta': daily_rollups.actualizado_hasta()
+        }
         
-        return jsonify({
-            'total_clientes': total_clientes,
-            'clientes_activos': clientes_activos,
-            'clientes_con_servicios': clientes_con_servicios,
-            'total_vehiculos': total_vehiculos,
-            'clientes': [{
+        paginacion = _paginacion_detalle()
+        if paginacion:
+            page, per_page = paginacion
+            filas = con_agregados(
+                Cliente.id, Cliente.nombre, Cliente.apellido, Cliente.email, Cliente.telefono,
+                num_vehiculos.label('vehiculos'), num_servicios.label('servicios_completados')
+            ).order_by(Cliente.id).offset((page - 1) * per_page).limit(per_page).all()
+            
+            reporte['clientes'] = [{
                 'id': c.id,
                 'nombre': f"{c.nombre} {c.apellido}",
                 'email': c.email,
                 'telefono': c.telefono,
-                'vehiculos': len(c.vehiculos),
-                'servicios_completados': sum(
-                    sum(1 for s in v.servicios if s.estado == 'completado')
-                    for v in c.vehiculos
-                )
-            } for c in clientes]
-        }), 200
+                'vehiculos': c.vehiculos,
+                'servicios_completados': int(c.servicios_completados or 0)
+            } for c in filas]
+            reporte['paginacion'] = {
+                'page': page,
+                'per_page': per_page,
+                'total': totales.total,
+                'pages': (totales.total + per_page - 1) // per_page
+            }
+        
+        return jsonify(reporte), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -252,44 +293,21 @@ def reporte_clientes():
 @reportes_bp.route('/api/reportes/mecanicos', methods=['GET'])
 @jwt_required()
 def reporte_mecanicos():
+    """Servicios completados y horas por mecánico a partir del resumen diario"""
     try:
-        # Obtener parámetros
-        fecha_inicio = request.args.get('fecha_inicio')
-        fecha_fin = request.args.get('fecha_fin')
-        
-        # Construir query base
-        query = db.session.query(
-            Servicio.mecanico_id,
-            func.count(Servicio.id).label('total_servicios'),
-            func.sum(HoraTrabajo.horas).label('total_horas')
-        ).join(HoraTrabajo).filter(
-            Servicio.estado == 'completado'
-        )
+        try:
+            desde, hasta = _periodo_dias()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Aplicar filtros
-        if fecha_inicio:
-            query = query.filter(Servicio.fecha_inicio >= datetime.fromisoformat(fecha_inicio))
-        if fecha_fin:
-            query = query.filter(Servicio.fecha_inicio <= datetime.fromisoformat(fecha_fin))
-        
-        resultados = query.group_by(Servicio.mecanico_id).all()
-        
-        # Procesar resultados
-        total_mecanicos = len(resultados)
-        total_servicios = sum(r.total_servicios for r in resultados)
-        total_horas = sum(r.total_horas for r in resultados)
+        mecanicos = daily_rollups.mecanicos(desde, hasta)
         
         return jsonify({
-            'total_mecanicos': total_mecanicos,
-            'total_servicios': total_servicios,
-            'total_horas': total_horas,
-            'mecanicos': [{
-                'id': r.mecanico_id,
-                'nombre': f"{r.mecanico.nombre} {r.mecanico.apellido}",
-                'especialidad': r.mecanico.especialidad,
-                'servicios_completados': r.total_servicios,
-                'horas_trabajadas': r.total_horas
-            } for r in resultados]
+            'total_mecanicos': len(mecanicos),
+            'total_servicios': sum(m['servicios_completados'] for m in mecanicos),
+            'total_horas': sum(m['horas_trabajadas'] for m in mecanicos),
+            'mecanicos': mecanicos,
+            'actualizado_hasta': daily_rollups.actualizado_hasta()
         }), 200
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -1,11 +1,13 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, jsonify, request, Response, send_file, stream_with_context, url_for
 from backend.services.report_service import ReportService
+from backend.services.report_job_service import report_jobs
+from backend.services.analytics_service import inventory_analytics
+from backend.utils.export import EXPORT_FORMATS, normalize_format
 from backend.utils.logger import log_activity
 from backend.utils.security import require_roles, block_sql_injection, prevent_xss
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from typing import Dict, Any
 from datetime import datetime
-from io import BytesIO
 
 reports_bp = Blueprint('reports', __name__)
 report_service = ReportService()
@@ -110,54 +112,95 @@ def get_turnover():
             'message': 'Error interno del servidor'
         }), 500
 
+@reports_bp.route('/reports/inventory-analytics', methods=['GET'])
+@jwt_required()
+def get_inventory_analytics():
+    """Rotación, días de cobertura y clasificación ABC de todo el catálogo
+    
+    Parámetros:
+        fecha_inicio, fecha_fin: Período analizado (por defecto, últimos 90 días)
+        categoria: Limita el análisis a una categoría
+        clase: Devuelve solo los repuestos de la clase A, B o C
+        page, per_page: Paginación de los repuestos (por defecto 1 y 100, máximo 1000),
+            ordenados por valor consumido
+    """
+    try:
+        fecha_inicio = request.args.get('fecha_inicio')
+        fecha_fin = request.args.get('fecha_fin')
+        
+        analisis = inventory_analytics.analizar(
+            datetime.fromisoformat(fecha_inicio) if fecha_inicio else None,
+            datetime.fromisoformat(fecha_fin) if fecha_fin else None,
+            request.args.get('categoria')
+        )
+        periodo = analisis.attrs['periodo']
+        resumen = inventory_analytics.resumen_abc(analisis)
+        
+        clase = request.args.get('clase')
+        if clase:
+            analisis = analisis[analisis['clase_abc'] == clase.upper()]
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = max(1, min(request.args.get('per_page', 100, type=int), 1000))
+        pagina = analisis.sort_values('valor_consumo', ascending=False, kind='stable').iloc[
+            (page - 1) * per_page:page * per_page
+        ]
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'periodo': periodo,
+                'resumen_abc': resumen,
+                'total': len(analisis),
+                'page': page,
+                'per_page': per_page,
+                'items': inventory_analytics.registros(pagina)
+            }
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        log_activity('report_error', f"Error en análisis de inventario: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Error interno del servidor'
+        }), 500
+
+def _fecha_param(params: Dict[str, Any], clave: str):
+    valor = params.get(clave)
+    return datetime.fromisoformat(valor) if valor else None
+
 @reports_bp.route('/reports/export', methods=['POST'])
 @jwt_required()
 def export_report():
-    """Exporta un reporte en el formato especificado"""
+    """Exporta un reporte en el formato especificado (csv o xlsx)
+    
+    El archivo se envía por partes mientras se leen las filas, sin
+    construirlo completo en memoria.
+    """
     try:
         data = request.get_json()
         report_type = data.get('type')
-        format = data.get('format', 'csv')
+        format = normalize_format(data.get('format', 'csv'))
         params = data.get('params', {})
         
-        # Obtener el reporte según el tipo
-        if report_type == 'inventory-value':
-            resultado = report_service.get_inventory_value_report(
-                datetime.fromisoformat(params.get('fecha_inicio')) if params.get('fecha_inicio') else None,
-                datetime.fromisoformat(params.get('fecha_fin')) if params.get('fecha_fin') else None
-            )
-        elif report_type == 'movements':
-            resultado = report_service.get_movements_report(
-                params.get('tipo'),
-                datetime.fromisoformat(params.get('fecha_inicio')) if params.get('fecha_inicio') else None,
-                datetime.fromisoformat(params.get('fecha_fin')) if params.get('fecha_fin') else None
-            )
-        elif report_type == 'stock-alerts':
-            resultado = report_service.get_stock_alerts_report()
-        elif report_type == 'turnover':
-            resultado = report_service.get_turnover_report(
-                datetime.fromisoformat(params.get('fecha_inicio')) if params.get('fecha_inicio') else None,
-                datetime.fromisoformat(params.get('fecha_fin')) if params.get('fecha_fin') else None
-            )
-        else:
-            return jsonify({
-                'status': 'error',
-                'message': 'Tipo de reporte no válido'
-            }), 400
-        
-        # Exportar el reporte
-        file_data = report_service.export_report(resultado, format)
-        
-        # Crear archivo en memoria
-        output = BytesIO(file_data)
-        output.seek(0)
-        
-        # Enviar archivo
-        return send_file(
-            output,
-            mimetype='text/csv' if format == 'csv' else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=f'reporte_{report_type}_{datetime.now().strftime("%Y%m%d")}.{format}'
+        partes = report_service.stream_report(
+            report_type,
+            format,
+            tipo=params.get('tipo'),
+            fecha_inicio=_fecha_param(params, 'fecha_inicio'),
+            fecha_fin=_fecha_param(params, 'fecha_fin')
+        )
+        
+        mimetype, extension = EXPORT_FORMATS[format]
+        nombre = f'reporte_{report_type}_{datetime.now().strftime("%Y%m%d")}.{extension}'
+        return Response(
+            stream_with_context(partes),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{nombre}"'}
         )
         
     except ValueError as e:
@@ -170,4 +213,86 @@ def export_report():
         return jsonify({
             'status': 'error',
             'message': 'Error interno del servidor'
-        }), 500 
\ No newline at end of file
+        }), 500
+
+def _job_dict(job) -> Dict[str, Any]:
+    datos = report_jobs.a_dict(job)
+    if job.estado == 'completado':
+        datos['descarga'] = url_for('reports.download_report_job', job_id=job.id)
+    return datos
+
+@reports_bp.route('/reports/jobs', methods=['POST'])
+@jwt_required()
+def create_report_job():
+    """Encola la generación de un reporte en segundo plano
+    
+    Una solicitud idéntica (tipo, formato y parámetros) a un trabajo en curso
+    o con resultado vigente devuelve ese mismo trabajo.
+    """
+    try:
+        data = request.get_json() or {}
+        job, creado = report_jobs.encolar(
+            data.get('type'),
+            data.get('format', 'csv'),
+            data.get('params', {}),
+            usuario_id=get_jwt_identity()
+        )
+        return jsonify({
+            'status': 'success',
+            'reutilizado': not creado,
+            'job': _job_dict(job)
+        }), 202 if creado else 200
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        log_activity('report_error', f"Error encolando reporte: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': 'Error interno del servidor'
+        }), 500
+
+@reports_bp.route('/reports/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_report_job(job_id):
+    """Estado y progreso de un trabajo de reporte"""
+    job = report_jobs.obtener(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Trabajo no encontrado'
+        }), 404
+    return jsonify({'status': 'success', 'job': _job_dict(job)})
+
+@reports_bp.route('/reports/jobs/<job_id>/download', methods=['GET'])
+@jwt_required()
+def download_report_job(job_id):
+    """Descarga el archivo de un trabajo completado"""
+    job = report_jobs.obtener(job_id)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Trabajo no encontrado'
+        }), 404
+    if job.estado != 'completado':
+        return jsonify({
+            'status': 'error',
+            'message': 'El reporte aún no está disponible',
+            'job': _job_dict(job)
+        }), 409
+    if not report_jobs.descargable(job):
+        return jsonify({
+            'status': 'error',
+            'message': 'El reporte ha caducado'
+        }), 410
+    
+    mimetype, extension = EXPORT_FORMATS[job.formato]
+    return send_file(
+        report_jobs.ruta(job),
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f'reporte_{job.tipo}_{job.fecha_fin.strftime("%Y%m%d")}.{extension}'
+    )
@@ -1,11 +1,45 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.extensions import db
 from backend.models import Servicio, Mecanico, Vehiculo, HoraTrabajo, Repuesto, MovimientoInventario, Usuario, Factura, HistorialEstado, Cliente
 from datetime import datetime, timezone, timedelta
 from sqlalchemy import or_
+from backend.services.search_service import search_service
+from backend.utils.serializers import (
+    ServicioSerializer, MecanicoSerializer, VehiculoSerializer, ClienteSerializer, nombre_completo
+)
+from backend.utils.pagination import keyset_paginate, InvalidCursorError
+from backend.services.statistics_service import StatisticsService
+from backend.services.dashboard_service import dashboard_summary
+from backend.utils.conditional import conditional_get
 
 servicios_bp = Blueprint('servicios', __name__)
+statistics_service = StatisticsService()
+
+# Serializadores: cada uno declara las relaciones que recorre y se cargan por adelantado
+SERVICIO_DETALLE = ServicioSerializer(
+    campos=('id', 'titulo', 'descripcion', 'fecha_inicio', 'fecha_fin', 'estado',
+            'mecanico_id', 'cliente_id', 'vehiculo_id', 'costo', 'notas'),
+    relaciones={
+        'mecanico': MecanicoSerializer(),
+        'vehiculo': VehiculoSerializer(campos=('id', 'placa', 'marca', 'modelo')),
+        'cliente': ClienteSerializer()
+    }
+)
+
+SERVICIO_LISTA = ServicioSerializer(
+    campos=('id', 'titulo', 'descripcion', 'fecha_inicio', 'fecha_fin', 'estado',
+            'mecanico_id', 'cliente_id', 'vehiculo_id', 'costo', 'notas')
+)
+
+SERVICIO_BUSQUEDA = ServicioSerializer(
+    campos=('id', 'tipo_servicio', 'estado', 'fecha_inicio'),
+    calculados={
+        'cliente': lambda s, ctx: nombre_completo(s.cliente),
+        'vehiculo': lambda s, ctx: f"{s.vehiculo.marca} {s.vehiculo.modelo} - {s.vehiculo.placa}" if s.vehiculo else None
+    },
+    requiere=('cliente', 'vehiculo')
+)
 
 # Rutas para Mecánicos
 @servicios_bp.route('/mecanicos', methods=['GET'])
@@ -24,7 +58,7 @@ def get_mecanicos():
             'servicios': [{
                 'id': s.id,
                 'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat() if s.fecha_inicio else None,
+                'fecha_inicio': s.fecha_inicio,
                 'estado': s.estado
             } for s in m.servicios]
         } for m in mecanicos]), 200
@@ -47,7 +81,7 @@ def get_mecanico(id):
             'servicios': [{
                 'id': s.id,
                 'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat() if s.fecha_inicio else None,
+                'fecha_inicio': s.fecha_inicio,
                 'estado': s.estado,
                 'vehiculo': {
                     'id': s.vehiculo.id,
@@ -58,7 +92,7 @@ def get_mecanico(id):
             } for s in mecanico.servicios],
             'horas_trabajo': [{
                 'id': h.id,
-                'fecha': h.fecha.isoformat() if h.fecha else None,
+                'fecha': h.fecha,
                 'horas_trabajadas': h.horas_trabajadas,
                 'descripcion': h.notas
             } for h in mecanico.horas_trabajo]
@@ -122,26 +156,88 @@ def delete_mecanico(id):
         return jsonify({"error": str(e)}), 500
 
 # Rutas para Servicios
+# Filas que se leen del cursor del servidor en cada vuelta al exportar en streaming
+SERVICIOS_YIELD_PER = 500
+
+def _filtrar_servicios(query):
+    """Aplica los filtros de estado, mecánico y rango de fechas de la petición
+
+    Raises:
+        ValueError: Si alguna fecha no tiene formato ISO 8601
+    """
+    estado = request.args.get('estado')
+    mecanico_id = request.args.get('mecanico_id', type=int)
+    fecha_desde = request.args.get('fecha_desde')
+    fecha_hasta = request.args.get('fecha_hasta')
+    
+    if estado:
+        query = query.filter(Servicio.estado == estado)
+    if mecanico_id:
+        query = query.filter(Servicio.mecanico_id == mecanico_id)
+    try:
+        if fecha_desde:
+            query = query.filter(Servicio.fecha_inicio >= datetime.fromisoformat(fecha_desde))
+        if fecha_hasta:
+            query = query.filter(Servicio.fecha_inicio <= datetime.fromisoformat(fecha_hasta))
+    except ValueError:
+        raise ValueError("Las fechas deben tener formato ISO 8601 (AAAA-MM-DD)")
+    return query
+
+def _stream_servicios(query, ndjson):
+    """Genera la respuesta fila a fila leyendo del cursor del servidor
+
+    Con ``yield_per`` las filas se traen de la base de datos por bloques, de
+    modo que la memoria no crece con el número de servicios exportados.
+    """
+    filas = query.order_by(Servicio.id.desc()).yield_per(SERVICIOS_YIELD_PER)
+    if ndjson:
+        for servicio in filas:
+            yield current_app.json.dumps(SERVICIO_LISTA.serializar(servicio)) + '\n'
+        return
+    
+    yield '{"servicios": ['
+    for i, servicio in enumerate(filas):
+        yield (',' if i else '') + current_app.json.dumps(SERVICIO_LISTA.serializar(servicio))
+    yield ']}'
+
 @servicios_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_servicios():
+    """Lista servicios con filtros, paginación por cursor o exportación en streaming
+
+    Parámetros:
+        estado, mecanico_id, fecha_desde, fecha_hasta: Filtros opcionales
+        cursor, per_page: Paginación por cursor (más recientes primero)
+        formato: 'ndjson' para exportar una línea JSON por servicio
+
+    Sin cursor ni per_page devuelve todos los servicios filtrados con la forma
+    ``{"servicios": [...]}``, enviada por partes en lugar de construirla en memoria.
+    """
     try:
-        servicios = Servicio.query.all()
-        return jsonify({
-            'servicios': [{
-                'id': s.id,
-                'titulo': s.titulo,
-                'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat() if s.fecha_inicio else None,
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
-                'estado': s.estado,
-                'mecanico_id': s.mecanico_id,
-                'cliente_id': s.cliente_id,
-                'vehiculo_id': s.vehiculo_id,
-                'costo': s.costo,
-                'notas': s.notas
-            } for s in servicios]
-        }), 200
+        query = _filtrar_servicios(Servicio.query)
+        
+        if 'cursor' in request.args or 'per_page' in request.args:
+            per_page = max(1, min(request.args.get('per_page', 50, type=int), 200))
+            servicios, next_cursor = keyset_paginate(
+                query,
+                [('id', Servicio.id)],
+                cursor=request.args.get('cursor') or None,
+                per_page=per_page,
+                descending=True
+            )
+            return jsonify({
+                'servicios': SERVICIO_LISTA.serializar_lista(servicios),
+                'next_cursor': next_cursor,
+                'per_page': per_page
+            }), 200
+        
+        ndjson = request.args.get('formato') == 'ndjson'
+        return Response(
+            stream_with_context(_stream_servicios(query, ndjson)),
+            mimetype='application/x-ndjson' if ndjson else 'application/json'
+        ), 200
+    except (InvalidCursorError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -149,39 +245,8 @@ def get_servicios():
 @jwt_required()
 def get_servicio(id):
     try:
-        servicio = Servicio.query.get_or_404(id)
-        return jsonify({
-            'id': servicio.id,
-            'titulo': servicio.titulo,
-            'descripcion': servicio.descripcion,
-            'fecha_inicio': servicio.fecha_inicio.isoformat() if servicio.fecha_inicio else None,
-            'fecha_fin': servicio.fecha_fin.isoformat() if servicio.fecha_fin else None,
-            'estado': servicio.estado,
-            'mecanico_id': servicio.mecanico_id,
-            'cliente_id': servicio.cliente_id,
-            'vehiculo_id': servicio.vehiculo_id,
-            'costo': servicio.costo,
-            'notas': servicio.notas,
-            'mecanico': {
-                'id': servicio.mecanico.id,
-                'nombre': servicio.mecanico.nombre,
-                'apellido': servicio.mecanico.apellido,
-                'especialidad': servicio.mecanico.especialidad
-            } if servicio.mecanico else None,
-            'vehiculo': {
-                'id': servicio.vehiculo.id,
-                'placa': servicio.vehiculo.placa,
-                'marca': servicio.vehiculo.marca,
-                'modelo': servicio.vehiculo.modelo
-            } if servicio.vehiculo else None,
-            'cliente': {
-                'id': servicio.cliente.id,
-                'nombre': servicio.cliente.nombre,
-                'apellido': servicio.cliente.apellido,
-                'email': servicio.cliente.email,
-                'telefono': servicio.cliente.telefono
-            } if servicio.cliente else None
-        }), 200
+        servicio = SERVICIO_DETALLE.aplicar(Servicio.query).get_or_404(id)
+        return jsonify(SERVICIO_DETALLE.serializar(servicio)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -303,7 +368,7 @@ def get_horas_trabajo(servicio_id):
         horas = HoraTrabajo.query.filter_by(servicio_id=servicio_id).all()
         return jsonify([{
             'id': h.id,
-            'fecha': h.fecha.isoformat(),
+            'fecha': h.fecha,
             'horas': h.horas,
             'descripcion': h.descripcion,
             'mecanico': {
@@ -406,8 +471,8 @@ def get_servicios_por_estado(estado):
             'id': s.id,
             'tipo_servicio': s.tipo_servicio,
             'descripcion': s.descripcion,
-            'fecha_inicio': s.fecha_inicio.isoformat(),
-            'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+            'fecha_inicio': s.fecha_inicio,
+            'fecha_fin': s.fecha_fin,
             'vehiculo': {
                 'id': s.vehiculo.id,
                 'placa': s.vehiculo.placa,
@@ -428,8 +493,8 @@ def get_servicios_por_mecanico(mecanico_id):
             'id': s.id,
             'tipo_servicio': s.tipo_servicio,
             'descripcion': s.descripcion,
-            'fecha_inicio': s.fecha_inicio.isoformat(),
-            'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+            'fecha_inicio': s.fecha_inicio,
+            'fecha_fin': s.fecha_fin,
             'estado': s.estado,
             'vehiculo': {
                 'id': s.vehiculo.id,
@@ -486,7 +551,7 @@ def registrar_horas(id):
             'mensaje': 'Horas registradas exitosamente',
             'horas': {
                 'id': horas.id,
-                'fecha': horas.fecha.isoformat(),
+                'fecha': horas.fecha,
                 'horas_trabajadas': horas.horas_trabajadas,
                 'notas': horas.notas,
                 'mecanico': f"{mecanico.nombre} {mecanico.apellido}",
@@ -729,7 +794,7 @@ def generar_factura(id):
             'factura': {
                 'id': factura.id,
                 'numero': factura.numero,
-                'fecha': factura.fecha.isoformat(),
+                'fecha': factura.fecha,
                 'total': factura.total,
                 'estado': factura.estado,
                 'detalles': {
@@ -842,6 +907,12 @@ def cambiar_estado(id):
             print(f"❌ Error al hacer commit: {str(commit_error)}")
             return jsonify({'error': f'Error al guardar los cambios: {str(commit_error)}'}), 500
         
+        dashboard_summary.publicar_cambio('servicio_estado', {
+            'servicio_id': servicio.id,
+            'estado_anterior': estado_anterior,
+            'estado_nuevo': nuevo_estado
+        })
+        
         # Devolver respuesta con datos completos
         return jsonify({
             'mensaje': 'Estado actualizado exitosamente',
@@ -851,14 +922,14 @@ def cambiar_estado(id):
                 'descripcion': servicio.descripcion,
                 'estado_anterior': estado_anterior,
                 'estado_nuevo': servicio.estado,
-                'fecha_actualizacion': fecha_cambio.isoformat(),
-                'fecha_fin': servicio.fecha_fin.isoformat() if servicio.fecha_fin else None,
+                'fecha_actualizacion': fecha_cambio,
+                'fecha_fin': servicio.fecha_fin,
                 'historial_reciente': {
                     'id': historial.id,
                     'estado_anterior': historial.estado_anterior,
                     'estado_nuevo': historial.estado_nuevo,
                     'comentario': historial.comentario,
-                    'fecha': historial.fecha.isoformat()
+                    'fecha': historial.fecha
                 }
             }
         }), 200
@@ -893,7 +964,7 @@ def obtener_historial(id):
                 'estado_anterior': h.estado_anterior,
                 'estado_nuevo': h.estado_nuevo,
                 'comentario': h.comentario,
-                'fecha': fecha_bogota.isoformat(),
+                'fecha': fecha_bogota,
                 'usuario': usuario_nombre,
                 'usuario_id': h.usuario_id
             })
@@ -910,6 +981,7 @@ def obtener_historial(id):
 # Obtener estados disponibles
 @servicios_bp.route('/estados', methods=['GET'])
 @jwt_required()
+@conditional_get()
 def obtener_estados():
     try:
         estados = {
@@ -959,41 +1031,14 @@ def obtener_estados():
 @jwt_required()
 def get_estadisticas_servicios():
     try:
-        # Servicios por estado
-        servicios_por_estado = {}
-        for estado in Servicio.ESTADOS.keys():
-            count = Servicio.query.filter_by(estado=estado).count()
-            servicios_por_estado[estado] = count
-        
-        # Servicios del mes actual
-        inicio_mes = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        servicios_mes = Servicio.query.filter(Servicio.fecha_inicio >= inicio_mes).count()
-        
-        # Ingresos del mes (solo servicios completados)
-        ingresos_mes = db.session.query(db.func.sum(Servicio.costo_real)).filter(
-            Servicio.estado == 'completado',
-            Servicio.fecha_fin >= inicio_mes
-        ).scalar() or 0
-        
-        # Top 5 mecánicos por servicios completados
-        top_mecanicos = db.session.query(
-            Mecanico,
-            db.func.count(Servicio.id).label('servicios_completados')
-        ).join(Servicio).filter(
-            Servicio.estado == 'completado'
-        ).group_by(Mecanico.id).order_by(
-            db.func.count(Servicio.id).desc()
-        ).limit(5).all()
+        # Conteos por estado, del mes e ingresos en una sola consulta agrupada
+        agregados = statistics_service.agregados_servicios()
         
         return jsonify({
-            'servicios_por_estado': servicios_por_estado,
-            'servicios_mes': servicios_mes,
-            'ingresos_mes': ingresos_mes,
-            'top_mecanicos': [{
-                'id': mecanico.id,
-                'nombre': f"{mecanico.nombre} {mecanico.apellido}",
-                'servicios_completados': count
-            } for mecanico, count in top_mecanicos]
+            'servicios_por_estado': agregados['servicios_por_estado'],
+            'servicios_mes': agregados['servicios_mes'],
+            'ingresos_mes': agregados['ingresos_mes'],
+            'top_mecanicos': statistics_service.top_mecanicos(5)
         }), 200
         
     except Exception as e:
@@ -1007,31 +1052,23 @@ def buscar_servicios():
     try:
         query_text = request.args.get('q', '').strip()
         
+        page = request.args.get('page', 1, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        
         if not query_text:
-            return jsonify({'servicios': []}), 200
-        
-        # Buscar en múltiples campos
-        servicios = Servicio.query.join(Cliente).join(Vehiculo).filter(
-            or_(
-                Servicio.tipo_servicio.ilike(f'%{query_text}%'),
-                Servicio.descripcion.ilike(f'%{query_text}%'),
-                Cliente.nombre.ilike(f'%{query_text}%'),
-                Cliente.apellido.ilike(f'%{query_text}%'),
-                Vehiculo.placa.ilike(f'%{query_text}%'),
-                Vehiculo.marca.ilike(f'%{query_text}%'),
-                Vehiculo.modelo.ilike(f'%{query_text}%')
-            )
-        ).order_by(Servicio.fecha_inicio.desc()).limit(20).all()
+            return jsonify({'servicios': [], 'total': 0, 'page': page, 'per_page': per_page}), 200
+        
+        # El índice de búsqueda ya incluye cliente y vehículo de cada servicio
+        servicios, total = search_service.buscar(
+            'servicio', query_text, page, per_page,
+            query=SERVICIO_BUSQUEDA.aplicar(Servicio.query)
+        )
         
         return jsonify({
-            'servicios': [{
-                'id': s.id,
-                'tipo_servicio': s.tipo_servicio,
-                'estado': s.estado,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'cliente': f"{s.cliente.nombre} {s.cliente.apellido}",
-                'vehiculo': f"{s.vehiculo.marca} {s.vehiculo.modelo} - {s.vehiculo.placa}"
-            } for s in servicios]
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'servicios': SERVICIO_BUSQUEDA.serializar_lista(servicios)
         }), 200
         
     except Exception as e:
@@ -2,7 +2,6 @@ from flask import Blueprint, jsonify, request
 from backend.services.sync_service import SyncService
 from backend.utils.logger import log_activity
 from backend.utils.security import require_roles, block_sql_injection, prevent_xss
-from backend.utils.cache import cache_decorator
 from typing import Dict, Any
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
@@ -11,7 +10,6 @@ sync_service = SyncService()
 
 @sync_bp.route('/status', methods=['GET'])
 @require_roles('admin', 'manager')
-@cache_decorator(ttl=300)  # Cache por 5 minutos
 def get_sync_status() -> Dict[str, Any]:
     """Obtiene el estado de sincronización"""
     try:
@@ -68,7 +66,6 @@ def cleanup_offline_data() -> Dict[str, Any]:
 
 @sync_bp.route('/storage/check', methods=['GET'])
 @require_roles('admin', 'manager')
-@cache_decorator(ttl=300)  # Cache por 5 minutos
 def check_storage() -> Dict[str, Any]:
     """Verifica límites de almacenamiento"""
     try:
@@ -32,8 +32,8 @@ def get_vehiculos():
                     'id': s.id,
                     'tipo_servicio': s.tipo_servicio,
                     'descripcion': s.descripcion,
-                    'fecha_inicio': s.fecha_inicio.isoformat() if s.fecha_inicio else None,
-                    'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                    'fecha_inicio': s.fecha_inicio,
+                    'fecha_fin': s.fecha_fin,
                     'estado': s.estado,
                     'mecanico': {
                         'id': s.mecanico.id,
@@ -162,8 +162,8 @@ def obtener_vehiculo(id):
                 'id': s.id,
                 'tipo': s.tipo_servicio,
                 'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat() if s.fecha_inicio else None,
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                'fecha_inicio': s.fecha_inicio,
+                'fecha_fin': s.fecha_fin,
                 'estado': s.estado,
                 'mecanico': {
                     'id': s.mecanico.id,
@@ -174,7 +174,7 @@ def obtener_vehiculo(id):
                 'total_servicios': len([s for s in vehiculo.servicios]),
                 'servicios_pendientes': len([s for s in vehiculo.servicios if s.estado == 'pendiente']),
                 'servicios_completados': len([s for s in vehiculo.servicios if s.estado == 'completado']),
-                'ultimo_servicio': vehiculo.servicios[0].fecha_inicio.isoformat() if vehiculo.servicios and len(vehiculo.servicios) > 0 else None
+                'ultimo_servicio': vehiculo.servicios[0].fecha_inicio if vehiculo.servicios and len(vehiculo.servicios) > 0 else None
             }
         }), 200
     except Exception as e:
@@ -211,8 +211,8 @@ def listar_servicios_vehiculo(id):
                 'id': s.id,
                 'tipo': s.tipo_servicio,
                 'descripcion': s.descripcion,
-                'fecha_inicio': s.fecha_inicio.isoformat(),
-                'fecha_fin': s.fecha_fin.isoformat() if s.fecha_fin else None,
+                'fecha_inicio': s.fecha_inicio,
+                'fecha_fin': s.fecha_fin,
                 'estado': s.estado,
                 'mecanico': f"{s.mecanico.nombre} {s.mecanico.apellido}" if s.mecanico else None,
                 'repuestos': len(s.repuestos),
@@ -11,7 +11,15 @@ celery = Celery(
     'automanager',
     broker=os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0'),
     backend=os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
-    include=['tasks']
+    # Módulos con las tareas (shared_task) que el worker y el beat deben registrar
+    include=[
+        'backend.tasks.inventory',
+        'backend.tasks.reports',
+        'backend.tasks.backup',
+        'backend.tasks.restore',
+        'backend.tasks.dashboard',
+        'backend.tasks.rollups'
+    ]
 )
 
 # Configuración de Celery
@@ -60,11 +68,41 @@ celery.conf.update(
             'args': (None,),
             'options': {'queue': 'high_priority'}
         },
+        'take-stock-snapshot-daily': {
+            'task': 'tasks.take_stock_snapshot',
+            'schedule': crontab(hour=0, minute=5),  # Cierre del día anterior
+            'options': {'queue': 'low_priority'}
+        },
+        'forecast-demand-nightly': {
+            'task': 'tasks.forecast_demand',
+            'schedule': crontab(hour=0, minute=30),  # Después de la sincronización
+            'options': {'queue': 'low_priority'}
+        },
         'check-stock-alerts': {
             'task': 'tasks.check_stock_alerts',
-            'schedule': crontab(hour='*/4'),  # Cada 4 horas
+            'schedule': crontab(hour='*/4'),  # Cada 4 horas, respaldo de las alertas en línea
             'options': {'queue': 'default'}
         },
+        'reconcile-dashboard-summary': {
+            'task': 'tasks.reconcile_dashboard_summary',
+            'schedule': crontab(minute='*/15'),  # Cada 15 minutos
+            'options': {'queue': 'low_priority'}
+        },
+        'refresh-daily-rollups': {
+            'task': 'tasks.refresh_daily_rollups',
+            'schedule': crontab(minute='*/10'),  # Cada 10 minutos
+            'options': {'queue': 'low_priority'}
+        },
+        'rebuild-daily-rollups': {
+            'task': 'tasks.rebuild_daily_rollups',
+            'schedule': crontab(hour=3, minute=30, day_of_week=0),  # Domingos 3:30 AM
+            'options': {'queue': 'low_priority'}
+        },
+        'cleanup-report-jobs': {
+            'task': 'tasks.cleanup_report_jobs',
+            'schedule': crontab(minute=30),  # Cada hora
+            'options': {'queue': 'low_priority'}
+        },
         'cleanup-old-data': {
             'task': 'tasks.cleanup_old_data',
             'schedule': crontab(hour=1, minute=0),  # 1 AM
@@ -25,6 +25,38 @@ class Config:
     CACHE_TYPE = 'redis'
     CACHE_REDIS_URL = REDIS_URL
     CACHE_DEFAULT_TIMEOUT = int(os.getenv('CACHE_TTL', 3600))
+    # Nivel local (LRU por proceso) delante de Redis
+    CACHE_LOCAL_MAX_ENTRIES = int(os.getenv('CACHE_LOCAL_MAX_ENTRIES', 1024))
+    CACHE_LOCAL_TTL = int(os.getenv('CACHE_LOCAL_TTL', 30))
+    # Segundos que un proceso reutiliza las versiones de etiquetas leídas de Redis
+    CACHE_TAG_LOCAL_TTL = float(os.getenv('CACHE_TAG_LOCAL_TTL', 2))
+    # Protección contra estampidas: TTL acortado al azar hasta un 10%, valor vencido
+    # servible durante la revalidación y bloqueo por clave entre workers
+    CACHE_TTL_JITTER = float(os.getenv('CACHE_TTL_JITTER', 0.1))
+    CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 60))
+    CACHE_LOCK_TIMEOUT = int(os.getenv('CACHE_LOCK_TIMEOUT', 30))
+    CACHE_LOCK_WAIT = float(os.getenv('CACHE_LOCK_WAIT', 5))
+    # Backend compartido: 'redis' (con failover a SQLite local) o 'local' (sin Redis,
+    # para despliegues offline); el circuito deja de llamar a Redis tras N errores
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'redis')
+    CACHE_LOCAL_PATH = os.getenv('CACHE_LOCAL_PATH') or None
+    CACHE_BREAKER_FAILURES = int(os.getenv('CACHE_BREAKER_FAILURES', 3))
+    CACHE_BREAKER_RESET = int(os.getenv('CACHE_BREAKER_RESET', 30))
+    # ETag de los catálogos a partir de las versiones de etiquetas; cambiar la
+    # versión cuando un despliegue modifica el formato de las respuestas
+    API_ETAG_ENABLED = os.getenv('API_ETAG_ENABLED', 'true').lower() == 'true'
+    API_ETAG_VERSION = os.getenv('API_ETAG_VERSION', '1')
+    # Compresión gzip/brotli de las respuestas de texto a partir de este tamaño (bytes);
+    # ver scripts/benchmark_responses.py para elegir nivel y umbral
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    
+    # Stream SSE del dashboard: cada conexión ocupa un worker síncrono, así que
+    # se cierra a los N segundos (el navegador reconecta) con keep-alive periódico
+    DASHBOARD_SSE_MAX_DURACION = int(os.getenv('DASHBOARD_SSE_MAX_DURACION', 300))
+    DASHBOARD_SSE_HEARTBEAT = int(os.getenv('DASHBOARD_SSE_HEARTBEAT', 15))
     
     # Configuración de Celery
     CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', REDIS_URL)
@@ -55,10 +87,16 @@ class Config:
     # Configuración de notificaciones
     NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 30))
     NOTIFICATION_BATCH_SIZE = int(os.getenv('NOTIFICATION_BATCH_SIZE', 50))
+    # Máximo de movimientos aceptados por POST /movimientos/bulk
+    INVENTARIO_BULK_MAX_ITEMS = int(os.getenv('INVENTARIO_BULK_MAX_ITEMS', 500))
+    # Alertas de stock bajo al registrar movimientos (una por repuesto y nivel en la ventana)
+    STOCK_ALERTS_ENABLED = os.getenv('STOCK_ALERTS_ENABLED', 'true').lower() == 'true'
+    STOCK_ALERT_DEDUP_TTL = int(os.getenv('STOCK_ALERT_DEDUP_TTL', 86400))
     
     # Configuración de reportes
     REPORT_MAX_ROWS = int(os.getenv('REPORT_MAX_ROWS', 10000))
     REPORT_CACHE_TTL = int(os.getenv('REPORT_CACHE_TTL', 3600))
+    REPORT_DIR = os.getenv('REPORT_DIR', os.path.join(os.getcwd(), 'reports'))
     
     # Configuración de seguridad
     BLOCKED_IPS = os.getenv('BLOCKED_IPS', '').split(',')
@@ -97,4 +135,18 @@ class Config:
             level=getattr(logging, cls.LOG_LEVEL),
             format=cls.LOG_FORMAT,
             filename=cls.LOG_FILE
-        ) 
\ No newline at end of file
+        ) 
+class TestingConfig(Config):
+    """Configuración de las pruebas: base de datos en memoria y caché local"""
+
+    TESTING = True
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    CACHE_BACKEND = 'local'
+    STOCK_ALERTS_ENABLED = False
+
+config = {
+    'default': Config,
+    'development': Config,
+    'testing': TestingConfig
+}
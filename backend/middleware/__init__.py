@@ -1,11 +1,13 @@
 from .security import SecurityMiddleware
 from .cors import setup_cors, handle_preflight, cors_required
 from .query_monitor import QueryMonitor
+from .compression import Compression
 
 __all__ = [
     'SecurityMiddleware',
     'setup_cors',
     'handle_preflight',
     'cors_required',
-    'QueryMonitor'
+    'QueryMonitor',
+    'Compression'
 ] 
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Compresión de respuestas
+========================
+
+Comprime con brotli o gzip, según el ``Accept-Encoding`` del cliente, las
+respuestas de texto que superan ``COMPRESSION_MIN_SIZE`` bytes. Por debajo
+de ese tamaño el coste de CPU no compensa los bytes ahorrados. brotli es
+opcional: si no está instalado solo se ofrece gzip.
+
+No se comprimen las respuestas en streaming (exportaciones NDJSON, eventos
+del dashboard) ni las de ``send_file``: se envían a medida que se generan.
+"""
+
+from flask import request
+from typing import Any, List, Optional
+import gzip
+from backend.utils.logger import metrics
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+TIPOS_COMPRIMIBLES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+}
+
+class Compression:
+    """Compresión negociada de las respuestas de la aplicación"""
+
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESSION_BROTLI_QUALITY', 4)
+        app.extensions['compression'] = self
+        if app.config.get('COMPRESSION_ENABLED', True):
+            app.after_request(self.comprimir)
+
+    @property
+    def codificaciones(self) -> List[str]:
+        """Codificaciones soportadas, en orden de preferencia"""
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    @staticmethod
+    def comprimible(mimetype: Optional[str]) -> bool:
+        return bool(mimetype) and (mimetype.startswith('text/') or mimetype in TIPOS_COMPRIMIBLES)
+
+    def codificar(self, datos: bytes, codificacion: str) -> bytes:
+        if codificacion == 'br':
+            return brotli.compress(datos, quality=self.brotli_quality)
+        return gzip.compress(datos, compresslevel=self.gzip_level)
+
+    def comprimir(self, response: Any) -> Any:
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or response.status_code == 204
+            or 'Content-Encoding' in response.headers
+            or not self.comprimible(response.mimetype)
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        codificacion = request.accept_encodings.best_match(self.codificaciones)
+        if codificacion is None or (response.content_length or 0) < self.min_size:
+            return response
+
+        datos = response.get_data()
+        comprimido = self.codificar(datos, codificacion)
+        if len(comprimido) >= len(datos):
+            return response
+
+        response.set_data(comprimido)
+        response.headers['Content-Encoding'] = codificacion
+        # Un ETag fuerte identifica los bytes exactos, que ya no son los mismos
+        etag, debil = response.get_etag()
+        if etag and not debil:
+            response.set_etag(etag, weak=True)
+        metrics.increment('http_compressed_total', labels={'encoding': codificacion})
+        metrics.increment('http_compressed_bytes_saved', len(datos) - len(comprimido))
+        return response
+
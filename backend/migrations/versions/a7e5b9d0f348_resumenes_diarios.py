@@ -0,0 +1,70 @@
+"""resúmenes diarios de facturación, clientes y mecánicos
+
+Revision ID: a7e5b9d0f348
+Revises: f6d4a8c9e237
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e5b9d0f348'
+down_revision = 'f6d4a8c9e237'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('factura', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_factura_fecha_actualizacion', ['fecha_actualizacion'], unique=False)
+
+    op.create_index('ix_servicio_fecha_actualizacion', 'servicio', ['fecha_actualizacion'], unique=False)
+    op.create_index('ix_servicio_fecha_creacion', 'servicio', ['fecha_creacion'], unique=False)
+
+    op.create_table(
+        'resumen_facturacion_diaria',
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('cliente_id', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('facturas', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('dia', 'cliente_id', 'estado')
+    )
+    op.create_table(
+        'resumen_cliente_diario',
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('cliente_id', sa.Integer(), nullable=False),
+        sa.Column('servicios_completados', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dia', 'cliente_id')
+    )
+    op.create_table(
+        'resumen_mecanico_diario',
+        sa.Column('dia', sa.Date(), nullable=False),
+        sa.Column('mecanico_id', sa.Integer(), nullable=False),
+        sa.Column('servicios_completados', sa.Integer(), nullable=False),
+        sa.Column('horas', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('dia', 'mecanico_id')
+    )
+    op.create_table(
+        'marca_agua_resumen',
+        sa.Column('origen', sa.String(length=50), nullable=False),
+        sa.Column('fecha', sa.DateTime(), nullable=True),
+        sa.Column('ultimo_id', sa.Integer(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('origen')
+    )
+
+
+def downgrade():
+    op.drop_table('marca_agua_resumen')
+    op.drop_table('resumen_mecanico_diario')
+    op.drop_table('resumen_cliente_diario')
+    op.drop_table('resumen_facturacion_diaria')
+    op.drop_index('ix_servicio_fecha_creacion', table_name='servicio')
+    op.drop_index('ix_servicio_fecha_actualizacion', table_name='servicio')
+    with op.batch_alter_table('factura', schema=None) as batch_op:
+        batch_op.drop_index('ix_factura_fecha_actualizacion')
+        batch_op.drop_column('fecha_actualizacion')
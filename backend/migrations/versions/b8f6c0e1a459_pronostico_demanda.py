@@ -0,0 +1,30 @@
+"""columnas de pronóstico de demanda en repuesto
+
+Revision ID: b8f6c0e1a459
+Revises: a7e5b9d0f348
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f6c0e1a459'
+down_revision = 'a7e5b9d0f348'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('repuesto', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('demanda_diaria', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('cantidad_reorden', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('fecha_pronostico', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('repuesto', schema=None) as batch_op:
+        batch_op.drop_column('fecha_pronostico')
+        batch_op.drop_column('cantidad_reorden')
+        batch_op.drop_column('demanda_diaria')
@@ -0,0 +1,23 @@
+"""indice repuesto (nombre, id) para paginacion por cursor
+
+Revision ID: c3a1f5d2e901
+Revises: 78c524f3b82d
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a1f5d2e901'
+down_revision = '78c524f3b82d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_repuesto_nombre_id', 'repuesto', ['nombre', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_repuesto_nombre_id', table_name='repuesto')
@@ -0,0 +1,35 @@
+"""tabla snapshot_stock con el stock diario de cada repuesto
+
+Revision ID: c9a7d1f2b560
+Revises: b8f6c0e1a459
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9a7d1f2b560'
+down_revision = 'b8f6c0e1a459'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'snapshot_stock',
+        sa.Column('fecha', sa.Date(), nullable=False),
+        sa.Column('repuesto_id', sa.Integer(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.Column('precio_compra', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['repuesto_id'], ['repuesto.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('fecha', 'repuesto_id')
+    )
+    # Reproducir el día posterior a un snapshot filtra movimientos por fecha
+    op.create_index('ix_movimientos_inventario_fecha', 'movimientos_inventario', ['fecha'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_movimientos_inventario_fecha', table_name='movimientos_inventario')
+    op.drop_table('snapshot_stock')
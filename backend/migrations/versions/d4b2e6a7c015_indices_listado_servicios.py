@@ -0,0 +1,27 @@
+"""indices para el listado paginado de servicios
+
+Revision ID: d4b2e6a7c015
+Revises: c3a1f5d2e901
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b2e6a7c015'
+down_revision = 'c3a1f5d2e901'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_servicio_estado_id', 'servicio', ['estado', 'id'], unique=False)
+    op.create_index('ix_servicio_mecanico_id_id', 'servicio', ['mecanico_id', 'id'], unique=False)
+    op.create_index('ix_servicio_fecha_inicio', 'servicio', ['fecha_inicio'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_servicio_fecha_inicio', table_name='servicio')
+    op.drop_index('ix_servicio_mecanico_id_id', table_name='servicio')
+    op.drop_index('ix_servicio_estado_id', table_name='servicio')
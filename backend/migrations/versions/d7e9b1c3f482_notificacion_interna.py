@@ -0,0 +1,36 @@
+"""columnas de notificaciones internas en notificacion
+
+Revision ID: d7e9b1c3f482
+Revises: c9a7d1f2b560
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e9b1c3f482'
+down_revision = 'c9a7d1f2b560'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notificacion', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('usuario_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('datos', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('leida', sa.Boolean(), nullable=True, server_default=sa.false()))
+        batch_op.add_column(sa.Column('prioridad', sa.String(length=20), nullable=True))
+        batch_op.create_foreign_key('fk_notificacion_usuario_id', 'usuario', ['usuario_id'], ['id'])
+        batch_op.create_index('ix_notificacion_leida', ['leida'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notificacion', schema=None) as batch_op:
+        batch_op.drop_index('ix_notificacion_leida')
+        batch_op.drop_constraint('fk_notificacion_usuario_id', type_='foreignkey')
+        batch_op.drop_column('prioridad')
+        batch_op.drop_column('leida')
+        batch_op.drop_column('datos')
+        batch_op.drop_column('usuario_id')
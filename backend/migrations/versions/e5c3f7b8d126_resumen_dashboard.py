@@ -0,0 +1,30 @@
+"""tabla resumen_dashboard con contadores incrementales
+
+Revision ID: e5c3f7b8d126
+Revises: d4b2e6a7c015
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c3f7b8d126'
+down_revision = 'd4b2e6a7c015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'resumen_dashboard',
+        sa.Column('clave', sa.String(length=80), nullable=False),
+        sa.Column('valor', sa.Float(), nullable=False),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('clave')
+    )
+
+
+def downgrade():
+    op.drop_table('resumen_dashboard')
@@ -0,0 +1,49 @@
+"""tabla reporte_job para reportes en segundo plano
+
+Revision ID: f6d4a8c9e237
+Revises: e5c3f7b8d126
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6d4a8c9e237'
+down_revision = 'e5c3f7b8d126'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reporte_job',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('formato', sa.String(length=10), nullable=False),
+        sa.Column('parametros', sa.JSON(), nullable=False),
+        sa.Column('clave', sa.String(length=64), nullable=False),
+        sa.Column('clave_activa', sa.String(length=64), nullable=True),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('progreso', sa.Integer(), nullable=False),
+        sa.Column('filas', sa.Integer(), nullable=True),
+        sa.Column('archivo', sa.String(length=255), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('usuario_id', sa.Integer(), nullable=True),
+        sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+        sa.Column('fecha_inicio', sa.DateTime(), nullable=True),
+        sa.Column('fecha_fin', sa.DateTime(), nullable=True),
+        sa.Column('expira_en', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['usuario_id'], ['usuario.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('clave_activa')
+    )
+    op.create_index('ix_reporte_job_clave', 'reporte_job', ['clave'], unique=False)
+    op.create_index('ix_reporte_job_expira_en', 'reporte_job', ['expira_en'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reporte_job_expira_en', table_name='reporte_job')
+    op.drop_index('ix_reporte_job_clave', table_name='reporte_job')
+    op.drop_table('reporte_job')
@@ -313,6 +313,16 @@ class Servicio(db.Model):
     archivos = db.relationship('ArchivoServicio', back_populates='servicio', lazy=True)
     fotos = db.relationship('FotoServicio', back_populates='servicio', lazy=True)
 
+    __table_args__ = (
+        # Soportan los filtros del listado paginado por cursor (ordenado por id)
+        db.Index('ix_servicio_estado_id', 'estado', 'id'),
+        db.Index('ix_servicio_mecanico_id_id', 'mecanico_id', 'id'),
+        db.Index('ix_servicio_fecha_inicio', 'fecha_inicio'),
+        # Marcas de agua de los resúmenes diarios
+        db.Index('ix_servicio_fecha_actualizacion', 'fecha_actualizacion'),
+        db.Index('ix_servicio_fecha_creacion', 'fecha_creacion'),
+    )
+
     def __init__(self, inicializar_estado=False, **kwargs):
         super(Servicio, self).__init__(**kwargs)
         # Solo registrar cambio de estado si se indica explícitamente
@@ -466,6 +476,10 @@ class Repuesto(db.Model):
     estado = db.Column(db.String(20), default='activo')
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Calculados por el pronóstico de demanda nocturno
+    demanda_diaria = db.Column(db.Float)
+    cantidad_reorden = db.Column(db.Integer)
+    fecha_pronostico = db.Column(db.DateTime)
     
     # Relaciones
     proveedor_id = db.Column(db.Integer, db.ForeignKey('proveedor.id'))
@@ -474,6 +488,8 @@ class Repuesto(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('codigo', name='uq_repuesto_codigo'),
+        # Soporta la paginación por cursor ordenada por (nombre, id)
+        db.Index('ix_repuesto_nombre_id', 'nombre', 'id'),
     )
 
     def to_dict(self):
@@ -490,6 +506,8 @@ class Repuesto(db.Model):
             'estado': self.estado,
             'fecha_creacion': self.fecha_creacion.isoformat(),
             'fecha_actualizacion': self.fecha_actualizacion.isoformat(),
+            'demanda_diaria': self.demanda_diaria,
+            'cantidad_reorden': self.cantidad_reorden,
             'proveedor': self.proveedor.to_dict() if self.proveedor else None
         }
 
@@ -539,15 +557,19 @@ class Inventario(db.Model):
 class MovimientoInventario(db.Model):
     __tablename__ = 'movimientos_inventario'
     id = db.Column(db.Integer, primary_key=True)
-    inventario_id = db.Column(db.Integer, db.ForeignKey('inventario.id'), nullable=False)
+    repuesto_id = db.Column(db.Integer, db.ForeignKey('repuesto.id'))
+    inventario_id = db.Column(db.Integer, db.ForeignKey('inventario.id'))
     servicio_id = db.Column(db.Integer, db.ForeignKey('servicio.id'), nullable=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)
     tipo = db.Column(db.String(20), nullable=False)  # 'entrada' o 'salida'
     cantidad = db.Column(db.Integer, nullable=False)
-    fecha = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     motivo = db.Column(db.String(200))
+    notas = db.Column(db.Text)
     referencia = db.Column(db.String(100))  # Número de factura o servicio relacionado
     # Relaciones
-    servicio = db.relationship('Servicio', backref='movimientos_inventario')
+    repuesto = db.relationship('Repuesto', back_populates='movimientos')
+    servicio = db.relationship('Servicio', back_populates='movimientos_inventario')
 
 class Factura(db.Model):
     __tablename__ = 'factura'
@@ -565,6 +587,8 @@ class Factura(db.Model):
     estado = db.Column(db.String(20), default='pendiente')
     metodo_pago = db.Column(db.String(50))
     notas = db.Column(db.Text)
+    # Marca de agua de los resúmenes diarios de facturación
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relaciones
     cliente = db.relationship('Cliente', back_populates='facturas')
@@ -605,6 +629,11 @@ class Notificacion(db.Model):
     servicio_id = db.Column(db.Integer, db.ForeignKey('servicio.id'))
     evento_id = db.Column(db.Integer, db.ForeignKey('evento.id'))
     enviada = db.Column(db.Boolean, default=False)
+    # Notificaciones internas del sistema (alertas de stock, sincronización)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)
+    datos = db.Column(db.Text)
+    leida = db.Column(db.Boolean, default=False, index=True)
+    prioridad = db.Column(db.String(20), default='normal')
 
 class Configuracion(db.Model):
     __tablename__ = 'configuracion'
@@ -669,4 +698,94 @@ class FotoServicio(db.Model):
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=False)
     
     servicio = db.relationship('Servicio', back_populates='fotos')
-    usuario = db.relationship('Usuario', backref='fotos_servicio') 
\ No newline at end of file
+    usuario = db.relationship('Usuario', backref='fotos_servicio')
+
+class ResumenDashboard(db.Model):
+    """Contadores del dashboard mantenidos de forma incremental
+
+    Claves: ``total:<modelo>``, ``estado:<estado>``, ``dia:servicios:<AAAA-MM-DD>``
+    y ``dia:ingresos:<AAAA-MM-DD>``.
+    """
+    __tablename__ = 'resumen_dashboard'
+    
+    clave = db.Column(db.String(80), primary_key=True)
+    valor = db.Column(db.Float, nullable=False, default=0)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ReporteJob(db.Model):
+    """Trabajo de generación de reporte en segundo plano
+
+    ``clave`` es el hash de (tipo, formato, parámetros). ``clave_activa`` la
+    repite mientras el trabajo está en curso o su resultado sigue vigente, y
+    su restricción única impide encolar dos veces el mismo reporte; al fallar
+    o expirar se pone a NULL y deja de bloquear nuevas solicitudes.
+    """
+    __tablename__ = 'reporte_job'
+    
+    ESTADOS = ['pendiente', 'en_proceso', 'completado', 'error']
+    
+    id = db.Column(db.String(36), primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    formato = db.Column(db.String(10), nullable=False)
+    parametros = db.Column(db.JSON, nullable=False, default=dict)
+    clave = db.Column(db.String(64), nullable=False, index=True)
+    clave_activa = db.Column(db.String(64), unique=True)
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')
+    progreso = db.Column(db.Integer, nullable=False, default=0)
+    filas = db.Column(db.Integer)
+    archivo = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'))
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    fecha_inicio = db.Column(db.DateTime)
+    fecha_fin = db.Column(db.DateTime)
+    expira_en = db.Column(db.DateTime, index=True)
+
+class ResumenFacturacionDiaria(db.Model):
+    """Facturas y total facturado por día de emisión, cliente y estado"""
+    __tablename__ = 'resumen_facturacion_diaria'
+    
+    dia = db.Column(db.Date, primary_key=True)
+    cliente_id = db.Column(db.Integer, primary_key=True)
+    estado = db.Column(db.String(20), primary_key=True)
+    facturas = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0)
+
+class ResumenClienteDiario(db.Model):
+    """Servicios completados por día de inicio y cliente (dueño del vehículo)"""
+    __tablename__ = 'resumen_cliente_diario'
+    
+    dia = db.Column(db.Date, primary_key=True)
+    cliente_id = db.Column(db.Integer, primary_key=True)
+    servicios_completados = db.Column(db.Integer, nullable=False, default=0)
+
+class ResumenMecanicoDiario(db.Model):
+    """Servicios completados y horas registradas por día de inicio y mecánico"""
+    __tablename__ = 'resumen_mecanico_diario'
+    
+    dia = db.Column(db.Date, primary_key=True)
+    mecanico_id = db.Column(db.Integer, primary_key=True)
+    servicios_completados = db.Column(db.Integer, nullable=False, default=0)
+    horas = db.Column(db.Float, nullable=False, default=0)
+
+class MarcaAguaResumen(db.Model):
+    """Hasta dónde se procesó cada origen de los resúmenes diarios
+
+    ``fecha`` es la marca temporal para Factura y Servicio; ``ultimo_id`` el
+    último ``HoraTrabajo.id`` procesado (la tabla no guarda fechas de cambio).
+    """
+    __tablename__ = 'marca_agua_resumen'
+    
+    origen = db.Column(db.String(50), primary_key=True)
+    fecha = db.Column(db.DateTime)
+    ultimo_id = db.Column(db.Integer)
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SnapshotStock(db.Model):
+    """Stock y precio de compra de cada repuesto al cierre de un día"""
+    __tablename__ = 'snapshot_stock'
+    
+    fecha = db.Column(db.Date, primary_key=True)
+    repuesto_id = db.Column(db.Integer, db.ForeignKey('repuesto.id', ondelete='CASCADE'), primary_key=True)
+    stock = db.Column(db.Integer, nullable=False, default=0)
+    precio_compra = db.Column(db.Float)
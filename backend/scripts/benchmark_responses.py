@@ -0,0 +1,118 @@
+"""
+Benchmark de serialización JSON y compresión de respuestas
+==========================================================
+
+Descarga sin comprimir las respuestas de los endpoints más grandes y mide:
+
+- Serialización: ``json`` estándar frente a orjson (``FastJSONProvider``).
+- Compresión: bytes resultantes y CPU de gzip y brotli en varios niveles.
+
+Sirve para elegir ``COMPRESSION_GZIP_LEVEL``, ``COMPRESSION_BROTLI_QUALITY``
+y ``COMPRESSION_MIN_SIZE``.
+
+Uso:
+    python -m backend.scripts.benchmark_responses
+    python -m backend.scripts.benchmark_responses -e /api/clientes/ -n 50
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+from flask_jwt_extended import create_access_token
+from backend.app import create_app
+from backend.middleware.compression import brotli
+from backend.utils.json_provider import _por_defecto, orjson
+from backend.models import Usuario
+
+ENDPOINTS = [
+    '/api/servicios/?per_page=200',
+    '/api/clientes/',
+    '/api/inventario/repuestos?per_page=1000',
+    '/api/reports/reports/inventory-analytics',
+]
+
+NIVELES_GZIP = (1, 6, 9)
+CALIDADES_BROTLI = (1, 4, 11)
+
+def medir(funcion: Callable[[], object], repeticiones: int) -> float:
+    """Mediana del tiempo de ``funcion`` en milisegundos"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def medir_endpoint(cliente, endpoint: str, token: str, repeticiones: int) -> List[Dict]:
+    respuesta = cliente.get(endpoint, headers={
+        'Authorization': f"Bearer {token}",
+        'Accept-Encoding': 'identity'
+    })
+    if respuesta.status_code != 200:
+        print(f"⚠️  {endpoint}: estado {respuesta.status_code}, se omite")
+        return []
+    cuerpo = respuesta.get_data()
+    datos = json.loads(cuerpo)
+
+    filas = [{
+        'metodo': 'json (stdlib)',
+        'bytes': len(json.dumps(datos, default=_por_defecto).encode()),
+        'ms': medir(lambda: json.dumps(datos, default=_por_defecto).encode(), repeticiones)
+    }]
+    if orjson is not None:
+        filas.append({
+            'metodo': 'orjson',
+            'bytes': len(orjson.dumps(datos)),
+            'ms': medir(lambda: orjson.dumps(datos), repeticiones)
+        })
+    for nivel in NIVELES_GZIP:
+        filas.append({
+            'metodo': f"gzip {nivel}",
+            'bytes': len(gzip.compress(cuerpo, compresslevel=nivel)),
+            'ms': medir(lambda: gzip.compress(cuerpo, compresslevel=nivel), repeticiones)
+        })
+    if brotli is not None:
+        for calidad in CALIDADES_BROTLI:
+            filas.append({
+                'metodo': f"brotli {calidad}",
+                'bytes': len(brotli.compress(cuerpo, quality=calidad)),
+                'ms': medir(lambda: brotli.compress(cuerpo, quality=calidad), repeticiones)
+            })
+    for fila in filas:
+        fila['ratio'] = fila['bytes'] / len(cuerpo)
+    return filas
+
+def imprimir(endpoint: str, filas: List[Dict]) -> None:
+    print(f"\n{endpoint}")
+    print(f"  {'método':<16}{'bytes':>12}{'ratio':>8}{'ms':>10}")
+    for fila in filas:
+        print(f"  {fila['metodo']:<16}{fila['bytes']:>12,}{fila['ratio']:>8.2f}{fila['ms']:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de serialización y compresión de respuestas')
+    parser.add_argument('-e', '--endpoint', action='append', help='Endpoint a medir (repetible)')
+    parser.add_argument('-n', '--repeticiones', type=int, default=20, help='Repeticiones por medida')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        usuario = Usuario.query.filter_by(rol='admin').first() or Usuario.query.first()
+        if usuario is None:
+            print("❌ No hay usuarios en la base de datos")
+            return
+        token = create_access_token(identity=usuario.id, additional_claims={'rol': usuario.rol})
+
+        print(f"orjson: {'sí' if orjson is not None else 'no instalado'} · "
+              f"brotli: {'sí' if brotli is not None else 'no instalado'} · "
+              f"repeticiones: {args.repeticiones}")
+        cliente = app.test_client()
+        for endpoint in args.endpoint or ENDPOINTS:
+            filas = medir_endpoint(cliente, endpoint, token, args.repeticiones)
+            if filas:
+                imprimir(endpoint, filas)
+
+if __name__ == '__main__':
+    main()
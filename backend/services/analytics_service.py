@@ -0,0 +1,168 @@
+from backend.models import db, Repuesto, MovimientoInventario
+from backend.services.snapshot_service import stock_snapshots
+from backend.utils.logger import log_activity, measure_time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import select
+import numpy as np
+import pandas as pd
+
+
+class InventoryAnalyticsService:
+    """Rotación, días de cobertura y clasificación ABC de todo el catálogo
+
+    Los movimientos del período y los repuestos se leen en bloque como
+    columnas (dos consultas) y todas las métricas se calculan con operaciones
+    vectorizadas de pandas/NumPy sobre el catálogo completo, sin consultas ni
+    bucles de Python por repuesto.
+
+    - Stock final: el actual si el período termina ahora; para un período
+      pasado, el stock en ``fecha_fin`` según ``stock_snapshots.stock_en``
+      (último snapshot más los movimientos hasta esa fecha).
+    - Stock promedio: media entre el stock inicial del período (reconstruido
+      a partir del final y de las entradas/salidas) y el final.
+    - Rotación anualizada: salidas / stock promedio * 365 / días del período.
+    - Días de cobertura: stock final / consumo diario medio.
+    - ABC: repuestos ordenados por valor consumido (salidas * precio de
+      compra); A hasta el ``UMBRAL_A`` acumulado, B hasta ``UMBRAL_B``, C el
+      resto y los repuestos sin consumo.
+    """
+
+    UMBRAL_A = 0.80
+    UMBRAL_B = 0.95
+    DIAS_POR_DEFECTO = 90
+
+    @staticmethod
+    def _leer(stmt, columnas) -> pd.DataFrame:
+        filas = db.session.execute(stmt).all()
+        return pd.DataFrame.from_records(filas, columns=columnas)
+
+    def _movimientos(self, desde: datetime, hasta: datetime) -> pd.DataFrame:
+        return self._leer(
+            select(
+                MovimientoInventario.repuesto_id,
+                MovimientoInventario.tipo,
+                MovimientoInventario.cantidad
+            ).where(MovimientoInventario.fecha.between(desde, hasta)),
+            ['repuesto_id', 'tipo', 'cantidad']
+        )
+
+    def _repuestos(self, categoria: Optional[str] = None, momento: Optional[datetime] = None) -> pd.DataFrame:
+        """Repuestos activos con su stock en el instante indicado (None para el actual)"""
+        stmt = stock_snapshots.stock_en(momento).where(Repuesto.estado == 'activo')
+        if categoria:
+            stmt = stmt.where(Repuesto.categoria == categoria)
+        columnas = ['id', 'codigo', 'nombre', 'categoria', 'stock', 'precio_compra']
+        return self._leer(stmt, ['id', 'codigo', 'nombre', 'categoria', 'precio_venta', 'stock',
+                                 'precio_compra'])[columnas]
+
+    def _por_tipo(self, movimientos: pd.DataFrame, tipo: str, ids: pd.Index) -> np.ndarray:
+        """Cantidades de un tipo de movimiento sumadas por repuesto, alineadas con ids"""
+        seleccion = movimientos[movimientos['tipo'] == tipo]
+        sumas = seleccion.groupby('repuesto_id')['cantidad'].sum()
+        return sumas.reindex(ids, fill_value=0).to_numpy(dtype=float)
+
+    def clasificar_abc(self, valores: np.ndarray) -> np.ndarray:
+        """Clase A/B/C de cada valor según su participación acumulada"""
+        clases = np.full(len(valores), 'C', dtype=object)
+        total = valores.sum()
+        if total <= 0:
+            return clases
+        orden = np.argsort(-valores, kind='stable')
+        # Participación acumulada hasta el repuesto anterior: el que cruza el
+        # umbral todavía pertenece a la clase superior
+        previa = (np.cumsum(valores[orden]) - valores[orden]) / total
+        ordenadas = np.select(
+            [previa < self.UMBRAL_A, previa < self.UMBRAL_B],
+            ['A', 'B'],
+            default='C'
+        ).astype(object)
+        ordenadas[valores[orden] <= 0] = 'C'
+        clases[orden] = ordenadas
+        return clases
+
+    @measure_time('analytics_inventory')
+    def analizar(
+        self,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        categoria: Optional[str] = None
+    ) -> pd.DataFrame:
+        """Métricas de todos los repuestos activos en el período
+
+        Returns:
+            DataFrame con una fila por repuesto: id, codigo, nombre, categoria,
+            stock, precio_compra, entradas, salidas, stock_promedio, rotacion,
+            consumo_diario, dias_cobertura, valor_consumo y clase_abc
+        """
+        try:
+            ahora = datetime.utcnow()
+            # Un período que termina en el pasado usa el stock en su fecha de fin
+            historico = fecha_fin is not None and fecha_fin < ahora
+            fecha_fin = fecha_fin if historico else ahora
+            fecha_inicio = fecha_inicio or fecha_fin - timedelta(days=self.DIAS_POR_DEFECTO)
+            dias = max((fecha_fin - fecha_inicio).days, 1)
+
+            repuestos = self._repuestos(categoria, fecha_fin if historico else None)
+            movimientos = self._movimientos(fecha_inicio, fecha_fin)
+            ids = pd.Index(repuestos['id'])
+
+            stock = repuestos['stock'].fillna(0).to_numpy(dtype=float)
+            precio = repuestos['precio_compra'].fillna(0).to_numpy(dtype=float)
+            entradas = self._por_tipo(movimientos, 'entrada', ids)
+            salidas = self._por_tipo(movimientos, 'salida', ids)
+
+            stock_inicial = np.maximum(stock - entradas + salidas, 0)
+            stock_promedio = (stock_inicial + stock) / 2
+            consumo_diario = salidas / dias
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rotacion = np.where(stock_promedio > 0, salidas / stock_promedio * (365 / dias), np.nan)
+                dias_cobertura = np.where(consumo_diario > 0, stock / consumo_diario, np.nan)
+
+            valor_consumo = salidas * precio
+            repuestos = repuestos.assign(
+                stock=stock,
+                entradas=entradas,
+                salidas=salidas,
+                stock_promedio=stock_promedio,
+                rotacion=rotacion,
+                consumo_diario=consumo_diario,
+                dias_cobertura=dias_cobertura,
+                valor_consumo=valor_consumo,
+                clase_abc=self.clasificar_abc(valor_consumo)
+            )
+            repuestos.attrs['periodo'] = {
+                'inicio': fecha_inicio.isoformat(),
+                'fin': fecha_fin.isoformat(),
+                'dias': dias
+            }
+            return repuestos
+
+        except Exception as e:
+            log_activity('analytics_error', f"Error analizando inventario: {str(e)}")
+            raise ValueError(f"Error analizando inventario: {str(e)}")
+
+    def resumen_abc(self, analisis: pd.DataFrame) -> Dict[str, Dict]:
+        """Número de repuestos y valor consumido por clase"""
+        grupos = analisis.groupby('clase_abc')['valor_consumo'].agg(['count', 'sum'])
+        total = float(analisis['valor_consumo'].sum())
+        return {
+            clase: {
+                'repuestos': int(grupos.loc[clase, 'count']) if clase in grupos.index else 0,
+                'valor_consumo': float(grupos.loc[clase, 'sum']) if clase in grupos.index else 0.0,
+                'participacion': float(grupos.loc[clase, 'sum']) / total
+                if total and clase in grupos.index else 0.0
+            }
+            for clase in ('A', 'B', 'C')
+        }
+
+    @staticmethod
+    def registros(analisis: pd.DataFrame) -> list:
+        """Filas como diccionarios serializables (NaN e infinitos como None)"""
+        limpio = analisis.replace([np.inf, -np.inf], np.nan)
+        limpio = limpio.astype(object).where(limpio.notna(), None)
+        return limpio.to_dict(orient='records')
+
+
+inventory_analytics = InventoryAnalyticsService()
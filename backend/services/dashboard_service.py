@@ -0,0 +1,446 @@
+from backend.models import db, Cliente, Vehiculo, Servicio, Mecanico, Factura, ResumenDashboard
+from backend.utils.logger import log_activity, metrics, measure_time
+from backend.utils.event_bus import Suscripcion, event_bus
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+from flask import current_app
+from sqlalchemy import event, func, insert, inspect, select, update, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import threading
+import time
+
+
+class DashboardSummaryService:
+    """Contadores del dashboard materializados en la tabla resumen_dashboard
+
+    Los eventos ``after_insert``/``after_update``/``after_delete`` de los
+    modelos suman o restan en la misma transacción que la escritura, con un
+    UPSERT ``valor = valor + delta``, así que leer el dashboard es una única
+    consulta sobre unas decenas de filas. Los ingresos y servicios recientes
+    se guardan por día (según ``Servicio.fecha_inicio``) para poder sumar la
+    ventana de los últimos 30 días sin recorrer las tablas.
+
+    Las escrituras que no pasan por el ORM (SQL directo, cargas masivas) no
+    disparan eventos: ``reconciliar`` recalcula todo desde las tablas de
+    origen y lo ejecuta periódicamente una tarea de Celery.
+    """
+
+    # Días de contadores diarios que se conservan al reconciliar
+    DIAS_RETENIDOS = 40
+
+    # Canal del bus de eventos por el que se publican los cambios
+    CANAL = 'dashboard'
+
+    # Milisegundos que espera EventSource antes de reconectar al cerrarse el stream
+    SSE_RECONEXION_MS = 3000
+
+    TOTALES = {
+        'cliente': Cliente,
+        'vehiculo': Vehiculo,
+        'servicio': Servicio,
+        'mecanico': Mecanico,
+    }
+
+    def __init__(self, app=None):
+        self._listeners_registrados = False
+        self._lock = threading.Lock()
+        self._lock_publicacion = threading.Lock()
+        self._ultimo_resumen: Optional[Dict] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registra los eventos de los modelos que alimentan los contadores"""
+        app.extensions['dashboard_summary'] = self
+
+        with self._lock:
+            if not self._listeners_registrados:
+                self._registrar_eventos()
+                self._listeners_registrados = True
+
+        @app.cli.command('reconciliar-dashboard')
+        def reconciliar_dashboard():
+            """Recalcula los contadores del dashboard desde las tablas de origen"""
+            total = self.reconciliar()
+            print(f"Resumen del dashboard reconciliado: {total} contadores")
+
+    # ========== ESCRITURA ==========
+
+    @staticmethod
+    def _dia(fecha: Any) -> Optional[str]:
+        if fecha is None:
+            return None
+        if isinstance(fecha, str):
+            # func.date() de SQLite devuelve el día como texto 'YYYY-MM-DD'
+            return fecha[:10]
+        if isinstance(fecha, datetime):
+            fecha = fecha.date()
+        return fecha.isoformat()
+
+    def _sumar(self, conn, deltas: Dict[str, float]) -> None:
+        """Suma los deltas a los contadores con un UPSERT en la conexión recibida"""
+        deltas = {clave: valor for clave, valor in deltas.items() if clave and valor}
+        if deltas:
+            self._escribir(conn, deltas, acumular=True)
+
+    def _escribir(self, conn, valores: Dict[str, float], acumular: bool) -> None:
+        """UPSERT de los contadores: suma el valor al existente o lo reemplaza"""
+        tabla = ResumenDashboard.__table__
+        ahora = datetime.utcnow()
+        filas = [{'clave': clave, 'valor': valor, 'fecha_actualizacion': ahora}
+                 for clave, valor in sorted(valores.items())]
+
+        dialecto = conn.dialect.name
+        if dialecto in ('postgresql', 'sqlite'):
+            stmt = (pg_insert if dialecto == 'postgresql' else sqlite_insert)(tabla)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[tabla.c.clave],
+                set_={
+                    'valor': tabla.c.valor + stmt.excluded.valor if acumular else stmt.excluded.valor,
+                    'fecha_actualizacion': stmt.excluded.fecha_actualizacion
+                }
+            )
+            conn.execute(stmt, filas)
+            return
+
+        for fila in filas:
+            actualizadas = conn.execute(
+                update(tabla).where(tabla.c.clave == fila['clave']).values(
+                    valor=tabla.c.valor + fila['valor'] if acumular else fila['valor'],
+                    fecha_actualizacion=ahora
+                )
+            ).rowcount
+            if not actualizadas:
+                conn.execute(insert(tabla).values(**fila))
+
+    @staticmethod
+    def _anterior(target: Any, atributo: str) -> Any:
+        """Valor del atributo antes del flush en curso"""
+        historial = inspect(target).attrs[atributo].history
+        if historial.deleted:
+            return historial.deleted[0]
+        return getattr(target, atributo)
+
+    @staticmethod
+    def _facturado(conn, servicio_id: int) -> float:
+        return float(conn.execute(
+            select(func.coalesce(func.sum(Factura.total), 0)).where(Factura.servicio_id == servicio_id)
+        ).scalar() or 0)
+
+    def _ingreso_factura(self, conn, servicio_id: Optional[int], total: Optional[float], signo: int) -> Dict:
+        """Delta de ingresos de una factura según el estado de su servicio"""
+        if not servicio_id or not total:
+            return {}
+        fila = conn.execute(
+            select(Servicio.estado, Servicio.fecha_inicio).where(Servicio.id == servicio_id)
+        ).first()
+        if fila is None or fila.estado != 'completado' or fila.fecha_inicio is None:
+            return {}
+        return {f"dia:ingresos:{self._dia(fila.fecha_inicio)}": signo * total}
+
+    def _registrar_eventos(self) -> None:
+        for nombre, modelo in self.TOTALES.items():
+            if modelo is Servicio:
+                continue
+            self._registrar_total(nombre, modelo)
+
+        # Sin historial activo, asignar un atributo expirado (tras un commit)
+        # no carga el valor anterior y _anterior no vería el cambio
+        for atributo in (Servicio.estado, Servicio.fecha_inicio, Factura.servicio_id, Factura.total):
+            event.listen(atributo, 'set', lambda target, valor, anterior, iniciador: valor,
+                         active_history=True, retval=True)
+
+        @event.listens_for(Servicio, 'after_insert')
+        def _servicio_insertado(mapper, connection, target):
+            self._sumar(connection, {
+                'total:servicio': 1,
+                f"estado:{target.estado}": 1,
+                f"dia:servicios:{self._dia(target.fecha_inicio)}" if target.fecha_inicio else None: 1
+            })
+
+        @event.listens_for(Servicio, 'after_update')
+        def _servicio_actualizado(mapper, connection, target):
+            estado_antes = self._anterior(target, 'estado')
+            fecha_antes = self._anterior(target, 'fecha_inicio')
+            if estado_antes == target.estado and fecha_antes == target.fecha_inicio:
+                return
+
+            deltas: Dict[str, float] = {}
+
+            def sumar(clave, valor):
+                if clave:
+                    deltas[clave] = deltas.get(clave, 0) + valor
+
+            sumar(f"estado:{estado_antes}", -1)
+            sumar(f"estado:{target.estado}", 1)
+            dia_antes, dia_ahora = self._dia(fecha_antes), self._dia(target.fecha_inicio)
+            sumar(f"dia:servicios:{dia_antes}" if dia_antes else None, -1)
+            sumar(f"dia:servicios:{dia_ahora}" if dia_ahora else None, 1)
+
+            # Las facturas cuentan como ingreso solo mientras el servicio está completado
+            contaba = estado_antes == 'completado' and dia_antes
+            cuenta = target.estado == 'completado' and dia_ahora
+            if contaba or cuenta:
+                facturado = self._facturado(connection, target.id)
+                if contaba:
+                    sumar(f"dia:ingresos:{dia_antes}", -facturado)
+                if cuenta:
+                    sumar(f"dia:ingresos:{dia_ahora}", facturado)
+
+            self._sumar(connection, deltas)
+
+        @event.listens_for(Servicio, 'after_delete')
+        def _servicio_eliminado(mapper, connection, target):
+            dia = self._dia(target.fecha_inicio)
+            deltas = {
+                'total:servicio': -1,
+                f"estado:{target.estado}": -1,
+                f"dia:servicios:{dia}" if dia else None: -1
+            }
+            if target.estado == 'completado' and dia:
+                deltas[f"dia:ingresos:{dia}"] = -self._facturado(connection, target.id)
+            self._sumar(connection, deltas)
+
+        @event.listens_for(Factura, 'after_insert')
+        def _factura_insertada(mapper, connection, target):
+            self._sumar(connection, self._ingreso_factura(connection, target.servicio_id, target.total, 1))
+
+        @event.listens_for(Factura, 'after_update')
+        def _factura_actualizada(mapper, connection, target):
+            servicio_antes = self._anterior(target, 'servicio_id')
+            total_antes = self._anterior(target, 'total')
+            if servicio_antes == target.servicio_id and total_antes == target.total:
+                return
+            deltas = self._ingreso_factura(connection, servicio_antes, total_antes, -1)
+            for clave, valor in self._ingreso_factura(connection, target.servicio_id, target.total, 1).items():
+                deltas[clave] = deltas.get(clave, 0) + valor
+            self._sumar(connection, deltas)
+
+        @event.listens_for(Factura, 'after_delete')
+        def _factura_eliminada(mapper, connection, target):
+            self._sumar(connection, self._ingreso_factura(connection, target.servicio_id, target.total, -1))
+
+    def _registrar_total(self, nombre: str, modelo: Any) -> None:
+        @event.listens_for(modelo, 'after_insert')
+        def _insertado(mapper, connection, target):
+            self._sumar(connection, {f"total:{nombre}": 1})
+
+        @event.listens_for(modelo, 'after_delete')
+        def _eliminado(mapper, connection, target):
+            self._sumar(connection, {f"total:{nombre}": -1})
+
+    # ========== RECONCILIACIÓN ==========
+
+    def calcular(self) -> Dict[str, float]:
+        """Cuenta todos los contadores desde las tablas de origen, sin escribir
+
+        Returns:
+            dict: Valor de cada clave del resumen
+        """
+        desde = datetime.combine(date.today() - timedelta(days=self.DIAS_RETENIDOS), datetime.min.time())
+        valores: Dict[str, float] = {}
+
+        for nombre, modelo in self.TOTALES.items():
+            valores[f"total:{nombre}"] = db.session.query(func.count(modelo.id)).scalar() or 0
+
+        for estado, total in db.session.query(
+            Servicio.estado, func.count(Servicio.id)
+        ).group_by(Servicio.estado):
+            valores[f"estado:{estado}"] = total
+
+        dia = func.date(Servicio.fecha_inicio)
+        for fecha, total in db.session.query(dia, func.count(Servicio.id)).filter(
+            Servicio.fecha_inicio >= desde
+        ).group_by(dia):
+            valores[f"dia:servicios:{self._dia(fecha)}"] = total
+
+        for fecha, total in db.session.query(dia, func.sum(Factura.total)).join(
+            Servicio, Factura.servicio_id == Servicio.id
+        ).filter(
+            Servicio.fecha_inicio >= desde,
+            Servicio.estado == 'completado'
+        ).group_by(dia):
+            valores[f"dia:ingresos:{self._dia(fecha)}"] = float(total or 0)
+
+        return valores
+
+    @measure_time('dashboard_reconciliar')
+    def reconciliar(self) -> int:
+        """Recalcula todos los contadores desde las tablas de origen
+
+        Corrige la deriva por escrituras fuera del ORM y descarta los
+        contadores diarios anteriores a ``DIAS_RETENIDOS``.
+
+        Antes de contar se bloquean las filas del resumen: los incrementos de
+        transacciones en curso esperan a que termine la reconciliación (y se
+        suman sobre el valor nuevo) y los ya confirmados quedan incluidos en
+        el recuento. Los valores se escriben con UPSERT y solo se borran las
+        claves que ya no existen en las tablas de origen.
+
+        Returns:
+            int: Número de contadores escritos
+        """
+        try:
+            tabla = ResumenDashboard.__table__
+            conn = db.session.connection()
+            # Bloqueo de escritura: filas en PostgreSQL, base de datos en SQLite
+            conn.execute(update(tabla).values(fecha_actualizacion=datetime.utcnow()))
+
+            valores = self.calcular()
+
+            conn.execute(delete(tabla).where(tabla.c.clave.notin_(list(valores))))
+            self._escribir(conn, valores, acumular=False)
+            db.session.commit()
+
+            log_activity('dashboard_reconciliar', f"Resumen del dashboard reconciliado: {len(valores)} contadores")
+            return len(valores)
+
+        except Exception as e:
+            db.session.rollback()
+            log_activity('dashboard_error', f"Error reconciliando el resumen del dashboard: {str(e)}")
+            raise ValueError(f"Error reconciliando el resumen del dashboard: {str(e)}")
+
+    # ========== LECTURA ==========
+
+    @measure_time('dashboard_leer_resumen')
+    def leer(self, dias: int = 30) -> Dict:
+        """Lee los contadores del dashboard con una sola consulta
+
+        Si la tabla aún no se ha poblado (antes de la primera reconciliación
+        del comando ``reconciliar-dashboard`` o de la tarea periódica) se
+        devuelven los contadores calculados desde las tablas de origen, sin
+        escribirlos: una lectura nunca bloquea ni reescribe el resumen.
+
+        Args:
+            dias: Ventana de los contadores recientes
+
+        Returns:
+            dict: totales, servicios_por_estado y recientes (servicios, ingresos)
+        """
+        valores = dict(db.session.execute(
+            select(ResumenDashboard.clave, ResumenDashboard.valor)
+        ).all())
+        if 'total:servicio' not in valores:
+            metrics.increment('dashboard_resumen_sin_poblar')
+            valores = self.calcular()
+
+        desde = (date.today() - timedelta(days=dias)).isoformat()
+        resumen = {
+            'totales': {nombre: int(valores.get(f"total:{nombre}", 0)) for nombre in self.TOTALES},
+            'servicios_por_estado': {estado: 0 for estado in Servicio.ESTADOS},
+            'recientes': {'servicios': 0, 'ingresos': 0.0}
+        }
+        for clave, valor in valores.items():
+            if clave.startswith('estado:'):
+                resumen['servicios_por_estado'][clave[len('estado:'):]] = int(valor)
+            elif clave.startswith('dia:'):
+                _, tipo, dia = clave.split(':', 2)
+                if dia >= desde:
+                    if tipo == 'servicios':
+                        resumen['recientes']['servicios'] += int(valor)
+                    else:
+                        resumen['recientes']['ingresos'] += valor
+        return resumen
+
+    # ========== PUBLICACIÓN ==========
+
+    def instantanea(self) -> Dict:
+        """Último resumen publicado, para enviarlo al conectarse un cliente"""
+        with self._lock_publicacion:
+            if self._ultimo_resumen is None:
+                self._ultimo_resumen = self.leer()
+            return self._ultimo_resumen
+
+    @staticmethod
+    def _diferencias(anterior: Optional[Dict], nuevo: Dict) -> Dict:
+        """Secciones del resumen con solo los valores que cambiaron"""
+        if anterior is None:
+            return nuevo
+        cambios = {}
+        for seccion, valores in nuevo.items():
+            distintos = {
+                clave: valor for clave, valor in valores.items()
+                if anterior.get(seccion, {}).get(clave) != valor
+            }
+            if distintos:
+                cambios[seccion] = distintos
+        return cambios
+
+    def publicar_cambio(self, tipo: str, datos: Optional[Dict] = None) -> None:
+        """Publica en el bus el cambio confirmado y los contadores afectados
+
+        Debe llamarse después del commit. El resumen se lee una sola vez por
+        cambio y se reparte a todos los dashboards conectados a este proceso,
+        en lugar de que cada uno lance sus propias consultas.
+        """
+        if not event_bus.suscriptores(self.CANAL):
+            # Nadie escucha: se invalida la instantánea para no servirla obsoleta
+            self._ultimo_resumen = None
+            return
+        try:
+            with self._lock_publicacion:
+                nuevo = self.leer()
+                cambios = self._diferencias(self._ultimo_resumen, nuevo)
+                self._ultimo_resumen = nuevo
+            event_bus.publicar(self.CANAL, {
+                'tipo': tipo,
+                'datos': datos or {},
+                'cambios': cambios,
+                'fecha': datetime.utcnow().isoformat()
+            })
+        except Exception as e:
+            # Publicar es accesorio: nunca debe romper la operación ya confirmada
+            log_activity('dashboard_error', f"Error publicando cambio del dashboard: {str(e)}")
+
+    # ========== STREAM SSE ==========
+
+    def suscribir(self) -> Suscripcion:
+        """Suscripción a los cambios publicados por este proceso"""
+        return event_bus.suscribir(self.CANAL)
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        event_bus.cancelar(suscripcion)
+
+    @staticmethod
+    def evento_sse(evento: str, datos: Any) -> str:
+        return f"event: {evento}\ndata: {current_app.json.dumps(datos)}\n\n"
+
+    def stream(self, max_duracion: float, heartbeat: float) -> Iterator[str]:
+        """Eventos SSE del dashboard para un cliente conectado
+
+        La suscripción se abre al llamar (antes de leer el resumen), así que
+        ningún cambio confirmado entre la lectura y el primer ``recibir`` se
+        pierde. Cada ``heartbeat`` segundos sin cambios se envía un
+        comentario keep-alive, que además detecta clientes desconectados. A
+        los ``max_duracion`` segundos el stream termina para liberar el
+        worker; EventSource reconecta solo y recibe un resumen nuevo.
+        """
+        suscripcion = self.suscribir()
+        try:
+            resumen = self.instantanea()
+        except Exception:
+            self.cancelar(suscripcion)
+            raise
+        return self._eventos(suscripcion, resumen, max_duracion, heartbeat)
+
+    def _eventos(self, suscripcion: Suscripcion, resumen: Dict,
+                 max_duracion: float, heartbeat: float) -> Iterator[str]:
+        limite = time.monotonic() + max_duracion
+        try:
+            yield f"retry: {self.SSE_RECONEXION_MS}\n"
+            yield self.evento_sse('resumen', resumen)
+            while True:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return
+                mensaje = suscripcion.recibir(timeout=min(heartbeat, restante))
+                if mensaje is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield self.evento_sse('cambio', mensaje)
+        finally:
+            self.cancelar(suscripcion)
+
+
+dashboard_summary = DashboardSummaryService()
@@ -0,0 +1,166 @@
+from backend.models import db, Repuesto, MovimientoInventario
+from backend.services.stock_alert_service import stock_alerts
+from backend.utils.logger import log_activity, measure_time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import select, update
+import numpy as np
+import pandas as pd
+
+
+class DemandForecastService:
+    """Pronóstico de demanda y punto de reorden para todo el catálogo
+
+    Las salidas de inventario de las últimas ``SEMANAS_HISTORIA`` semanas se
+    agrupan en una matriz repuestos × semanas. Sobre ella se ajustan, para
+    todos los repuestos a la vez:
+
+    - Media móvil de las últimas ``SEMANAS_MEDIA_MOVIL`` semanas.
+    - Suavizado exponencial simple (``ALFA``), que es el pronóstico usado.
+
+    Con la demanda diaria pronosticada y la desviación semanal se calculan:
+
+    - ``stock_minimo`` (punto de reorden): demanda durante el plazo de
+      reposición + stock de seguridad ``Z * σ * sqrt(plazo en semanas)``.
+    - ``cantidad_reorden``: demanda prevista para ``DIAS_REVISION`` días.
+
+    Los repuestos sin salidas en la historia conservan su ``stock_minimo``.
+    """
+
+    SEMANAS_HISTORIA = 26
+    SEMANAS_MEDIA_MOVIL = 4
+    ALFA = 0.3
+    # Plazo de reposición del proveedor y nivel de servicio (95%)
+    PLAZO_REPOSICION_DIAS = 7
+    Z = 1.65
+    DIAS_REVISION = 30
+
+    def demanda_semanal(self, hasta: Optional[datetime] = None) -> pd.DataFrame:
+        """Matriz de salidas por repuesto (filas) y semana (columnas, de la más antigua a la última)"""
+        hasta = hasta or datetime.utcnow()
+        desde = hasta - timedelta(weeks=self.SEMANAS_HISTORIA)
+        filas = db.session.execute(
+            select(
+                MovimientoInventario.repuesto_id,
+                MovimientoInventario.fecha,
+                MovimientoInventario.cantidad
+            ).where(
+                MovimientoInventario.tipo == 'salida',
+                MovimientoInventario.fecha > desde,
+                MovimientoInventario.fecha <= hasta
+            )
+        ).all()
+        salidas = pd.DataFrame.from_records(filas, columns=['repuesto_id', 'fecha', 'cantidad'])
+
+        semanas = range(self.SEMANAS_HISTORIA)
+        if salidas.empty:
+            return pd.DataFrame(columns=list(semanas), dtype=float)
+        # Semana 0 = la más antigua, SEMANAS_HISTORIA - 1 = la que termina en ``hasta``
+        antiguedad = (pd.Timestamp(hasta) - pd.to_datetime(salidas['fecha'])).dt.days // 7
+        salidas['semana'] = self.SEMANAS_HISTORIA - 1 - antiguedad.clip(0, self.SEMANAS_HISTORIA - 1)
+        return salidas.pivot_table(
+            index='repuesto_id', columns='semana', values='cantidad', aggfunc='sum', fill_value=0
+        ).reindex(columns=semanas, fill_value=0).astype(float)
+
+    def suavizado_exponencial(self, matriz: np.ndarray) -> np.ndarray:
+        """Nivel final del suavizado exponencial simple de cada fila"""
+        if matriz.shape[1] == 0:
+            return np.zeros(matriz.shape[0])
+        nivel = matriz[:, 0].copy()
+        # Un paso por semana, vectorizado sobre todos los repuestos
+        for t in range(1, matriz.shape[1]):
+            nivel = self.ALFA * matriz[:, t] + (1 - self.ALFA) * nivel
+        return nivel
+
+    @measure_time('forecast_pronosticar')
+    def pronosticar(self, hasta: Optional[datetime] = None) -> pd.DataFrame:
+        """Demanda pronosticada y parámetros de reorden por repuesto
+
+        Returns:
+            DataFrame indexado por repuesto_id con media_movil, demanda_semanal,
+            demanda_diaria, desviacion_semanal, stock_minimo y cantidad_reorden
+        """
+        try:
+            semanal = self.demanda_semanal(hasta)
+            matriz = semanal.to_numpy(dtype=float)
+
+            media_movil = matriz[:, -self.SEMANAS_MEDIA_MOVIL:].mean(axis=1) if matriz.size else np.zeros(0)
+            pronostico = self.suavizado_exponencial(matriz)
+            desviacion = matriz.std(axis=1, ddof=1) if matriz.shape[1] > 1 else np.zeros(len(matriz))
+
+            demanda_diaria = pronostico / 7
+            plazo_semanas = self.PLAZO_REPOSICION_DIAS / 7
+            seguridad = self.Z * desviacion * np.sqrt(plazo_semanas)
+            stock_minimo = np.ceil(demanda_diaria * self.PLAZO_REPOSICION_DIAS + seguridad)
+            cantidad_reorden = np.maximum(np.ceil(demanda_diaria * self.DIAS_REVISION), 1)
+
+            return pd.DataFrame({
+                'media_movil': media_movil,
+                'demanda_semanal': pronostico,
+                'demanda_diaria': demanda_diaria,
+                'desviacion_semanal': desviacion,
+                'stock_minimo': stock_minimo.astype(int),
+                'cantidad_reorden': cantidad_reorden.astype(int)
+            }, index=semanal.index)
+
+        except Exception as e:
+            log_activity('forecast_error', f"Error pronosticando demanda: {str(e)}")
+            raise ValueError(f"Error pronosticando demanda: {str(e)}")
+
+    @measure_time('forecast_aplicar')
+    def aplicar(self, hasta: Optional[datetime] = None) -> Dict:
+        """Pronostica y guarda stock_minimo y cantidad_reorden en un UPDATE masivo
+
+        Returns:
+            dict: repuestos actualizados y variación total de stock mínimo
+        """
+        try:
+            pronostico = self.pronosticar(hasta)
+            actuales = db.session.execute(
+                select(Repuesto.id, Repuesto.stock, Repuesto.stock_minimo).where(Repuesto.estado == 'activo')
+            ).all()
+            anteriores = {r.id: r.stock_minimo for r in actuales}
+            pronostico = pronostico[pronostico.index.isin(list(anteriores))]
+            if pronostico.empty:
+                return {'actualizados': 0, 'variacion_stock_minimo': 0}
+
+            ahora = datetime.utcnow()
+            # tolist() devuelve tipos de Python, que todos los drivers saben adaptar
+            cambios = [{
+                'id': repuesto_id,
+                'stock_minimo': minimo,
+                'cantidad_reorden': reorden,
+                'demanda_diaria': round(diaria, 4),
+                'fecha_pronostico': ahora
+            } for repuesto_id, minimo, reorden, diaria in zip(
+                pronostico.index.tolist(),
+                pronostico['stock_minimo'].tolist(),
+                pronostico['cantidad_reorden'].tolist(),
+                pronostico['demanda_diaria'].tolist()
+            )]
+
+            # UPDATE por clave primaria con executemany: una sola sentencia
+            db.session.execute(update(Repuesto), cambios)
+            # El UPDATE masivo no dispara eventos del modelo: los repuestos que
+            # quedan por debajo del nuevo mínimo avisan al confirmar
+            stock_alerts.registrar(stock_alerts.detectar_minimos(
+                {r.id: r.stock for r in actuales},
+                anteriores,
+                {c['id']: c['stock_minimo'] for c in cambios}
+            ))
+            db.session.commit()
+
+            variacion = sum(c['stock_minimo'] - (anteriores.get(c['id']) or 0) for c in cambios)
+            log_activity(
+                'forecast_applied',
+                f"Pronóstico aplicado a {len(cambios)} repuestos (stock mínimo {variacion:+d})"
+            )
+            return {'actualizados': len(cambios), 'variacion_stock_minimo': variacion}
+
+        except Exception as e:
+            db.session.rollback()
+            log_activity('forecast_error', f"Error aplicando pronóstico: {str(e)}")
+            raise ValueError(f"Error aplicando pronóstico: {str(e)}")
+
+
+demand_forecast = DemandForecastService()
@@ -4,11 +4,15 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from sqlalchemy import func, and_, desc, case
 from backend.utils.logger import log_activity, metrics, measure_time
+from backend.services.statistics_service import StatisticsService
 import psutil
 import json
 from io import BytesIO
 
 class MetricsService:
+    def __init__(self):
+        self.statistics = StatisticsService()
+
     @measure_time('get_system_metrics')
     def get_system_metrics(self) -> Dict:
         """Obtiene métricas del sistema"""
@@ -98,6 +102,9 @@ class MetricsService:
                 func.sum(Repuesto.stock_actual * Repuesto.precio_compra)
             ).scalar() or 0
             
+            # Servicios del período (consulta agregada compartida con el dashboard)
+            servicios = self.statistics.agregados_servicios(desde=fecha_inicio, hasta=fecha_fin)
+            
             return {
                 'status': 'success',
                 'data': {
@@ -118,6 +125,11 @@ class MetricsService:
                     } for m in movimientos],
                     'proveedores': {
                         'activos': proveedores_activos
+                    },
+                    'servicios': {
+                        'total_periodo': servicios['servicios_periodo'],
+                        'por_estado': servicios['servicios_por_estado'],
+                        'ingresos_mes': servicios['ingresos_mes']
                     }
                 }
             }
@@ -65,11 +65,9 @@ class NotificationService:
             log_activity(
                 'notification_created',
                 f"Nueva notificación creada: {tipo}",
-                {
-                    'tipo': tipo,
-                    'usuario_id': usuario_id,
-                    'datos': datos
-                }
+                tipo=tipo,
+                usuario_id=usuario_id,
+                datos=datos
             )
             
             # Actualizar métricas
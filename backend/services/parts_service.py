@@ -1,12 +1,12 @@
 from backend.models import db, Repuesto
 from backend.utils.logger import log_activity
-from backend.utils.cache import cache_with_args, invalidate_cache_pattern
+from backend.utils.cache import cache_with_args
 from typing import List, Dict, Optional
 from sqlalchemy import or_
 
 class PartsService:
     @staticmethod
-    @cache_with_args(timeout=300, key_prefix='parts')
+    @cache_with_args(timeout=300, key_prefix='parts', tags=('repuestos:list',))
     def get_parts(
         search: Optional[str] = None,
         category: Optional[str] = None,
@@ -51,7 +51,7 @@ class PartsService:
             raise
     
     @staticmethod
-    @cache_with_args(timeout=3600, key_prefix='part')
+    @cache_with_args(timeout=3600, key_prefix='part', tags=('repuesto', 'repuesto:{part_id}'))
     def get_part(part_id: int) -> Dict:
         """Obtiene un repuesto específico con caché"""
         try:
@@ -70,9 +70,6 @@ class PartsService:
             db.session.add(part)
             db.session.commit()
             
-            # Invalidar caché relacionada
-            invalidate_cache_pattern('parts')
-            
             log_activity('part_create', f"Repuesto creado: {part.nombre}")
             return part.to_dict()
             
@@ -92,10 +89,6 @@ class PartsService:
             
             db.session.commit()
             
-            # Invalidar caché relacionada
-            invalidate_cache_pattern('parts')
-            invalidate_cache_pattern(f'part:{part_id}')
-            
             log_activity('part_update', f"Repuesto actualizado: {part.nombre}")
             return part.to_dict()
             
@@ -112,10 +105,6 @@ class PartsService:
             db.session.delete(part)
             db.session.commit()
             
-            # Invalidar caché relacionada
-            invalidate_cache_pattern('parts')
-            invalidate_cache_pattern(f'part:{part_id}')
-            
             log_activity('part_delete', f"Repuesto eliminado: {part.nombre}")
             return True
             
@@ -125,7 +114,7 @@ class PartsService:
             raise
     
     @staticmethod
-    @cache_with_args(timeout=3600, key_prefix='part_categories')
+    @cache_with_args(timeout=3600, key_prefix='part_categories', tags=('repuestos:list',))
     def get_categories() -> List[str]:
         """Obtiene lista de categorías con caché"""
         try:
@@ -137,7 +126,7 @@ class PartsService:
             raise
     
     @staticmethod
-    @cache_with_args(timeout=300, key_prefix='part_stats')
+    @cache_with_args(timeout=300, key_prefix='part_stats', tags=('repuestos:list',))
     def get_stats() -> Dict:
         """Obtiene estadísticas de repuestos con caché"""
         try:
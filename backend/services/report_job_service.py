@@ -0,0 +1,299 @@
+from backend.models import db, ReporteJob
+from backend.services.report_service import ReportService
+from backend.utils.export import EXPORT_FORMATS, normalize_format, stream_export
+from backend.utils.logger import log_activity, measure_time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import hashlib
+import json
+import os
+import uuid
+
+
+class ReportJobService:
+    """Reportes generados en segundo plano con resultados reutilizables
+
+    ``encolar`` registra el trabajo y lo envía a Celery. Si ya hay uno en
+    curso o con resultado vigente para el mismo (tipo, formato, parámetros),
+    devuelve ese trabajo en lugar de generar otro: la restricción única de
+    ``ReporteJob.clave_activa`` resuelve también las solicitudes simultáneas.
+
+    El worker escribe el archivo en ``REPORT_DIR`` con los escritores en
+    streaming de ``utils.export`` y publica el progreso desde una sesión
+    propia, sin interrumpir el cursor del servidor que lee las filas. En
+    SQLite no hay progreso intermedio: el cursor abierto retiene el bloqueo
+    de lectura y la escritura desde otra conexión fallaría con
+    ``database is locked``. Los resultados caducan a los
+    ``REPORT_CACHE_TTL`` segundos.
+    """
+
+    TIPOS = ('inventory-value', 'movements', 'stock-alerts', 'turnover')
+    PARAMETROS = ('tipo', 'fecha_inicio', 'fecha_fin')
+
+    # Un trabajo sin terminar tras este tiempo se considera abandonado
+    # (coincide con task_time_limit de celery_config)
+    TIEMPO_MAXIMO = timedelta(hours=1)
+
+    # Filas entre actualizaciones de progreso
+    PROGRESO_CADA = 1000
+
+    def __init__(self):
+        self.report_service = ReportService()
+
+    # ========== PARÁMETROS ==========
+
+    def normalizar_parametros(self, tipo: str, parametros: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Valida el tipo y deja solo los parámetros conocidos con valor
+
+        Raises:
+            ValueError: Si el tipo no existe o una fecha no es ISO 8601
+        """
+        if tipo not in self.TIPOS:
+            raise ValueError('Tipo de reporte no válido')
+        normalizados = {}
+        for nombre in self.PARAMETROS:
+            valor = (parametros or {}).get(nombre)
+            if valor in (None, ''):
+                continue
+            if nombre.startswith('fecha_'):
+                try:
+                    valor = datetime.fromisoformat(valor).isoformat()
+                except (TypeError, ValueError):
+                    raise ValueError('Las fechas deben tener formato ISO 8601 (AAAA-MM-DD)')
+            normalizados[nombre] = str(valor)
+        return normalizados
+
+    @staticmethod
+    def clave(tipo: str, formato: str, parametros: Dict[str, str]) -> str:
+        """Hash estable de la solicitud, independiente del orden de los parámetros"""
+        contenido = json.dumps([tipo, formato, parametros], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+    # ========== ENCOLADO ==========
+
+    def _vigente(self, job: ReporteJob, ahora: datetime) -> bool:
+        if job.estado == 'completado':
+            return bool(job.expira_en and job.expira_en > ahora and os.path.exists(self.ruta(job)))
+        if job.estado in ('pendiente', 'en_proceso'):
+            return job.fecha_creacion > ahora - self.TIEMPO_MAXIMO
+        return False
+
+    def _liberar(self, job: ReporteJob, error: Optional[str] = None) -> None:
+        """Deja de usar el trabajo para deduplicar (fallido, abandonado o expirado)"""
+        job.clave_activa = None
+        if error and job.estado != 'completado':
+            job.estado = 'error'
+            job.error = error
+            job.fecha_fin = datetime.utcnow()
+
+    @measure_time('report_job_enqueue')
+    def encolar(
+        self,
+        tipo: str,
+        formato: str = 'csv',
+        parametros: Optional[Dict[str, Any]] = None,
+        usuario_id: Optional[int] = None
+    ) -> Tuple[ReporteJob, bool]:
+        """Encola un reporte o reutiliza el trabajo equivalente vigente
+
+        Returns:
+            tuple: (trabajo, creado) donde creado es False si se reutilizó uno existente
+
+        Raises:
+            ValueError: Si la solicitud no es válida o no se pudo encolar
+        """
+        formato = normalize_format(formato)
+        parametros = self.normalizar_parametros(tipo, parametros)
+        clave = self.clave(tipo, formato, parametros)
+        ahora = datetime.utcnow()
+
+        existente = ReporteJob.query.filter_by(clave_activa=clave).first()
+        if existente:
+            if self._vigente(existente, ahora):
+                return existente, False
+            self._liberar(existente, 'Trabajo abandonado')
+            db.session.commit()
+
+        job = ReporteJob(
+            id=str(uuid.uuid4()),
+            tipo=tipo,
+            formato=formato,
+            parametros=parametros,
+            clave=clave,
+            clave_activa=clave,
+            estado='pendiente',
+            progreso=0,
+            usuario_id=usuario_id,
+            fecha_creacion=ahora
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Otra solicitud idéntica se registró entre la consulta y el INSERT
+            db.session.rollback()
+            existente = ReporteJob.query.filter_by(clave_activa=clave).first()
+            if existente:
+                return existente, False
+            raise ValueError('No se pudo registrar el reporte')
+
+        try:
+            from backend.tasks.reports import generate_report_job
+            generate_report_job.apply_async(args=[job.id], queue='low_priority')
+        except Exception as e:
+            self._liberar(job, f"No se pudo encolar: {str(e)}")
+            db.session.commit()
+            log_activity('report_job_error', f"Error encolando reporte {job.id}: {str(e)}")
+            raise ValueError(f"Error encolando reporte: {str(e)}")
+
+        log_activity('report_job_enqueued', f"Reporte {tipo} encolado: {job.id}")
+        return job, True
+
+    # ========== EJECUCIÓN ==========
+
+    def _publicar_progreso(self, job_id: str, **valores: Any) -> None:
+        """Actualiza el trabajo en una sesión aparte para no cerrar el cursor en uso"""
+        with Session(db.engine) as sesion:
+            sesion.execute(update(ReporteJob).where(ReporteJob.id == job_id).values(**valores))
+            sesion.commit()
+
+    @staticmethod
+    def _progreso_en_vivo() -> bool:
+        """Si se puede escribir el progreso mientras el cursor de lectura sigue abierto"""
+        return db.engine.dialect.name != 'sqlite'
+
+    def _con_progreso(
+        self,
+        job_id: str,
+        filas: Iterable[Dict],
+        total: Optional[int],
+        contador: Dict[str, int]
+    ) -> Iterator[Dict]:
+        publicar = self._progreso_en_vivo()
+        for fila in filas:
+            yield fila
+            contador['filas'] += 1
+            if publicar and contador['filas'] % self.PROGRESO_CADA == 0:
+                # Sin total conocido no se puede estimar: se informa solo el conteo
+                progreso = min(99, contador['filas'] * 100 // total) if total else 0
+                self._publicar_progreso(job_id, progreso=progreso, filas=contador['filas'])
+
+    def ruta(self, job: ReporteJob) -> str:
+        directorio = current_app.config.get('REPORT_DIR', os.path.join(os.getcwd(), 'reports'))
+        return os.path.join(directorio, job.archivo or f"{job.id}.{EXPORT_FORMATS[job.formato][1]}")
+
+    @measure_time('report_job_run')
+    def ejecutar(self, job_id: str) -> Optional[ReporteJob]:
+        """Genera el archivo de un trabajo pendiente (lo llama el worker de Celery)
+
+        Raises:
+            ValueError: Si la generación falla; el trabajo queda en estado 'error'
+        """
+        job = db.session.get(ReporteJob, job_id)
+        if job is None or job.estado != 'pendiente':
+            return job
+
+        job.estado = 'en_proceso'
+        job.fecha_inicio = datetime.utcnow()
+        db.session.commit()
+
+        ruta = self.ruta(job)
+        temporal = f"{ruta}.tmp"
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            parametros = {
+                'tipo': job.parametros.get('tipo'),
+                'fecha_inicio': datetime.fromisoformat(job.parametros['fecha_inicio'])
+                if job.parametros.get('fecha_inicio') else None,
+                'fecha_fin': datetime.fromisoformat(job.parametros['fecha_fin'])
+                if job.parametros.get('fecha_fin') else None,
+            }
+            total = self.report_service.export_total(job.tipo, **parametros)
+            contador = {'filas': 0}
+            filas = self._con_progreso(
+                job.id, self.report_service.export_rows(job.tipo, **parametros), total, contador
+            )
+
+            with open(temporal, 'wb') as archivo:
+                for bloque in stream_export(filas, job.formato):
+                    archivo.write(bloque)
+            os.replace(temporal, ruta)
+
+            ttl = current_app.config.get('REPORT_CACHE_TTL', 3600)
+            job.estado = 'completado'
+            job.progreso = 100
+            job.filas = contador['filas']
+            job.archivo = os.path.basename(ruta)
+            job.fecha_fin = datetime.utcnow()
+            job.expira_en = job.fecha_fin + timedelta(seconds=ttl)
+            db.session.commit()
+            log_activity('report_job_done', f"Reporte {job.id} generado ({job.filas} filas)")
+            return job
+
+        except Exception as e:
+            db.session.rollback()
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            job = db.session.get(ReporteJob, job_id)
+            self._liberar(job, str(e))
+            db.session.commit()
+            log_activity('report_job_error', f"Error generando reporte {job_id}: {str(e)}")
+            raise ValueError(f"Error generando reporte: {str(e)}")
+
+    # ========== CONSULTA Y LIMPIEZA ==========
+
+    def obtener(self, job_id: str) -> Optional[ReporteJob]:
+        return db.session.get(ReporteJob, job_id)
+
+    def descargable(self, job: ReporteJob) -> bool:
+        return job.estado == 'completado' and self._vigente(job, datetime.utcnow())
+
+    def a_dict(self, job: ReporteJob) -> Dict[str, Any]:
+        return {
+            'id': job.id,
+            'tipo': job.tipo,
+            'formato': job.formato,
+            'parametros': job.parametros,
+            'estado': job.estado,
+            'progreso': job.progreso,
+            'filas': job.filas,
+            'error': job.error,
+            'fecha_creacion': job.fecha_creacion.isoformat() if job.fecha_creacion else None,
+            'fecha_fin': job.fecha_fin.isoformat() if job.fecha_fin else None,
+            'expira_en': job.expira_en.isoformat() if job.expira_en else None
+        }
+
+    @measure_time('report_job_cleanup')
+    def limpiar_expirados(self) -> int:
+        """Borra los trabajos caducados o fallidos y sus archivos
+
+        Returns:
+            int: Número de trabajos eliminados
+        """
+        try:
+            ahora = datetime.utcnow()
+            caducados = ReporteJob.query.filter(
+                db.or_(
+                    ReporteJob.expira_en <= ahora,
+                    db.and_(ReporteJob.estado == 'error',
+                            ReporteJob.fecha_creacion <= ahora - self.TIEMPO_MAXIMO)
+                )
+            ).all()
+            for job in caducados:
+                if job.archivo and os.path.exists(self.ruta(job)):
+                    os.remove(self.ruta(job))
+                db.session.delete(job)
+            db.session.commit()
+            return len(caducados)
+
+        except Exception as e:
+            db.session.rollback()
+            log_activity('report_job_error', f"Error limpiando reportes: {str(e)}")
+            raise ValueError(f"Error limpiando reportes: {str(e)}")
+
+
+report_jobs = ReportJobService()
@@ -1,54 +1,109 @@
 from backend.models import db, Repuesto, MovimientoInventario, Proveedor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from sqlalchemy import func, and_, desc, case
 from backend.utils.logger import log_activity, metrics, measure_time
-import pandas as pd
+from backend.utils.export import stream_export
+from backend.services.analytics_service import inventory_analytics
+from backend.services.snapshot_service import stock_snapshots
 import json
-from io import BytesIO
+
+# Filas que se leen del cursor del servidor en cada vuelta al exportar
+EXPORT_YIELD_PER = 1000
 
 class ReportService:
     @measure_time('report_inventory_value')
     def get_inventory_value_report(self, fecha_inicio: Optional[datetime] = None, fecha_fin: Optional[datetime] = None) -> Dict:
-        """Genera reporte del valor total del inventario"""
+        """Genera reporte del valor total del inventario
+        
+        El stock se valora en ``fecha_fin`` (o el actual si no se indica),
+        reconstruido desde el último snapshot diario anterior. Con
+        ``fecha_inicio`` se incluye además el valor en ese instante y la
+        variación del período.
+        """
         try:
-            query = db.session.query(
-                Repuesto.codigo,
-                Repuesto.nombre,
-                Repuesto.stock_actual,
-                Repuesto.precio_compra,
-                Repuesto.precio_venta,
-                func.sum(Repuesto.stock_actual * Repuesto.precio_compra).label('valor_total')
-            ).group_by(Repuesto.id)
-            
-            if fecha_inicio and fecha_fin:
-                query = query.filter(
-                    Repuesto.fecha_actualizacion.between(fecha_inicio, fecha_fin)
-                )
+            base = stock_snapshots.snapshot_base(fecha_fin) if fecha_fin else None
+            stock = stock_snapshots.stock_en(fecha_fin, base).subquery()
+            resultados = db.session.execute(
+                db.select(
+                    stock,
+                    (stock.c.stock * stock.c.precio_compra).label('valor_total')
+                ).order_by(stock.c.codigo)
+            ).all()
             
-            resultados = query.all()
+            total_valor = sum(r.valor_total or 0 for r in resultados)
+            data = {
+                'fecha': (fecha_fin or datetime.utcnow()).isoformat(),
+                'snapshot_base': base.isoformat() if base else None,
+                'total_valor': total_valor,
+                'items': [{
+                    'codigo': r.codigo,
+                    'nombre': r.nombre,
+                    'stock': r.stock,
+                    'precio_compra': r.precio_compra,
+                    'precio_venta': r.precio_venta,
+                    'valor_total': r.valor_total
+                } for r in resultados]
+            }
             
-            total_valor = sum(r.valor_total for r in resultados)
+            if fecha_inicio:
+                inicial = stock_snapshots.valoracion_en(fecha_inicio)
+                data['total_valor_inicio'] = inicial['total_valor']
+                data['variacion'] = total_valor - inicial['total_valor']
             
             return {
                 'status': 'success',
-                'data': {
-                    'total_valor': total_valor,
-                    'items': [{
-                        'codigo': r.codigo,
-                        'nombre': r.nombre,
-                        'stock': r.stock_actual,
-                        'precio_compra': r.precio_compra,
-                        'precio_venta': r.precio_venta,
-                        'valor_total': r.valor_total
-                    } for r in resultados]
-                }
+                'data': data
             }
             
         except Exception as e:
             log_activity('report_error', f"Error generando reporte de valor: {str(e)}")
             raise ValueError(f"Error generando reporte: {str(e)}")
     
+    def _movements_query(
+        self,
+        tipo: Optional[str] = None,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None
+    ):
+        """Consulta de movimientos ordenada por fecha descendente"""
+        query = db.session.query(
+            MovimientoInventario,
+            Repuesto.codigo,
+            Repuesto.nombre,
+            Repuesto.precio_compra,
+            Proveedor.nombre.label('proveedor_nombre')
+        ).join(
+            Repuesto,
+            MovimientoInventario.repuesto_id == Repuesto.id
+        ).outerjoin(
+            Proveedor,
+            Repuesto.proveedor_id == Proveedor.id
+        )
+        
+        if tipo:
+            query = query.filter(MovimientoInventario.tipo == tipo)
+        
+        if fecha_inicio and fecha_fin:
+            query = query.filter(
+                MovimientoInventario.fecha.between(fecha_inicio, fecha_fin)
+            )
+        
+        return query.order_by(desc(MovimientoInventario.fecha))
+    
+    @staticmethod
+    def _movement_row(r) -> Dict:
+        return {
+            'id': r.MovimientoInventario.id,
+            'fecha': r.MovimientoInventario.fecha.isoformat(),
+            'tipo': r.MovimientoInventario.tipo,
+            'cantidad': r.MovimientoInventario.cantidad,
+            'precio_unitario': r.precio_compra,
+            'repuesto_codigo': r.codigo,
+            'repuesto_nombre': r.nombre,
+            'proveedor': r.proveedor_nombre
+        }
+    
     @measure_time('report_movements')
     def get_movements_report(
         self,
@@ -58,74 +113,52 @@ class ReportService:
     ) -> Dict:
         """Genera reporte de movimientos de inventario"""
         try:
-            query = db.session.query(
-                MovimientoInventario,
-                Repuesto.codigo,
-                Repuesto.nombre,
-                Proveedor.nombre.label('proveedor_nombre')
-            ).join(
-                Repuesto,
-                MovimientoInventario.repuesto_id == Repuesto.id
-            ).outerjoin(
-                Proveedor,
-                MovimientoInventario.proveedor_id == Proveedor.id
-            )
-            
-            if tipo:
-                query = query.filter(MovimientoInventario.tipo == tipo)
-            
-            if fecha_inicio and fecha_fin:
-                query = query.filter(
-                    MovimientoInventario.fecha.between(fecha_inicio, fecha_fin)
-                )
-            
-            resultados = query.order_by(desc(MovimientoInventario.fecha)).all()
+            resultados = self._movements_query(tipo, fecha_inicio, fecha_fin).all()
             
             return {
                 'status': 'success',
-                'data': [{
-                    'id': r.MovimientoInventario.id,
-                    'fecha': r.MovimientoInventario.fecha.isoformat(),
-                    'tipo': r.MovimientoInventario.tipo,
-                    'cantidad': r.MovimientoInventario.cantidad,
-                    'precio_unitario': r.MovimientoInventario.precio_unitario,
-                    'repuesto_codigo': r.codigo,
-                    'repuesto_nombre': r.nombre,
-                    'proveedor': r.proveedor_nombre
-                } for r in resultados]
+                'data': [self._movement_row(r) for r in resultados]
             }
             
         except Exception as e:
             log_activity('report_error', f"Error generando reporte de movimientos: {str(e)}")
             raise ValueError(f"Error generando reporte: {str(e)}")
     
+    def _stock_alerts_query(self):
+        """Consulta de repuestos con stock en o por debajo del mínimo"""
+        return db.session.query(
+            Repuesto.codigo,
+            Repuesto.nombre,
+            Repuesto.stock.label('stock_actual'),
+            Repuesto.stock_minimo,
+            Proveedor.nombre.label('proveedor_nombre')
+        ).outerjoin(
+            Proveedor,
+            Repuesto.proveedor_id == Proveedor.id
+        ).filter(
+            Repuesto.stock <= Repuesto.stock_minimo
+        ).order_by(Repuesto.codigo)
+    
+    @staticmethod
+    def _stock_alert_row(r) -> Dict:
+        return {
+            'codigo': r.codigo,
+            'nombre': r.nombre,
+            'stock_actual': r.stock_actual,
+            'stock_minimo': r.stock_minimo,
+            'proveedor': r.proveedor_nombre,
+            'estado': 'crítico' if r.stock_actual == 0 else 'bajo'
+        }
+    
     @measure_time('report_stock_alerts')
     def get_stock_alerts_report(self) -> Dict:
         """Genera reporte de alertas de stock"""
         try:
-            resultados = db.session.query(
-                Repuesto.codigo,
-                Repuesto.nombre,
-                Repuesto.stock_actual,
-                Repuesto.stock_minimo,
-                Proveedor.nombre.label('proveedor_nombre')
-            ).outerjoin(
-                Proveedor,
-                Repuesto.proveedor_id == Proveedor.id
-            ).filter(
-                Repuesto.stock_actual <= Repuesto.stock_minimo
-            ).all()
+            resultados = self._stock_alerts_query().all()
             
             return {
                 'status': 'success',
-                'data': [{
-                    'codigo': r.codigo,
-                    'nombre': r.nombre,
-                    'stock_actual': r.stock_actual,
-                    'stock_minimo': r.stock_minimo,
-                    'proveedor': r.proveedor_nombre,
-                    'estado': 'crítico' if r.stock_actual == 0 else 'bajo'
-                } for r in resultados]
+                'data': [self._stock_alert_row(r) for r in resultados]
             }
             
         except Exception as e:
@@ -138,51 +171,28 @@ class ReportService:
         fecha_inicio: Optional[datetime] = None,
         fecha_fin: Optional[datetime] = None
     ) -> Dict:
-        """Genera reporte de rotación de inventario"""
+        """Genera reporte de rotación de inventario
+        
+        Las métricas se calculan de forma vectorizada para todo el catálogo
+        en ``InventoryAnalyticsService``.
+        """
         try:
             if not fecha_inicio:
                 fecha_inicio = datetime.utcnow() - timedelta(days=30)
             if not fecha_fin:
                 fecha_fin = datetime.utcnow()
             
-            # Calcular rotación por repuesto
-            resultados = db.session.query(
-                Repuesto.codigo,
-                Repuesto.nombre,
-                func.sum(
-                    case(
-                        (MovimientoInventario.tipo == 'salida', MovimientoInventario.cantidad),
-                        else_=0
-                    )
-                ).label('unidades_vendidas'),
-                func.avg(Repuesto.stock_actual).label('stock_promedio')
-            ).join(
-                MovimientoInventario,
-                Repuesto.id == MovimientoInventario.repuesto_id
-            ).filter(
-                MovimientoInventario.fecha.between(fecha_inicio, fecha_fin)
-            ).group_by(
-                Repuesto.id
-            ).all()
-            
-            # Calcular días del período
-            dias_periodo = (fecha_fin - fecha_inicio).days
+            analisis = inventory_analytics.analizar(fecha_inicio, fecha_fin)
+            periodo = analisis.attrs['periodo']
+            items = analisis[['codigo', 'nombre', 'salidas', 'stock_promedio', 'rotacion']].rename(
+                columns={'salidas': 'unidades_vendidas'}
+            ).fillna({'rotacion': 0})
             
             return {
                 'status': 'success',
                 'data': {
-                    'periodo': {
-                        'inicio': fecha_inicio.isoformat(),
-                        'fin': fecha_fin.isoformat(),
-                        'dias': dias_periodo
-                    },
-                    'items': [{
-                        'codigo': r.codigo,
-                        'nombre': r.nombre,
-                        'unidades_vendidas': r.unidades_vendidas or 0,
-                        'stock_promedio': r.stock_promedio or 0,
-                        'rotacion': (r.unidades_vendidas or 0) / (r.stock_promedio or 1) * (365 / dias_periodo)
-                    } for r in resultados]
+                    'periodo': periodo,
+                    'items': inventory_analytics.registros(items)
                 }
             }
             
@@ -190,21 +200,71 @@ class ReportService:
             log_activity('report_error', f"Error generando reporte de rotación: {str(e)}")
             raise ValueError(f"Error generando reporte: {str(e)}")
     
+    def export_rows(
+        self,
+        report_type: str,
+        tipo: Optional[str] = None,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None
+    ) -> Iterator[Dict]:
+        """Filas de un reporte para exportar, sin materializar la lista completa
+
+        Los movimientos y las alertas de stock se leen del cursor del servidor
+        con ``yield_per``; los reportes de valor y rotación ya vienen agregados
+        (una fila por repuesto) y se recorren desde su resultado.
+
+        Raises:
+            ValueError: Si el tipo de reporte no existe
+        """
+        if report_type == 'movements':
+            query = self._movements_query(tipo, fecha_inicio, fecha_fin)
+            return (self._movement_row(r) for r in query.yield_per(EXPORT_YIELD_PER))
+        if report_type == 'stock-alerts':
+            query = self._stock_alerts_query()
+            return (self._stock_alert_row(r) for r in query.yield_per(EXPORT_YIELD_PER))
+        if report_type == 'inventory-value':
+            return iter(self.get_inventory_value_report(fecha_inicio, fecha_fin)['data']['items'])
+        if report_type == 'turnover':
+            return iter(self.get_turnover_report(fecha_inicio, fecha_fin)['data']['items'])
+        raise ValueError('Tipo de reporte no válido')
+    
+    def export_total(
+        self,
+        report_type: str,
+        tipo: Optional[str] = None,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None
+    ) -> Optional[int]:
+        """Número de filas que exportará ``export_rows`` (None si no se conoce de antemano)"""
+        if report_type == 'movements':
+            return self._movements_query(tipo, fecha_inicio, fecha_fin).order_by(None).count()
+        if report_type == 'stock-alerts':
+            return self._stock_alerts_query().order_by(None).count()
+        return None
+    
+    def stream_report(self, report_type: str, format: str = 'csv', **params: Any) -> Iterator[bytes]:
+        """Genera el archivo exportado por bloques (CSV o XLSX)
+        
+        El tipo y el formato se validan al llamar, antes de empezar a
+        enviar la respuesta; la lectura de filas ocurre mientras se consume.
+        """
+        try:
+            return stream_export(self.export_rows(report_type, **params), format)
+        except Exception as e:
+            log_activity('report_error', f"Error exportando reporte: {str(e)}")
+            raise ValueError(f"Error exportando reporte: {str(e)}")
+    
     @measure_time('report_export')
     def export_report(self, report_data: Dict, format: str = 'csv') -> bytes:
-        """Exporta un reporte en el formato especificado"""
+        """Exporta un reporte ya generado en el formato especificado
+        
+        Para reportes grandes usar ``stream_report``, que no acumula el archivo.
+        """
         try:
-            df = pd.DataFrame(report_data['data'])
-            
-            if format == 'csv':
-                return df.to_csv(index=False).encode('utf-8')
-            elif format == 'excel':
-                output = BytesIO()
-                df.to_excel(output, index=False)
-                return output.getvalue()
-            else:
-                raise ValueError(f"Formato no soportado: {format}")
+            data = report_data['data']
+            filas = data['items'] if isinstance(data, dict) else data
+            return b''.join(stream_export(filas, format))
                 
         except Exception as e:
             log_activity('report_error', f"Error exportando reporte: {str(e)}")
-            raise ValueError(f"Error exportando reporte: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Error exportando reporte: {str(e)}")
@@ -0,0 +1,338 @@
+from backend.models import (
+    db, Vehiculo, Servicio, Factura, HoraTrabajo, Mecanico,
+    ResumenFacturacionDiaria, ResumenClienteDiario, ResumenMecanicoDiario, MarcaAguaResumen
+)
+from backend.utils.logger import log_activity, measure_time
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import Date, delete, func, insert, or_, select
+
+
+class DailyRollupService:
+    """Resúmenes diarios de facturación, clientes y mecánicos
+
+    Los reportes por período suman filas de ``resumen_*_diaria`` (una por día
+    y cliente/mecánico/estado) en lugar de recorrer Factura, Servicio y
+    HoraTrabajo. Una tarea de Celery llama a ``actualizar``, que:
+
+    1. Busca los días afectados por cambios posteriores a la marca de agua de
+       cada origen (``fecha_actualizacion`` de Factura y Servicio, último id de
+       HoraTrabajo).
+    2. Recalcula solo esos días con ``INSERT ... SELECT ... GROUP BY``, por
+       rangos contiguos de días, y avanza las marcas.
+
+    Recalcular un día es idempotente, así que las marcas se retrasan
+    ``SOLAPE`` para no perder transacciones que confirmaron tarde. Los borrados
+    y los cambios de día de un registro no dejan rastro en las marcas:
+    ``reconstruir`` recalcula todo y se programa semanalmente.
+    """
+
+    ORIGENES = ('factura', 'servicio', 'hora_trabajo')
+
+    # Margen hacia atrás de las marcas de agua temporales
+    SOLAPE = timedelta(minutes=5)
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['daily_rollups'] = self
+
+        @app.cli.command('reconstruir-resumenes')
+        def reconstruir_resumenes():
+            """Recalcula los resúmenes diarios desde las tablas de origen"""
+            dias = self.reconstruir()
+            print(f"Resúmenes diarios reconstruidos: {dias} días")
+
+    # ========== CÁLCULO ==========
+
+    @staticmethod
+    def _dia(columna: Any) -> Any:
+        """Día de una columna DateTime (DATE() en SQLite y PostgreSQL)"""
+        return func.date(columna, type_=Date)
+
+    @staticmethod
+    def _rangos(dias: Set[date]) -> List[Tuple[date, date]]:
+        """Agrupa los días en rangos contiguos [inicio, fin]"""
+        rangos: List[List[date]] = []
+        for dia in sorted(dias):
+            if rangos and dia == rangos[-1][1] + timedelta(days=1):
+                rangos[-1][1] = dia
+            else:
+                rangos.append([dia, dia])
+        return [(inicio, fin) for inicio, fin in rangos]
+
+    def _recalcular_rango(self, inicio: date, fin: date) -> None:
+        """Sustituye los resúmenes de los días [inicio, fin] por los de origen"""
+        desde = datetime.combine(inicio, time.min)
+        hasta = datetime.combine(fin + timedelta(days=1), time.min)
+
+        for modelo in (ResumenFacturacionDiaria, ResumenClienteDiario, ResumenMecanicoDiario):
+            db.session.execute(delete(modelo).where(modelo.dia.between(inicio, fin)))
+
+        dia_factura = self._dia(Factura.fecha_emision)
+        estado_factura = func.coalesce(Factura.estado, 'pendiente')
+        db.session.execute(insert(ResumenFacturacionDiaria).from_select(
+            ['dia', 'cliente_id', 'estado', 'facturas', 'total'],
+            select(
+                dia_factura,
+                Factura.cliente_id,
+                estado_factura,
+                func.count(Factura.id),
+                func.coalesce(func.sum(Factura.total), 0)
+            ).where(
+                Factura.fecha_emision >= desde,
+                Factura.fecha_emision < hasta
+            ).group_by(dia_factura, Factura.cliente_id, estado_factura)
+        ))
+
+        dia_servicio = self._dia(Servicio.fecha_inicio)
+        completados = [
+            Servicio.estado == 'completado',
+            Servicio.fecha_inicio >= desde,
+            Servicio.fecha_inicio < hasta
+        ]
+        db.session.execute(insert(ResumenClienteDiario).from_select(
+            ['dia', 'cliente_id', 'servicios_completados'],
+            select(
+                dia_servicio,
+                Vehiculo.cliente_id,
+                func.count(Servicio.id)
+            ).join(
+                Vehiculo, Servicio.vehiculo_id == Vehiculo.id
+            ).where(*completados).group_by(dia_servicio, Vehiculo.cliente_id)
+        ))
+
+        horas = select(
+            func.coalesce(func.sum(HoraTrabajo.horas_trabajadas), 0)
+        ).where(HoraTrabajo.servicio_id == Servicio.id).scalar_subquery()
+        por_servicio = select(
+            dia_servicio.label('dia'),
+            Servicio.mecanico_id,
+            horas.label('horas')
+        ).where(*completados, Servicio.mecanico_id.isnot(None)).subquery()
+        db.session.execute(insert(ResumenMecanicoDiario).from_select(
+            ['dia', 'mecanico_id', 'servicios_completados', 'horas'],
+            select(
+                por_servicio.c.dia,
+                por_servicio.c.mecanico_id,
+                func.count(),
+                func.coalesce(func.sum(por_servicio.c.horas), 0)
+            ).group_by(por_servicio.c.dia, por_servicio.c.mecanico_id)
+        ))
+
+    def _guardar_marcas(self, ahora: datetime, ultimo_id: Optional[int]) -> None:
+        for origen in self.ORIGENES:
+            marca = db.session.get(MarcaAguaResumen, origen) or MarcaAguaResumen(origen=origen)
+            marca.fecha = ahora
+            marca.ultimo_id = ultimo_id if origen == 'hora_trabajo' else None
+            db.session.add(marca)
+
+    def _dias_modificados(self, marcas: Dict[str, MarcaAguaResumen], ultimo_id: Optional[int]) -> Set[date]:
+        """Días con cambios posteriores a las marcas de agua"""
+        dias: Set[date] = set()
+
+        desde = marcas['factura'].fecha - self.SOLAPE
+        dias.update(db.session.execute(
+            select(self._dia(Factura.fecha_emision).label('dia')).distinct().where(
+                Factura.fecha_actualizacion > desde,
+                Factura.fecha_emision.isnot(None)
+            )
+        ).scalars())
+
+        desde = marcas['servicio'].fecha - self.SOLAPE
+        dias.update(db.session.execute(
+            select(self._dia(Servicio.fecha_inicio).label('dia')).distinct().where(
+                or_(Servicio.fecha_actualizacion > desde, Servicio.fecha_creacion > desde),
+                Servicio.fecha_inicio.isnot(None)
+            )
+        ).scalars())
+
+        procesado = marcas['hora_trabajo'].ultimo_id or 0
+        if ultimo_id and ultimo_id > procesado:
+            dias.update(db.session.execute(
+                select(self._dia(Servicio.fecha_inicio).label('dia')).distinct().join(
+                    HoraTrabajo, HoraTrabajo.servicio_id == Servicio.id
+                ).where(
+                    HoraTrabajo.id > procesado,
+                    HoraTrabajo.id <= ultimo_id,
+                    Servicio.fecha_inicio.isnot(None)
+                )
+            ).scalars())
+
+        return {self._como_fecha(dia) for dia in dias if dia is not None}
+
+    @measure_time('rollup_actualizar')
+    def actualizar(self) -> int:
+        """Recalcula los días modificados desde la última ejecución
+
+        Returns:
+            int: Número de días recalculados
+        """
+        try:
+            marcas = {m.origen: m for m in MarcaAguaResumen.query.all()}
+            if any(marcas.get(o) is None or marcas[o].fecha is None for o in self.ORIGENES):
+                # Primera ejecución: no hay marcas desde las que avanzar
+                return self.reconstruir()
+
+            ahora = datetime.utcnow()
+            ultimo_id = db.session.execute(select(func.max(HoraTrabajo.id))).scalar()
+            dias = self._dias_modificados(marcas, ultimo_id)
+            for inicio, fin in self._rangos(dias):
+                self._recalcular_rango(inicio, fin)
+
+            self._guardar_marcas(ahora, ultimo_id)
+            db.session.commit()
+            return len(dias)
+
+        except Exception as e:
+            db.session.rollback()
+            log_activity('rollup_error', f"Error actualizando resúmenes diarios: {str(e)}")
+            raise ValueError(f"Error actualizando resúmenes diarios: {str(e)}")
+
+    @measure_time('rollup_reconstruir')
+    def reconstruir(self) -> int:
+        """Recalcula todos los resúmenes desde las tablas de origen
+
+        Returns:
+            int: Número de días del rango recalculado
+        """
+        try:
+            ahora = datetime.utcnow()
+            ultimo_id = db.session.execute(select(func.max(HoraTrabajo.id))).scalar()
+            limites = db.session.execute(select(
+                func.min(self._dia(Factura.fecha_emision)),
+                func.max(self._dia(Factura.fecha_emision))
+            )).one(), db.session.execute(select(
+                func.min(self._dia(Servicio.fecha_inicio)),
+                func.max(self._dia(Servicio.fecha_inicio))
+            )).one()
+            inicios = [self._como_fecha(fila[0]) for fila in limites if fila[0] is not None]
+            fines = [self._como_fecha(fila[1]) for fila in limites if fila[1] is not None]
+
+            for modelo in (ResumenFacturacionDiaria, ResumenClienteDiario, ResumenMecanicoDiario):
+                db.session.execute(delete(modelo))
+            dias = 0
+            if inicios:
+                inicio, fin = min(inicios), max(fines)
+                self._recalcular_rango(inicio, fin)
+                dias = (fin - inicio).days + 1
+
+            self._guardar_marcas(ahora, ultimo_id)
+            db.session.commit()
+            log_activity('rollup_rebuild', f"Resúmenes diarios reconstruidos ({dias} días)")
+            return dias
+
+        except Exception as e:
+            db.session.rollback()
+            log_activity('rollup_error', f"Error reconstruyendo resúmenes diarios: {str(e)}")
+            raise ValueError(f"Error reconstruyendo resúmenes diarios: {str(e)}")
+
+    @staticmethod
+    def _como_fecha(valor: Any) -> date:
+        # MIN/MAX sobre DATE() devuelve texto en SQLite
+        if isinstance(valor, str):
+            return date.fromisoformat(valor[:10])
+        if isinstance(valor, datetime):
+            return valor.date()
+        return valor
+
+    # ========== LECTURA ==========
+
+    @staticmethod
+    def _periodo(modelo: Any, desde: Optional[date], hasta: Optional[date]) -> List[Any]:
+        condiciones = []
+        if desde:
+            condiciones.append(modelo.dia >= desde)
+        if hasta:
+            condiciones.append(modelo.dia <= hasta)
+        return condiciones
+
+    def actualizado_hasta(self) -> Optional[str]:
+        """Momento de la última actualización de los resúmenes (ISO 8601)"""
+        fecha = db.session.execute(select(func.min(MarcaAguaResumen.fecha))).scalar()
+        return fecha.isoformat() if fecha else None
+
+    @measure_time('rollup_facturacion')
+    def facturacion(
+        self,
+        desde: Optional[date] = None,
+        hasta: Optional[date] = None,
+        estado: Optional[str] = None
+    ) -> Dict:
+        """Totales de facturación por estado y por mes del período
+
+        Returns:
+            dict: total_facturado, total_facturas, facturas_por_estado y
+            facturas_por_mes ({'AAAA-MM': {'cantidad', 'total'}})
+        """
+        condiciones = self._periodo(ResumenFacturacionDiaria, desde, hasta)
+        if estado:
+            condiciones.append(ResumenFacturacionDiaria.estado == estado)
+        filas = db.session.query(
+            ResumenFacturacionDiaria.dia,
+            ResumenFacturacionDiaria.estado,
+            func.sum(ResumenFacturacionDiaria.facturas).label('facturas'),
+            func.sum(ResumenFacturacionDiaria.total).label('total')
+        ).filter(*condiciones).group_by(
+            ResumenFacturacionDiaria.dia, ResumenFacturacionDiaria.estado
+        ).all()
+
+        resultado = {
+            'total_facturado': 0.0,
+            'total_facturas': 0,
+            'facturas_por_estado': {},
+            'facturas_por_mes': {}
+        }
+        for fila in filas:
+            cantidad, total = int(fila.facturas or 0), float(fila.total or 0)
+            resultado['total_facturado'] += total
+            resultado['total_facturas'] += cantidad
+            por_estado = resultado['facturas_por_estado']
+            por_estado[fila.estado] = por_estado.get(fila.estado, 0) + cantidad
+            mes = resultado['facturas_por_mes'].setdefault(
+                self._como_fecha(fila.dia).strftime('%Y-%m'), {'cantidad': 0, 'total': 0.0}
+            )
+            mes['cantidad'] += cantidad
+            mes['total'] += total
+        return resultado
+
+    def servicios_por_cliente(self, desde: Optional[date] = None, hasta: Optional[date] = None):
+        """Subconsulta (cliente_id, servicios_completados) del período"""
+        return select(
+            ResumenClienteDiario.cliente_id,
+            func.sum(ResumenClienteDiario.servicios_completados).label('servicios_completados')
+        ).where(
+            *self._periodo(ResumenClienteDiario, desde, hasta)
+        ).group_by(ResumenClienteDiario.cliente_id).subquery()
+
+    @measure_time('rollup_mecanicos')
+    def mecanicos(self, desde: Optional[date] = None, hasta: Optional[date] = None) -> List[Dict]:
+        """Servicios completados y horas por mecánico en el período"""
+        servicios = func.sum(ResumenMecanicoDiario.servicios_completados).label('servicios')
+        filas = db.session.query(
+            Mecanico.id,
+            Mecanico.nombre,
+            Mecanico.apellido,
+            Mecanico.especialidad,
+            servicios,
+            func.sum(ResumenMecanicoDiario.horas).label('horas')
+        ).join(
+            ResumenMecanicoDiario, ResumenMecanicoDiario.mecanico_id == Mecanico.id
+        ).filter(
+            *self._periodo(ResumenMecanicoDiario, desde, hasta)
+        ).group_by(
+            Mecanico.id, Mecanico.nombre, Mecanico.apellido, Mecanico.especialidad
+        ).order_by(servicios.desc()).all()
+
+        return [{
+            'id': f.id,
+            'nombre': f"{f.nombre} {f.apellido}",
+            'especialidad': f.especialidad,
+            'servicios_completados': int(f.servicios or 0),
+            'horas_trabajadas': float(f.horas or 0)
+        } for f in filas]
+
+
+daily_rollups = DailyRollupService()
@@ -0,0 +1,467 @@
+from backend.models import db, Repuesto, Cliente, Vehiculo, Servicio
+from backend.utils.logger import log_activity
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event, select, text, inspect, Integer, Float, String
+from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+import logging
+import threading
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Hilos compartidos por todas las búsquedas federadas del proceso, uno por
+# entidad indexada; cada tarea abre su propio contexto de aplicación y sesión
+_executor_busqueda = ThreadPoolExecutor(max_workers=4, thread_name_prefix='busqueda')
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Pasa el texto a minúsculas y elimina acentos para indexar y buscar"""
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', str(texto))
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+class SearchService:
+    """Índice de búsqueda de texto completo para repuestos, clientes, vehículos y servicios
+
+    Cada entidad tiene su propia tabla de índice ``busqueda_<entidad>`` con una
+    fila por registro (``id`` = id de la entidad) y el texto buscable ya
+    normalizado:
+
+    - SQLite: tabla virtual FTS5 con tokenizador ``trigram``, que resuelve
+      búsquedas por subcadena (equivalentes a ``ILIKE '%termino%'``) desde el
+      índice y ordena por ``bm25``.
+    - PostgreSQL: tabla con índice GIN ``pg_trgm`` sobre el contenido y una
+      columna ``tsvector`` generada; ordena por similitud y ``ts_rank``.
+    - Otros motores: tabla normal consultada con ``LIKE`` (sin índice, pero
+      sobre una sola columna ya normalizada).
+
+    El índice se mantiene con eventos ``after_insert``/``after_update``/
+    ``after_delete`` de los modelos, dentro de la misma transacción que la
+    escritura.
+    """
+
+    MIN_TRIGRAM = 3
+
+    # El texto indexado de un servicio incluye datos de su cliente y su vehículo
+    DEPENDENCIAS = {
+        'cliente': [('servicio', Servicio.cliente_id)],
+        'vehiculo': [('servicio', Servicio.vehiculo_id)],
+    }
+
+    def __init__(self, app=None):
+        self.modelos = {
+            'repuesto': Repuesto,
+            'cliente': Cliente,
+            'vehiculo': Vehiculo,
+            'servicio': Servicio,
+        }
+        self.columnas_indexadas = {
+            'repuesto': ('codigo', 'nombre', 'categoria', 'descripcion'),
+            'cliente': ('nombre', 'apellido', 'email', 'telefono'),
+            'vehiculo': ('placa', 'marca', 'modelo'),
+            'servicio': ('titulo', 'tipo_servicio', 'descripcion', 'vehiculo_id', 'cliente_id'),
+        }
+        self.motor = None
+        self._listeners_registrados = False
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Crea las tablas del índice y registra los eventos de los modelos
+
+        Args:
+            app: Aplicación Flask
+        """
+        app.extensions['search_service'] = self
+
+        with app.app_context():
+            self.crear_esquema()
+
+        with self._lock:
+            if not self._listeners_registrados:
+                for entidad, modelo in self.modelos.items():
+                    self._registrar_eventos(entidad, modelo)
+                self._listeners_registrados = True
+
+        @app.cli.command('reconstruir-busqueda')
+        def reconstruir_busqueda():
+            """Reconstruye el índice de búsqueda completo"""
+            total = self.reconstruir()
+            print(f"Índice de búsqueda reconstruido: {total} registros")
+
+    # ========== ESQUEMA ==========
+
+    def _detectar_motor(self, conn) -> str:
+        """Determina qué implementación de índice usar para la conexión"""
+        dialecto = conn.dialect.name
+        if dialecto == 'postgresql':
+            return 'postgresql'
+        if dialecto == 'sqlite':
+            try:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts_probe USING fts5(x, tokenize='trigram')"
+                ))
+                conn.execute(text("DROP TABLE temp._fts_probe"))
+                return 'fts5'
+            except Exception:
+                logger.warning("SQLite sin FTS5/trigram, se usa índice LIKE")
+        return 'like'
+
+    def crear_esquema(self) -> None:
+        """Crea las tablas del índice si no existen"""
+        with db.engine.begin() as conn:
+            self.motor = self._detectar_motor(conn)
+            for entidad in self.modelos:
+                tabla = self._tabla(entidad)
+                if self.motor == 'fts5':
+                    conn.execute(text(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla} "
+                        f"USING fts5(contenido, tokenize='trigram')"
+                    ))
+                elif self.motor == 'postgresql':
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {tabla} ("
+                        f"id INTEGER PRIMARY KEY, "
+                        f"contenido TEXT NOT NULL, "
+                        f"documento TSVECTOR GENERATED ALWAYS AS "
+                        f"(to_tsvector('simple', contenido)) STORED)"
+                    ))
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{tabla}_trgm "
+                        f"ON {tabla} USING gin (contenido gin_trgm_ops)"
+                    ))
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{tabla}_documento "
+                        f"ON {tabla} USING gin (documento)"
+                    ))
+                else:
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {tabla} ("
+                        f"id INTEGER PRIMARY KEY, contenido TEXT NOT NULL)"
+                    ))
+
+    @staticmethod
+    def _tabla(entidad: str) -> str:
+        return f"busqueda_{entidad}"
+
+    # ========== CONTENIDO ==========
+
+    def _consulta_contenido(self, entidad: str):
+        """SELECT que produce (id, campos...) con el texto buscable de la entidad"""
+        if entidad == 'repuesto':
+            return select(Repuesto.id, Repuesto.codigo, Repuesto.nombre,
+                          Repuesto.categoria, Repuesto.descripcion)
+        if entidad == 'cliente':
+            return select(Cliente.id, Cliente.nombre, Cliente.apellido,
+                          Cliente.email, Cliente.telefono)
+        if entidad == 'vehiculo':
+            return select(Vehiculo.id, Vehiculo.placa, Vehiculo.marca, Vehiculo.modelo)
+        if entidad == 'servicio':
+            return select(
+                Servicio.id, Servicio.titulo, Servicio.tipo_servicio, Servicio.descripcion,
+                Cliente.nombre, Cliente.apellido,
+                Vehiculo.placa, Vehiculo.marca, Vehiculo.modelo
+            ).select_from(Servicio).outerjoin(
+                Vehiculo, Servicio.vehiculo_id == Vehiculo.id
+            ).outerjoin(
+                Cliente, Servicio.cliente_id == Cliente.id
+            )
+        raise ValueError(f"Entidad no indexada: {entidad}")
+
+    def _filas_contenido(self, conn, entidad: str, ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Lee los registros de la entidad y construye el texto del índice"""
+        consulta = self._consulta_contenido(entidad)
+        if ids is not None:
+            consulta = consulta.where(self.modelos[entidad].id.in_(list(ids)))
+        return [{
+            'id': fila[0],
+            'contenido': normalizar(' '.join(str(v) for v in fila[1:] if v))
+        } for fila in conn.execute(consulta)]
+
+    # ========== MANTENIMIENTO ==========
+
+    def reindexar(self, conn, entidad: str, ids: Iterable[int]) -> None:
+        """Actualiza las filas del índice de los ids indicados
+
+        Usa la conexión recibida para formar parte de la transacción en curso.
+        """
+        ids = [i for i in ids if i is not None]
+        if not ids or self.motor is None:
+            return
+
+        tabla = self._tabla(entidad)
+        filas = self._filas_contenido(conn, entidad, ids)
+
+        if self.motor == 'postgresql':
+            if filas:
+                conn.execute(text(
+                    f"INSERT INTO {tabla} (id, contenido) VALUES (:id, :contenido) "
+                    f"ON CONFLICT (id) DO UPDATE SET contenido = EXCLUDED.contenido"
+                ), filas)
+        else:
+            columna_id = 'rowid' if self.motor == 'fts5' else 'id'
+            conn.execute(text(f"DELETE FROM {tabla} WHERE {columna_id} = :id"), [{'id': i} for i in ids])
+            if filas:
+                conn.execute(text(
+                    f"INSERT INTO {tabla} ({columna_id}, contenido) VALUES (:id, :contenido)"
+                ), filas)
+
+        # El texto de los servicios incluye datos de cliente y vehículo
+        for dependiente, columna in self.DEPENDENCIAS.get(entidad, []):
+            relacionados = [r for (r,) in conn.execute(
+                select(self.modelos[dependiente].id).where(columna.in_(ids))
+            )]
+            self.reindexar(conn, dependiente, relacionados)
+
+    def eliminar(self, conn, entidad: str, ids: Iterable[int]) -> None:
+        """Elimina del índice los ids indicados"""
+        if self.motor is None:
+            return
+        columna_id = 'rowid' if self.motor == 'fts5' else 'id'
+        conn.execute(
+            text(f"DELETE FROM {self._tabla(entidad)} WHERE {columna_id} = :id"),
+            [{'id': i} for i in ids if i is not None]
+        )
+
+    def reconstruir(self, entidades: Optional[List[str]] = None) -> int:
+        """Reconstruye el índice completo de las entidades indicadas (todas por defecto)"""
+        if self.motor is None:
+            self.crear_esquema()
+
+        total = 0
+        with db.engine.begin() as conn:
+            for entidad in entidades or list(self.modelos):
+                tabla = self._tabla(entidad)
+                columna_id = 'rowid' if self.motor == 'fts5' else 'id'
+                conn.execute(text(f"DELETE FROM {tabla}"))
+                filas = self._filas_contenido(conn, entidad)
+                if filas:
+                    conn.execute(text(
+                        f"INSERT INTO {tabla} ({columna_id}, contenido) VALUES (:id, :contenido)"
+                    ), filas)
+                total += len(filas)
+
+        log_activity('search_rebuild', f"Índice de búsqueda reconstruido: {total} registros")
+        return total
+
+    def _registrar_eventos(self, entidad: str, modelo: Any) -> None:
+        """Mantiene el índice sincronizado con las escrituras del modelo"""
+        columnas = self.columnas_indexadas[entidad]
+
+        @event.listens_for(modelo, 'after_insert')
+        def _after_insert(mapper, connection, target):
+            self.reindexar(connection, entidad, [target.id])
+
+        @event.listens_for(modelo, 'after_update')
+        def _after_update(mapper, connection, target):
+            estado = inspect(target)
+            if any(estado.attrs[c].history.has_changes() for c in columnas):
+                self.reindexar(connection, entidad, [target.id])
+
+        @event.listens_for(modelo, 'after_delete')
+        def _after_delete(mapper, connection, target):
+            self.eliminar(connection, entidad, [target.id])
+
+    # ========== CONSULTA ==========
+
+    def coincidencias(self, entidad: str, termino: str):
+        """Subconsulta con (entidad_id, puntuacion, contenido) de los registros que coinciden
+
+        Una puntuación menor indica mayor relevancia, de modo que se puede ordenar
+        con ``ORDER BY puntuacion`` y combinar con otros filtros mediante JOIN.
+
+        Args:
+            entidad: repuesto, cliente, vehiculo o servicio
+            termino: Texto buscado
+
+        Returns:
+            Subconsulta SQLAlchemy con columnas entidad_id, puntuacion y contenido
+        """
+        if entidad not in self.modelos:
+            raise ValueError(f"Entidad no indexada: {entidad}")
+        if self.motor is None:
+            self.crear_esquema()
+
+        tabla = self._tabla(entidad)
+        termino = normalizar(termino).strip()
+        patron = '%' + termino.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        parametro = f"termino_{entidad}"
+
+        if self.motor == 'fts5' and len(termino) >= self.MIN_TRIGRAM:
+            consulta = text(
+                f"SELECT rowid AS entidad_id, bm25({tabla}) AS puntuacion, contenido "
+                f"FROM {tabla} WHERE {tabla} MATCH :{parametro}"
+            ).bindparams(**{parametro: '"' + termino.replace('"', '""') + '"'})
+        elif self.motor == 'fts5':
+            # Términos cortos: el tokenizador trigram también acelera LIKE
+            consulta = text(
+                f"SELECT rowid AS entidad_id, length(contenido) AS puntuacion, contenido "
+                f"FROM {tabla} WHERE contenido LIKE :{parametro} ESCAPE '\\'"
+            ).bindparams(**{parametro: patron})
+        elif self.motor == 'postgresql':
+            consulta = text(
+                f"SELECT id AS entidad_id, "
+                f"-(similarity(contenido, :{parametro}) "
+                f"+ ts_rank(documento, plainto_tsquery('simple', :{parametro}))) AS puntuacion, "
+                f"contenido "
+                f"FROM {tabla} WHERE contenido ILIKE :{parametro}_patron "
+                f"OR documento @@ plainto_tsquery('simple', :{parametro})"
+            ).bindparams(**{parametro: termino, f"{parametro}_patron": patron})
+        else:
+            consulta = text(
+                f"SELECT id AS entidad_id, length(contenido) AS puntuacion, contenido "
+                f"FROM {tabla} WHERE contenido LIKE :{parametro} ESCAPE '\\'"
+            ).bindparams(**{parametro: patron})
+
+        return consulta.columns(
+            entidad_id=Integer, puntuacion=Float, contenido=String
+        ).subquery(f"busqueda_{entidad}_q")
+
+    def buscar(self, entidad: str, termino: str, page: int = 1, per_page: int = 20,
+               query: Any = None) -> Tuple[List[Any], int]:
+        """Busca registros de una entidad ordenados por relevancia
+
+        Args:
+            entidad: repuesto, cliente, vehiculo o servicio
+            termino: Texto buscado
+            page: Página (desde 1)
+            per_page: Elementos por página
+            query: Consulta base opcional del modelo con filtros adicionales
+
+        Returns:
+            tuple: (registros de la página, total de coincidencias)
+        """
+        modelo = self.modelos[entidad]
+        sub = self.coincidencias(entidad, termino)
+        base = (query if query is not None else modelo.query).join(sub, modelo.id == sub.c.entidad_id)
+
+        total = base.count()
+        items = base.order_by(sub.c.puntuacion, modelo.id)\
+            .offset((page - 1) * per_page)\
+            .limit(per_page)\
+            .all()
+        return items, total
+
+    # ========== BÚSQUEDA FEDERADA ==========
+
+    @staticmethod
+    def relevancia(termino: str, contenido: Optional[str]) -> float:
+        """Puntuación de 0 a 1 comparable entre entidades
+
+        Las puntuaciones nativas del motor (bm25, similarity) no se pueden
+        comparar entre tablas distintas, así que para mezclar resultados se
+        valora el tipo de coincidencia sobre el texto indexado: completa, al
+        inicio, al inicio de una palabra o en medio, más un pequeño extra
+        cuanto mayor parte del texto cubre el término.
+        """
+        termino = normalizar(termino).strip()
+        contenido = contenido or ''
+        if not termino or not contenido:
+            return 0.0
+        if contenido == termino:
+            base = 1.0
+        elif contenido.startswith(termino):
+            base = 0.8
+        elif f" {termino}" in f" {contenido}":
+            base = 0.6
+        elif termino in contenido:
+            base = 0.4
+        else:
+            # Coincidencia solo por tsvector (PostgreSQL)
+            base = 0.2
+        return round(min(base + 0.2 * len(termino) / len(contenido), 1.0), 4)
+
+    def _buscar_entidad(self, session: Session, entidad: str, termino: str,
+                        consulta: Any, limite: int) -> Dict:
+        """Ejecuta la búsqueda acotada de una entidad en la sesión indicada"""
+        modelo = self.modelos[entidad]
+        sub = self.coincidencias(entidad, termino)
+        filas = session.execute(
+            consulta.join(sub, modelo.id == sub.c.entidad_id)
+            .add_columns(sub.c.contenido)
+            .order_by(sub.c.puntuacion, modelo.id)
+            .limit(limite + 1)
+        ).unique().all()
+
+        resultados = [{
+            'tipo': entidad,
+            'registro': registro,
+            'relevancia': self.relevancia(termino, contenido),
+            'posicion': posicion
+        } for posicion, (registro, contenido) in enumerate(filas[:limite])]
+        return {'resultados': resultados, 'hay_mas': len(filas) > limite}
+
+    def _buscar_entidad_aislada(self, app, entidad: str, termino: str,
+                                consulta: Any, limite: int) -> Dict:
+        """Busca una entidad en un hilo con su propia sesión y conexión"""
+        with app.app_context():
+            with Session(db.engine, expire_on_commit=False) as session:
+                resultado = self._buscar_entidad(session, entidad, termino, consulta, limite)
+                # Los registros quedan desvinculados con sus relaciones ya cargadas
+                session.expunge_all()
+                return resultado
+
+    def _admite_conexiones_paralelas(self) -> bool:
+        """Una base SQLite en memoria no se comparte entre conexiones"""
+        url = db.engine.url
+        return not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'))
+
+    def buscar_federado(self, termino: str, consultas: Dict[str, Any],
+                        limite: int = 5, top: int = 20) -> Dict:
+        """Busca en varias entidades a la vez y mezcla los mejores resultados
+
+        Cada entidad se consulta con su propio ``LIMIT`` (``limite + 1`` para
+        saber si hay más) y, si el motor lo permite, en paralelo sobre
+        conexiones independientes del pool. Los resultados se mezclan por
+        relevancia y se devuelven los ``top`` primeros.
+
+        Args:
+            termino: Texto buscado
+            consultas: ``select(Modelo)`` por entidad, con los filtros y las
+                opciones de carga (``joinedload``) que necesite el serializador
+            limite: Máximo de resultados por entidad
+            top: Máximo de resultados en total
+
+        Returns:
+            dict: ``resultados`` (dicts con tipo, registro y relevancia,
+            ordenados de mayor a menor relevancia) y ``hay_mas`` por entidad
+        """
+        for entidad in consultas:
+            if entidad not in self.modelos:
+                raise ValueError(f"Entidad no indexada: {entidad}")
+        if self.motor is None:
+            self.crear_esquema()
+
+        if len(consultas) > 1 and self._admite_conexiones_paralelas():
+            app = current_app._get_current_object()
+            futuros = {
+                entidad: _executor_busqueda.submit(
+                    self._buscar_entidad_aislada, app, entidad, termino, consulta, limite
+                )
+                for entidad, consulta in consultas.items()
+            }
+            parciales = {entidad: futuro.result() for entidad, futuro in futuros.items()}
+        else:
+            parciales = {
+                entidad: self._buscar_entidad(db.session, entidad, termino, consulta, limite)
+                for entidad, consulta in consultas.items()
+            }
+
+        orden_entidades = list(consultas)
+        resultados = [r for parcial in parciales.values() for r in parcial['resultados']]
+        resultados.sort(key=lambda r: (-r['relevancia'], r['posicion'], orden_entidades.index(r['tipo'])))
+
+        return {
+            'resultados': resultados[:top],
+            'hay_mas': {entidad: parcial['hay_mas'] for entidad, parcial in parciales.items()}
+        }
+
+
+search_service = SearchService()
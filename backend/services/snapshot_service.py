@@ -0,0 +1,165 @@
+from backend.models import db, Repuesto, MovimientoInventario, SnapshotStock
+from backend.utils.logger import log_activity, measure_time
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import Date, and_, case, delete, distinct, func, insert, literal, select
+
+
+class StockSnapshotService:
+    """Stock histórico a partir de snapshots diarios y reproducción de movimientos
+
+    Cada noche ``tomar`` guarda el stock de todos los repuestos al cierre del
+    día anterior. El stock en un instante cualquiera es el del último
+    snapshot anterior más la variación neta de los movimientos posteriores
+    hasta ese instante: una lectura del snapshot y, como mucho, un día de
+    movimientos agrupados por repuesto.
+
+    Sin snapshots previos (instantes anteriores al primero) se reproduce
+    hacia atrás desde el stock actual. Los snapshots de más de
+    ``DIAS_RETENCION`` días se reducen al último de cada mes, que sigue
+    acotando la reproducción a un mes de movimientos (los movimientos de más
+    de 90 días los borra ``cleanup_old_data``, así que para esas fechas solo
+    son exactos los cierres de mes).
+    """
+
+    DIAS_RETENCION = 90
+
+    @staticmethod
+    def _como_fecha(valor: Any) -> date:
+        if isinstance(valor, str):
+            return date.fromisoformat(valor[:10])
+        if isinstance(valor, datetime):
+            return valor.date()
+        return valor
+
+    @staticmethod
+    def _variacion(desde: Optional[datetime] = None, hasta: Optional[datetime] = None):
+        """Subconsulta (repuesto_id, delta) con la variación neta de stock en [desde, hasta)"""
+        delta = case(
+            (MovimientoInventario.tipo == 'entrada', MovimientoInventario.cantidad),
+            else_=-MovimientoInventario.cantidad
+        )
+        condiciones = []
+        if desde:
+            condiciones.append(MovimientoInventario.fecha >= desde)
+        if hasta:
+            condiciones.append(MovimientoInventario.fecha < hasta)
+        return select(
+            MovimientoInventario.repuesto_id,
+            func.sum(delta).label('delta')
+        ).where(*condiciones).group_by(MovimientoInventario.repuesto_id).subquery()
+
+    # ========== SNAPSHOTS ==========
+
+    @measure_time('snapshot_tomar')
+    def tomar(self, dia: Optional[date] = None) -> int:
+        """Guarda el stock de cada repuesto al cierre del día (por defecto, ayer)
+
+        El stock de cierre se obtiene del actual descontando los movimientos
+        posteriores, así que la tarea puede ejecutarse con retraso. Repetirla
+        para el mismo día reemplaza el snapshot.
+
+        Returns:
+            int: Número de repuestos guardados
+        """
+        try:
+            dia = dia or datetime.utcnow().date() - timedelta(days=1)
+            cierre = datetime.combine(dia + timedelta(days=1), time.min)
+            posteriores = self._variacion(desde=cierre)
+
+            db.session.execute(delete(SnapshotStock).where(SnapshotStock.fecha == dia))
+            resultado = db.session.execute(insert(SnapshotStock).from_select(
+                ['fecha', 'repuesto_id', 'stock', 'precio_compra'],
+                select(
+                    literal(dia, type_=Date),
+                    Repuesto.id,
+                    func.coalesce(Repuesto.stock, 0) - func.coalesce(posteriores.c.delta, 0),
+                    Repuesto.precio_compra
+                ).outerjoin(
+                    posteriores, posteriores.c.repuesto_id == Repuesto.id
+                ).where(Repuesto.fecha_creacion < cierre)
+            ))
+            self._depurar(dia)
+            db.session.commit()
+            return resultado.rowcount
+
+        except Exception as e:
+            db.session.rollback()
+            log_activity('snapshot_error', f"Error tomando snapshot de stock: {str(e)}")
+            raise ValueError(f"Error tomando snapshot de stock: {str(e)}")
+
+    def _depurar(self, hoy: date) -> None:
+        """Conserva los snapshots recientes y el último de cada mes"""
+        limite = hoy - timedelta(days=self.DIAS_RETENCION)
+        antiguos = [self._como_fecha(f) for f in db.session.execute(
+            select(distinct(SnapshotStock.fecha)).where(SnapshotStock.fecha < limite)
+        ).scalars()]
+        borrar = [f for f in antiguos if (f + timedelta(days=1)).month == f.month]
+        if borrar:
+            db.session.execute(delete(SnapshotStock).where(SnapshotStock.fecha.in_(borrar)))
+
+    # ========== CONSULTA ==========
+
+    def snapshot_base(self, momento: datetime) -> Optional[date]:
+        """Último día cuyo cierre es anterior o igual al instante"""
+        fecha = db.session.execute(
+            select(func.max(SnapshotStock.fecha)).where(SnapshotStock.fecha < momento.date())
+        ).scalar()
+        return self._como_fecha(fecha) if fecha else None
+
+    def stock_en(self, momento: Optional[datetime] = None, base: Optional[date] = None):
+        """Consulta (id, codigo, nombre, categoria, stock, precio_compra, precio_venta) en un instante
+
+        Args:
+            momento: Instante a reconstruir (None para el stock actual)
+            base: Snapshot de partida ya resuelto con ``snapshot_base``
+        """
+        columnas = [Repuesto.id, Repuesto.codigo, Repuesto.nombre, Repuesto.categoria, Repuesto.precio_venta]
+        if momento is None:
+            return select(*columnas, Repuesto.stock.label('stock'), Repuesto.precio_compra.label('precio_compra'))
+
+        base = base or self.snapshot_base(momento)
+        if base is None:
+            # Sin snapshot anterior: se deshacen los movimientos desde el instante
+            posteriores = self._variacion(desde=momento)
+            return select(
+                *columnas,
+                (func.coalesce(Repuesto.stock, 0) - func.coalesce(posteriores.c.delta, 0)).label('stock'),
+                Repuesto.precio_compra.label('precio_compra')
+            ).outerjoin(
+                posteriores, posteriores.c.repuesto_id == Repuesto.id
+            ).where(Repuesto.fecha_creacion < momento)
+
+        variacion = self._variacion(desde=datetime.combine(base + timedelta(days=1), time.min), hasta=momento)
+        return select(
+            *columnas,
+            (func.coalesce(SnapshotStock.stock, 0) + func.coalesce(variacion.c.delta, 0)).label('stock'),
+            func.coalesce(SnapshotStock.precio_compra, Repuesto.precio_compra).label('precio_compra')
+        ).outerjoin(
+            SnapshotStock, and_(SnapshotStock.repuesto_id == Repuesto.id, SnapshotStock.fecha == base)
+        ).outerjoin(
+            variacion, variacion.c.repuesto_id == Repuesto.id
+        ).where(Repuesto.fecha_creacion < momento)
+
+    @measure_time('snapshot_valoracion')
+    def valoracion_en(self, momento: Optional[datetime] = None) -> Dict:
+        """Valor total del inventario en un instante
+
+        Returns:
+            dict: fecha, snapshot_base, total_repuestos y total_valor
+        """
+        base = self.snapshot_base(momento) if momento else None
+        stock = self.stock_en(momento, base).subquery()
+        fila = db.session.execute(select(
+            func.count(stock.c.id).label('repuestos'),
+            func.coalesce(func.sum(stock.c.stock * stock.c.precio_compra), 0).label('valor')
+        )).one()
+        return {
+            'fecha': (momento or datetime.utcnow()).isoformat(),
+            'snapshot_base': base.isoformat() if base else None,
+            'total_repuestos': fila.repuestos,
+            'total_valor': float(fila.valor or 0)
+        }
+
+
+stock_snapshots = StockSnapshotService()
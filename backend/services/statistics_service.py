@@ -0,0 +1,289 @@
+from backend.models import Cliente, Vehiculo, Servicio, Mecanico, Factura, Repuesto
+from backend.extensions import db
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, case, select
+from backend.utils.logger import log_activity, measure_time
+
+
+class StatisticsService:
+    """Estadísticas de servicios calculadas con agregaciones condicionales
+
+    Cada bloque de estadísticas se resuelve con una única consulta:
+
+    - ``agregados_servicios``: conteo por estado, servicios del mes y del
+      período e ingresos, con ``GROUP BY estado`` y ``SUM(CASE ...)``.
+    - ``totales``: conteos de clientes, vehículos, mecánicos y facturación
+      reciente como subconsultas escalares de un solo SELECT.
+    - ``top_mecanicos``: ranking por servicios completados.
+    - ``valoracion_inventario``: valor, conteo por categoría y stock bajo del
+      inventario con ``GROUP BY categoria`` y ``FILTER``.
+
+    Así el panel de control hace un número fijo de viajes a la base de datos
+    en lugar de uno por estado.
+    """
+
+    @staticmethod
+    def _inicio_mes(fecha: Optional[datetime] = None) -> datetime:
+        fecha = fecha or datetime.utcnow()
+        return fecha.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @measure_time('stats_agregados_servicios')
+    def agregados_servicios(
+        self,
+        desde: Optional[datetime] = None,
+        hasta: Optional[datetime] = None,
+        inicio_mes: Optional[datetime] = None
+    ) -> Dict:
+        """Conteos e ingresos de servicios en una sola consulta agrupada
+
+        Args:
+            desde: Inicio del período (por defecto, hace 30 días)
+            hasta: Fin del período (por defecto, sin límite)
+            inicio_mes: Inicio del mes en curso (por defecto, el mes actual)
+
+        Returns:
+            dict: servicios_por_estado (con todos los estados conocidos),
+            total, servicios_mes, ingresos_mes, servicios_periodo
+        """
+        try:
+            desde = desde or datetime.utcnow() - timedelta(days=30)
+            inicio_mes = inicio_mes or self._inicio_mes()
+
+            en_periodo = Servicio.fecha_inicio >= desde
+            if hasta:
+                en_periodo = en_periodo & (Servicio.fecha_inicio <= hasta)
+            filas = db.session.query(
+                Servicio.estado,
+                func.count(Servicio.id).label('total'),
+                func.sum(case((Servicio.fecha_inicio >= inicio_mes, 1), else_=0)).label('mes'),
+                func.sum(case((en_periodo, 1), else_=0)).label('periodo'),
+                func.sum(case(
+                    (Servicio.fecha_fin >= inicio_mes, func.coalesce(Servicio.costo_real, 0)),
+                    else_=0
+                )).label('ingresos_mes')
+            ).group_by(Servicio.estado).all()
+
+            por_estado = {estado: 0 for estado in Servicio.ESTADOS}
+            resultado = {
+                'total': 0,
+                'servicios_mes': 0,
+                'servicios_periodo': 0,
+                'ingresos_mes': 0.0
+            }
+            for fila in filas:
+                por_estado[fila.estado] = fila.total
+                resultado['total'] += fila.total
+                resultado['servicios_mes'] += int(fila.mes or 0)
+                resultado['servicios_periodo'] += int(fila.periodo or 0)
+                # Solo los servicios completados generan ingresos
+                if fila.estado == 'completado':
+                    resultado['ingresos_mes'] = float(fila.ingresos_mes or 0)
+
+            resultado['servicios_por_estado'] = por_estado
+            return resultado
+
+        except Exception as e:
+            log_activity('stats_error', f"Error calculando agregados de servicios: {str(e)}")
+            raise ValueError(f"Error calculando agregados de servicios: {str(e)}")
+
+    @measure_time('stats_totales')
+    def totales(self, desde: Optional[datetime] = None) -> Dict:
+        """Totales generales y facturación reciente en un único SELECT
+
+        Args:
+            desde: Inicio del período de facturación (por defecto, hace 30 días)
+
+        Returns:
+            dict: clientes, vehiculos, servicios, mecanicos e ingresos_periodo
+            (facturas de servicios completados iniciados desde ``desde``)
+        """
+        try:
+            desde = desde or datetime.utcnow() - timedelta(days=30)
+
+            def contar(modelo):
+                return select(func.count(modelo.id)).scalar_subquery()
+
+            ingresos = select(func.coalesce(func.sum(Factura.total), 0)).join(
+                Servicio, Factura.servicio_id == Servicio.id
+            ).where(
+                Servicio.fecha_inicio >= desde,
+                Servicio.estado == 'completado'
+            ).scalar_subquery()
+
+            fila = db.session.execute(select(
+                contar(Cliente).label('clientes'),
+                contar(Vehiculo).label('vehiculos'),
+                contar(Servicio).label('servicios'),
+                contar(Mecanico).label('mecanicos'),
+                ingresos.label('ingresos_periodo')
+            )).one()
+
+            return {
+                'clientes': fila.clientes,
+                'vehiculos': fila.vehiculos,
+                'servicios': fila.servicios,
+                'mecanicos': fila.mecanicos,
+                'ingresos_periodo': float(fila.ingresos_periodo or 0)
+            }
+
+        except Exception as e:
+            log_activity('stats_error', f"Error calculando totales: {str(e)}")
+            raise ValueError(f"Error calculando totales: {str(e)}")
+
+    @measure_time('stats_top_mecanicos')
+    def top_mecanicos(self, limite: int = 5) -> List[Dict]:
+        """Mecánicos con más servicios completados"""
+        try:
+            completados = func.count(Servicio.id).label('servicios_completados')
+            filas = db.session.query(
+                Mecanico.id,
+                Mecanico.nombre,
+                Mecanico.apellido,
+                completados
+            ).join(
+                Servicio, Servicio.mecanico_id == Mecanico.id
+            ).filter(
+                Servicio.estado == 'completado'
+            ).group_by(
+                Mecanico.id, Mecanico.nombre, Mecanico.apellido
+            ).order_by(
+                completados.desc()
+            ).limit(limite).all()
+
+            return [{
+                'id': f.id,
+                'nombre': f"{f.nombre} {f.apellido}",
+                'servicios_completados': f.servicios_completados
+            } for f in filas]
+
+        except Exception as e:
+            log_activity('stats_error', f"Error calculando top de mecánicos: {str(e)}")
+            raise ValueError(f"Error calculando top de mecánicos: {str(e)}")
+
+    @staticmethod
+    def filtros_servicios(
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        estado: Optional[str] = None
+    ) -> List[Any]:
+        """Condiciones de filtro de los reportes de servicios"""
+        condiciones = []
+        if fecha_inicio:
+            condiciones.append(Servicio.fecha_inicio >= fecha_inicio)
+        if fecha_fin:
+            condiciones.append(Servicio.fecha_inicio <= fecha_fin)
+        if estado:
+            condiciones.append(Servicio.estado == estado)
+        return condiciones
+
+    @measure_time('stats_desglose_servicios')
+    def desglose_servicios(
+        self,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        estado: Optional[str] = None
+    ) -> Dict:
+        """Totales de servicios por estado, tipo y mecánico en una sola consulta
+
+        La base de datos agrupa por (estado, tipo_servicio, mecánico) y solo
+        viajan las combinaciones distintas, que son pocas aunque el período
+        tenga decenas de miles de servicios; los tres desgloses se obtienen
+        sumando esos grupos.
+
+        Returns:
+            dict: total_servicios, servicios_por_estado, servicios_por_tipo
+            y servicios_por_mecanico
+        """
+        try:
+            grupos = db.session.query(
+                Servicio.estado,
+                Servicio.tipo_servicio,
+                Mecanico.nombre,
+                Mecanico.apellido,
+                func.count(Servicio.id).label('total')
+            ).outerjoin(
+                Mecanico, Servicio.mecanico_id == Mecanico.id
+            ).filter(
+                *self.filtros_servicios(fecha_inicio, fecha_fin, estado)
+            ).group_by(
+                Servicio.estado, Servicio.tipo_servicio,
+                Servicio.mecanico_id, Mecanico.nombre, Mecanico.apellido
+            ).all()
+
+            resultado = {
+                'total_servicios': 0,
+                'servicios_por_estado': {},
+                'servicios_por_tipo': {},
+                'servicios_por_mecanico': {}
+            }
+            for grupo in grupos:
+                resultado['total_servicios'] += grupo.total
+                por_estado = resultado['servicios_por_estado']
+                por_estado[grupo.estado] = por_estado.get(grupo.estado, 0) + grupo.total
+                por_tipo = resultado['servicios_por_tipo']
+                por_tipo[grupo.tipo_servicio] = por_tipo.get(grupo.tipo_servicio, 0) + grupo.total
+                if grupo.nombre is not None:
+                    nombre = f"{grupo.nombre} {grupo.apellido}"
+                    por_mecanico = resultado['servicios_por_mecanico']
+                    por_mecanico[nombre] = por_mecanico.get(nombre, 0) + grupo.total
+            return resultado
+
+        except Exception as e:
+            log_activity('stats_error', f"Error calculando desglose de servicios: {str(e)}")
+            raise ValueError(f"Error calculando desglose de servicios: {str(e)}")
+
+    @staticmethod
+    def filtros_inventario(categoria: Optional[str] = None, stock_bajo: bool = False) -> List[Any]:
+        """Condiciones de filtro del reporte de inventario (solo repuestos activos)"""
+        condiciones = [Repuesto.estado == 'activo']
+        if categoria:
+            condiciones.append(Repuesto.categoria == categoria)
+        if stock_bajo:
+            condiciones.append(Repuesto.stock <= Repuesto.stock_minimo)
+        return condiciones
+
+    @measure_time('stats_valoracion_inventario')
+    def valoracion_inventario(self, categoria: Optional[str] = None, stock_bajo: bool = False) -> Dict:
+        """Valor del inventario, repuestos por categoría y stock bajo en una consulta
+
+        La base de datos agrupa por categoría y devuelve una fila por grupo con
+        ``COUNT(*)``, ``SUM(stock * precio_compra)`` y
+        ``COUNT(*) FILTER (WHERE stock <= stock_minimo)``; los totales del
+        reporte son la suma de esas pocas filas, así que el coste no depende
+        de cuántos repuestos haya que transferir.
+
+        Returns:
+            dict: total_repuestos, repuestos_por_categoria,
+            valor_total_inventario y repuestos_stock_bajo
+        """
+        try:
+            grupos = db.session.query(
+                Repuesto.categoria,
+                func.count(Repuesto.id).label('total'),
+                func.coalesce(
+                    func.sum(func.coalesce(Repuesto.stock, 0) * Repuesto.precio_compra), 0
+                ).label('valor'),
+                func.count(Repuesto.id).filter(
+                    Repuesto.stock <= Repuesto.stock_minimo
+                ).label('stock_bajo')
+            ).filter(
+                *self.filtros_inventario(categoria, stock_bajo)
+            ).group_by(Repuesto.categoria).all()
+
+            resultado = {
+                'total_repuestos': 0,
+                'repuestos_por_categoria': {},
+                'valor_total_inventario': 0.0,
+                'repuestos_stock_bajo': 0
+            }
+            for grupo in grupos:
+                resultado['total_repuestos'] += grupo.total
+                resultado['repuestos_por_categoria'][grupo.categoria] = grupo.total
+                resultado['valor_total_inventario'] += float(grupo.valor or 0)
+                resultado['repuestos_stock_bajo'] += int(grupo.stock_bajo or 0)
+            return resultado
+
+        except Exception as e:
+            log_activity('stats_error', f"Error calculando valoración de inventario: {str(e)}")
+            raise ValueError(f"Error calculando valoración de inventario: {str(e)}")
@@ -0,0 +1,265 @@
+from backend.models import db, Repuesto
+from backend.services.notification_service import NotificationService
+from backend.utils.cache import remote_cache
+from backend.utils.logger import log_activity, metrics, measure_time
+from datetime import datetime
+from typing import Dict, Optional
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+import threading
+
+
+class StockAlertService:
+    """Alertas de stock bajo emitidas en el momento del movimiento
+
+    ``StockService`` informa, para cada repuesto actualizado, la variación
+    aplicada, el stock resultante y el stock mínimo. Aquí se detectan los
+    cruces del umbral:
+
+    - Bajada: el stock pasa de estar por encima del mínimo a estar en él o
+      por debajo (``stock_bajo``), o llega a cero (``stock_critico``).
+    - Reposición: el stock vuelve a superar el mínimo; se libera la
+      deduplicación para que la próxima bajada vuelva a avisar.
+
+    Las escrituras del ORM que cambian ``stock`` o ``stock_minimo`` de un
+    ``Repuesto`` sin pasar por ``StockService`` (repuestos usados en un
+    servicio, edición del repuesto, sincronización con proveedores) se
+    detectan con el evento ``after_update`` del modelo, comparando el valor
+    anterior con el nuevo. Las actualizaciones masivas que no pasan por el
+    ORM deben llamar a ``detectar_minimos`` o ``detectar``; además,
+    ``revisar`` recorre periódicamente los repuestos bajo el mínimo como
+    respaldo.
+
+    Los cruces se guardan en ``session.info`` y solo se despachan cuando la
+    transacción se confirma (un rollback los descarta). Cada alerta se encola
+    en Celery una única vez por repuesto y nivel: la clave
+    ``stock_alert:<id>:<nivel>`` se reserva con ``add`` (SET NX en Redis, o
+    en el caché local si Redis no responde) durante ``STOCK_ALERT_DEDUP_TTL``
+    segundos, así que un repuesto que oscila alrededor del mínimo o varios
+    procesos que registran movimientos a la vez no generan notificaciones
+    repetidas.
+    """
+
+    CLAVE_SESION = 'alertas_stock'
+    NIVELES = ('stock_bajo', 'stock_critico')
+
+    def __init__(self):
+        self._listeners_registrados = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Registra el despacho de alertas al confirmar las transacciones"""
+        app.extensions['stock_alerts'] = self
+        with self._lock:
+            if not self._listeners_registrados:
+                event.listen(Session, 'after_commit', self._despachar)
+                event.listen(Session, 'after_soft_rollback', self._descartar)
+                # Sin historial activo, asignar un atributo expirado no carga el valor anterior
+                for atributo in (Repuesto.stock, Repuesto.stock_minimo):
+                    event.listen(atributo, 'set', lambda target, valor, anterior, iniciador: valor,
+                                 active_history=True, retval=True)
+                event.listen(Repuesto, 'after_update', self._repuesto_actualizado)
+                self._listeners_registrados = True
+
+    # ========== DETECCIÓN ==========
+
+    @staticmethod
+    def nivel(stock: int, minimo: int) -> Optional[str]:
+        if stock <= 0:
+            return 'stock_critico'
+        if stock <= minimo:
+            return 'stock_bajo'
+        return None
+
+    def detectar(
+        self,
+        deltas: Dict[int, int],
+        stocks: Dict[int, Optional[int]],
+        minimos: Dict[int, Optional[int]]
+    ) -> Dict[int, Dict]:
+        """Cruces del umbral provocados por las variaciones aplicadas
+
+        Returns:
+            dict: Por repuesto_id, ``{'nivel', 'stock', 'stock_minimo'}`` donde
+            nivel es None si el repuesto se repuso por encima del mínimo
+        """
+        cruces = {}
+        for repuesto_id, stock in stocks.items():
+            if stock is None or repuesto_id not in minimos:
+                continue
+            minimo = minimos[repuesto_id]
+            cruce = self.cruce(stock - deltas.get(repuesto_id, 0), minimo, stock, minimo)
+            if cruce:
+                cruces[repuesto_id] = cruce
+        return cruces
+
+    def detectar_minimos(
+        self,
+        stocks: Dict[int, Optional[int]],
+        minimos_antes: Dict[int, Optional[int]],
+        minimos: Dict[int, Optional[int]]
+    ) -> Dict[int, Dict]:
+        """Cruces del umbral provocados por cambiar el stock mínimo sin mover stock"""
+        cruces = {}
+        for repuesto_id, minimo in minimos.items():
+            if repuesto_id not in stocks or repuesto_id not in minimos_antes:
+                continue
+            stock = stocks[repuesto_id] or 0
+            cruce = self.cruce(stock, minimos_antes[repuesto_id], stock, minimo)
+            if cruce:
+                cruces[repuesto_id] = cruce
+        return cruces
+
+    def cruce(
+        self,
+        stock_antes: int,
+        minimo_antes: Optional[int],
+        stock: int,
+        minimo: Optional[int]
+    ) -> Optional[Dict]:
+        """Cruce del umbral entre dos estados de un repuesto, o None si no hay aviso"""
+        nivel_antes = self.nivel(stock_antes, minimo_antes or 0)
+        nivel_ahora = self.nivel(stock, minimo or 0)
+        if nivel_ahora == nivel_antes:
+            return None
+        if nivel_ahora is None or nivel_antes is None or nivel_ahora == 'stock_critico':
+            return {'nivel': nivel_ahora, 'stock': stock, 'stock_minimo': minimo or 0}
+        return None
+
+    def _repuesto_actualizado(self, mapper, connection, target) -> None:
+        """Detecta los cruces de las escrituras del ORM que no pasan por StockService"""
+        estado = inspect(target)
+        cambios = {atributo: estado.attrs[atributo].history for atributo in ('stock', 'stock_minimo')}
+        if not any(h.has_changes() for h in cambios.values()):
+            return
+
+        def anterior(atributo):
+            historial = cambios[atributo]
+            return historial.deleted[0] if historial.deleted else getattr(target, atributo)
+
+        cruce = self.cruce(anterior('stock') or 0, anterior('stock_minimo'), target.stock or 0, target.stock_minimo)
+        if cruce:
+            self.registrar({target.id: cruce}, object_session(target))
+
+    def registrar(self, cruces: Dict[int, Dict], session: Optional[Session] = None) -> None:
+        """Deja los cruces pendientes hasta el commit de la transacción en curso"""
+        if cruces:
+            (session or db.session).info.setdefault(self.CLAVE_SESION, {}).update(cruces)
+
+    # ========== DESPACHO ==========
+
+    @staticmethod
+    def clave(repuesto_id: int, nivel: str) -> str:
+        return f"stock_alert:{repuesto_id}:{nivel}"
+
+    def _descartar(self, session, previous_transaction=None) -> None:
+        session.info.pop(self.CLAVE_SESION, None)
+
+    def _despachar(self, session) -> None:
+        cruces = session.info.pop(self.CLAVE_SESION, None)
+        if cruces:
+            self.encolar(cruces)
+
+    def encolar(self, cruces: Dict[int, Dict]) -> int:
+        """Encola las alertas nuevas y libera las de los repuestos repuestos
+
+        Nunca lanza excepciones: el movimiento ya está confirmado y la alerta
+        es accesoria.
+
+        Returns:
+            int: Número de alertas encoladas
+        """
+        try:
+            if not current_app.config.get('STOCK_ALERTS_ENABLED', True):
+                return 0
+            ttl = current_app.config.get('STOCK_ALERT_DEDUP_TTL', 86400)
+        except RuntimeError:
+            # Fuera de un contexto de aplicación no hay configuración ni caché
+            return 0
+
+        encoladas = 0
+        for repuesto_id, cruce in cruces.items():
+            try:
+                if cruce['nivel'] is None:
+                    for nivel in self.NIVELES:
+                        remote_cache.delete(self.clave(repuesto_id, nivel))
+                    continue
+                if not self._reservar(repuesto_id, cruce['nivel'], ttl):
+                    metrics.increment('stock_alertas_deduplicadas', labels={'nivel': cruce['nivel']})
+                    continue
+
+                from backend.tasks.inventory import notify_low_stock
+                notify_low_stock.apply_async(args=[repuesto_id, cruce['nivel']], queue='high_priority')
+                metrics.increment('stock_alertas_encoladas', labels={'nivel': cruce['nivel']})
+                encoladas += 1
+            except Exception as e:
+                log_activity('stock_alert_error', f"Error encolando alerta del repuesto {repuesto_id}: {str(e)}")
+        return encoladas
+
+    def _reservar(self, repuesto_id: int, nivel: str, ttl: int) -> bool:
+        """Reserva la alerta; False si ya hay una igual encolada o enviada"""
+        try:
+            return bool(remote_cache.add(self.clave(repuesto_id, nivel), datetime.utcnow().isoformat(), timeout=ttl))
+        except Exception as e:
+            # Sin Redis se prefiere un aviso duplicado a perder la alerta
+            log_activity('stock_alert_error', f"Deduplicación no disponible: {str(e)}")
+            return True
+
+    @measure_time('stock_alert_review')
+    def revisar(self) -> int:
+        """Encola las alertas de todos los repuestos que siguen en o bajo el mínimo
+
+        Respaldo periódico de la detección en línea: recupera las alertas
+        perdidas (worker caído, Celery sin conexión al confirmar) y las
+        escrituras que no pasan por el ORM. La deduplicación evita repetir
+        las que ya se enviaron dentro de ``STOCK_ALERT_DEDUP_TTL``.
+
+        Returns:
+            int: Número de alertas encoladas
+        """
+        filas = db.session.query(Repuesto.id, Repuesto.stock, Repuesto.stock_minimo).filter(
+            Repuesto.stock <= Repuesto.stock_minimo
+        ).all()
+        cruces = {}
+        for repuesto_id, stock, minimo in filas:
+            nivel = self.nivel(stock or 0, minimo or 0)
+            if nivel:
+                cruces[repuesto_id] = {'nivel': nivel, 'stock': stock or 0, 'stock_minimo': minimo or 0}
+        return self.encolar(cruces)
+
+    # ========== NOTIFICACIÓN ==========
+
+    @measure_time('stock_alert_notify')
+    def notificar(self, repuesto_id: int, nivel: str) -> Optional[Dict]:
+        """Crea la notificación si el repuesto sigue por debajo del mínimo (lo llama el worker)
+
+        Returns:
+            dict: Datos de la alerta, o None si ya no aplica
+        """
+        repuesto = db.session.get(Repuesto, repuesto_id)
+        if repuesto is None:
+            return None
+        nivel_actual = self.nivel(repuesto.stock or 0, repuesto.stock_minimo or 0)
+        if nivel_actual is None:
+            # Se repuso antes de que el worker procesara la alerta
+            return None
+
+        alerta = {
+            'repuesto_id': repuesto.id,
+            'codigo': repuesto.codigo,
+            'nombre': repuesto.nombre,
+            'stock': repuesto.stock,
+            'stock_minimo': repuesto.stock_minimo
+        }
+        NotificationService().create_notification(
+            tipo=nivel_actual,
+            mensaje=f"Stock {'agotado' if nivel_actual == 'stock_critico' else 'bajo'} "
+                    f"para {repuesto.nombre}: {repuesto.stock} unidades",
+            datos=alerta
+        )
+        log_activity('stock_alert', f"Alerta {nivel_actual} para el repuesto {repuesto.codigo}")
+        return dict(alerta, nivel=nivel_actual)
+
+
+stock_alerts = StockAlertService()
@@ -0,0 +1,353 @@
+from backend.models import db, Repuesto, MovimientoInventario
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import update, select, insert
+from backend.utils.logger import log_activity, metrics
+from backend.services.stock_alert_service import stock_alerts
+
+TIPOS_MOVIMIENTO = ('entrada', 'salida')
+
+
+class StockInsuficienteError(ValueError):
+    """El movimiento dejaría el stock del repuesto en negativo"""
+
+    def __init__(self, repuesto_ids: List[int]):
+        self.repuesto_ids = repuesto_ids
+        super().__init__(f"Stock insuficiente para los repuestos: {repuesto_ids}")
+
+
+class RepuestoNoEncontradoError(ValueError):
+    """El repuesto del movimiento no existe"""
+
+    def __init__(self, repuesto_ids: List[int]):
+        self.repuesto_ids = repuesto_ids
+        super().__init__(f"Repuestos no encontrados: {repuesto_ids}")
+
+
+class StockService:
+    """Aplica movimientos de inventario de forma atómica en la base de datos
+
+    El stock nunca se lee, modifica y escribe desde Python. Cada repuesto se
+    actualiza con una única sentencia condicional::
+
+        UPDATE repuesto SET stock = stock + :delta
+        WHERE id = :id AND stock + :delta >= 0
+
+    de modo que dos escritores concurrentes no pierden actualizaciones y una
+    salida nunca deja el stock en negativo. En PostgreSQL la sentencia toma el
+    bloqueo de fila durante la transacción; en SQLite la escritura está
+    serializada por el bloqueo de la base de datos.
+
+    La misma sentencia devuelve el stock mínimo, con lo que los cruces del
+    umbral se detectan sin consultas extra y se avisan al confirmar la
+    transacción (ver ``StockAlertService``).
+    """
+
+    @staticmethod
+    def delta(tipo: str, cantidad: int) -> int:
+        """Convierte un movimiento en la variación de stock que produce"""
+        return cantidad if tipo == 'entrada' else -cantidad
+
+    @staticmethod
+    def validar(tipo: str, cantidad) -> Optional[str]:
+        """Valida tipo y cantidad de un movimiento sin consultar la base de datos"""
+        if tipo not in TIPOS_MOVIMIENTO:
+            return "Tipo debe ser entrada o salida"
+        try:
+            cantidad = int(cantidad)
+        except (TypeError, ValueError):
+            return "La cantidad debe ser un número entero"
+        if cantidad <= 0:
+            return "La cantidad debe ser mayor a 0"
+        return None
+
+    def aplicar_deltas(
+        self,
+        deltas: Dict[int, int],
+        minimos: Optional[Dict[int, Optional[int]]] = None
+    ) -> Dict[int, Optional[int]]:
+        """Aplica variaciones de stock agrupadas por repuesto
+
+        Los repuestos se actualizan en orden de id para que todas las
+        transacciones tomen los bloqueos de fila en el mismo orden y no se
+        produzcan interbloqueos entre lotes concurrentes.
+
+        No hace commit: forma parte de la transacción del llamador.
+
+        Args:
+            deltas: Variación neta de stock por repuesto_id
+            minimos: Si se indica, se completa con el stock mínimo de cada
+                repuesto actualizado (leído en la misma sentencia)
+
+        Returns:
+            dict: Stock resultante por repuesto_id, o None si la condición
+            no se cumplió (stock insuficiente o repuesto inexistente)
+        """
+        resultado = {}
+        usar_returning = db.session.get_bind().dialect.update_returning
+        ahora = datetime.utcnow()
+
+        for repuesto_id in sorted(deltas):
+            delta = deltas[repuesto_id]
+            stmt = update(Repuesto).where(Repuesto.id == repuesto_id)
+            if delta < 0:
+                stmt = stmt.where(Repuesto.stock + delta >= 0)
+            stmt = stmt.values(
+                stock=Repuesto.stock + delta,
+                fecha_actualizacion=ahora
+            ).execution_options(
+                synchronize_session=False,
+                # Solo este repuesto y los listados, no toda la entidad
+                cache_tags=('repuestos:list', f"repuesto:{repuesto_id}")
+            )
+
+            if usar_returning:
+                fila = db.session.execute(stmt.returning(Repuesto.stock, Repuesto.stock_minimo)).first()
+            else:
+                fila = None
+                if db.session.execute(stmt).rowcount:
+                    fila = db.session.execute(
+                        select(Repuesto.stock, Repuesto.stock_minimo).where(Repuesto.id == repuesto_id)
+                    ).first()
+            resultado[repuesto_id] = fila.stock if fila else None
+            if fila and minimos is not None:
+                minimos[repuesto_id] = fila.stock_minimo
+
+        return resultado
+
+    def _clasificar_fallos(self, repuesto_ids: List[int]) -> None:
+        """Distingue repuestos inexistentes de stock insuficiente y lanza el error"""
+        existentes = {
+            r for (r,) in db.session.execute(
+                select(Repuesto.id).where(Repuesto.id.in_(repuesto_ids))
+            )
+        }
+        no_encontrados = [r for r in repuesto_ids if r not in existentes]
+        if no_encontrados:
+            raise RepuestoNoEncontradoError(no_encontrados)
+        raise StockInsuficienteError(repuesto_ids)
+
+    def registrar(
+        self,
+        repuesto_id: int,
+        cantidad: int,
+        tipo: str,
+        notas: Optional[str] = None,
+        servicio_id: Optional[int] = None,
+        usuario_id: Optional[int] = None,
+        commit: bool = True
+    ) -> Dict:
+        """Registra un movimiento con una sola sentencia UPDATE condicional
+
+        Raises:
+            ValueError: Si el tipo o la cantidad no son válidos
+            RepuestoNoEncontradoError: Si el repuesto no existe
+            StockInsuficienteError: Si una salida supera el stock disponible
+        """
+        return self.registrar_lote([{
+            'repuesto_id': repuesto_id,
+            'cantidad': cantidad,
+            'tipo': tipo,
+            'notas': notas,
+            'servicio_id': servicio_id,
+            'usuario_id': usuario_id
+        }], commit=commit)[0]
+
+    def registrar_lote(self, movimientos: List[Dict], commit: bool = True) -> List[Dict]:
+        """Registra varios movimientos en una única transacción
+
+        Las variaciones se agrupan por repuesto, así que un lote con N
+        movimientos sobre M repuestos ejecuta M sentencias UPDATE. Si algún
+        repuesto no tiene stock suficiente se revierte el lote completo.
+
+        Args:
+            movimientos: Lista de dicts con repuesto_id, cantidad, tipo y
+                opcionalmente notas, servicio_id y usuario_id
+            commit: Si se confirma la transacción al terminar
+
+        Returns:
+            list: Un dict por movimiento con el id creado y el stock resultante
+        """
+        deltas: Dict[int, int] = {}
+        for mov in movimientos:
+            if not isinstance(mov, dict) or 'repuesto_id' not in mov:
+                raise ValueError("Campo repuesto_id es requerido")
+            error = self.validar(mov.get('tipo'), mov.get('cantidad'))
+            if error:
+                raise ValueError(error)
+            try:
+                repuesto_id = int(mov['repuesto_id'])
+            except (TypeError, ValueError):
+                raise ValueError("repuesto_id debe ser un número entero")
+            deltas[repuesto_id] = deltas.get(repuesto_id, 0) + self.delta(mov['tipo'], int(mov['cantidad']))
+
+        try:
+            minimos: Dict[int, Optional[int]] = {}
+            stocks = self.aplicar_deltas(deltas, minimos)
+            fallidos = [r for r, stock in stocks.items() if stock is None]
+            if fallidos:
+                self._clasificar_fallos(fallidos)
+
+            ids = self._insertar_movimientos(movimientos)
+            # Las alertas se despachan cuando se confirme la transacción
+            stock_alerts.registrar(stock_alerts.detectar(deltas, stocks, minimos))
+
+            if commit:
+                db.session.commit()
+        except Exception:
+            # Con commit=False el llamador es dueño de la transacción y debe revertirla
+            if commit:
+                db.session.rollback()
+            metrics.increment('stock_movimientos_rechazados', len(movimientos))
+            raise
+
+        metrics.increment('stock_movimientos_total', len(movimientos))
+        log_activity(
+            'stock_movimiento',
+            f"Registrados {len(movimientos)} movimientos sobre {len(deltas)} repuestos"
+        )
+
+        return [{
+            'id': movimiento_id,
+            'repuesto_id': int(mov['repuesto_id']),
+            'tipo': mov['tipo'],
+            'cantidad': int(mov['cantidad']),
+            'stock_actual': stocks[int(mov['repuesto_id'])]
+        } for movimiento_id, mov in zip(ids, movimientos)]
+
+    def _insertar_movimientos(self, movimientos: List[Dict]) -> List[Optional[int]]:
+        """Inserta los movimientos con un único INSERT por lotes (executemany)
+
+        Cuando el dialecto admite RETURNING en inserciones múltiples se
+        devuelven los ids creados; en caso contrario se devuelve None por fila.
+        """
+        if not movimientos:
+            return []
+
+        fecha = datetime.utcnow()
+        filas = [{
+            'repuesto_id': int(mov['repuesto_id']),
+            'tipo': mov['tipo'],
+            'cantidad': int(mov['cantidad']),
+            'notas': mov.get('notas'),
+            'fecha': fecha,
+            'servicio_id': mov.get('servicio_id'),
+            'usuario_id': mov.get('usuario_id')
+        } for mov in movimientos]
+
+        if db.session.get_bind().dialect.insert_executemany_returning:
+            return list(db.session.scalars(
+                insert(MovimientoInventario).returning(
+                    MovimientoInventario.id, sort_by_parameter_order=True
+                ),
+                filas
+            ))
+
+        db.session.execute(insert(MovimientoInventario), filas)
+        return [None] * len(filas)
+
+    def registrar_lote_parcial(self, movimientos: List[Dict]) -> Dict:
+        """Registra un lote aceptando los movimientos válidos y rechazando el resto
+
+        Pensado para las órdenes de trabajo que consumen muchos repuestos:
+
+        1. Valida todos los movimientos sin tocar la base de datos.
+        2. Carga el stock de todos los repuestos con una sola consulta ``IN``.
+        3. Agrupa las variaciones por repuesto; si el neto de un repuesto deja
+           el stock en negativo se rechazan todos sus movimientos.
+        4. Aplica las variaciones con UPDATE condicionales (la condición se
+           vuelve a comprobar en la base de datos por si hubo escritores
+           concurrentes entre la consulta y la actualización).
+        5. Inserta los movimientos aceptados con un único INSERT por lotes y
+           hace un solo commit.
+
+        Args:
+            movimientos: Lista de dicts con repuesto_id, cantidad, tipo y
+                opcionalmente notas, servicio_id y usuario_id
+
+        Returns:
+            dict: ``resultados`` (uno por movimiento, en el mismo orden),
+            ``exitosos`` y ``fallidos``
+        """
+        resultados: List[Dict] = [{'indice': i, 'exito': False} for i in range(len(movimientos))]
+        grupos: Dict[int, List[int]] = {}
+
+        for i, mov in enumerate(movimientos):
+            if not isinstance(mov, dict) or 'repuesto_id' not in mov:
+                resultados[i]['error'] = "Campo repuesto_id es requerido"
+                continue
+            error = self.validar(mov.get('tipo'), mov.get('cantidad'))
+            if error:
+                resultados[i]['error'] = error
+                continue
+            try:
+                repuesto_id = int(mov['repuesto_id'])
+            except (TypeError, ValueError):
+                resultados[i]['error'] = "repuesto_id debe ser un número entero"
+                continue
+            resultados[i]['repuesto_id'] = repuesto_id
+            grupos.setdefault(repuesto_id, []).append(i)
+
+        try:
+            stock_actual = dict(db.session.execute(
+                select(Repuesto.id, Repuesto.stock).where(Repuesto.id.in_(list(grupos)))
+            ).all()) if grupos else {}
+
+            deltas: Dict[int, int] = {}
+            for repuesto_id, indices in grupos.items():
+                if repuesto_id not in stock_actual:
+                    self._marcar_error(resultados, indices, "Repuesto no encontrado")
+                    continue
+                delta = sum(
+                    self.delta(movimientos[i]['tipo'], int(movimientos[i]['cantidad']))
+                    for i in indices
+                )
+                if (stock_actual[repuesto_id] or 0) + delta < 0:
+                    self._marcar_error(resultados, indices, "Stock insuficiente")
+                    continue
+                deltas[repuesto_id] = delta
+
+            minimos: Dict[int, Optional[int]] = {}
+            stocks = self.aplicar_deltas(deltas, minimos)
+            aceptados = []
+            for repuesto_id, nuevo_stock in stocks.items():
+                if nuevo_stock is None:
+                    self._marcar_error(resultados, grupos[repuesto_id], "Stock insuficiente")
+                    continue
+                aceptados.extend(grupos[repuesto_id])
+            aceptados.sort()
+
+            ids = self._insertar_movimientos([movimientos[i] for i in aceptados])
+            stock_alerts.registrar(stock_alerts.detectar(deltas, stocks, minimos))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for i, movimiento_id in zip(aceptados, ids):
+            resultados[i].update({
+                'exito': True,
+                'id': movimiento_id,
+                'stock_actual': stocks[resultados[i]['repuesto_id']]
+            })
+
+        exitosos = len(aceptados)
+        fallidos = len(movimientos) - exitosos
+        metrics.increment('stock_movimientos_total', exitosos)
+        metrics.increment('stock_movimientos_rechazados', fallidos)
+        log_activity(
+            'stock_movimiento_lote',
+            f"Lote de movimientos: {exitosos} aceptados, {fallidos} rechazados"
+        )
+
+        return {
+            'resultados': resultados,
+            'exitosos': exitosos,
+            'fallidos': fallidos
+        }
+
+    @staticmethod
+    def _marcar_error(resultados: List[Dict], indices: List[int], mensaje: str) -> None:
+        """Marca como fallidos los movimientos indicados"""
+        for i in indices:
+            resultados[i]['error'] = mensaje
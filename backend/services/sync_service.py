@@ -302,6 +302,7 @@ class SyncService:
             log_activity('sync_error', f"Error obteniendo estado de sincronización: {str(e)}")
             return {'status': 'error', 'error': str(e)}
     
+    @cache_decorator(ttl=300)  # Cache por 5 minutos
     def check_storage_limits(self) -> bool:
         """Verifica límites de almacenamiento"""
         try:
@@ -1,7 +1,6 @@
 from celery import Celery
 from backend.utils.logger import log_activity
 from backend.utils.cache import invalidate_cache
-from backend.models import Repuesto
 from backend.services.sync_service import SyncService
 from backend.services.report_service import ReportService
 from backend.services.notification_service import NotificationService
@@ -61,24 +60,3 @@ def cleanup_old_data():
     except Exception as e:
         log_activity('cleanup_error', f"Error en limpieza: {str(e)}")
         raise
-
-@celery.task(name='tasks.check_stock_alerts')
-def check_stock_alerts():
-    """Tarea asíncrona para verificar alertas de stock"""
-    try:
-        notification_service = NotificationService()
-        repuestos_bajo_stock = Repuesto.query.filter(
-            Repuesto.stock_actual <= Repuesto.stock_minimo
-        ).all()
-        
-        for repuesto in repuestos_bajo_stock:
-            notification_service.create_notification(
-                tipo='stock_alert',
-                mensaje=f'Stock bajo para {repuesto.nombre}',
-                datos={'repuesto_id': repuesto.id}
-            )
-            
-        log_activity('stock_check', f'Verificadas {len(repuestos_bajo_stock)} alertas de stock')
-    except Exception as e:
-        log_activity('stock_check_error', f"Error verificando stock: {str(e)}")
-        raise 
\ No newline at end of file
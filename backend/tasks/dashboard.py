@@ -0,0 +1,19 @@
+from celery import shared_task
+from backend.utils.logger import log_activity
+from backend.services.dashboard_service import dashboard_summary
+from typing import Dict
+
+@shared_task(name='tasks.reconcile_dashboard_summary', bind=True, max_retries=3)
+def reconcile_dashboard_summary(self) -> Dict:
+    """Recalcula los contadores materializados del dashboard"""
+    try:
+        total = dashboard_summary.reconciliar()
+        return {
+            'status': 'success',
+            'message': 'Resumen del dashboard reconciliado',
+            'counters': total
+        }
+        
+    except Exception as e:
+        log_activity('dashboard_reconcile_error', f"Error reconciliando el dashboard: {str(e)}")
+        self.retry(exc=e, countdown=60)
@@ -1,9 +1,11 @@
 from celery import shared_task
 from backend.extensions import db
-from backend.models import Repuesto, MovimientoInventario, Proveedor
+from backend.models import MovimientoInventario, Proveedor
 from backend.utils.logger import log_activity
 from backend.services.sync_service import SyncService
-from backend.services.notification_service import NotificationService
+from backend.services.forecast_service import demand_forecast
+from backend.services.snapshot_service import stock_snapshots
+from backend.services.stock_alert_service import stock_alerts
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 import json
@@ -30,58 +32,66 @@ def sync_inventory(self, supplier_id: Optional[int] = None) -> Dict:
         log_activity('inventory_sync_error', f"Error en sincronización: {str(e)}")
         self.retry(exc=e, countdown=300)  # Reintentar en 5 minutos
 
+@shared_task(name='tasks.notify_low_stock', bind=True, max_retries=3)
+def notify_low_stock(self, repuesto_id: int, nivel: str) -> Dict:
+    """Notifica un cruce del stock mínimo detectado al registrar un movimiento"""
+    try:
+        alerta = stock_alerts.notificar(repuesto_id, nivel)
+        return {
+            'status': 'success',
+            'message': 'Alerta de stock enviada' if alerta else 'El repuesto ya no tiene stock bajo',
+            'alert': alerta
+        }
+        
+    except Exception as e:
+        log_activity('stock_alerts_error', f"Error notificando stock bajo: {str(e)}")
+        self.retry(exc=e, countdown=60)
+
 @shared_task(name='tasks.check_stock_alerts')
 def check_stock_alerts() -> Dict:
-    """Verifica alertas de stock bajo"""
+    """Revisa los repuestos bajo el mínimo y encola las alertas no enviadas"""
     try:
-        # Obtener repuestos con stock bajo
-        low_stock = Repuesto.query.filter(
-            Repuesto.stock <= Repuesto.stock_minimo
-        ).all()
-        
-        if not low_stock:
-            return {
-                'status': 'success',
-                'message': 'No hay alertas de stock',
-                'alerts': []
-            }
-        
-        # Crear notificaciones
-        notification_service = NotificationService()
-        
-        alerts = []
-        for part in low_stock:
-            alert = {
-                'part_id': part.id,
-                'name': part.nombre,
-                'current_stock': part.stock,
-                'min_stock': part.stock_minimo
-            }
-            
-            # Crear notificación
-            notification_service.create_notification(
-                tipo='stock_alert',
-                mensaje=f"Stock bajo para {part.nombre}: {part.stock} unidades",
-                metadata=alert
-            )
-            
-            alerts.append(alert)
-        
-        log_activity(
-            'stock_alerts',
-            f"Verificadas {len(alerts)} alertas de stock"
-        )
-        
+        encoladas = stock_alerts.revisar()
         return {
             'status': 'success',
-            'message': f'Encontradas {len(alerts)} alertas de stock',
-            'alerts': alerts
+            'message': f'Encoladas {encoladas} alertas de stock',
+            'alerts': encoladas
         }
         
     except Exception as e:
         log_activity('stock_alerts_error', f"Error verificando alertas: {str(e)}")
         raise
 
+@shared_task(name='tasks.forecast_demand', bind=True, max_retries=3)
+def forecast_demand(self) -> Dict:
+    """Recalcula stock mínimo y cantidad de reorden a partir de la demanda pronosticada"""
+    try:
+        resultado = demand_forecast.aplicar()
+        return {
+            'status': 'success',
+            'message': 'Pronóstico de demanda aplicado',
+            'details': resultado
+        }
+        
+    except Exception as e:
+        log_activity('forecast_error', f"Error en pronóstico de demanda: {str(e)}")
+        self.retry(exc=e, countdown=600)
+
+@shared_task(name='tasks.take_stock_snapshot', bind=True, max_retries=3)
+def take_stock_snapshot(self) -> Dict:
+    """Guarda el stock de cierre del día anterior para las consultas históricas"""
+    try:
+        repuestos = stock_snapshots.tomar()
+        return {
+            'status': 'success',
+            'message': 'Snapshot de stock guardado',
+            'repuestos': repuestos
+        }
+        
+    except Exception as e:
+        log_activity('snapshot_error', f"Error en snapshot de stock: {str(e)}")
+        self.retry(exc=e, countdown=600)
+
 @shared_task(name='tasks.cleanup_old_data')
 def cleanup_old_data() -> Dict:
     """Limpia datos antiguos del sistema"""
@@ -5,6 +5,7 @@ from backend.extensions import db
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 from backend.utils.cache import cache_with_args
+from backend.services.report_job_service import report_jobs
 import pandas as pd
 import os
 import io
@@ -162,4 +163,38 @@ def generate_stock_alerts_report() -> Dict:
         
     except Exception as e:
         log_activity('report_error', f"Error generando reporte: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
+
+@shared_task(name='tasks.generate_report_job')
+def generate_report_job(job_id: str) -> Dict:
+    """Genera el archivo de un trabajo de reporte encolado desde la API"""
+    try:
+        job = report_jobs.ejecutar(job_id)
+        if job is None:
+            return {'status': 'error', 'message': 'Trabajo no encontrado'}
+        return {
+            'status': 'success',
+            'message': 'Reporte generado',
+            'job_id': job.id,
+            'estado': job.estado
+        }
+        
+    except Exception as e:
+        # El trabajo ya quedó marcado como 'error'; reintentar volvería a fallar
+        log_activity('report_error', f"Error generando reporte {job_id}: {str(e)}")
+        return {'status': 'error', 'message': str(e), 'job_id': job_id}
+
+@shared_task(name='tasks.cleanup_report_jobs')
+def cleanup_report_jobs() -> Dict:
+    """Elimina los resultados de reportes caducados"""
+    try:
+        eliminados = report_jobs.limpiar_expirados()
+        return {
+            'status': 'success',
+            'message': 'Reportes caducados eliminados',
+            'deleted': eliminados
+        }
+        
+    except Exception as e:
+        log_activity('report_error', f"Error limpiando reportes: {str(e)}")
+        raise
@@ -0,0 +1,34 @@
+from celery import shared_task
+from backend.utils.logger import log_activity
+from backend.services.rollup_service import daily_rollups
+from typing import Dict
+
+@shared_task(name='tasks.refresh_daily_rollups', bind=True, max_retries=3)
+def refresh_daily_rollups(self) -> Dict:
+    """Recalcula los días de los resúmenes con cambios desde la última marca de agua"""
+    try:
+        dias = daily_rollups.actualizar()
+        return {
+            'status': 'success',
+            'message': 'Resúmenes diarios actualizados',
+            'days': dias
+        }
+        
+    except Exception as e:
+        log_activity('rollup_error', f"Error actualizando resúmenes diarios: {str(e)}")
+        self.retry(exc=e, countdown=60)
+
+@shared_task(name='tasks.rebuild_daily_rollups')
+def rebuild_daily_rollups() -> Dict:
+    """Reconstruye los resúmenes diarios completos (recoge borrados y cambios de día)"""
+    try:
+        dias = daily_rollups.reconstruir()
+        return {
+            'status': 'success',
+            'message': 'Resúmenes diarios reconstruidos',
+            'days': dias
+        }
+        
+    except Exception as e:
+        log_activity('rollup_error', f"Error reconstruyendo resúmenes diarios: {str(e)}")
+        raise
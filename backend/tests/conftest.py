@@ -1,7 +1,9 @@
 import pytest
 from datetime import datetime, timezone
 from backend import create_app, db
-from backend.models import Mecanico, Servicio, HoraTrabajo
+from backend.config import TestingConfig
+from backend.services.search_service import search_service
+from backend.models import Usuario, Cliente, Vehiculo, Mecanico, Servicio, HoraTrabajo
 
 @pytest.fixture
 def app():
@@ -10,8 +12,10 @@ def app():
     
     # Crear el contexto de la aplicación
     with app.app_context():
-        # Crear todas las tablas
+        # Crear todas las tablas, incluidas las del índice de búsqueda, cuyos
+        # eventos quedan registrados en los modelos para todo el proceso
         db.create_all()
+        search_service.init_app(app)
         
         yield app
         
@@ -19,6 +23,23 @@ def app():
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture
+def app_archivo(tmp_path, monkeypatch):
+    """Aplicación sobre una base SQLite en archivo
+
+    A diferencia de la base en memoria, cada sesión y cada hilo abren su
+    propia conexión, con los bloqueos de SQLite entre ellas.
+    """
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'automanager.db'}")
+    app = create_app('testing')
+    app.config['REPORT_DIR'] = str(tmp_path / 'reports')
+    with app.app_context():
+        db.create_all()
+        search_service.init_app(app)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
 @pytest.fixture
 def client(app):
     """Cliente de prueba para hacer peticiones"""
@@ -32,46 +53,83 @@ def runner(app):
 @pytest.fixture
 def mecanico_ejemplo(app):
     """Crear un mecánico de ejemplo para pruebas"""
-    with app.app_context():
-        mecanico = Mecanico(
-            nombre='Ejemplo',
-            apellido='Mecánico',
-            email='ejemplo@test.com',
-            telefono='123456789',
-            especialidad='General',
-            tarifa_hora=50.0,
-            tipo_pago='tarifa_hora'
-        )
-        db.session.add(mecanico)
-        db.session.commit()
-        return mecanico
+    mecanico = Mecanico(
+        nombre='Ejemplo',
+        apellido='Mecánico',
+        email='ejemplo@test.com',
+        telefono='123456789',
+        especialidad='General',
+        tarifa_hora=50.0
+    )
+    db.session.add(mecanico)
+    db.session.commit()
+    return mecanico
 
 @pytest.fixture
-def servicio_ejemplo(app, mecanico_ejemplo):
-    """Crear un servicio de ejemplo para pruebas"""
-    with app.app_context():
-        servicio = Servicio(
-            titulo='Servicio de prueba',
-            descripcion='Descripción de prueba',
-            estado='en_progreso',
-            fecha_inicio=datetime.now(timezone.utc),
-            mecanico_id=mecanico_ejemplo.id
-        )
+def usuario_ejemplo(app):
+    """Crear un usuario de ejemplo que figura como creador de los servicios"""
+    usuario = Usuario(nombre='Usuario', apellido='Prueba', email='usuario@test.com', rol='admin')
+    usuario.set_password('secreto')
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
+
+@pytest.fixture
+def cliente_ejemplo(app):
+    """Crear un cliente de ejemplo para pruebas"""
+    cliente = Cliente(nombre='Cliente', apellido='Ejemplo', email='cliente@test.com', telefono='987654321')
+    db.session.add(cliente)
+    db.session.commit()
+    return cliente
+
+@pytest.fixture
+def vehiculo_ejemplo(app, cliente_ejemplo):
+    """Crear un vehículo de ejemplo del cliente de ejemplo"""
+    vehiculo = Vehiculo(marca='Toyota', modelo='Corolla', año=2020, placa='ABC123', cliente_id=cliente_ejemplo.id)
+    db.session.add(vehiculo)
+    db.session.commit()
+    return vehiculo
+
+@pytest.fixture
+def crear_servicio(app, vehiculo_ejemplo, usuario_ejemplo):
+    """Fábrica de servicios con el vehículo y el usuario obligatorios ya asignados
+
+    Añade el servicio a la sesión sin confirmar; los argumentos sustituyen
+    a los valores por defecto.
+    """
+    def _crear(**datos):
+        datos.setdefault('titulo', 'Servicio de prueba')
+        datos.setdefault('vehiculo_id', vehiculo_ejemplo.id)
+        datos.setdefault('cliente_id', vehiculo_ejemplo.cliente_id)
+        datos.setdefault('usuario_id', usuario_ejemplo.id)
+        servicio = Servicio(**datos)
         db.session.add(servicio)
-        db.session.commit()
         return servicio
+    return _crear
+
+@pytest.fixture
+def servicio_ejemplo(app, mecanico_ejemplo, crear_servicio):
+    """Crear un servicio de ejemplo para pruebas"""
+    servicio = crear_servicio(
+        titulo='Servicio de prueba',
+        descripcion='Descripción de prueba',
+        estado='en_progreso',
+        fecha_inicio=datetime.now(timezone.utc),
+        mecanico_id=mecanico_ejemplo.id
+    )
+    db.session.commit()
+    return servicio
 
 @pytest.fixture
 def hora_trabajo_ejemplo(app, mecanico_ejemplo, servicio_ejemplo):
     """Crear un registro de horas de trabajo de ejemplo"""
-    with app.app_context():
-        hora = HoraTrabajo(
-            mecanico_id=mecanico_ejemplo.id,
-            servicio_id=servicio_ejemplo.id,
-            fecha=datetime.now(timezone.utc),
-            horas_trabajadas=4.0,
-            descripcion='Trabajo de prueba'
-        )
-        db.session.add(hora)
-        db.session.commit()
-        return hora 
\ No newline at end of file
+    hora = HoraTrabajo(
+        mecanico_id=mecanico_ejemplo.id,
+        servicio_id=servicio_ejemplo.id,
+        fecha=datetime.now(timezone.utc).date(),
+        horas_trabajadas=4.0,
+        notas='Trabajo de prueba'
+    )
+    db.session.add(hora)
+    db.session.commit()
+    return hora
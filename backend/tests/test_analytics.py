@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from backend import db
+from backend.models import MovimientoInventario, Repuesto
+from backend.services.analytics_service import inventory_analytics
+
+def test_clasificar_abc_por_valor_acumulado():
+    """A concentra el 80% del valor consumido, B hasta el 95% y C el resto"""
+    valores = np.array([10.0, 700.0, 0.0, 150.0, 100.0, 40.0])
+    clases = inventory_analytics.clasificar_abc(valores)
+    # 700 (70%) y 150 (cruza el 80%) son A; 100 llega al 95%; el resto es C
+    assert list(clases) == ['C', 'A', 'C', 'A', 'B', 'C']
+
+def test_clasificar_abc_sin_consumo():
+    """Sin consumo en el período todos los repuestos son C"""
+    assert list(inventory_analytics.clasificar_abc(np.zeros(3))) == ['C', 'C', 'C']
+
+def test_registros_serializables():
+    """NaN e infinitos se devuelven como None"""
+    df = pd.DataFrame({'codigo': ['X'], 'rotacion': [np.nan], 'dias_cobertura': [np.inf]})
+    assert inventory_analytics.registros(df) == [{'codigo': 'X', 'rotacion': None, 'dias_cobertura': None}]
+
+def test_periodo_pasado_usa_el_stock_al_cierre(app):
+    """Los movimientos posteriores a fecha_fin no cuentan en el stock del período"""
+    with app.app_context():
+        repuesto = Repuesto(codigo='ANL-1', nombre='Amortiguador', stock=10, precio_compra=3.0,
+                            precio_venta=5.0, estado='activo', fecha_creacion=datetime(2024, 1, 1))
+        db.session.add(repuesto)
+        db.session.flush()
+        db.session.add_all([
+            MovimientoInventario(repuesto_id=repuesto.id, tipo='salida', cantidad=4,
+                                 fecha=datetime(2024, 3, 10)),
+            MovimientoInventario(repuesto_id=repuesto.id, tipo='entrada', cantidad=6,
+                                 fecha=datetime(2024, 4, 10))
+        ])
+        db.session.commit()
+
+        analisis = inventory_analytics.analizar(datetime(2024, 3, 1), datetime(2024, 3, 31))
+        fila = analisis.set_index('codigo').loc['ANL-1']
+        assert fila['stock'] == 4
+        assert fila['salidas'] == 4
+        assert fila['stock_promedio'] == 6
+        assert fila['dias_cobertura'] == 30
+
+        actual = inventory_analytics.analizar(datetime(2024, 3, 1))
+        assert actual.set_index('codigo').loc['ANL-1', 'stock'] == 10
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import select
+from backend import db
+from backend.models import Cliente, Repuesto
+from backend.services.search_service import search_service, normalizar
+
+@pytest.fixture
+def catalogo(app):
+    """Crear repuestos indexados por los eventos del modelo (registrados por el fixture app)"""
+    with app.app_context():
+        for codigo, nombre in [('FA-001', 'Filtro de aceite'),
+                               ('FR-002', 'Filtro de aire'),
+                               ('PF-003', 'Pastillas de freno')]:
+            db.session.add(Repuesto(
+                codigo=codigo,
+                nombre=nombre,
+                categoria='Motor',
+                precio_compra=10.0,
+                precio_venta=15.0,
+                stock=5
+            ))
+        db.session.commit()
+
+def test_normalizar_quita_acentos():
+    """La normalización ignora mayúsculas y acentos"""
+    assert normalizar('Mecánico ÁLVAREZ') == 'mecanico alvarez'
+
+def test_buscar_por_subcadena(app, catalogo):
+    """La búsqueda encuentra coincidencias parciales en el índice"""
+    with app.app_context():
+        items, total = search_service.buscar('repuesto', 'filtro')
+        assert total == 2
+        assert {r.codigo for r in items} == {'FA-001', 'FR-002'}
+
+def test_buscar_refleja_actualizaciones(app, catalogo):
+    """Los cambios del modelo se propagan al índice en la misma transacción"""
+    with app.app_context():
+        repuesto = Repuesto.query.filter_by(codigo='PF-003').first()
+        repuesto.nombre = 'Disco de freno'
+        db.session.commit()
+
+        items, total = search_service.buscar('repuesto', 'disco')
+        assert total == 1
+        assert items[0].codigo == 'PF-003'
+        assert search_service.buscar('repuesto', 'pastillas')[1] == 0
+
+def test_relevancia_prefiere_coincidencia_al_inicio():
+    """Una coincidencia al inicio del texto puntúa más que una en medio"""
+    assert search_service.relevancia('filtro', 'filtro de aceite') > \
+        search_service.relevancia('filtro', 'kit con filtro de aceite')
+
+def test_buscar_federado_respeta_limite(app, catalogo):
+    """Cada entidad devuelve como máximo el límite e indica si hay más"""
+    with app.app_context():
+        federado = search_service.buscar_federado(
+            'filtro', {'repuesto': select(Repuesto)}, limite=1, top=10
+        )
+        assert len(federado['resultados']) == 1
+        assert federado['resultados'][0]['tipo'] == 'repuesto'
+        assert federado['hay_mas'] == {'repuesto': True}
+
+def test_buscar_federado_en_paralelo(app_archivo):
+    """Con conexiones independientes las entidades se buscan en los hilos compartidos"""
+    db.session.add(Repuesto(codigo='FA-001', nombre='Filtro de aceite', precio_compra=10.0, precio_venta=15.0))
+    db.session.add(Cliente(nombre='Filomena', apellido='Ruiz', email='filomena@test.com'))
+    db.session.commit()
+
+    consultas = {'repuesto': select(Repuesto), 'cliente': select(Cliente)}
+    for _ in range(2):
+        federado = search_service.buscar_federado('fil', consultas, limite=5, top=10)
+        assert {r['tipo'] for r in federado['resultados']} == {'repuesto', 'cliente'}
+        assert federado['hay_mas'] == {'repuesto': False, 'cliente': False}
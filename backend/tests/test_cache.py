@@ -0,0 +1,154 @@
+import threading
+import time
+from datetime import date
+from flask import jsonify
+from backend import db
+from backend.models import Repuesto
+from backend.utils.cache import (
+    _AUSENTE, EntradaCache, LocalCache, TieredCache, TagVersions, cache_tags, function_cache_key, tag_versions
+)
+
+class RemotoEnMemoria:
+    """Sustituto de Redis para las pruebas del nivel local"""
+
+    def __init__(self):
+        self.datos = {}
+        self.lecturas = 0
+
+    def get(self, key):
+        self.lecturas += 1
+        return self.datos.get(key)
+
+    def set(self, key, value, timeout=None):
+        self.datos[key] = value
+
+    def delete(self, key):
+        self.datos.pop(key, None)
+
+    def clear(self):
+        self.datos.clear()
+
+    def get_many(self, *keys):
+        return [self.datos.get(k) for k in keys]
+
+    def add(self, key, value, timeout=None):
+        if key in self.datos:
+            return False
+        self.datos[key] = value
+        return True
+
+    def inc(self, key, delta=1):
+        self.datos[key] = self.datos.get(key, 0) + delta
+        return self.datos[key]
+
+class Servicio:
+    def estado(self, proveedor_id=None):
+        return proveedor_id
+
+def test_clave_estable_en_metodos():
+    """La clave no depende de la instancia ni del orden de los kwargs"""
+    a = function_cache_key(Servicio.estado, (Servicio(),), {'proveedor_id': 1})
+    b = function_cache_key(Servicio.estado, (Servicio(),), {'proveedor_id': 1})
+    assert a == b
+    assert a.startswith(f"{__name__}.Servicio.estado:")
+    assert function_cache_key(Servicio.estado, (Servicio(),), {'proveedor_id': 2}) != a
+    assert function_cache_key(len, (date(2024, 1, 1),), {}) == function_cache_key(len, ('2024-01-01',), {})
+
+def test_lru_desaloja_la_menos_usada():
+    local = LocalCache(max_entries=2, ttl=60)
+    local.set('a', 1)
+    local.set('b', 2)
+    assert local.get('a') == 1
+    local.set('c', 3)
+    assert local.get('b') != 2
+    assert local.stats()['evictions'] == 1
+    assert local.get('a') == 1 and local.get('c') == 3
+
+def test_lecturas_repetidas_no_van_a_redis():
+    """Tras el primer acierto en Redis el valor se sirve desde el proceso"""
+    remoto = RemotoEnMemoria()
+    remoto.datos['k'] = {'total': 5}
+    niveles = TieredCache(remoto, max_entries=10, local_ttl=60)
+
+    assert niveles.get('k') == {'total': 5}
+    assert niveles.get('k') == {'total': 5}
+    assert remoto.lecturas == 1
+    assert niveles.stats()['local']['hits'] == 1
+
+    llamadas = []
+    valor = niveles.get_or_set('nueva', lambda: llamadas.append(1) or 'x', ttl=30)
+    assert valor == 'x' and niveles.get_or_set('nueva', lambda: 'y') == 'x'
+    assert llamadas == [1]
+
+def test_invalidar_etiqueta_cambia_la_firma():
+    """Solo cambian las firmas de las entradas con la etiqueta invalidada"""
+    versiones = TagVersions(RemotoEnMemoria(), local_ttl=60)
+    fila = versiones.firma(['repuesto', 'repuesto:1'])
+    otra = versiones.firma(['repuesto', 'repuesto:2'])
+
+    versiones.invalidar('repuesto:1')
+    assert versiones.firma(['repuesto', 'repuesto:1']) != fila
+    assert versiones.firma(['repuesto', 'repuesto:2']) == otra
+
+def test_escrituras_del_orm_invalidan_al_confirmar(app, monkeypatch):
+    """Insertar un repuesto invalida su fila y los listados tras el commit"""
+    invalidadas = []
+    monkeypatch.setattr(tag_versions, 'invalidar', lambda *tags: invalidadas.extend(tags))
+    with app.app_context():
+        cache_tags.init_app(app)
+        repuesto = Repuesto(codigo='CCH001', nombre='Bujía', precio_compra=1.0, precio_venta=2.0)
+        db.session.add(repuesto)
+        db.session.commit()
+        assert sorted(invalidadas) == sorted(['repuestos:list', f'repuesto:{repuesto.id}'])
+
+def test_single_flight_calcula_una_vez():
+    """Los hilos que piden una clave ausente a la vez esperan un único cálculo"""
+    niveles = TieredCache(RemotoEnMemoria())
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        time.sleep(0.1)
+        return 'resultado'
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(niveles.get_or_set('k', calcular, 60)))
+             for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert llamadas == [1]
+    assert resultados == ['resultado'] * 5
+
+def test_entrada_vencida_se_sirve_mientras_otro_revalida():
+    """Con el bloqueo tomado por otro worker se devuelve el valor anterior"""
+    remoto = RemotoEnMemoria()
+    remoto.datos['k'] = EntradaCache('anterior', time.time() - 1)
+    remoto.datos['lock:k'] = 'otro-worker'
+    niveles = TieredCache(remoto)
+
+    assert niveles.get_or_set('k', lambda: 'nuevo', 60) == 'anterior'
+    assert niveles.stats()['redis']['stale'] == 1
+
+    del remoto.datos['lock:k']
+    niveles.local.clear()
+    assert niveles.get_or_set('k', lambda: 'nuevo', 60) == 'nuevo'
+
+def test_ttl_con_jitter():
+    niveles = TieredCache(RemotoEnMemoria())
+    niveles.jitter = 0.2
+    vidas = {niveles.ttl_con_jitter(100) for _ in range(20)}
+    assert all(80 <= v <= 100 for v in vidas) and len(vidas) > 1
+    assert niveles.ttl_con_jitter(None) is None
+
+def test_respuestas_http_no_se_cachean(app):
+    """Una vista cacheada por error se calcula en cada llamada y no comparte su Response"""
+    niveles = TieredCache(RemotoEnMemoria(), max_entries=10, local_ttl=60)
+    with app.test_request_context():
+        primera = niveles.get_or_set('vista', lambda: jsonify({'ok': True}), ttl=30)
+        segunda = niveles.get_or_set('vista', lambda: (jsonify({'ok': True}), 200), ttl=30)
+
+    assert primera is not segunda[0]
+    assert niveles.local.get('vista') is _AUSENTE
+    assert niveles.remote.datos == {}
@@ -0,0 +1,97 @@
+import pytest
+from backend.utils.cache_backends import CircuitBreaker, FailoverCache, SQLiteCache
+
+
+class RedisCaido:
+    """Sustituto de Redis que falla mientras ``caido`` es True"""
+
+    def __init__(self):
+        self.caido = True
+        self.llamadas = 0
+        self.datos = {}
+
+    def _comprobar(self):
+        self.llamadas += 1
+        if self.caido:
+            raise ConnectionError('Redis no responde')
+
+    def get(self, key):
+        self._comprobar()
+        return self.datos.get(key)
+
+    def set(self, key, value, timeout=None):
+        self._comprobar()
+        self.datos[key] = value
+        return True
+
+    def delete(self, key):
+        self._comprobar()
+        return self.datos.pop(key, None) is not None
+
+    def inc(self, key, delta=1):
+        self._comprobar()
+        self.datos[key] = self.datos.get(key, 0) + delta
+        return self.datos[key]
+
+
+def test_sqlite_add_inc_y_vencimiento(tmp_path, monkeypatch):
+    local = SQLiteCache(str(tmp_path / 'cache.sqlite3'))
+    assert local.add('lock:a', 1, timeout=10)
+    assert not local.add('lock:a', 2, timeout=10)
+    assert local.inc('tag:repuestos:list') == 1
+    assert local.inc('tag:repuestos:list') == 2
+
+    local.set('k', {'x': 1}, timeout=5)
+    assert local.get_many('k', 'nada') == [{'x': 1}, None]
+
+    import backend.utils.cache_backends as backends
+    ahora = backends.time.time()
+    monkeypatch.setattr(backends.time, 'time', lambda: ahora + 60)
+    assert local.get('k') is None
+    # La reserva vencida puede volver a tomarse
+    assert local.add('lock:a', 3, timeout=10)
+
+
+def test_sqlite_compartido_entre_instancias(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    SQLiteCache(path).set('k', 'v')
+    assert SQLiteCache(path).get('k') == 'v'
+
+
+def test_failover_abre_el_circuito_y_resincroniza(tmp_path, monkeypatch):
+    redis = RedisCaido()
+    breaker = CircuitBreaker(failures=2, reset_timeout=30)
+    backend = FailoverCache(redis, SQLiteCache(str(tmp_path / 'cache.sqlite3')), breaker)
+
+    backend.set('k', 'v')
+    assert breaker.estado == 'cerrado'
+    # Al abrirse el circuito se vacía el respaldo, que podría estar obsoleto
+    assert backend.get('k') is None
+    assert breaker.estado == 'abierto'
+    assert backend.activo == 'local'
+
+    llamadas = redis.llamadas
+    backend.set('k', 'v')
+    backend.delete('repuesto:1')
+    backend.inc('tag:repuestos:list')
+    assert backend.get('k') == 'v'
+    assert redis.llamadas == llamadas  # con el circuito abierto no se espera a Redis
+
+    import backend.utils.cache_backends as backends
+    ahora = backends.time.monotonic()
+    monkeypatch.setattr(backends.time, 'monotonic', lambda: ahora + 31)
+    redis.caido = False
+    redis.datos['repuesto:1'] = 'obsoleto'
+    backend.get('k')
+    assert breaker.estado == 'cerrado'
+    assert 'repuesto:1' not in redis.datos
+    assert redis.datos['tag:repuestos:list'] == 1
+    assert backend.stats()['invalidaciones_pendientes'] == 0
+
+
+def test_sin_respaldo_propaga_el_error():
+    backend = FailoverCache(RedisCaido(), None, CircuitBreaker(failures=1))
+    with pytest.raises(ConnectionError):
+        backend.get('k')
+    with pytest.raises(ConnectionError):
+        backend.get('k')
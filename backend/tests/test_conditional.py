@@ -0,0 +1,45 @@
+from flask import jsonify
+from backend.utils.cache import TagVersions
+from backend.utils.conditional import conditional_get
+import backend.utils.conditional as conditional
+
+class Contadores:
+    """Sustituto de Redis con lo que usan las versiones de etiquetas"""
+
+    def __init__(self):
+        self.datos = {}
+
+    def get_many(self, *keys):
+        return [self.datos.get(k) for k in keys]
+
+    def inc(self, key, delta=1):
+        self.datos[key] = self.datos.get(key, 0) + delta
+        return self.datos[key]
+
+def test_304_sin_ejecutar_la_vista_hasta_que_cambia_la_tabla(app, monkeypatch):
+    """El ETag sale de la versión de la etiqueta y solo cambia al invalidarla"""
+    versiones = TagVersions(Contadores(), local_ttl=60)
+    monkeypatch.setattr(conditional, 'tag_versions', versiones)
+    llamadas = []
+
+    @app.route('/catalogo')
+    @conditional_get('repuestos:list')
+    def catalogo():
+        llamadas.append(1)
+        return jsonify({'repuestos': []}), 200
+
+    cliente = app.test_client()
+    primera = cliente.get('/catalogo')
+    etag = primera.headers['ETag']
+    assert primera.status_code == 200 and etag.startswith('W/')
+
+    repetida = cliente.get('/catalogo', headers={'If-None-Match': etag})
+    assert repetida.status_code == 304
+    assert repetida.headers['ETag'] == etag
+    assert llamadas == [1]
+
+    versiones.invalidar('repuestos:list')
+    cambiada = cliente.get('/catalogo', headers={'If-None-Match': etag})
+    assert cambiada.status_code == 200
+    assert cambiada.headers['ETag'] != etag
+    assert llamadas == [1, 1]
@@ -0,0 +1,131 @@
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+from flask_jwt_extended import create_access_token
+import backend
+from backend import db
+from backend.models import Factura, ResumenDashboard
+from backend.services.dashboard_service import dashboard_summary
+from backend.utils.event_bus import event_bus
+
+def _contadores():
+    return {r.clave: r.valor for r in ResumenDashboard.query.all()}
+
+def test_eventos_mantienen_contadores(app, mecanico_ejemplo, crear_servicio):
+    """Los contadores incrementales coinciden con una reconciliación completa"""
+    with app.app_context():
+        dashboard_summary.init_app(app)
+        dashboard_summary.reconciliar()
+        servicio = crear_servicio(
+            titulo='Cambio de aceite',
+            estado='pendiente',
+            fecha_inicio=datetime.utcnow(),
+            mecanico_id=mecanico_ejemplo.id
+        )
+        db.session.commit()
+
+        servicio.estado = 'completado'
+        db.session.commit()
+
+        incrementales = _contadores()
+        assert incrementales['total:servicio'] == 1
+        assert incrementales['estado:completado'] == 1
+        assert incrementales.get('estado:pendiente', 0) == 0
+
+        dashboard_summary.reconciliar()
+        reconciliados = _contadores()
+        assert {k: v for k, v in incrementales.items() if v} == reconciliados
+
+def test_leer_resumen(app, mecanico_ejemplo, crear_servicio):
+    """La lectura devuelve totales, estados y la ventana reciente"""
+    with app.app_context():
+        crear_servicio(titulo='Revisión', estado='pendiente',
+                       fecha_inicio=datetime.utcnow(), mecanico_id=mecanico_ejemplo.id)
+        db.session.commit()
+
+        resumen = dashboard_summary.leer(dias=30)
+        assert resumen['totales']['mecanico'] == 1
+        assert resumen['totales']['servicio'] == 1
+        assert resumen['servicios_por_estado']['pendiente'] == 1
+        assert resumen['recientes']['servicios'] == 1
+
+def test_leer_sin_poblar_no_escribe(app, mecanico_ejemplo, crear_servicio):
+    """Con la tabla vacía la lectura calcula el resumen sin escribir contadores"""
+    with app.app_context():
+        crear_servicio(titulo='Alineación', estado='en_proceso',
+                       fecha_inicio=datetime.utcnow(), mecanico_id=mecanico_ejemplo.id)
+        db.session.commit()
+        # Los eventos de otras pruebas pueden haber sumado contadores
+        ResumenDashboard.query.delete()
+        db.session.commit()
+
+        resumen = dashboard_summary.leer(dias=30)
+        assert resumen['totales']['servicio'] == 1
+        assert resumen['servicios_por_estado']['en_proceso'] == 1
+        assert ResumenDashboard.query.count() == 0
+        assert not db.session.new and not db.session.dirty
+
+def test_reconciliar_en_sqlite_con_contadores_diarios(app, mecanico_ejemplo, crear_servicio, cliente_ejemplo):
+    """En SQLite func.date() devuelve texto; la reconciliación lo usa como clave del día"""
+    with app.app_context():
+        hoy = datetime.utcnow()
+        servicio = crear_servicio(titulo='Frenos', estado='completado', fecha_inicio=hoy,
+                                  mecanico_id=mecanico_ejemplo.id)
+        db.session.flush()
+        db.session.add(Factura(numero='F-001', cliente_id=cliente_ejemplo.id, servicio_id=servicio.id,
+                               subtotal=100.0, total=116.0, estado='pagada'))
+        db.session.add(ResumenDashboard(clave='estado:obsoleto', valor=3))
+        db.session.commit()
+
+        assert db.engine.dialect.name == 'sqlite'
+        dashboard_summary.reconciliar()
+
+        contadores = _contadores()
+        dia = hoy.date().isoformat()
+        assert contadores[f"dia:servicios:{dia}"] == 1
+        assert contadores[f"dia:ingresos:{dia}"] == 116.0
+        assert 'estado:obsoleto' not in contadores
+
+        resumen = dashboard_summary.leer(dias=30)
+        assert resumen['recientes'] == {'servicios': 1, 'ingresos': 116.0}
+
+def _blueprint_dashboard():
+    """Carga blueprints/dashboard.py sin importar el paquete blueprints completo"""
+    ruta = Path(backend.__file__).parent / 'blueprints' / 'dashboard.py'
+    spec = importlib.util.spec_from_file_location('blueprint_dashboard', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.bp
+
+def test_stream_recibe_los_cambios_publicados(app):
+    """Un cambio publicado por el servicio llega al suscriptor abierto por el blueprint"""
+    app.register_blueprint(_blueprint_dashboard(), url_prefix='/api/dashboard')
+    app.config['DASHBOARD_SSE_HEARTBEAT'] = 0.1
+    with app.app_context():
+        token = create_access_token(identity='1')
+    dashboard_summary._ultimo_resumen = None
+
+    respuesta = app.test_client().get('/api/dashboard/stream', headers={'Authorization': f"Bearer {token}"})
+    try:
+        assert respuesta.status_code == 200
+        eventos = (bloque.decode() for bloque in respuesta.response)
+        assert next(eventos).startswith('retry:')
+        assert next(eventos).startswith('event: resumen')
+        assert event_bus.suscriptores(dashboard_summary.CANAL) == 1
+
+        dashboard_summary.publicar_cambio('factura', {'id': 7})
+        cambio = next(e for e in eventos if not e.startswith(':'))
+        assert cambio.startswith('event: cambio')
+        assert '"tipo":"factura"' in cambio.replace(' ', '')
+    finally:
+        respuesta.close()
+    assert event_bus.suscriptores(dashboard_summary.CANAL) == 0
+
+def test_stream_termina_tras_la_duracion_maxima(app):
+    """El stream envía keep-alive y se cierra solo, liberando la suscripción"""
+    with app.test_request_context():
+        eventos = list(dashboard_summary.stream(max_duracion=0.3, heartbeat=0.1))
+
+    assert eventos[1].startswith('event: resumen')
+    assert ': keep-alive\n\n' in eventos
+    assert event_bus.suscriptores(dashboard_summary.CANAL) == 0
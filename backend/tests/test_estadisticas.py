@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from backend import db
+from backend.models import Repuesto
+from backend.services.statistics_service import StatisticsService
+
+def test_agregados_servicios(app, mecanico_ejemplo, crear_servicio):
+    """Una única consulta agrupada devuelve conteos por estado, del mes e ingresos"""
+    with app.app_context():
+        ahora = datetime.utcnow()
+        for estado, costo in [('pendiente', 0), ('completado', 100.0), ('completado', 50.0)]:
+            crear_servicio(
+                titulo=f'Servicio {estado}',
+                estado=estado,
+                fecha_inicio=ahora,
+                fecha_fin=ahora if estado == 'completado' else None,
+                costo_real=costo,
+                mecanico_id=mecanico_ejemplo.id
+            )
+        db.session.commit()
+
+        agregados = StatisticsService().agregados_servicios(desde=ahora - timedelta(days=1))
+
+        assert agregados['servicios_por_estado']['pendiente'] == 1
+        assert agregados['servicios_por_estado']['completado'] == 2
+        assert agregados['servicios_por_estado']['cancelado'] == 0
+        assert agregados['servicios_mes'] == 3
+        assert agregados['servicios_periodo'] == 3
+        assert agregados['ingresos_mes'] == 150.0
+
+def test_top_mecanicos(app, mecanico_ejemplo, crear_servicio):
+    """El ranking cuenta solo servicios completados"""
+    with app.app_context():
+        crear_servicio(titulo='Hecho', estado='completado', mecanico_id=mecanico_ejemplo.id)
+        crear_servicio(titulo='Pendiente', estado='pendiente', mecanico_id=mecanico_ejemplo.id)
+        db.session.commit()
+
+        top = StatisticsService().top_mecanicos()
+        assert top == [{
+            'id': mecanico_ejemplo.id,
+            'nombre': 'Ejemplo Mecánico',
+            'servicios_completados': 1
+        }]
+
+def test_desglose_servicios(app, mecanico_ejemplo, crear_servicio):
+    """Los desgloses por estado, tipo y mecánico salen de una consulta agrupada"""
+    with app.app_context():
+        for estado, tipo, mecanico_id in [
+            ('pendiente', 'Mantenimiento', mecanico_ejemplo.id),
+            ('completado', 'Mantenimiento', mecanico_ejemplo.id),
+            ('completado', 'Reparación', None),
+        ]:
+            crear_servicio(titulo='S', estado=estado, tipo_servicio=tipo, mecanico_id=mecanico_id)
+        db.session.commit()
+
+        desglose = StatisticsService().desglose_servicios()
+        assert desglose['total_servicios'] == 3
+        assert desglose['servicios_por_estado'] == {'pendiente': 1, 'completado': 2}
+        assert desglose['servicios_por_tipo'] == {'Mantenimiento': 2, 'Reparación': 1}
+        assert desglose['servicios_por_mecanico'] == {'Ejemplo Mecánico': 2}
+
+        completados = StatisticsService().desglose_servicios(estado='completado')
+        assert completados['total_servicios'] == 2
+
+def test_valoracion_inventario(app):
+    """Valor, categorías y stock bajo salen de una consulta agrupada"""
+    with app.app_context():
+        for codigo, categoria, stock, estado in [
+            ('A-1', 'Motor', 2, 'activo'),
+            ('A-2', 'Motor', 10, 'activo'),
+            ('B-1', 'Frenos', 4, 'activo'),
+            ('C-1', 'Frenos', 50, 'inactivo'),
+        ]:
+            db.session.add(Repuesto(
+                codigo=codigo, nombre=codigo, categoria=categoria, stock=stock,
+                stock_minimo=5, precio_compra=10.0, precio_venta=15.0, estado=estado
+            ))
+        db.session.commit()
+
+        valoracion = StatisticsService().valoracion_inventario()
+        assert valoracion['total_repuestos'] == 3
+        assert valoracion['repuestos_por_categoria'] == {'Motor': 2, 'Frenos': 1}
+        assert valoracion['valor_total_inventario'] == 160.0
+        assert valoracion['repuestos_stock_bajo'] == 2
+
+        motor = StatisticsService().valoracion_inventario(categoria='Motor', stock_bajo=True)
+        assert motor['total_repuestos'] == 1
+        assert motor['valor_total_inventario'] == 20.0
@@ -0,0 +1,28 @@
+from backend.utils.event_bus import EventBus
+
+def test_publicar_reparte_a_todos_los_suscriptores():
+    """Un mensaje publicado llega a cada suscriptor del canal"""
+    bus = EventBus()
+    a = bus.suscribir('dashboard')
+    b = bus.suscribir('dashboard')
+
+    assert bus.publicar('dashboard', {'tipo': 'factura'}) == 2
+    assert a.recibir(timeout=0.1) == {'tipo': 'factura'}
+    assert b.recibir(timeout=0.1) == {'tipo': 'factura'}
+
+def test_cola_llena_descarta_los_mas_antiguos():
+    """Un suscriptor lento no bloquea al publicador"""
+    bus = EventBus(max_mensajes=2)
+    lento = bus.suscribir('dashboard')
+    for i in range(5):
+        bus.publicar('dashboard', i)
+
+    assert lento.recibir(timeout=0.1) == 3
+    assert lento.recibir(timeout=0.1) == 4
+    assert lento.recibir(timeout=0.1) is None
+
+def test_cancelar_suscripcion():
+    bus = EventBus()
+    suscripcion = bus.suscribir('dashboard')
+    bus.cancelar(suscripcion)
+    assert bus.suscriptores('dashboard') == 0
@@ -0,0 +1,34 @@
+import io
+import zipfile
+import pytest
+from backend.utils import export
+from backend.utils.export import stream_csv, stream_xlsx, normalize_format
+
+def _filas(n):
+    return ({'id': i, 'nombre': f'Repuesto {i}'} for i in range(n))
+
+def test_stream_csv_por_bloques(monkeypatch):
+    """El CSV se emite en bloques de CSV_CHUNK_ROWS filas"""
+    monkeypatch.setattr(export, 'CSV_CHUNK_ROWS', 2)
+    bloques = list(stream_csv(_filas(5)))
+    assert len(bloques) == 3
+    lineas = b''.join(bloques).decode('utf-8').splitlines()
+    assert lineas[0] == 'id,nombre'
+    assert lineas[-1] == '4,Repuesto 4'
+    assert len(lineas) == 6
+
+def test_stream_csv_sin_filas_usa_columnas():
+    """Sin filas solo se escribe la cabecera indicada"""
+    assert b''.join(stream_csv([], columnas=['id', 'nombre'])) == b'id,nombre\r\n'
+
+def test_stream_xlsx_genera_libro_valido():
+    """El XLSX generado en modo de memoria constante es un ZIP válido"""
+    contenido = b''.join(stream_xlsx(_filas(10)))
+    with zipfile.ZipFile(io.BytesIO(contenido)) as libro:
+        assert 'xl/worksheets/sheet1.xml' in libro.namelist()
+
+def test_normalize_format():
+    """'excel' es un alias de xlsx y los formatos desconocidos se rechazan"""
+    assert normalize_format('excel') == 'xlsx'
+    with pytest.raises(ValueError):
+        normalize_format('pdf')
@@ -0,0 +1,45 @@
+import pytest
+from backend import db
+from backend.models import Repuesto
+from backend.utils.pagination import (
+    encode_cursor, decode_cursor, keyset_paginate, InvalidCursorError
+)
+
+@pytest.fixture
+def repuestos_ejemplo(app):
+    """Crear un catálogo pequeño con nombres repetidos"""
+    with app.app_context():
+        for i in range(7):
+            db.session.add(Repuesto(
+                codigo=f'PAG{i:03d}',
+                nombre='Filtro' if i % 2 else 'Aceite',
+                precio_compra=10.0,
+                precio_venta=15.0,
+                stock=i
+            ))
+        db.session.commit()
+
+def test_cursor_ida_y_vuelta():
+    """El cursor decodificado devuelve los mismos valores"""
+    valores = {'nombre': 'Filtro de aire', 'id': 42}
+    assert decode_cursor(encode_cursor(valores)) == valores
+
+def test_cursor_invalido():
+    """Un cursor alterado produce InvalidCursorError"""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('no-es-un-cursor')
+
+def test_keyset_recorre_todas_las_paginas(app, repuestos_ejemplo):
+    """Recorrer por cursor devuelve todos los registros sin repetir"""
+    with app.app_context():
+        columnas = [('nombre', Repuesto.nombre), ('id', Repuesto.id)]
+        vistos = []
+        cursor = None
+        while True:
+            items, cursor = keyset_paginate(Repuesto.query, columnas, cursor=cursor, per_page=3)
+            vistos.extend(r.id for r in items)
+            if cursor is None:
+                break
+
+        esperados = [r.id for r in Repuesto.query.order_by(Repuesto.nombre, Repuesto.id).all()]
+        assert vistos == esperados
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from backend.services.forecast_service import DemandForecastService
+
+def test_suavizado_exponencial_por_fila():
+    """El suavizado se aplica a cada repuesto de forma independiente"""
+    servicio = DemandForecastService()
+    matriz = np.array([[10.0, 10.0, 10.0], [0.0, 0.0, 10.0]])
+    nivel = servicio.suavizado_exponencial(matriz)
+    assert nivel[0] == 10.0
+    assert nivel[1] == servicio.ALFA * 10.0
+
+def test_pronostico_demanda_constante(app, monkeypatch):
+    """Con demanda constante no hay stock de seguridad y el punto de reorden cubre el plazo"""
+    servicio = DemandForecastService()
+    semanal = pd.DataFrame([[7.0] * servicio.SEMANAS_HISTORIA], index=pd.Index([1], name='repuesto_id'))
+    monkeypatch.setattr(servicio, 'demanda_semanal', lambda hasta=None: semanal)
+
+    with app.app_context():
+        pronostico = servicio.pronosticar()
+    assert pronostico.loc[1, 'demanda_diaria'] == 1.0
+    assert pronostico.loc[1, 'stock_minimo'] == servicio.PLAZO_REPOSICION_DIAS
+    assert pronostico.loc[1, 'cantidad_reorden'] == servicio.DIAS_REVISION
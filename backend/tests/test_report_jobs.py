@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import insert
+from backend import db
+from backend.models import MovimientoInventario, Proveedor, ReporteJob, Repuesto
+from backend.services.report_job_service import report_jobs
+
+def test_clave_ignora_orden_y_parametros_vacios():
+    """Solicitudes equivalentes producen la misma clave"""
+    a = report_jobs.normalizar_parametros('movements', {'fecha_fin': '2024-02-01', 'tipo': 'entrada'})
+    b = report_jobs.normalizar_parametros('movements', {'tipo': 'entrada', 'fecha_fin': '2024-02-01T00:00:00',
+                                                        'fecha_inicio': '', 'otro': 1})
+    assert report_jobs.clave('movements', 'csv', a) == report_jobs.clave('movements', 'csv', b)
+    assert report_jobs.clave('movements', 'csv', a) != report_jobs.clave('movements', 'xlsx', a)
+
+def test_parametros_invalidos():
+    """Tipos desconocidos y fechas mal formadas se rechazan"""
+    with pytest.raises(ValueError):
+        report_jobs.normalizar_parametros('desconocido', {})
+    with pytest.raises(ValueError):
+        report_jobs.normalizar_parametros('movements', {'fecha_inicio': 'ayer'})
+
+def test_encolar_reutiliza_trabajo_en_curso(app):
+    """Una solicitud idéntica a un trabajo en curso devuelve ese trabajo"""
+    with app.app_context():
+        clave = report_jobs.clave('stock-alerts', 'csv', {})
+        db.session.add(ReporteJob(
+            id='job-en-curso', tipo='stock-alerts', formato='csv', parametros={},
+            clave=clave, clave_activa=clave, estado='en_proceso', progreso=40,
+            fecha_creacion=datetime.utcnow()
+        ))
+        db.session.commit()
+
+        job, creado = report_jobs.encolar('stock-alerts', 'csv', {})
+        assert not creado
+        assert job.id == 'job-en-curso'
+        assert ReporteJob.query.count() == 1
+
+def test_ejecutar_trabajo_grande_en_sqlite(app_archivo):
+    """Un trabajo con más de PROGRESO_CADA filas termina aunque el cursor siga abierto"""
+    total = report_jobs.PROGRESO_CADA + 500
+    db.session.execute(insert(Repuesto), [{
+        'codigo': f'R-{i:05d}', 'nombre': f'Repuesto {i}', 'stock': 0, 'stock_minimo': 5,
+        'precio_compra': 10.0, 'precio_venta': 15.0, 'estado': 'activo'
+    } for i in range(total)])
+    clave = report_jobs.clave('stock-alerts', 'csv', {})
+    db.session.add(ReporteJob(
+        id='job-grande', tipo='stock-alerts', formato='csv', parametros={},
+        clave=clave, clave_activa=clave, estado='pendiente', progreso=0,
+        fecha_creacion=datetime.utcnow()
+    ))
+    db.session.commit()
+
+    job = report_jobs.ejecutar('job-grande')
+    assert job.estado == 'completado'
+    assert job.filas == total
+    with open(report_jobs.ruta(job), encoding='utf-8') as archivo:
+        assert sum(1 for _ in archivo) == total + 1
+
+def test_ejecutar_trabajo_de_movimientos(app_archivo):
+    """El reporte de movimientos toma precio y proveedor desde el repuesto"""
+    proveedor = Proveedor(nombre='Proveedor Uno')
+    db.session.add(proveedor)
+    db.session.flush()
+    repuesto = Repuesto(codigo='MOV-1', nombre='Filtro', stock=10, stock_minimo=2,
+                        precio_compra=12.5, precio_venta=20.0, proveedor_id=proveedor.id)
+    db.session.add(repuesto)
+    db.session.flush()
+    db.session.add_all([
+        MovimientoInventario(repuesto_id=repuesto.id, tipo='entrada', cantidad=5),
+        MovimientoInventario(repuesto_id=repuesto.id, tipo='salida', cantidad=2)
+    ])
+    clave = report_jobs.clave('movements', 'csv', {})
+    db.session.add(ReporteJob(
+        id='job-movimientos', tipo='movements', formato='csv', parametros={},
+        clave=clave, clave_activa=clave, estado='pendiente', progreso=0,
+        fecha_creacion=datetime.utcnow()
+    ))
+    db.session.commit()
+
+    job = report_jobs.ejecutar('job-movimientos')
+    assert job.estado == 'completado'
+    assert job.filas == 2
+    with open(report_jobs.ruta(job), encoding='utf-8') as archivo:
+        contenido = archivo.read()
+    assert 'Proveedor Uno' in contenido
+    assert '12.5' in contenido
@@ -0,0 +1,34 @@
+import gzip
+import json
+from datetime import date, datetime
+from flask import jsonify
+from backend.middleware.compression import Compression
+
+def test_fechas_en_iso_8601(app):
+    """El proveedor JSON serializa las fechas igual que ``.isoformat()``"""
+    fecha = datetime(2024, 3, 1, 8, 30, 15, 250000)
+    with app.test_request_context():
+        datos = json.loads(jsonify({'fecha': fecha, 'dia': date(2024, 3, 1), 'nada': None}).get_data())
+    assert datos == {'fecha': fecha.isoformat(), 'dia': '2024-03-01', 'nada': None}
+
+def test_compresion_negociada_por_tamano(app):
+    """Solo se comprimen las respuestas que superan el umbral y si el cliente acepta gzip"""
+    app.config['COMPRESSION_MIN_SIZE'] = 1024
+    Compression(app)
+
+    @app.route('/grande')
+    def grande():
+        return jsonify({'repuestos': [{'id': i, 'nombre': f"Repuesto {i}"} for i in range(500)]})
+
+    @app.route('/pequena')
+    def pequena():
+        return jsonify({'ok': True})
+
+    cliente = app.test_client()
+    comprimida = cliente.get('/grande', headers={'Accept-Encoding': 'gzip'})
+    assert comprimida.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in comprimida.headers['Vary']
+    assert len(json.loads(gzip.decompress(comprimida.get_data()))['repuestos']) == 500
+
+    assert 'Content-Encoding' not in cliente.get('/grande').headers
+    assert 'Content-Encoding' not in cliente.get('/pequena', headers={'Accept-Encoding': 'gzip'}).headers
@@ -0,0 +1,46 @@
+from datetime import date, datetime
+from backend import db
+from backend.models import Factura, HoraTrabajo
+from backend.services.rollup_service import daily_rollups
+
+def test_rangos_contiguos():
+    """Los días modificados se agrupan en rangos contiguos"""
+    dias = {date(2024, 1, 1), date(2024, 1, 2), date(2024, 1, 5)}
+    assert daily_rollups._rangos(dias) == [
+        (date(2024, 1, 1), date(2024, 1, 2)),
+        (date(2024, 1, 5), date(2024, 1, 5))
+    ]
+
+def test_resumen_mecanicos(app, mecanico_ejemplo, crear_servicio):
+    """Servicios completados y horas se resumen por día y mecánico"""
+    with app.app_context():
+        servicio = crear_servicio(titulo='Frenos', estado='completado',
+                                  fecha_inicio=datetime(2024, 3, 10, 9), mecanico_id=mecanico_ejemplo.id)
+        db.session.commit()
+        db.session.add(HoraTrabajo(mecanico_id=mecanico_ejemplo.id, servicio_id=servicio.id,
+                                   fecha=date(2024, 3, 10), horas_trabajadas=3.5))
+        db.session.commit()
+
+        daily_rollups.reconstruir()
+        mecanicos = daily_rollups.mecanicos(date(2024, 3, 1), date(2024, 3, 31))
+        assert mecanicos[0]['servicios_completados'] == 1
+        assert mecanicos[0]['horas_trabajadas'] == 3.5
+        assert daily_rollups.mecanicos(date(2024, 4, 1), date(2024, 4, 30)) == []
+
+def test_actualizar_recalcula_dias_modificados(app):
+    """Los cambios posteriores a la marca de agua se reflejan al actualizar"""
+    with app.app_context():
+        factura = Factura(numero='F-001', cliente_id=1, fecha_emision=datetime(2024, 5, 2, 12),
+                          subtotal=100.0, total=116.0, estado='pendiente')
+        db.session.add(factura)
+        db.session.commit()
+        daily_rollups.reconstruir()
+        assert daily_rollups.facturacion()['facturas_por_estado'] == {'pendiente': 1}
+
+        factura.estado = 'pagada'
+        db.session.commit()
+        assert daily_rollups.actualizar() == 1
+
+        resumen = daily_rollups.facturacion(date(2024, 5, 1), date(2024, 5, 31))
+        assert resumen['facturas_por_estado'] == {'pagada': 1}
+        assert resumen['facturas_por_mes'] == {'2024-05': {'cantidad': 1, 'total': 116.0}}
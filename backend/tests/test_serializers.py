@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from sqlalchemy import event
+from backend import db
+from backend.models import Servicio
+from backend.utils.serializers import ServicioSerializer, MecanicoSerializer, FacturaSerializer
+
+SERIALIZADOR = ServicioSerializer(
+    campos=('id', 'titulo', 'estado'),
+    relaciones={
+        'mecanico': MecanicoSerializer(),
+        'facturas': FacturaSerializer(primero=True, clave='factura')
+    }
+)
+
+def _contar_consultas(app, funcion):
+    """Ejecuta la función y devuelve cuántas sentencias SQL lanzó"""
+    consultas = []
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', _registrar)
+    try:
+        funcion()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', _registrar)
+    return len(consultas)
+
+def _crear_servicios(crear_servicio, mecanico_id, cantidad):
+    for i in range(cantidad):
+        crear_servicio(
+            titulo=f'Servicio {i}',
+            estado='pendiente',
+            fecha_inicio=datetime.now(timezone.utc),
+            mecanico_id=mecanico_id
+        )
+    db.session.commit()
+    db.session.expunge_all()
+
+def _serializar_todo():
+    return SERIALIZADOR.serializar_lista(SERIALIZADOR.aplicar(Servicio.query).all())
+
+def test_serializa_relaciones(app, mecanico_ejemplo, crear_servicio):
+    """Las relaciones declaradas aparecen en la salida"""
+    with app.app_context():
+        _crear_servicios(crear_servicio, mecanico_ejemplo.id, 1)
+        datos = _serializar_todo()[0]
+        assert datos['mecanico']['nombre'] == 'Ejemplo'
+        assert datos['factura'] is None
+
+def test_numero_de_consultas_constante(app, mecanico_ejemplo, crear_servicio):
+    """Serializar 2 o 20 servicios ejecuta el mismo número de consultas"""
+    with app.app_context():
+        _crear_servicios(crear_servicio, mecanico_ejemplo.id, 2)
+        pocas = _contar_consultas(app, _serializar_todo)
+
+        _crear_servicios(crear_servicio, mecanico_ejemplo.id, 18)
+        muchas = _contar_consultas(app, _serializar_todo)
+
+        assert pocas == muchas
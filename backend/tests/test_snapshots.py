@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from backend import db
+from backend.models import Repuesto, SnapshotStock
+from backend.services.snapshot_service import stock_snapshots
+
+def _repuesto(app, stock=10):
+    with app.app_context():
+        repuesto = Repuesto(nombre='Filtro', codigo='FIL-1', stock=stock, precio_compra=2.5,
+                            precio_venta=4.0, fecha_creacion=datetime(2024, 1, 1))
+        db.session.add(repuesto)
+        db.session.commit()
+        return repuesto.id
+
+def test_valoracion_desde_snapshot(app):
+    """El valor histórico parte del último snapshot anterior al instante"""
+    repuesto_id = _repuesto(app)
+    with app.app_context():
+        assert stock_snapshots.tomar(date(2024, 3, 1)) == 1
+        snapshot = db.session.get(SnapshotStock, (date(2024, 3, 1), repuesto_id))
+        assert snapshot.stock == 10
+
+        assert stock_snapshots.snapshot_base(datetime(2024, 3, 2, 15)) == date(2024, 3, 1)
+        assert stock_snapshots.snapshot_base(datetime(2024, 3, 1, 15)) is None
+        valoracion = stock_snapshots.valoracion_en(datetime(2024, 3, 2, 15))
+        assert valoracion['snapshot_base'] == '2024-03-01'
+        assert valoracion['total_valor'] == 25.0
+
+def test_retencion_conserva_cierres_de_mes(app):
+    """Los snapshots antiguos se reducen al último día de cada mes"""
+    _repuesto(app)
+    with app.app_context():
+        for dia in (date(2024, 1, 30), date(2024, 1, 31)):
+            stock_snapshots.tomar(dia)
+        stock_snapshots.tomar(date(2024, 6, 1))
+        fechas = {f for f, in db.session.query(SnapshotStock.fecha).distinct()}
+        assert fechas == {date(2024, 1, 31), date(2024, 6, 1)}
@@ -0,0 +1,101 @@
+from backend import db
+from backend.models import Notificacion, Repuesto
+from backend.services.stock_alert_service import stock_alerts
+
+def test_detectar_cruces_del_minimo():
+    """Solo avisan las bajadas del umbral, las llegadas a cero y las reposiciones"""
+    deltas = {1: -3, 2: -1, 3: -2, 4: 10}
+    stocks = {1: 5, 2: 3, 3: 0, 4: 12}
+    minimos = {1: 5, 2: 5, 3: 5, 4: 5}
+    cruces = stock_alerts.detectar(deltas, stocks, minimos)
+    # 2 ya estaba bajo (4 -> 3): no vuelve a avisar
+    assert cruces == {
+        1: {'nivel': 'stock_bajo', 'stock': 5, 'stock_minimo': 5},
+        3: {'nivel': 'stock_critico', 'stock': 0, 'stock_minimo': 5},
+        4: {'nivel': None, 'stock': 12, 'stock_minimo': 5}
+    }
+
+def test_alertas_se_despachan_al_confirmar(app, monkeypatch):
+    """Los cruces pendientes se encolan tras el commit y se descartan con rollback"""
+    encoladas = []
+    monkeypatch.setattr(stock_alerts, 'encolar', lambda cruces: encoladas.append(cruces))
+    stock_alerts.init_app(app)
+    with app.app_context():
+        stock_alerts.registrar({1: {'nivel': 'stock_bajo', 'stock': 2, 'stock_minimo': 5}})
+        db.session.rollback()
+        assert encoladas == []
+
+        stock_alerts.registrar({1: {'nivel': 'stock_bajo', 'stock': 2, 'stock_minimo': 5}})
+        db.session.add(Repuesto(codigo='ALR001', nombre='Filtro', precio_compra=1.0, precio_venta=2.0))
+        db.session.commit()
+        assert encoladas == [{1: {'nivel': 'stock_bajo', 'stock': 2, 'stock_minimo': 5}}]
+
+def test_escrituras_directas_del_orm_avisan(app, monkeypatch):
+    """Cambiar stock o stock_minimo fuera de StockService también detecta el cruce"""
+    encoladas = []
+    monkeypatch.setattr(stock_alerts, 'encolar', lambda cruces: encoladas.append(cruces))
+    stock_alerts.init_app(app)
+    with app.app_context():
+        repuesto = Repuesto(codigo='ALR002', nombre='Bujía', stock=10, stock_minimo=5,
+                            precio_compra=1.0, precio_venta=2.0)
+        db.session.add(repuesto)
+        db.session.commit()
+
+        # Como en los repuestos usados en un servicio: resta directa sobre el atributo
+        repuesto.stock -= 6
+        db.session.commit()
+        assert encoladas == [{repuesto.id: {'nivel': 'stock_bajo', 'stock': 4, 'stock_minimo': 5}}]
+
+        # Como en la edición del repuesto: el nuevo mínimo lo deja repuesto
+        repuesto.stock_minimo = 2
+        db.session.commit()
+        assert encoladas[-1] == {repuesto.id: {'nivel': None, 'stock': 4, 'stock_minimo': 2}}
+
+        repuesto.nombre = 'Bujía iridio'
+        db.session.commit()
+        assert len(encoladas) == 2
+
+def test_detectar_cambios_de_minimo():
+    """Subir el mínimo por encima del stock avisa; bajarlo por debajo libera el aviso"""
+    stocks = {1: 4, 2: 4, 3: 20}
+    antes = {1: 2, 2: 5, 3: 5}
+    despues = {1: 6, 2: 3, 3: 8}
+    assert stock_alerts.detectar_minimos(stocks, antes, despues) == {
+        1: {'nivel': 'stock_bajo', 'stock': 4, 'stock_minimo': 6},
+        2: {'nivel': None, 'stock': 4, 'stock_minimo': 3}
+    }
+
+def test_notificar_crea_la_notificacion(app):
+    """El worker guarda la alerta como notificación no leída con sus datos"""
+    from backend.tasks.inventory import notify_low_stock
+    with app.app_context():
+        repuesto = Repuesto(codigo='ALR003', nombre='Pastilla', stock=0, stock_minimo=3,
+                            precio_compra=1.0, precio_venta=2.0)
+        db.session.add(repuesto)
+        db.session.commit()
+
+        alerta = stock_alerts.notificar(repuesto.id, 'stock_critico')
+        assert alerta['nivel'] == 'stock_critico'
+
+        resultado = notify_low_stock.apply(args=[repuesto.id, 'stock_critico']).get()
+        assert resultado['status'] == 'success'
+
+        notificaciones = Notificacion.query.filter_by(tipo='stock_critico').all()
+        assert len(notificaciones) == 2
+        assert all(not n.leida and n.prioridad == 'urgent' for n in notificaciones)
+        assert '"codigo": "ALR003"' in notificaciones[0].datos
+
+def test_revisar_encola_los_repuestos_bajo_minimo(app, monkeypatch):
+    """La revisión periódica encola una alerta por cada repuesto en o bajo el mínimo"""
+    encoladas = []
+    monkeypatch.setattr(stock_alerts, 'encolar', lambda cruces: encoladas.append(cruces) or len(cruces))
+    with app.app_context():
+        db.session.add_all([
+            Repuesto(codigo='REV1', nombre='A', stock=0, stock_minimo=2, precio_compra=1.0, precio_venta=2.0),
+            Repuesto(codigo='REV2', nombre='B', stock=2, stock_minimo=2, precio_compra=1.0, precio_venta=2.0),
+            Repuesto(codigo='REV3', nombre='C', stock=9, stock_minimo=2, precio_compra=1.0, precio_venta=2.0)
+        ])
+        db.session.commit()
+
+        assert stock_alerts.revisar() == 2
+        assert sorted(c['nivel'] for c in encoladas[0].values()) == ['stock_bajo', 'stock_critico']
@@ -0,0 +1,157 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from backend import db
+from backend.models import MovimientoInventario, Repuesto
+from backend.services.stock_service import StockService, StockInsuficienteError
+
+@pytest.fixture
+def repuesto_ejemplo(app):
+    """Crear un repuesto con stock 10"""
+    with app.app_context():
+        repuesto = Repuesto(
+            codigo='STK001',
+            nombre='Pastillas de freno',
+            precio_compra=20.0,
+            precio_venta=30.0,
+            stock=10
+        )
+        db.session.add(repuesto)
+        db.session.commit()
+        return repuesto.id
+
+def test_aplicar_deltas_entrada_y_salida(app, repuesto_ejemplo):
+    """Las variaciones se aplican en la base de datos y devuelven el stock final"""
+    with app.app_context():
+        servicio = StockService()
+        assert servicio.aplicar_deltas({repuesto_ejemplo: 5})[repuesto_ejemplo] == 15
+        assert servicio.aplicar_deltas({repuesto_ejemplo: -15})[repuesto_ejemplo] == 0
+        db.session.commit()
+        assert db.session.get(Repuesto, repuesto_ejemplo).stock == 0
+
+def test_aplicar_deltas_no_permite_stock_negativo(app, repuesto_ejemplo):
+    """Una salida mayor al stock no modifica la fila"""
+    with app.app_context():
+        resultado = StockService().aplicar_deltas({repuesto_ejemplo: -11})
+        db.session.commit()
+        assert resultado[repuesto_ejemplo] is None
+        assert db.session.get(Repuesto, repuesto_ejemplo).stock == 10
+
+def test_validar_movimiento():
+    """Validaciones de tipo y cantidad sin acceso a la base de datos"""
+    assert StockService.validar('entrada', 3) is None
+    assert StockService.validar('ajuste', 3) == "Tipo debe ser entrada o salida"
+    assert StockService.validar('salida', 0) == "La cantidad debe ser mayor a 0"
+
+@pytest.fixture
+def repuestos_lote(app):
+    """Dos repuestos con stock 10 y 2"""
+    with app.app_context():
+        repuestos = [
+            Repuesto(codigo='LOT001', nombre='Filtro', precio_compra=5.0, precio_venta=8.0, stock=10),
+            Repuesto(codigo='LOT002', nombre='Correa', precio_compra=9.0, precio_venta=14.0, stock=2)
+        ]
+        db.session.add_all(repuestos)
+        db.session.commit()
+        return [r.id for r in repuestos]
+
+@pytest.fixture
+def cliente_inventario(app):
+    """Cliente HTTP con el blueprint de inventario y un token válido"""
+    from backend.blueprints.inventario import inventario_bp
+    app.register_blueprint(inventario_bp, url_prefix='/api/inventario')
+    token = create_access_token(identity='1')
+    return app.test_client(), {'Authorization': f'Bearer {token}'}
+
+def test_registrar_lote_agrupa_por_repuesto(app, repuestos_lote):
+    """El lote aplica el neto por repuesto y devuelve el stock final de cada movimiento"""
+    a, b = repuestos_lote
+    with app.app_context():
+        movimientos = StockService().registrar_lote([
+            {'repuesto_id': a, 'tipo': 'salida', 'cantidad': 3},
+            {'repuesto_id': b, 'tipo': 'entrada', 'cantidad': 4},
+            {'repuesto_id': a, 'tipo': 'entrada', 'cantidad': 1}
+        ])
+        assert [m['stock_actual'] for m in movimientos] == [8, 6, 8]
+        assert db.session.get(Repuesto, a).stock == 8
+        assert MovimientoInventario.query.count() == 3
+
+def test_registrar_lote_revierte_si_falta_stock(app, repuestos_lote):
+    """Un repuesto sin stock suficiente revierte el lote completo"""
+    a, b = repuestos_lote
+    with app.app_context():
+        with pytest.raises(StockInsuficienteError) as error:
+            StockService().registrar_lote([
+                {'repuesto_id': a, 'tipo': 'salida', 'cantidad': 3},
+                {'repuesto_id': b, 'tipo': 'salida', 'cantidad': 5}
+            ])
+        assert error.value.repuesto_ids == [b]
+        assert db.session.get(Repuesto, a).stock == 10
+        assert MovimientoInventario.query.count() == 0
+
+def test_registrar_lote_rechaza_elementos_invalidos(app, repuestos_lote):
+    """Elementos que no son objetos o sin repuesto_id válido son un ValueError"""
+    with app.app_context():
+        for lote in ([1, 2], [{'tipo': 'entrada', 'cantidad': 1}],
+                     [{'repuesto_id': None, 'tipo': 'entrada', 'cantidad': 1}]):
+            with pytest.raises(ValueError):
+                StockService().registrar_lote(lote)
+
+def test_insertar_movimientos_devuelve_ids_en_orden(app, repuestos_lote):
+    """Con RETURNING los ids corresponden a las filas en el orden recibido"""
+    a, b = repuestos_lote
+    with app.app_context():
+        lote = [{'repuesto_id': (a, b)[i % 2], 'tipo': 'entrada', 'cantidad': i + 1} for i in range(20)]
+        ids = StockService()._insertar_movimientos(lote)
+        db.session.commit()
+        if not db.session.get_bind().dialect.insert_executemany_returning:
+            pytest.skip('El dialecto no admite RETURNING en inserciones múltiples')
+        for movimiento_id, mov in zip(ids, lote):
+            movimiento = db.session.get(MovimientoInventario, movimiento_id)
+            assert (movimiento.repuesto_id, movimiento.cantidad) == (mov['repuesto_id'], mov['cantidad'])
+
+def test_registrar_lote_parcial(app, repuestos_lote):
+    """Se aplican los repuestos válidos y se informa el error de los demás"""
+    a, b = repuestos_lote
+    with app.app_context():
+        resultado = StockService().registrar_lote_parcial([
+            {'repuesto_id': a, 'tipo': 'salida', 'cantidad': 4},
+            {'repuesto_id': b, 'tipo': 'salida', 'cantidad': 3},
+            {'repuesto_id': 9999, 'tipo': 'entrada', 'cantidad': 1},
+            'no es un movimiento'
+        ])
+        assert (resultado['exitosos'], resultado['fallidos']) == (1, 3)
+        items = resultado['resultados']
+        assert items[0]['exito'] and items[0]['stock_actual'] == 6
+        assert items[1]['error'] == 'Stock insuficiente'
+        assert items[2]['error'] == 'Repuesto no encontrado'
+        assert items[3]['error'] == 'Campo repuesto_id es requerido'
+        assert db.session.get(Repuesto, b).stock == 2
+
+def test_bulk_parcial_responde_207(app, repuestos_lote, cliente_inventario):
+    """Un lote con rechazos responde 207 con el resultado de cada movimiento"""
+    a, b = repuestos_lote
+    client, headers = cliente_inventario
+    respuesta = client.post('/api/inventario/movimientos/bulk', headers=headers, json=[
+        {'repuesto_id': a, 'tipo': 'entrada', 'cantidad': 2},
+        {'repuesto_id': b, 'tipo': 'salida', 'cantidad': 3}
+    ])
+    assert respuesta.status_code == 207
+    assert respuesta.get_json()['resultados']['exitosos'] == 1
+
+def test_bulk_atomico_rechaza_elementos_que_no_son_objetos(app, repuestos_lote, cliente_inventario):
+    """En modo atómico un elemento que no es un objeto es un 400, no un 500"""
+    client, headers = cliente_inventario
+    respuesta = client.post('/api/inventario/movimientos/bulk', headers=headers,
+                            json={'atomico': True, 'movimientos': [1, 2]})
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['indices'] == [0, 1]
+
+def test_bulk_respeta_el_maximo_de_elementos(app, repuestos_lote, cliente_inventario):
+    """Los lotes por encima de INVENTARIO_BULK_MAX_ITEMS se rechazan sin tocar la base"""
+    a, _ = repuestos_lote
+    client, headers = cliente_inventario
+    app.config['INVENTARIO_BULK_MAX_ITEMS'] = 2
+    respuesta = client.post('/api/inventario/movimientos/bulk', headers=headers,
+                            json=[{'repuesto_id': a, 'tipo': 'entrada', 'cantidad': 1}] * 3)
+    assert respuesta.status_code == 400
+    assert MovimientoInventario.query.count() == 0
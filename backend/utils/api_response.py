@@ -88,4 +88,39 @@ def paginated_response(
         }
     }
     
-    return success_response(data=data, message=message) 
\ No newline at end of file
+    return success_response(data=data, message=message) 
+
+def cursor_response(
+    items: List[Any],
+    next_cursor: Optional[str],
+    per_page: int,
+    total: Optional[int] = None,
+    total_estimated: bool = False,
+    message: str = "Lista obtenida exitosamente"
+) -> tuple:
+    """
+    Genera una respuesta paginada por cursor (keyset)
+    
+    Args:
+        items: Lista de elementos
+        next_cursor: Cursor opaco de la siguiente página o None si es la última
+        per_page: Elementos por página
+        total: Total de elementos (opcional, exacto o estimado)
+        total_estimated: Indica si el total es una estimación
+        message: Mensaje descriptivo
+        
+    Returns:
+        tuple: (response, status_code)
+    """
+    data = {
+        "items": items,
+        "pagination": {
+            "per_page": per_page,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None,
+            "total": total,
+            "total_estimated": total_estimated
+        }
+    }
+    
+    return success_response(data=data, message=message)
@@ -1,10 +1,25 @@
 from flask_caching import Cache
+from collections import OrderedDict
+from datetime import date, datetime
+from contextlib import contextmanager
 from functools import wraps
 import hashlib
+import inspect
 import json
-from typing import Any, Callable, Dict, Optional, TypeVar, cast
+import random
+import threading
+import time
+import uuid
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, TypeVar, Union, cast
+)
 import logging
 from flask import current_app
+from sqlalchemy import event
+from werkzeug.wrappers import Response
+from sqlalchemy.orm import Session, object_session
+from backend.utils.logger import metrics
+from backend.utils.cache_backends import CircuitBreaker, FailoverCache, SQLiteCache
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -22,6 +37,9 @@ cache = Cache(config={
     }
 })
 
+# Backend compartido: Redis con respaldo en SQLite local (ver setup_cache)
+remote_cache = FailoverCache(primary=cache)
+
 T = TypeVar('T')
 
 def generate_cache_key(*args: Any, **kwargs: Any) -> str:
@@ -31,226 +49,764 @@ def generate_cache_key(*args: Any, **kwargs: Any) -> str:
     key_string = "|".join(key_parts)
     return hashlib.md5(key_string.encode()).hexdigest()
 
+# ========== CLAVES ESTABLES ==========
+
+def _serializar(valor: Any) -> Any:
+    """Representación estable de valores que json no sabe serializar"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor, key=str)
+    tipo = type(valor)
+    if tipo.__str__ is object.__str__:
+        # El repr por defecto incluye la dirección de memoria: cambia en cada proceso
+        identificador = getattr(valor, 'id', None)
+        return f"{tipo.__module__}.{tipo.__qualname__}:{identificador}"
+    return str(valor)
+
+def _canonico(valor: Any) -> str:
+    return json.dumps(valor, sort_keys=True, default=_serializar, separators=(',', ':'))
+
+def _es_metodo(f: Callable) -> bool:
+    """True si el primer parámetro de la función es self o cls"""
+    try:
+        parametros = list(inspect.signature(f).parameters)
+    except (TypeError, ValueError):
+        return False
+    return bool(parametros) and parametros[0] in ('self', 'cls')
+
+def function_cache_key(f: Callable, args: tuple, kwargs: dict, prefix: Optional[str] = None) -> str:
+    """Clave estable de una llamada: nombre calificado + hash de los argumentos
+
+    En los métodos se omite ``self``/``cls``, cuyo repr cambia con cada
+    instancia y proceso: las instancias de servicio comparten entrada.
+    Los argumentos se serializan como JSON con claves ordenadas, así que
+    valores iguales producen la misma clave en cualquier worker.
+    """
+    if _es_metodo(f):
+        args = args[1:]
+    nombre = prefix or f"{f.__module__}.{f.__qualname__}"
+    return f"{nombre}:" + generate_cache_key(
+        *(_canonico(a) for a in args),
+        **{k: _canonico(v) for k, v in kwargs.items()}
+    )
+
+# ========== CACHÉ DE DOS NIVELES ==========
+
+_AUSENTE = object()
+
+class LocalCache:
+    """Caché LRU en memoria del proceso, acotada en número de entradas y con TTL
+
+    Segura entre hilos. Al superar ``max_entries`` se desaloja la entrada
+    usada hace más tiempo; las entradas vencidas se descartan al leerlas.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._datos: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._contadores = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def _contar(self, contador: str) -> None:
+        self._contadores[contador] += 1
+        metrics.increment(f"cache_{contador}_total", labels={'nivel': 'local'})
+
+    def get(self, key: str) -> Any:
+        """Valor guardado o ``_AUSENTE``"""
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is None:
+                self._contar('misses')
+                return _AUSENTE
+            vence, valor = entrada
+            if vence <= time.monotonic():
+                del self._datos[key]
+                self._contar('expirations')
+                self._contar('misses')
+                return _AUSENTE
+            self._datos.move_to_end(key)
+            self._contar('hits')
+            return valor
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        ttl = min(ttl, self.ttl) if ttl else self.ttl
+        with self._lock:
+            self._datos[key] = (time.monotonic() + ttl, value)
+            self._datos.move_to_end(key)
+            while len(self._datos) > self.max_entries:
+                self._datos.popitem(last=False)
+                self._contar('evictions')
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._datos.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._contadores, entries=len(self._datos), max_entries=self.max_entries)
+
+
+class EntradaCache(NamedTuple):
+    """Valor cacheado y el instante (epoch) hasta el que se considera fresco"""
+    valor: Any
+    fresco_hasta: float
+
+
+class SingleFlight:
+    """Un cálculo en curso por clave dentro del proceso
+
+    Los hilos que piden la misma clave mientras otro la calcula esperan su
+    resultado en lugar de repetir la consulta.
+    """
+
+    def __init__(self):
+        self._vuelos: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _tomar(self, key: str) -> List[Any]:
+        with self._lock:
+            vuelo = self._vuelos.setdefault(key, [threading.Lock(), 0])
+            vuelo[1] += 1
+            return vuelo
+
+    def _soltar(self, key: str, vuelo: List[Any]) -> None:
+        with self._lock:
+            vuelo[1] -= 1
+            if not vuelo[1]:
+                self._vuelos.pop(key, None)
+
+    @contextmanager
+    def lock(self, key: str, blocking: bool = True) -> Iterator[bool]:
+        """Bloqueo de la clave; con blocking=False devuelve False si está ocupada"""
+        vuelo = self._tomar(key)
+        adquirido = vuelo[0].acquire(blocking)
+        try:
+            yield adquirido
+        finally:
+            if adquirido:
+                vuelo[0].release()
+            self._soltar(key, vuelo)
+
+
+class TieredCache:
+    """Caché de dos niveles: LRU del proceso delante de Redis
+
+    Las lecturas frecuentes se sirven desde la memoria del proceso sin ir a
+    Redis. El nivel local usa un TTL corto (``CACHE_LOCAL_TTL``) para acotar
+    cuánto tiempo puede un worker servir un valor que otro proceso ya cambió;
+    Redis conserva el TTL completo y comparte los resultados entre workers.
+
+    ``get_or_set`` evita la estampida cuando vence una clave muy leída:
+
+    - TTL con jitter: cada escritura acorta el TTL un porcentaje aleatorio
+      (``CACHE_TTL_JITTER``) para que las claves creadas a la vez no venzan
+      a la vez.
+    - Stale-while-revalidate: tras vencer, la entrada se conserva
+      ``CACHE_STALE_TTL`` segundos más. Un único llamador la recalcula y el
+      resto recibe el valor anterior sin esperar.
+    - Single-flight: ante un fallo, un solo hilo por proceso (bloqueo por
+      clave) y un solo proceso (bloqueo ``lock:<clave>`` en Redis) calculan
+      el valor; los demás esperan hasta ``CACHE_LOCK_WAIT`` segundos a que
+      aparezca y solo entonces lo calculan por su cuenta.
+
+    Un error de Redis se registra y se trata como fallo de caché: la llamada
+    se calcula igualmente. Los valores None no se cachean.
+    """
+
+    PREFIJO_LOCK = 'lock:'
+    ESPERA_SONDEO = 0.05
+
+    def __init__(self, remote: Any = remote_cache, max_entries: int = 1024, local_ttl: int = 30):
+        self.remote = remote
+        self.local = LocalCache(max_entries, local_ttl)
+        self.jitter = 0.1
+        self.stale_ttl = 60
+        self.lock_timeout = 30
+        self.lock_wait = 5.0
+        self._vuelos = SingleFlight()
+        self._contadores = {'hits': 0, 'misses': 0, 'errors': 0, 'stale': 0, 'coalesced': 0}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.local = LocalCache(
+            app.config.get('CACHE_LOCAL_MAX_ENTRIES', 1024),
+            app.config.get('CACHE_LOCAL_TTL', 30)
+        )
+        self.jitter = app.config.get('CACHE_TTL_JITTER', 0.1)
+        self.stale_ttl = app.config.get('CACHE_STALE_TTL', 60)
+        self.lock_timeout = app.config.get('CACHE_LOCK_TIMEOUT', 30)
+        self.lock_wait = app.config.get('CACHE_LOCK_WAIT', 5.0)
+        app.extensions['tiered_cache'] = self
+
+    def _contar(self, contador: str) -> None:
+        with self._lock:
+            self._contadores[contador] += 1
+        metrics.increment(f"cache_{contador}_total", labels={'nivel': 'redis'})
+
+    # ========== LECTURA Y ESCRITURA ==========
+
+    @staticmethod
+    def _como_entrada(valor: Any) -> EntradaCache:
+        # Valores escritos sin sobre (versiones anteriores): frescos hasta que venzan
+        return valor if isinstance(valor, EntradaCache) else EntradaCache(valor, float('inf'))
+
+    def _leer_remoto(self, key: str) -> Optional[EntradaCache]:
+        try:
+            valor = self.remote.get(key)
+        except Exception as e:
+            self._contar('errors')
+            logger.warning(f"Error leyendo del caché {key}: {str(e)}")
+            return None
+        if valor is None:
+            self._contar('misses')
+            return None
+        self._contar('hits')
+        entrada = self._como_entrada(valor)
+        self.local.set(key, entrada)
+        return entrada
+
+    def _leer(self, key: str) -> Optional[EntradaCache]:
+        entrada = self.local.get(key)
+        if entrada is not _AUSENTE:
+            return entrada
+        return self._leer_remoto(key)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Valor fresco de la clave o None"""
+        entrada = self._leer(key)
+        if entrada is None or entrada.fresco_hasta <= time.time():
+            return None
+        return entrada.valor
+
+    def ttl_con_jitter(self, ttl: Optional[int]) -> Optional[float]:
+        if not ttl:
+            return None
+        return ttl * (1 - random.uniform(0, self.jitter))
+
+    @staticmethod
+    def cacheable(value: Any) -> bool:
+        """Si el valor puede guardarse y compartirse entre peticiones
+
+        Las respuestas HTTP no: son mutables (la compresión reescribe el cuerpo
+        y las cabeceras de la misma instancia) y el nivel local devuelve el
+        objeto guardado. Se cachean los datos, no la vista.
+        """
+        if value is None:
+            return False
+        if isinstance(value, tuple):
+            return not any(isinstance(parte, Response) for parte in value)
+        return not isinstance(value, Response)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        if not self.cacheable(value):
+            if value is not None:
+                logger.warning(f"No se cachea {key}: las respuestas HTTP no son cacheables")
+            return
+        vida = self.ttl_con_jitter(ttl)
+        entrada = EntradaCache(value, time.time() + vida if vida else float('inf'))
+        self.local.set(key, entrada, int(vida) if vida else None)
+        try:
+            # Redis conserva la entrada durante la ventana en la que puede servirse vencida
+            self.remote.set(key, entrada, timeout=int(vida + self.stale_ttl) if vida else None)
+        except Exception as e:
+            self._contar('errors')
+            logger.warning(f"Error escribiendo en el caché {key}: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        try:
+            self.remote.delete(key)
+        except Exception as e:
+            self._contar('errors')
+            logger.warning(f"Error eliminando del caché {key}: {str(e)}")
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.remote.clear()
+
+    # ========== BLOQUEO ENTRE PROCESOS ==========
+
+    def _bloquear_remoto(self, key: str) -> Optional[str]:
+        """Token del bloqueo en Redis, o None si otro proceso está calculando"""
+        token = uuid.uuid4().hex
+        try:
+            if self.remote.add(self.PREFIJO_LOCK + key, token, timeout=self.lock_timeout):
+                return token
+            return None
+        except Exception as e:
+            # Sin Redis solo queda la coordinación dentro del proceso
+            logger.warning(f"Error tomando el bloqueo de {key}: {str(e)}")
+            return token
+
+    def _liberar_remoto(self, key: str, token: str) -> None:
+        try:
+            if self.remote.get(self.PREFIJO_LOCK + key) == token:
+                self.remote.delete(self.PREFIJO_LOCK + key)
+        except Exception as e:
+            logger.warning(f"Error liberando el bloqueo de {key}: {str(e)}")
+
+    def _esperar(self, key: str) -> Optional[EntradaCache]:
+        """Espera a que otro proceso publique la clave"""
+        limite = time.monotonic() + self.lock_wait
+        while time.monotonic() < limite:
+            time.sleep(self.ESPERA_SONDEO)
+            entrada = self._leer_remoto(key)
+            if entrada is not None:
+                return entrada
+        return None
+
+    def _calcular(self, key: str, compute: Callable[[], T], ttl: Optional[int], token: str) -> T:
+        try:
+            valor = compute()
+            self.set(key, valor, ttl)
+            return valor
+        finally:
+            self._liberar_remoto(key, token)
+
+    # ========== LECTURA CON CÁLCULO ==========
+
+    def _revalidar(self, key: str, entrada: EntradaCache, compute: Callable[[], T], ttl: Optional[int]) -> T:
+        """Recalcula una entrada vencida si nadie lo está haciendo; si no, sirve la anterior"""
+        with self._vuelos.lock(key, blocking=False) as propio:
+            token = self._bloquear_remoto(key) if propio else None
+            if token is None:
+                self._contar('stale')
+                return entrada.valor
+            try:
+                return self._calcular(key, compute, ttl, token)
+            except Exception as e:
+                # El valor anterior es preferible a propagar el error
+                logger.warning(f"Error revalidando {key}, se sirve el valor anterior: {str(e)}")
+                self._contar('stale')
+                return entrada.valor
+
+    def get_or_set(self, key: str, compute: Callable[[], T], ttl: Optional[int] = None) -> T:
+        """Devuelve el valor cacheado o lo calcula una sola vez y lo guarda en ambos niveles"""
+        entrada = self._leer(key)
+        if entrada is not None:
+            if entrada.fresco_hasta > time.time():
+                return cast(T, entrada.valor)
+            return self._revalidar(key, entrada, compute, ttl)
+
+        with self._vuelos.lock(key):
+            # Otro hilo del proceso pudo calcularla mientras se esperaba el bloqueo
+            entrada = self.local.get(key)
+            if entrada is not _AUSENTE:
+                self._contar('coalesced')
+                return cast(T, entrada.valor)
+
+            token = self._bloquear_remoto(key)
+            if token is None:
+                entrada = self._esperar(key)
+                if entrada is not None:
+                    self._contar('coalesced')
+                    return cast(T, entrada.valor)
+                token = uuid.uuid4().hex
+            return self._calcular(key, compute, ttl, token)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            remoto = dict(self._contadores)
+        return {'local': self.local.stats(), 'redis': remoto}
+
+
+tiered_cache = TieredCache()
+
+# ========== ETIQUETAS E INVALIDACIÓN ==========
+
+class TagVersions:
+    """Versión de cada etiqueta de caché, compartida entre procesos en Redis
+
+    La clave de una entrada incluye la versión de sus etiquetas, así que
+    invalidar una etiqueta es un ``INCR`` de su contador: las entradas
+    anteriores dejan de ser alcanzables y vencen solas por TTL. El coste es
+    proporcional al número de etiquetas invalidadas, sin recorrer el
+    espacio de claves con ``KEYS``.
+
+    Cada proceso recuerda las versiones leídas durante ``local_ttl``
+    segundos; las invalidaciones propias se ven al instante y las de otros
+    procesos, como mucho, tras ese intervalo.
+    """
+
+    PREFIJO = 'tag:'
+    MAX_LOCALES = 10000
+
+    def __init__(self, remote: Any = remote_cache, local_ttl: float = 2.0):
+        self.remote = remote
+        self.local_ttl = local_ttl
+        self._locales: Dict[str, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def _recordar(self, tag: str, version: int, ahora: float) -> None:
+        if len(self._locales) >= self.MAX_LOCALES:
+            self._locales = {t: e for t, e in self._locales.items() if e[0] > ahora}
+        self._locales[tag] = (ahora + self.local_ttl, version)
+
+    def versiones(self, tags: Iterable[str]) -> Dict[str, int]:
+        ahora = time.monotonic()
+        resultado: Dict[str, int] = {}
+        faltan: List[str] = []
+        with self._lock:
+            for tag in tags:
+                entrada = self._locales.get(tag)
+                if entrada and entrada[0] > ahora:
+                    resultado[tag] = entrada[1]
+                else:
+                    faltan.append(tag)
+        if not faltan:
+            return resultado
+
+        try:
+            valores = self.remote.get_many(*(self.PREFIJO + tag for tag in faltan))
+        except Exception as e:
+            logger.warning(f"Error leyendo versiones de etiquetas: {str(e)}")
+            valores = [None] * len(faltan)
+        with self._lock:
+            for tag, valor in zip(faltan, valores):
+                # Sin valor en el backend se conserva la última versión conocida
+                # por el proceso. Si lo hay se toma tal cual aunque sea menor: el
+                # respaldo local empieza de cero cuando Redis cae
+                conocida = self._locales.get(tag, (0, 0))[1]
+                version = int(valor) if valor is not None else conocida
+                self._recordar(tag, version, ahora)
+                resultado[tag] = version
+        return resultado
+
+    def firma(self, tags: Iterable[str]) -> str:
+        """Resumen corto de las versiones actuales de las etiquetas"""
+        versiones = self.versiones(sorted(set(tags)))
+        return generate_cache_key(*(f"{t}={v}" for t, v in sorted(versiones.items())))[:12]
+
+    def invalidar(self, *tags: str) -> None:
+        for tag in set(tags):
+            try:
+                version = int(self.remote.inc(self.PREFIJO + tag))
+            except Exception as e:
+                logger.warning(f"Error invalidando la etiqueta {tag}: {str(e)}")
+                with self._lock:
+                    version = self._locales.get(tag, (0, 0))[1] + 1
+            with self._lock:
+                self._recordar(tag, version, time.monotonic())
+            metrics.increment('cache_tag_invalidations_total')
+
+
+tag_versions = TagVersions()
+
+def invalidate_tags(*tags: str) -> None:
+    """Invalida todas las entradas cacheadas bajo las etiquetas indicadas"""
+    if tags:
+        tag_versions.invalidar(*tags)
+
+TagsSpec = Union[Iterable[str], Callable[..., Iterable[str]], None]
+
+def _resolver_tags(f: Callable, tags: TagsSpec, args: tuple, kwargs: dict) -> List[str]:
+    """Etiquetas de una llamada; admite plantillas con los argumentos, p. ej. 'repuesto:{part_id}'"""
+    if not tags:
+        return []
+    if callable(tags):
+        return list(tags(*args, **kwargs))
+    tags = list(tags)
+    if any('{' in tag for tag in tags):
+        ligados = inspect.signature(f).bind(*args, **kwargs)
+        ligados.apply_defaults()
+        return [tag.format(**ligados.arguments) for tag in tags]
+    return tags
+
+
+class ModelCacheInvalidator:
+    """Invalida las etiquetas de caché de los modelos al confirmar sus escrituras
+
+    Cada modelo registrado tiene una etiqueta de entidad (``repuesto``) y
+    una de listados (``repuestos:list``). Las entradas de una fila se
+    cachean con ``('repuesto', 'repuesto:{id}')`` y los listados con
+    ``'repuestos:list'``:
+
+    - Una escritura del ORM sobre una fila invalida la fila y los listados.
+    - Un INSERT/UPDATE/DELETE masivo invalida los listados y, si modifica
+      filas, la entidad completa; puede acotarse pasando
+      ``execution_options(cache_tags=[...])`` en la sentencia.
+
+    Las etiquetas se acumulan en ``session.info`` y se invalidan tras el
+    commit; un rollback las descarta.
+    """
+
+    CLAVE_SESION = 'cache_tags'
+    MODELOS = {
+        'Repuesto': ('repuesto', 'repuestos:list'),
+        'Proveedor': ('proveedor', 'proveedores:list'),
+        'Cliente': ('cliente', 'clientes:list'),
+        'Vehiculo': ('vehiculo', 'vehiculos:list'),
+        'Mecanico': ('mecanico', 'mecanicos:list'),
+        'Servicio': ('servicio', 'servicios:list'),
+        'Configuracion': ('configuracion', 'configuracion:list'),
+        'Factura': ('factura', 'facturas:list'),
+        'MovimientoInventario': ('movimiento', 'movimientos:list'),
+    }
+
+    def __init__(self):
+        self._modelos: Dict[type, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._listeners_registrados = False
+
+    def init_app(self, app) -> None:
+        from backend import models
+
+        for nombre, (entidad, lista) in self.MODELOS.items():
+            modelo = getattr(models, nombre, None)
+            if modelo is not None:
+                self.registrar_modelo(modelo, entidad, lista)
+        with self._lock:
+            if not self._listeners_registrados:
+                event.listen(Session, 'do_orm_execute', self._sentencia_ejecutada)
+                event.listen(Session, 'after_commit', self._invalidar_pendientes)
+                event.listen(Session, 'after_soft_rollback', self._descartar)
+                self._listeners_registrados = True
+
+    def registrar_modelo(self, modelo: type, entidad: str, lista: str) -> None:
+        with self._lock:
+            if modelo in self._modelos:
+                return
+            self._modelos[modelo] = (entidad, lista)
+        for evento in ('after_insert', 'after_update', 'after_delete'):
+            event.listen(modelo, evento, self._fila_modificada)
+
+    def _pendientes(self, session) -> Set[str]:
+        return session.info.setdefault(self.CLAVE_SESION, set())
+
+    def _fila_modificada(self, mapper, connection, target) -> None:
+        etiquetas = self._modelos.get(mapper.class_)
+        session = object_session(target)
+        if etiquetas is None or session is None:
+            return
+        entidad, lista = etiquetas
+        clave = '-'.join(str(v) for v in mapper.primary_key_from_instance(target))
+        self._pendientes(session).update((lista, f"{entidad}:{clave}"))
+
+    def _sentencia_ejecutada(self, estado) -> None:
+        if not (estado.is_insert or estado.is_update or estado.is_delete):
+            return
+        tags = estado.execution_options.get('cache_tags')
+        if tags is None:
+            mapper = estado.bind_mapper
+            etiquetas = self._modelos.get(mapper.class_) if mapper is not None else None
+            if etiquetas is None:
+                return
+            entidad, lista = etiquetas
+            tags = (lista,) if estado.is_insert else (lista, entidad)
+        self._pendientes(estado.session).update(tags)
+
+    def _invalidar_pendientes(self, session) -> None:
+        tags = session.info.pop(self.CLAVE_SESION, None)
+        if tags:
+            invalidate_tags(*tags)
+
+    def _descartar(self, session, previous_transaction=None) -> None:
+        session.info.pop(self.CLAVE_SESION, None)
+
+
+cache_tags = ModelCacheInvalidator()
+
+def cached(
+    ttl: Optional[int] = 300,
+    key_prefix: Optional[str] = None,
+    tags: TagsSpec = None
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorador base: cachea el resultado en ``tiered_cache`` con clave estable
+
+    Args:
+        ttl: Tiempo de vida en segundos
+        key_prefix: Prefijo legible de las claves
+        tags: Etiquetas de invalidación (plantillas con los argumentos o
+            una función que recibe los mismos argumentos)
+    """
+    def decorator(f: Callable[..., T]) -> Callable[..., T]:
+        @wraps(f)
+        def decorated_function(*args: Any, **kwargs: Any) -> T:
+            key = function_cache_key(f, args, kwargs, key_prefix)
+            etiquetas = _resolver_tags(f, tags, args, kwargs)
+            if etiquetas:
+                key = f"{key}@{tag_versions.firma(etiquetas)}"
+            return tiered_cache.get_or_set(key, lambda: f(*args, **kwargs), ttl)
+        return cast(Callable[..., T], decorated_function)
+    return decorator
+
 def cache_decorator(ttl: int = 300):
     """Decorador para cachear resultados de funciones
-    
+
     Args:
         ttl (int): Tiempo de vida del caché en segundos (default: 300)
     """
-    def decorator(f: Callable) -> Callable:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> Any:
-            # Generar una clave única para el caché
-            cache_key = f"{f.__name__}:{str(args)}:{str(kwargs)}"
-            
-            # Intentar obtener del caché
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
-            
-            # Si no está en caché, ejecutar la función
-            result = f(*args, **kwargs)
-            
-            # Guardar en caché
-            cache.set(cache_key, result, timeout=ttl)
-            
-            return result
-        return decorated_function
-    return decorator
+    return cached(ttl)
 
 def invalidate_cache_pattern(pattern: str) -> None:
     """
-    Invalida todas las claves que coincidan con el patrón
-    
+    Invalida las entradas de una etiqueta (compatibilidad)
+
+    Ya no recorre Redis con ``KEYS``: el patrón, sin el ``*`` final, se
+    trata como etiqueta. Usar ``invalidate_tags``.
+
     Args:
-        pattern: Patrón de claves a invalidar (ej: "user_*")
+        pattern: Etiqueta a invalidar (ej: "repuestos:list")
     """
-    try:
-        keys = cache.redis.keys(f"{cache.config['CACHE_KEY_PREFIX']}{pattern}")
-        if keys:
-            cache.redis.delete(*keys)
-            logger.info(f"Invalidadas {len(keys)} claves con patrón: {pattern}")
-    except Exception as e:
-        logger.error(f"Error al invalidar caché: {str(e)}")
+    invalidate_tags(pattern.rstrip('*'))
+
+def invalidate_cache(*tags: str) -> None:
+    """Invalida las entradas cacheadas bajo las etiquetas indicadas"""
+    invalidate_tags(*tags)
 
 def clear_all_cache() -> None:
     """Limpia todo el caché"""
     try:
-        cache.clear()
+        tiered_cache.clear()
         logger.info("Caché limpiado completamente")
     except Exception as e:
         logger.error(f"Error al limpiar caché: {str(e)}")
 
 def get_cache_stats() -> dict:
     """Obtiene estadísticas del caché"""
+    stats = {'niveles': tiered_cache.stats(), 'backend': remote_cache.stats()}
+    if remote_cache.activo != 'redis':
+        return stats
     try:
-        info = cache.redis.info()
-        return {
+        cliente = cache.cache._read_client
+        info = cliente.info()
+        stats.update({
             'used_memory': info['used_memory'],
             'used_memory_peak': info['used_memory_peak'],
             'connected_clients': info['connected_clients'],
-            'total_keys': cache.redis.dbsize()
-        }
+            'total_keys': cliente.dbsize()
+        })
     except Exception as e:
         logger.error(f"Error al obtener estadísticas del caché: {str(e)}")
-        return {}
+    return stats
 
 def setup_cache(app):
-    """Configura el caché para la aplicación"""
+    """Configura el caché para la aplicación
+
+    ``CACHE_BACKEND``:
+        - ``redis`` (por defecto): Redis, con failover al archivo SQLite
+          local mientras no responde.
+        - ``local``: solo el archivo SQLite, para despliegues en modo
+          offline sin Redis; no se intenta conectar.
+    """
     try:
-        # Configurar caché desde variables de entorno
-        cache_config = {
-            'CACHE_TYPE': 'redis',
-            'CACHE_REDIS_URL': app.config.get('REDIS_URL', 'redis://localhost:6379/0'),
-            'CACHE_DEFAULT_TIMEOUT': app.config.get('CACHE_DEFAULT_TIMEOUT', 300),
-            'CACHE_KEY_PREFIX': app.config.get('CACHE_KEY_PREFIX', 'automanager_'),
-            'CACHE_OPTIONS': {
-                'socket_timeout': app.config.get('CACHE_SOCKET_TIMEOUT', 5),
-                'socket_connect_timeout': app.config.get('CACHE_SOCKET_CONNECT_TIMEOUT', 5),
-                'retry_on_timeout': app.config.get('CACHE_RETRY_ON_TIMEOUT', True)
+        local = SQLiteCache(app.config.get('CACHE_LOCAL_PATH'))
+        backend = app.config.get('CACHE_BACKEND', 'redis')
+        if backend not in ('redis', 'local'):
+            raise ValueError(f"CACHE_BACKEND no válido: {backend}")
+
+        if backend == 'local':
+            cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+            remote_cache.configure(primary=None, fallback=local)
+        else:
+            # Configurar caché desde variables de entorno
+            cache_config = {
+                'CACHE_TYPE': 'redis',
+                'CACHE_REDIS_URL': app.config.get('REDIS_URL', 'redis://localhost:6379/0'),
+                'CACHE_DEFAULT_TIMEOUT': app.config.get('CACHE_DEFAULT_TIMEOUT', 300),
+                'CACHE_KEY_PREFIX': app.config.get('CACHE_KEY_PREFIX', 'automanager_'),
+                'CACHE_OPTIONS': {
+                    'socket_timeout': app.config.get('CACHE_SOCKET_TIMEOUT', 5),
+                    'socket_connect_timeout': app.config.get('CACHE_SOCKET_CONNECT_TIMEOUT', 5),
+                    'retry_on_timeout': app.config.get('CACHE_RETRY_ON_TIMEOUT', True)
+                }
             }
-        }
-        
-        cache.init_app(app, config=cache_config)
-        logger.info("Caché configurado correctamente")
-        
+            cache.init_app(app, config=cache_config)
+            remote_cache.configure(
+                primary=cache,
+                fallback=local,
+                breaker=CircuitBreaker(
+                    app.config.get('CACHE_BREAKER_FAILURES', 3),
+                    app.config.get('CACHE_BREAKER_RESET', 30)
+                )
+            )
+
+        tiered_cache.init_app(app)
+        tag_versions.local_ttl = app.config.get('CACHE_TAG_LOCAL_TTL', 2)
+        cache_tags.init_app(app)
+        logger.info(f"Caché configurado correctamente (backend: {backend})")
+
     except Exception as e:
         logger.error(f"Error al configurar caché: {str(e)}")
         raise
 
-def cache_with_args(ttl: int = 300) -> Callable[[Callable[..., T]], Callable[..., T]]:
+def cache_with_args(
+    ttl: int = 300,
+    timeout: Optional[int] = None,
+    key_prefix: Optional[str] = None,
+    tags: TagsSpec = None
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """Decorador para cachear resultados de funciones con argumentos
-    
+
     Args:
         ttl: Tiempo de vida del caché en segundos
-        
+        timeout: Alias de ttl
+        key_prefix: Prefijo legible de las claves (por defecto, el nombre calificado)
+        tags: Etiquetas de invalidación, ver ``cached``
+
     Returns:
         Decorador que cachea el resultado de la función
     """
-    def decorator(f: Callable[..., T]) -> Callable[..., T]:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> T:
-            # Generar clave única basada en la función y sus argumentos
-            key_parts = [
-                f.__module__,
-                f.__name__,
-                str(args),
-                str(sorted(kwargs.items()))
-            ]
-            cache_key = hashlib.md5(''.join(key_parts).encode()).hexdigest()
-            
-            # Intentar obtener del caché
-            result = cache.get(cache_key)
-            if result is not None:
-                return cast(T, result)
-            
-            # Ejecutar función y cachear resultado
-            result = f(*args, **kwargs)
-            cache.set(cache_key, result, timeout=ttl)
-            
-            return result
-        return cast(Callable[..., T], decorated_function)
-    return decorator
+    return cached(timeout or ttl, key_prefix, tags)
 
 def cache_key_prefix(prefix: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """Decorador para agregar un prefijo a las claves de caché
-    
+
     Args:
         prefix: Prefijo para las claves de caché
-        
+
     Returns:
         Decorador que agrega el prefijo a las claves de caché
     """
-    def decorator(f: Callable[..., T]) -> Callable[..., T]:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> T:
-            # Generar clave con prefijo
-            key_parts = [
-                prefix,
-                f.__module__,
-                f.__name__,
-                str(args),
-                str(sorted(kwargs.items()))
-            ]
-            cache_key = hashlib.md5(''.join(key_parts).encode()).hexdigest()
-            
-            # Intentar obtener del caché
-            result = cache.get(cache_key)
-            if result is not None:
-                return cast(T, result)
-            
-            # Ejecutar función y cachear resultado
-            result = f(*args, **kwargs)
-            cache.set(cache_key, result)
-            
-            return result
-        return cast(Callable[..., T], decorated_function)
-    return decorator
+    return cached(None, prefix)
 
 def cache_invalidate(*keys: str) -> None:
     """Invalidar claves de caché
-    
+
     Args:
         *keys: Claves a invalidar
     """
     for key in keys:
-        cache.delete(key)
+        tiered_cache.delete(key)
 
 def cache_clear() -> None:
     """Limpiar todo el caché"""
-    cache.clear()
+    tiered_cache.clear()
 
 def cache_get(key: str) -> Optional[Any]:
     """Obtener valor del caché
-    
+
     Args:
         key: Clave del caché
-        
+
     Returns:
         Valor cacheado o None si no existe
     """
-    return cache.get(key)
+    return tiered_cache.get(key)
 
 def cache_set(key: str, value: Any, ttl: Optional[int] = None) -> None:
     """Establecer valor en el caché
-    
+
     Args:
         key: Clave del caché
         value: Valor a cachear
         ttl: Tiempo de vida en segundos (opcional)
     """
-    cache.set(key, value, timeout=ttl)
+    tiered_cache.set(key, value, ttl)
 
 def cache_memoize(ttl: int = 300) -> Callable[[Callable[..., T]], Callable[..., T]]:
     """Decorador para cachear resultados de funciones con argumentos (versión memoizada)
-    
+
     Args:
         ttl: Tiempo de vida del caché en segundos
-        
+
     Returns:
         Decorador que cachea el resultado de la función
     """
-    def decorator(f: Callable[..., T]) -> Callable[..., T]:
-        @wraps(f)
-        def decorated_function(*args: Any, **kwargs: Any) -> T:
-            # Generar clave única basada en la función y sus argumentos
-            key_parts = [
-                f.__module__,
-                f.__name__,
-                json.dumps(args, sort_keys=True),
-                json.dumps(kwargs, sort_keys=True)
-            ]
-            cache_key = hashlib.md5(''.join(key_parts).encode()).hexdigest()
-            
-            # Intentar obtener del caché
-            result = cache.get(cache_key)
-            if result is not None:
-                return cast(T, result)
-            
-            # Ejecutar función y cachear resultado
-            result = f(*args, **kwargs)
-            cache.set(cache_key, result, timeout=ttl)
-            
-            return result
-        return cast(Callable[..., T], decorated_function)
-    return decorator 
\ No newline at end of file
+    return cached(ttl)
@@ -0,0 +1,284 @@
+"""
+Backends del caché compartido
+=============================
+
+``FailoverCache`` es el backend remoto que usan ``TieredCache`` y las
+versiones de etiquetas. Envía las operaciones a Redis y, si Redis no
+responde, a ``SQLiteCache``: un archivo SQLite en modo WAL que comparten
+todos los workers del mismo host.
+
+Un ``CircuitBreaker`` evita pagar el timeout del socket en cada llamada
+mientras Redis está caído. Tras ``failures`` errores seguidos deja de
+intentarlo durante ``reset_timeout`` segundos y después prueba una sola
+llamada. Las invalidaciones hechas durante la caída se repiten en Redis
+al recuperarlo, para que no sirva entradas que se invalidaron mientras
+tanto.
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from backend.utils.logger import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCache:
+    """Caché en disco compartida entre procesos del mismo host
+
+    Cada hilo usa su propia conexión. Los valores se guardan serializados
+    con pickle junto con su vencimiento; las entradas vencidas se ignoran al
+    leer y se purgan cada ``PURGAR_CADA`` escrituras.
+    """
+
+    PURGAR_CADA = 500
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(tempfile.gettempdir(), 'automanager_cache.sqlite3')
+        self._local = threading.local()
+        self._escrituras = 0
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            directorio = os.path.dirname(self.path)
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+            conexion = sqlite3.connect(self.path, timeout=1, isolation_level=None, check_same_thread=False)
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            conexion.execute(
+                'CREATE TABLE IF NOT EXISTS cache (clave TEXT PRIMARY KEY, valor BLOB NOT NULL, expira REAL)'
+            )
+            self._local.conexion = conexion
+        return conexion
+
+    @staticmethod
+    def _expira(timeout: Optional[float]) -> Optional[float]:
+        return time.time() + timeout if timeout else None
+
+    def _vigente(self, fila) -> Any:
+        if fila is None or (fila[1] is not None and fila[1] <= time.time()):
+            return None
+        return pickle.loads(fila[0])
+
+    def _escrito(self) -> None:
+        self._escrituras += 1
+        if self._escrituras % self.PURGAR_CADA == 0:
+            self._conexion().execute('DELETE FROM cache WHERE expira <= ?', (time.time(),))
+
+    def get(self, key: str) -> Any:
+        fila = self._conexion().execute('SELECT valor, expira FROM cache WHERE clave = ?', (key,)).fetchone()
+        return self._vigente(fila)
+
+    def get_many(self, *keys: str) -> List[Any]:
+        if not keys:
+            return []
+        marcas = ','.join('?' * len(keys))
+        filas = {
+            clave: (valor, expira) for clave, valor, expira in self._conexion().execute(
+                f'SELECT clave, valor, expira FROM cache WHERE clave IN ({marcas})', keys
+            )
+        }
+        return [self._vigente(filas.get(key)) for key in keys]
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None) -> bool:
+        self._conexion().execute(
+            'INSERT OR REPLACE INTO cache (clave, valor, expira) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value), self._expira(timeout))
+        )
+        self._escrito()
+        return True
+
+    def add(self, key: str, value: Any, timeout: Optional[float] = None) -> bool:
+        """Guarda la clave solo si no existe (o está vencida); True si la guardó"""
+        conexion = self._conexion()
+        conexion.execute('BEGIN IMMEDIATE')
+        try:
+            conexion.execute('DELETE FROM cache WHERE clave = ? AND expira <= ?', (key, time.time()))
+            insertadas = conexion.execute(
+                'INSERT OR IGNORE INTO cache (clave, valor, expira) VALUES (?, ?, ?)',
+                (key, pickle.dumps(value), self._expira(timeout))
+            ).rowcount
+            conexion.execute('COMMIT')
+        except Exception:
+            conexion.execute('ROLLBACK')
+            raise
+        self._escrito()
+        return insertadas == 1
+
+    def inc(self, key: str, delta: int = 1) -> int:
+        conexion = self._conexion()
+        conexion.execute('BEGIN IMMEDIATE')
+        try:
+            fila = conexion.execute('SELECT valor, expira FROM cache WHERE clave = ?', (key,)).fetchone()
+            valor = int(self._vigente(fila) or 0) + delta
+            conexion.execute(
+                'INSERT OR REPLACE INTO cache (clave, valor, expira) VALUES (?, ?, NULL)',
+                (key, pickle.dumps(valor))
+            )
+            conexion.execute('COMMIT')
+        except Exception:
+            conexion.execute('ROLLBACK')
+            raise
+        return valor
+
+    def delete(self, key: str) -> bool:
+        return self._conexion().execute('DELETE FROM cache WHERE clave = ?', (key,)).rowcount > 0
+
+    def clear(self) -> bool:
+        self._conexion().execute('DELETE FROM cache')
+        return True
+
+
+class CircuitBreaker:
+    """Corta las llamadas a un servicio caído durante un intervalo
+
+    Estados: ``cerrado`` (se llama normalmente), ``abierto`` (no se llama
+    hasta que pasen ``reset_timeout`` segundos) y ``semiabierto`` (se
+    permite una única llamada de prueba que lo cierra o lo vuelve a abrir).
+    """
+
+    def __init__(self, failures: int = 3, reset_timeout: float = 30):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.estado = 'cerrado'
+        self._fallos = 0
+        self._abierto_desde = 0.0
+        self._lock = threading.Lock()
+
+    def permite(self) -> bool:
+        with self._lock:
+            if self.estado == 'cerrado':
+                return True
+            if self.estado == 'abierto' and time.monotonic() - self._abierto_desde >= self.reset_timeout:
+                self.estado = 'semiabierto'
+                return True
+            return False
+
+    def exito(self) -> bool:
+        """Registra una llamada correcta; True si el circuito estaba abierto"""
+        with self._lock:
+            recuperado = self.estado != 'cerrado'
+            self.estado = 'cerrado'
+            self._fallos = 0
+            return recuperado
+
+    def fallo(self) -> bool:
+        """Registra un error; True si el circuito acaba de abrirse desde cerrado"""
+        with self._lock:
+            self._fallos += 1
+            if self.estado == 'semiabierto' or self._fallos >= self.failures:
+                abierto = self.estado == 'cerrado'
+                if self.estado != 'abierto':
+                    metrics.increment('cache_circuit_open_total')
+                self.estado = 'abierto'
+                self._abierto_desde = time.monotonic()
+                return abierto
+            return False
+
+
+class FailoverCache:
+    """Backend remoto con Redis como principal y SQLite local como respaldo
+
+    Con ``primary=None`` (``CACHE_BACKEND=local``) se usa solo el respaldo,
+    pensado para los despliegues en modo offline sin Redis.
+    """
+
+    MAX_PENDIENTES = 10000
+
+    def __init__(self, primary: Any = None, fallback: Optional[SQLiteCache] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.configure(primary, fallback, breaker)
+
+    def configure(self, primary: Any = None, fallback: Optional[SQLiteCache] = None,
+                  breaker: Optional[CircuitBreaker] = None) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.breaker = breaker or CircuitBreaker()
+        # Claves invalidadas en el respaldo que deben repetirse en Redis al volver
+        self._pendientes: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def activo(self) -> str:
+        if self.primary is not None and self.breaker.estado != 'abierto':
+            return 'redis'
+        return 'local' if self.fallback is not None else 'ninguno'
+
+    def _llamar(self, metodo: str, *args: Any, invalida: Optional[str] = None) -> Any:
+        if self.primary is not None and self.breaker.permite():
+            try:
+                resultado = getattr(self.primary, metodo)(*args)
+            except Exception as e:
+                metrics.increment('cache_failover_total', labels={'operacion': metodo})
+                logger.warning(f"Redis no disponible ({metodo}), se usa el caché local: {str(e)}")
+                if self.fallback is None:
+                    self.breaker.fallo()
+                    raise
+                if self.breaker.fallo():
+                    # Lo que quedó de una caída anterior puede estar invalidado en Redis
+                    self.fallback.clear()
+            else:
+                if self.breaker.exito():
+                    self._sincronizar()
+                return resultado
+        if self.fallback is None:
+            raise ConnectionError('No hay backend de caché disponible')
+        if invalida and self.primary is not None:
+            with self._lock:
+                if len(self._pendientes) < self.MAX_PENDIENTES:
+                    self._pendientes.add(invalida)
+        return getattr(self.fallback, metodo)(*args)
+
+    def _sincronizar(self) -> None:
+        """Repite en Redis las invalidaciones hechas mientras estuvo caído"""
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, set()
+        for key in pendientes:
+            try:
+                if key.startswith('tag:'):
+                    self.primary.inc(key)
+                else:
+                    self.primary.delete(key)
+            except Exception as e:
+                logger.warning(f"Error sincronizando la invalidación de {key}: {str(e)}")
+        if pendientes:
+            logger.info(f"Redis recuperado: {len(pendientes)} invalidaciones repetidas")
+
+    def get(self, key: str) -> Any:
+        return self._llamar('get', key)
+
+    def get_many(self, *keys: str) -> List[Any]:
+        return self._llamar('get_many', *keys)
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None) -> Any:
+        return self._llamar('set', key, value, timeout)
+
+    def add(self, key: str, value: Any, timeout: Optional[float] = None) -> Any:
+        return self._llamar('add', key, value, timeout)
+
+    def inc(self, key: str, delta: int = 1) -> Any:
+        return self._llamar('inc', key, delta, invalida=key)
+
+    def delete(self, key: str) -> Any:
+        return self._llamar('delete', key, invalida=key)
+
+    def clear(self) -> Any:
+        return self._llamar('clear')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pendientes = len(self._pendientes)
+        return {
+            'backend': self.activo,
+            'circuito': self.breaker.estado,
+            'invalidaciones_pendientes': pendientes,
+            'local_path': self.fallback.path if self.fallback is not None else None
+        }
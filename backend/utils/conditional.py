@@ -0,0 +1,66 @@
+"""
+Validación de respuestas con ETag
+=================================
+
+Los catálogos que el frontend vuelve a pedir en cada navegación responden
+``304 Not Modified`` si no cambió nada desde la última descarga.
+
+El ETag no sale de un hash del cuerpo: se forma con la versión de las
+etiquetas de caché de las tablas que lee el endpoint (``clientes:list``,
+``repuestos:list``...), que ``ModelCacheInvalidator`` incrementa al
+confirmar cada escritura. Así, cuando el ``If-None-Match`` coincide, se
+responde sin ejecutar la consulta ni el serializador.
+
+La firma se calcula antes de ejecutar la vista. Si una escritura se confirma
+mientras la vista consulta, el ETag que se envía es el anterior, y la
+siguiente petición descarga de nuevo los datos.
+"""
+
+from functools import wraps
+from typing import Any, Callable, Iterable, TypeVar, cast
+from flask import current_app, make_response, request
+from backend.utils.cache import tag_versions
+from backend.utils.logger import metrics
+
+T = TypeVar('T')
+
+def etag_for(tags: Iterable[str], endpoint: str = '') -> str:
+    """ETag de las versiones actuales de las etiquetas
+
+    ``API_ETAG_VERSION`` forma parte de la firma: hay que cambiarlo cuando un
+    despliegue cambia el formato de las respuestas sin tocar los datos.
+    """
+    version = current_app.config.get('API_ETAG_VERSION', '1')
+    return f"{endpoint}-{version}-{tag_versions.firma(tags)}"
+
+def conditional_get(*tags: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorador: ETag por versión de tablas y ``304`` sin ejecutar la vista
+
+    Se aplica debajo de ``@jwt_required()``, así que la autenticación se
+    comprueba antes de responder ``304``.
+
+    Args:
+        tags: Etiquetas de las tablas que lee el endpoint. Sin etiquetas el
+            ETag solo cambia con ``API_ETAG_VERSION`` (datos estáticos).
+    """
+    def decorator(f: Callable[..., T]) -> Callable[..., T]:
+        @wraps(f)
+        def decorated_function(*args: Any, **kwargs: Any) -> Any:
+            if request.method not in ('GET', 'HEAD') or not current_app.config.get('API_ETAG_ENABLED', True):
+                return f(*args, **kwargs)
+
+            etag = etag_for(tags, request.endpoint or f.__name__)
+            if request.if_none_match.contains_weak(etag):
+                metrics.increment('http_not_modified_total', labels={'endpoint': request.endpoint})
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            # Débil: el cuerpo puede ir comprimido de distintas formas
+            response.set_etag(etag, weak=True)
+            # El navegador guarda la respuesta pero la revalida en cada uso
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return cast(Callable[..., T], decorated_function)
+    return decorator
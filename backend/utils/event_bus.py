@@ -0,0 +1,85 @@
+"""
+Bus de eventos local (publicación/suscripción en memoria)
+========================================================
+
+Reparte mensajes entre los hilos de un mismo proceso. Cada suscriptor tiene
+su propia cola acotada: si un cliente lento la llena, se descartan sus
+mensajes más antiguos sin bloquear al publicador ni al resto de suscriptores.
+"""
+
+import queue
+import threading
+from typing import Any, Dict, Optional, Set
+
+from backend.utils.logger import metrics
+
+
+class Suscripcion:
+    """Cola de mensajes de un suscriptor"""
+
+    def __init__(self, canal: str, max_mensajes: int):
+        self.canal = canal
+        self._cola: 'queue.Queue[Any]' = queue.Queue(maxsize=max_mensajes)
+
+    def entregar(self, mensaje: Any) -> None:
+        """Encola el mensaje descartando el más antiguo si la cola está llena"""
+        while True:
+            try:
+                self._cola.put_nowait(mensaje)
+                return
+            except queue.Full:
+                try:
+                    self._cola.get_nowait()
+                    metrics.increment('event_bus_descartados', labels={'canal': self.canal})
+                except queue.Empty:
+                    pass
+
+    def recibir(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """Espera el siguiente mensaje; devuelve None si vence el timeout"""
+        try:
+            return self._cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """Bus de publicación/suscripción en memoria, seguro entre hilos"""
+
+    def __init__(self, max_mensajes: int = 100):
+        self.max_mensajes = max_mensajes
+        self._suscripciones: Dict[str, Set[Suscripcion]] = {}
+        self._lock = threading.Lock()
+
+    def suscribir(self, canal: str) -> Suscripcion:
+        suscripcion = Suscripcion(canal, self.max_mensajes)
+        with self._lock:
+            self._suscripciones.setdefault(canal, set()).add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            suscriptores = self._suscripciones.get(suscripcion.canal)
+            if suscriptores:
+                suscriptores.discard(suscripcion)
+                if not suscriptores:
+                    del self._suscripciones[suscripcion.canal]
+
+    def suscriptores(self, canal: str) -> int:
+        with self._lock:
+            return len(self._suscripciones.get(canal, ()))
+
+    def publicar(self, canal: str, mensaje: Any) -> int:
+        """Entrega el mensaje a todos los suscriptores del canal
+
+        Returns:
+            int: Número de suscriptores que lo recibieron
+        """
+        with self._lock:
+            suscriptores = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscriptores:
+            suscripcion.entregar(mensaje)
+        metrics.increment('event_bus_publicados', labels={'canal': canal})
+        return len(suscriptores)
+
+
+event_bus = EventBus()
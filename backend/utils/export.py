@@ -0,0 +1,137 @@
+"""
+Exportación de reportes en streaming
+===================================
+
+Escribe CSV y XLSX a partir de un iterable de filas (diccionarios) sin
+construir el archivo completo en memoria:
+
+- CSV: se emite un bloque de bytes cada ``CSV_CHUNK_ROWS`` filas.
+- XLSX: XlsxWriter en modo ``constant_memory`` vuelca cada fila a disco al
+  escribirla; el libro terminado se envía desde el archivo temporal por bloques.
+
+Combinado con una consulta ``yield_per`` (cursor del servidor) la memoria del
+worker se mantiene constante sin importar cuántas filas tenga el reporte.
+"""
+
+import csv
+import io
+import os
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+import xlsxwriter
+
+# Filas que se acumulan antes de emitir un bloque CSV
+CSV_CHUNK_ROWS = 500
+# Tamaño de los bloques leídos del XLSX terminado
+XLSX_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+# 'excel' es el nombre histórico del formato XLSX en ReportService.export_report
+FORMAT_ALIASES = {'excel': 'xlsx'}
+
+
+def normalize_format(format: str) -> str:
+    """Devuelve el formato canónico o lanza ValueError si no está soportado"""
+    format = FORMAT_ALIASES.get(format, format)
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato no soportado: {format}")
+    return format
+
+
+def _columnas(primera: Optional[Dict[str, Any]], columnas: Optional[Sequence[str]]) -> Sequence[str]:
+    if columnas:
+        return columnas
+    return list(primera.keys()) if primera else []
+
+
+def stream_csv(filas: Iterable[Dict[str, Any]], columnas: Optional[Sequence[str]] = None) -> Iterator[bytes]:
+    """Genera el CSV por bloques de ``CSV_CHUNK_ROWS`` filas
+
+    Args:
+        filas: Filas a exportar; se consumen una sola vez
+        columnas: Orden de las columnas (por defecto, las claves de la primera fila)
+    """
+    filas = iter(filas)
+    primera = next(filas, None)
+    columnas = _columnas(primera, columnas)
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columnas, extrasaction='ignore')
+    writer.writeheader()
+    if primera is None:
+        yield buffer.getvalue().encode('utf-8')
+        return
+
+    writer.writerow(primera)
+    pendientes = 1
+    for fila in filas:
+        writer.writerow(fila)
+        pendientes += 1
+        if pendientes >= CSV_CHUNK_ROWS:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+            pendientes = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _valor_celda(valor: Any) -> Any:
+    if valor is None or isinstance(valor, (int, float, str, bool)):
+        return valor
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    return str(valor)
+
+
+def stream_xlsx(
+    filas: Iterable[Dict[str, Any]],
+    columnas: Optional[Sequence[str]] = None,
+    hoja: str = 'Reporte'
+) -> Iterator[bytes]:
+    """Genera un XLSX con memoria constante y lo emite por bloques
+
+    XLSX es un ZIP cuyo índice se escribe al final, así que el libro se
+    completa en un archivo temporal (fila a fila, en modo ``constant_memory``)
+    y después se envía en bloques de ``XLSX_CHUNK_BYTES``.
+    """
+    descriptor, ruta = tempfile.mkstemp(suffix='.xlsx')
+    os.close(descriptor)
+    try:
+        libro = xlsxwriter.Workbook(ruta, {'constant_memory': True})
+        try:
+            hoja_xlsx = libro.add_worksheet(hoja)
+            filas = iter(filas)
+            primera = next(filas, None)
+            columnas = _columnas(primera, columnas)
+            hoja_xlsx.write_row(0, 0, columnas)
+            if primera is not None:
+                hoja_xlsx.write_row(1, 0, [_valor_celda(primera.get(c)) for c in columnas])
+                for numero, fila in enumerate(filas, start=2):
+                    hoja_xlsx.write_row(numero, 0, [_valor_celda(fila.get(c)) for c in columnas])
+        finally:
+            libro.close()
+
+        with open(ruta, 'rb') as archivo:
+            while True:
+                bloque = archivo.read(XLSX_CHUNK_BYTES)
+                if not bloque:
+                    break
+                yield bloque
+    finally:
+        os.remove(ruta)
+
+
+def stream_export(
+    filas: Iterable[Dict[str, Any]],
+    format: str,
+    columnas: Optional[Sequence[str]] = None
+) -> Iterator[bytes]:
+    """Elige el escritor en streaming según el formato"""
+    if normalize_format(format) == 'csv':
+        return stream_csv(filas, columnas)
+    return stream_xlsx(filas, columnas)
@@ -0,0 +1,96 @@
+"""
+Proveedor JSON de la aplicación
+===============================
+
+Todas las respuestas de ``jsonify`` pasan por ``FastJSONProvider``. Si
+``orjson`` está instalado, la serialización la hace orjson. Serializa
+``datetime``, ``date``, ``time``, ``UUID``, dataclasses y arrays de numpy
+de forma nativa y escribe bytes sin pasar por ``str``.
+
+Las fechas salen siempre en ISO 8601, igual que ``.isoformat()``, así que
+las vistas devuelven los objetos tal cual. Sin orjson se usa el módulo
+``json`` estándar con la misma conversión de fechas, en lugar del formato
+HTTP (RFC 822) que usa Flask por defecto.
+
+Las claves no se ordenan: el orden de los dicts ya es estable y ordenarlas
+solo cuesta CPU.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+import dataclasses
+import json
+import uuid
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional
+    orjson = None
+
+# Argumentos de json.dumps que se pueden traducir a opciones de orjson
+_ARGUMENTOS_ORJSON = {'indent', 'separators', 'sort_keys', 'default'}
+
+def _por_defecto(o: Any) -> Any:
+    """Tipos que ni orjson ni json saben serializar"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, 'tolist'):
+        # Escalares y arrays de numpy (y pandas) que llegan desde los reportes
+        return o.tolist()
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON con orjson y fechas en ISO 8601"""
+
+    default = staticmethod(_por_defecto)
+    sort_keys = False
+
+    @staticmethod
+    def disponible() -> bool:
+        return orjson is not None
+
+    def _orjson(self, obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+        opciones = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            opciones |= orjson.OPT_INDENT_2
+        if sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_por_defecto, option=opciones)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or set(kwargs) - _ARGUMENTOS_ORJSON or kwargs.get('default', _por_defecto) is not _por_defecto:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._orjson(obj, bool(kwargs.get('indent')), kwargs.get('sort_keys', self.sort_keys)).decode()
+        except TypeError:
+            # Enteros de más de 64 bits y otros casos que orjson rechaza
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        if orjson is not None:
+            try:
+                cuerpo = self._orjson(obj, indent, self.sort_keys) + b'\n'
+                return self._app.response_class(cuerpo, mimetype=self.mimetype)
+            except TypeError:
+                pass
+        return super().response(*args, **kwargs)
@@ -0,0 +1,158 @@
+"""
+Utilidades de paginación por cursor (keyset)
+==========================================
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_, text
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginación mal formado o alterado"""
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Codifica los valores de la última fila en un cursor opaco
+
+    Args:
+        values: Valores de las columnas de orden de la última fila
+
+    Returns:
+        str: Cursor en base64 url-safe
+    """
+    raw = json.dumps(values, separators=(',', ':'), sort_keys=True, default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decodifica un cursor generado por encode_cursor
+
+    Args:
+        cursor: Cursor opaco recibido del cliente
+
+    Returns:
+        dict: Valores de las columnas de orden
+
+    Raises:
+        InvalidCursorError: Si el cursor no se puede decodificar
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode((cursor + padding).encode('ascii'))
+        values = json.loads(raw.decode('utf-8'))
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError(f"Cursor inválido: {str(e)}")
+
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Cursor inválido")
+    return values
+
+
+def keyset_filter(columns: Sequence[Tuple[str, Any]], values: Dict[str, Any], descending: bool = False):
+    """Construye la condición de búsqueda (seek) para un orden compuesto
+
+    Genera ``(a > :a) OR (a = :a AND b > :b) ...`` que es equivalente a la
+    comparación de tuplas y funciona tanto en SQLite como en PostgreSQL.
+
+    Args:
+        columns: Pares (nombre, columna) en el orden de la consulta
+        values: Valores decodificados del cursor
+        descending: Si el orden es descendente
+
+    Returns:
+        Expresión SQLAlchemy para usar en ``filter``
+    """
+    missing = [name for name, _ in columns if name not in values]
+    if missing:
+        raise InvalidCursorError(f"Cursor inválido: faltan campos {missing}")
+
+    condiciones = []
+    for i, (name, column) in enumerate(columns):
+        iguales = [col == values[prev] for prev, col in columns[:i]]
+        comparacion = column < values[name] if descending else column > values[name]
+        condiciones.append(and_(*iguales, comparacion))
+    return or_(*condiciones)
+
+
+def keyset_paginate(
+    query: Any,
+    columns: Sequence[Tuple[str, Any]],
+    cursor: Optional[str] = None,
+    per_page: int = 20,
+    descending: bool = False
+) -> Tuple[List[Any], Optional[str]]:
+    """Pagina una consulta buscando a partir del cursor en lugar de usar OFFSET
+
+    El coste de cada página es constante: la base de datos salta directamente
+    al primer registro posterior al cursor usando el índice de las columnas
+    de orden, sin recorrer las páginas anteriores.
+
+    Args:
+        query: Consulta SQLAlchemy ya filtrada (sin order_by)
+        columns: Pares (nombre, columna) que definen un orden único
+        cursor: Cursor de la página anterior o None para la primera
+        per_page: Elementos por página
+        descending: Si el orden es descendente
+
+    Returns:
+        tuple: (items, next_cursor) donde next_cursor es None en la última página
+    """
+    if cursor:
+        query = query.filter(keyset_filter(columns, decode_cursor(cursor), descending))
+
+    orden = [col.desc() if descending else col.asc() for _, col in columns]
+    # Pedimos un elemento extra para saber si existe una página siguiente
+    items = query.order_by(*orden).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        ultimo = items[-1]
+        next_cursor = encode_cursor({name: _row_value(ultimo, name) for name, _ in columns})
+    return items, next_cursor
+
+
+def _row_value(row: Any, name: str) -> Any:
+    """Obtiene el valor de una columna de orden desde un modelo o una fila"""
+    value = getattr(row, name)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def estimate_count(query: Any, model: Any, filtered: bool = True) -> Optional[int]:
+    """Estima el total de registros sin recorrer la tabla
+
+    En PostgreSQL usa las estadísticas del planificador (``pg_class.reltuples``)
+    y en SQLite el mayor ``rowid``. Con filtros no hay estimación barata, así
+    que devuelve None y el cliente debe pedir ``count=exact`` si lo necesita.
+
+    Args:
+        query: Consulta SQLAlchemy
+        model: Modelo de la tabla principal
+        filtered: Si la consulta tiene filtros aplicados
+
+    Returns:
+        int o None
+    """
+    if filtered:
+        return None
+
+    session = query.session
+    dialect = session.get_bind().dialect.name
+    table = model.__tablename__
+
+    if dialect == 'postgresql':
+        estimado = session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :tabla"),
+            {'tabla': table}
+        ).scalar()
+        if estimado is not None and estimado >= 0:
+            return int(estimado)
+    elif dialect == 'sqlite':
+        return session.query(func.max(model.id)).scalar() or 0
+
+    return None
@@ -0,0 +1,233 @@
+"""
+Serializadores con carga anticipada de relaciones
+================================================
+
+Cada serializador declara los campos y las relaciones que necesita. A partir
+de esa declaración genera las opciones de carga (``joinedload`` para
+relaciones a uno, ``selectinload`` para colecciones) y precarga en bloque las
+relaciones ``lazy='dynamic'``, que SQLAlchemy no puede cargar por adelantado.
+Así un listado ejecuta siempre el mismo número de consultas sin importar
+cuántas filas devuelva.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from backend.models import db, Servicio, Vehiculo, Cliente, Repuesto, Factura, Mecanico
+
+
+class Contexto:
+    """Relaciones dinámicas precargadas durante una serialización"""
+
+    def __init__(self):
+        self._precargadas: Dict[str, Dict[Any, List[Any]]] = {}
+
+    def guardar(self, modelo: Any, relacion: str, grupos: Dict[Any, List[Any]]) -> None:
+        self._precargadas[f"{modelo.__name__}.{relacion}"] = grupos
+
+    def relacion(self, obj: Any, nombre: str) -> Any:
+        """Devuelve la relación del objeto, usando la precarga si es dinámica"""
+        clave = f"{type(obj).__name__}.{nombre}"
+        if clave in self._precargadas:
+            return self._precargadas[clave].get(obj.id, [])
+        return getattr(obj, nombre)
+
+
+class Serializer:
+    """Serializa instancias de un modelo y declara las relaciones que recorre
+
+    Args:
+        campos: Columnas a incluir tal cual (el proveedor JSON pasa las fechas a ISO 8601)
+        relaciones: Serializadores anidados por nombre de relación
+        calculados: Campos derivados, ``fn(obj, contexto) -> valor``
+        requiere: Rutas de relaciones que usan los calculados (``'vehiculo.cliente'``)
+        primero: Para colecciones, serializar solo el primer elemento (o None)
+        clave: Nombre del campo de salida cuando se anida (por defecto, la relación)
+    """
+
+    modelo: Any = None
+    campos: Sequence[str] = ('id',)
+
+    def __init__(
+        self,
+        campos: Optional[Sequence[str]] = None,
+        relaciones: Optional[Dict[str, 'Serializer']] = None,
+        calculados: Optional[Dict[str, Callable[[Any, Contexto], Any]]] = None,
+        requiere: Sequence[str] = (),
+        primero: bool = False,
+        clave: Optional[str] = None
+    ):
+        if campos is not None:
+            self.campos = tuple(campos)
+        self.relaciones = relaciones or {}
+        self.calculados = calculados or {}
+        self.requiere = tuple(requiere)
+        self.primero = primero
+        self.clave = clave
+
+    # ========== CARGA ==========
+
+    def _propiedad(self, nombre: str):
+        return inspect(self.modelo).relationships[nombre]
+
+    @staticmethod
+    def _es_dinamica(propiedad) -> bool:
+        return propiedad.lazy == 'dynamic'
+
+    def _arbol(self) -> Dict[str, Any]:
+        """Relaciones a cargar: nombre -> (serializador anidado o None, subrutas)"""
+        arbol: Dict[str, Any] = {}
+        for nombre, anidado in self.relaciones.items():
+            arbol[nombre] = [anidado, []]
+        for ruta in self.requiere:
+            nombre, _, resto = ruta.partition('.')
+            arbol.setdefault(nombre, [None, []])
+            if resto:
+                arbol[nombre][1].append(resto)
+        return arbol
+
+    def opciones(self) -> List[Any]:
+        """Opciones de carga anticipada para ``query.options(...)``"""
+        opciones = []
+        for nombre, (anidado, subrutas) in self._arbol().items():
+            propiedad = self._propiedad(nombre)
+            if self._es_dinamica(propiedad):
+                # Se precargan en bloque en serializar_lista
+                continue
+            atributo = getattr(self.modelo, nombre)
+            carga = selectinload(atributo) if propiedad.uselist else joinedload(atributo)
+
+            hijo = anidado or Serializer.para(propiedad.mapper.class_)
+            hijo = hijo.con_requisitos(subrutas)
+            sub_opciones = hijo.opciones()
+            opciones.append(carga.options(*sub_opciones) if sub_opciones else carga)
+        return opciones
+
+    def aplicar(self, query: Any) -> Any:
+        """Añade a la consulta las opciones de carga que necesita el serializador"""
+        return query.options(*self.opciones())
+
+    def con_requisitos(self, requiere: Iterable[str]) -> 'Serializer':
+        """Copia del serializador con rutas de relaciones adicionales"""
+        requiere = tuple(requiere)
+        if not requiere:
+            return self
+        copia = type(self)(self.campos, self.relaciones, self.calculados,
+                           self.requiere + requiere, self.primero, self.clave)
+        copia.modelo = self.modelo
+        return copia
+
+    @classmethod
+    def para(cls, modelo: Any) -> 'Serializer':
+        """Serializador mínimo para un modelo sin serializador declarado"""
+        serializador = cls(campos=())
+        serializador.modelo = modelo
+        return serializador
+
+    def precargar(self, objetos: List[Any], contexto: Contexto) -> None:
+        """Carga en bloque las relaciones dinámicas (una consulta por relación)"""
+        objetos = [o for o in objetos if o is not None]
+        if not objetos:
+            return
+
+        for nombre, (anidado, subrutas) in self._arbol().items():
+            propiedad = self._propiedad(nombre)
+            destino = propiedad.mapper.class_
+
+            if self._es_dinamica(propiedad):
+                if propiedad.secondary is not None or len(propiedad.local_remote_pairs) != 1:
+                    raise ValueError(f"No se puede precargar la relación {self.modelo.__name__}.{nombre}")
+                _, remota = propiedad.local_remote_pairs[0]
+                clave = propiedad.mapper.get_property_by_column(remota).key
+                ids = [o.id for o in objetos]
+                grupos: Dict[Any, List[Any]] = defaultdict(list)
+                for relacionado in db.session.execute(
+                    select(destino).where(remota.in_(ids)).order_by(destino.id)
+                ).scalars():
+                    grupos[getattr(relacionado, clave)].append(relacionado)
+                contexto.guardar(self.modelo, nombre, grupos)
+                hijos = [r for grupo in grupos.values() for r in grupo]
+            else:
+                hijos = []
+                for o in objetos:
+                    valor = getattr(o, nombre)
+                    if propiedad.uselist:
+                        hijos.extend(valor)
+                    elif valor is not None:
+                        hijos.append(valor)
+
+            hijo = (anidado or Serializer.para(destino)).con_requisitos(subrutas)
+            hijo.precargar(hijos, contexto)
+
+    # ========== SERIALIZACIÓN ==========
+
+    def _serializar(self, obj: Any, contexto: Contexto) -> Optional[Dict]:
+        if obj is None:
+            return None
+        datos = {campo: getattr(obj, campo) for campo in self.campos}
+        for nombre, anidado in self.relaciones.items():
+            valor = contexto.relacion(obj, nombre)
+            clave = anidado.clave or nombre
+            if self._propiedad(nombre).uselist:
+                valor = list(valor)
+                if anidado.primero:
+                    datos[clave] = anidado._serializar(valor[0], contexto) if valor else None
+                else:
+                    datos[clave] = [anidado._serializar(v, contexto) for v in valor]
+            else:
+                datos[clave] = anidado._serializar(valor, contexto)
+        for nombre, funcion in self.calculados.items():
+            datos[nombre] = funcion(obj, contexto)
+        return datos
+
+    def serializar_lista(self, objetos: Iterable[Any]) -> List[Dict]:
+        """Serializa una lista de instancias cargadas con ``aplicar``"""
+        objetos = list(objetos)
+        contexto = Contexto()
+        self.precargar(objetos, contexto)
+        return [self._serializar(o, contexto) for o in objetos]
+
+    def serializar(self, obj: Any) -> Optional[Dict]:
+        """Serializa una única instancia"""
+        return self.serializar_lista([obj])[0]
+
+
+class ServicioSerializer(Serializer):
+    modelo = Servicio
+    campos = ('id', 'titulo', 'tipo_servicio', 'descripcion', 'estado',
+              'fecha_inicio', 'fecha_fin', 'costo')
+
+
+class VehiculoSerializer(Serializer):
+    modelo = Vehiculo
+    campos = ('id', 'placa', 'marca', 'modelo', 'año')
+
+
+class ClienteSerializer(Serializer):
+    modelo = Cliente
+    campos = ('id', 'nombre', 'apellido', 'email', 'telefono')
+
+
+class RepuestoSerializer(Serializer):
+    modelo = Repuesto
+    campos = ('id', 'codigo', 'nombre', 'categoria', 'stock', 'precio_venta')
+
+
+class FacturaSerializer(Serializer):
+    modelo = Factura
+    campos = ('id', 'numero', 'total', 'estado')
+
+
+class MecanicoSerializer(Serializer):
+    modelo = Mecanico
+    campos = ('id', 'nombre', 'apellido', 'especialidad')
+
+
+def nombre_completo(persona: Any) -> Optional[str]:
+    """'Nombre Apellido' de un cliente o mecánico, o None"""
+    if persona is None:
+        return None
+    return f"{persona.nombre} {persona.apellido}"
@@ -68,6 +68,35 @@ export const getServicios = async () => {
   }
 };
 
+// Página de servicios filtrada (estado, mecanico_id, fecha_desde, fecha_hasta)
+// paginada por cursor; pasar next_cursor de la respuesta para la siguiente
+export const getServiciosPagina = async (filtros = {}, cursor = '', perPage = 50) => {
+  try {
+    const response = await api.get('/servicios/', {
+      params: { ...filtros, cursor, per_page: perPage },
+      timeout: 10000
+    });
+    return response.data;
+  } catch (error) {
+    return handleApiError(error, 'getServiciosPagina');
+  }
+};
+
+// Búsqueda federada en clientes, vehículos, servicios y repuestos. Responde
+// { termino, resultados: [{ tipo, relevancia, ...campos }], hay_mas: { clientes, vehiculos, ... } }
+// con los resultados de todos los tipos mezclados y ordenados por relevancia
+export const buscar = async (q, { tipos = [], limit = 5, top = 20 } = {}) => {
+  try {
+    const response = await api.get('/buscar', {
+      params: { q, limit, top, ...(tipos.length ? { tipos: tipos.join(',') } : {}) },
+      timeout: 8000
+    });
+    return response.data;
+  } catch (error) {
+    return handleApiError(error, 'buscar');
+  }
+};
+
 export const getServicio = async (id) => {
   try {
     console.log(`API: Obteniendo servicio ID ${id}`);
@@ -416,6 +445,17 @@ export const getEstadisticas = async () => {
   }
 };
 
+// Suscripción a los cambios del dashboard por Server-Sent Events.
+// onResumen recibe el resumen completo al conectar y onCambio cada cambio
+// posterior. Devuelve una función para cerrar la conexión.
+export const suscribirDashboard = (onResumen, onCambio) => {
+  const token = localStorage.getItem('token');
+  const fuente = new EventSource(`${api.defaults.baseURL}/dashboard/stream?jwt=${encodeURIComponent(token || '')}`);
+  fuente.addEventListener('resumen', (e) => onResumen(JSON.parse(e.data)));
+  fuente.addEventListener('cambio', (e) => onCambio(JSON.parse(e.data)));
+  return () => fuente.close();
+};
+
 // Auth
 export const login = async (credentials) => {
   try {
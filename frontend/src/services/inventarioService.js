@@ -87,5 +87,15 @@ export const inventarioService = {
         } catch (error) {
             throw error.response?.data || error;
         }
+    },
+
+    // Crear varios movimientos en una sola petición
+    createMovimientosBulk: async (movimientos, atomico = false) => {
+        try {
+            const response = await axiosInstance.post(`${INVENTARIO_URL}/movimientos/bulk`, { movimientos, atomico });
+            return response.data;
+        } catch (error) {
+            throw error.response?.data || error;
+        }
     }
 }; 
\ No newline at end of file